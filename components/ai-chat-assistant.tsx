@@ -1,6 +1,7 @@
 "use client"
 
 import { useState, useRef, useEffect } from "react"
+import { useSession } from "next-auth/react"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
@@ -8,6 +9,8 @@ import { Badge } from "@/components/ui/badge"
 import { ScrollArea } from "@/components/ui/scroll-area"
 import { Loader2, MessageCircle, User, Bot, Send } from "lucide-react"
 
+const SYSTEM_PROMPT = "You are a helpful career advisor and resume expert. Provide practical, actionable advice for job seekers, resume writing, interview preparation, and career development. Keep responses concise but informative."
+
 interface ChatMessage {
   role: 'user' | 'assistant'
   content: string
@@ -15,6 +18,9 @@ interface ChatMessage {
 }
 
 export function AIChatAssistant() {
+  const { data: authSession } = useSession()
+  // The AI server shares upstream rate limits fairly across user roles
+  const role = authSession?.user?.role
   const [messages, setMessages] = useState<ChatMessage[]>([
     {
       role: 'assistant',
@@ -24,6 +30,10 @@ export function AIChatAssistant() {
   ])
   const [inputMessage, setInputMessage] = useState("")
   const [isLoading, setIsLoading] = useState(false)
+  // Server-side session: the server keeps (and compacts) the history, so only the new message is sent
+  const [sessionId, setSessionId] = useState<string | null>(null)
+  // Set once the server answers 503 (sessions disabled); the recent history is then sent with each message
+  const [sessionsDisabled, setSessionsDisabled] = useState(false)
   const scrollAreaRef = useRef<HTMLDivElement>(null)
 
   const scrollToBottom = () => {
@@ -49,30 +59,51 @@ export function AIChatAssistant() {
     setInputMessage("")
     setIsLoading(true)
 
-    try {
-      const response = await fetch('http://localhost:5001/api/ai/chat', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          messages: [
-            {
-              role: "system",
-              content: "You are a helpful career advisor and resume expert. Provide practical, actionable advice for job seekers, resume writing, interview preparation, and career development. Keep responses concise but informative."
-            },
-            ...messages.slice(-5), // Include last 5 messages for context
-            userMessage
-          ].map(msg => ({ role: msg.role, content: msg.content })),
-          model: "meta/llama-3.1-8b-instruct",
-          max_tokens: 500,
-          temperature: 0.7
-        })
+    const post = (body: object) => fetch('http://localhost:5001/api/ai/chat', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(role ? { 'X-User-Role': role } : {}),
+      },
+      body: JSON.stringify({
+        ...body,
+        model: "meta/llama-3.1-8b-instruct",
+        max_tokens: 500,
+        temperature: 0.7
       })
+    })
+
+    const requestReply = (session: string | null) => post({
+      session_id: session ?? undefined,
+      message: userMessage.content,
+      system: SYSTEM_PROMPT, // Only used when a new session is started
+    })
+
+    const requestStateless = () => post({
+      messages: [
+        { role: "system", content: SYSTEM_PROMPT },
+        ...messages.slice(-5), // Include last 5 messages for context
+        userMessage
+      ].map(msg => ({ role: msg.role, content: msg.content })),
+    })
+
+    try {
+      let response = sessionsDisabled ? await requestStateless() : await requestReply(sessionId)
+      if (response.status === 404 && sessionId) {
+        // Session expired on the server: start a new one
+        response = await requestReply(null)
+      }
+      if (response.status === 503 && !sessionsDisabled) {
+        // Sessions are disabled on the server: send the history ourselves
+        setSessionsDisabled(true)
+        setSessionId(null)
+        response = await requestStateless()
+      }
 
       const result = await response.json()
       
       if (result.success) {
+        setSessionId(result.session_id ?? null)
         const assistantMessage: ChatMessage = {
           role: 'assistant',
           content: result.content,
@@ -1,6 +1,7 @@
 "use client"
 
 import { useState } from "react"
+import { useSession } from "next-auth/react"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Textarea } from "@/components/ui/textarea"
@@ -15,6 +16,9 @@ interface AIAnalysisResult {
 }
 
 export function AIResumeAnalyzer() {
+  const { data: session } = useSession()
+  // The AI server shares upstream rate limits fairly across user roles
+  const role = session?.user?.role
   const [resumeContent, setResumeContent] = useState("")
   const [analysis, setAnalysis] = useState<AIAnalysisResult | null>(null)
   const [isAnalyzing, setIsAnalyzing] = useState(false)
@@ -33,6 +37,7 @@ export function AIResumeAnalyzer() {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          ...(role ? { 'X-User-Role': role } : {}),
         },
         body: JSON.stringify({
           resume_content: resumeContent
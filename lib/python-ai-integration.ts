@@ -7,20 +7,105 @@ interface PythonAPIResponse<T> {
   error?: string;
 }
 
+export type BatchTaskOp = 'analyze' | 'enhance' | 'skills' | 'cover-letter';
+
+export interface BatchTask {
+  id?: string;
+  op: BatchTaskOp;
+  resume_content?: string;
+  resume_data?: any;
+  job_description?: string;
+  company_name?: string;
+}
+
+export interface BatchTaskResult {
+  index: number;
+  id?: string | null;
+  op: BatchTaskOp;
+  success: boolean;
+  error?: string;
+  analysis?: string;
+  enhancement?: string;
+  skills?: string[];
+  cover_letter?: string;
+  // Served from the cached result of a near-duplicate input
+  approximate?: boolean;
+  similarity?: number;
+}
+
+export type SkillType = 'technical' | 'soft' | 'experience' | 'education';
+
+export interface TypedSkill {
+  name: string;
+  type: SkillType;
+}
+
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed';
+
+export interface AIJob {
+  id: string;
+  op: BatchTaskOp;
+  status: JobStatus;
+  attempts: number;
+  created_at: number;
+  started_at?: number | null;
+  finished_at?: number | null;
+  expires_at?: number | null;
+  result?: Omit<BatchTaskResult, 'index' | 'id' | 'op' | 'success' | 'error'> & { models?: string[] };
+  error?: string;
+}
+
+export interface ChatSession {
+  id: string;
+  summary: string;       // Rolling summary of the compacted older messages
+  summarized: number;    // Number of messages folded into the summary
+  messages: Array<{role: string, content: string}>;  // Recent messages kept verbatim
+  created_at: number;
+  expires_at: number;
+}
+
+export interface FullReport {
+  report: {
+    analysis?: string;
+    skills?: string[];
+    skill_match?: {matched: string[], missing: string[], coverage: number};
+    enhancement?: string;
+    cover_letter?: string;
+  };
+  errors: Record<string, string>;  // Failed (or skipped) steps; the others are still reported
+  timings: Record<string, {started: number | null, seconds: number | null}>;
+  seconds: number;
+}
+
+export type UserRole = 'recruiter' | 'candidate';
+
 class PythonAIService {
   private baseUrl: string;
+  private role?: UserRole;
 
-  constructor(baseUrl: string = 'http://localhost:5001') {
+  constructor(baseUrl: string = 'http://localhost:5001', role?: UserRole) {
     this.baseUrl = baseUrl;
+    this.role = role;
+  }
+
+  // The server shares upstream rate limits fairly across roles (X-User-Role)
+  setRole(role?: UserRole) {
+    this.role = role;
+  }
+
+  private headers(extra?: Record<string, string>): Record<string, string> {
+    return {
+      'Content-Type': 'application/json',
+      ...(this.role ? { 'X-User-Role': this.role } : {}),
+      ...extra,
+    };
   }
 
   private async makeRequest<T>(endpoint: string, data?: any): Promise<T> {
     try {
       const response = await fetch(`${this.baseUrl}${endpoint}`, {
         method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
+        headers: this.headers(),
         body: JSON.stringify(data),
       });
 
@@ -61,10 +146,51 @@ class PythonAIService {
     return response.content;
   }
 
+  // Chat with a server-side session: only the new message is sent, the server keeps and
+  // compacts the history. Omit sessionId to start a session; reuse the returned one afterwards
+  async chatSession(message: string, options: {
+    sessionId?: string;
+    system?: string;
+    model?: string;
+    max_tokens?: number;
+    temperature?: number;
+    top_p?: number;
+  } = {}): Promise<{content: string, sessionId: string}> {
+    const {sessionId, ...rest} = options;
+    const response = await this.makeRequest<{content: string, session_id: string}>('/api/ai/chat', {
+      message,
+      session_id: sessionId,
+      ...rest
+    });
+    return {content: response.content, sessionId: response.session_id};
+  }
+
+  async getChatSession(sessionId: string): Promise<ChatSession> {
+    const response = await fetch(`${this.baseUrl}/api/ai/chat/sessions/${encodeURIComponent(sessionId)}`, {
+      headers: this.headers(),
+    });
+    const result = await response.json();
+    if (!response.ok || !result.success) {
+      throw new Error(result.error || `HTTP error! status: ${response.status}`);
+    }
+    return result.session;
+  }
+
+  // Analysis, skills, skill match, enhancement and cover letter in one request; steps run concurrently
+  async fullReport(resume: any, jobDescription: string, companyName?: string): Promise<FullReport> {
+    return this.makeRequest<FullReport>('/api/ai/full-report', {
+      ...(typeof resume === 'string' ? {resume_content: resume} : {resume_data: resume}),
+      job_description: jobDescription,
+      company_name: companyName
+    });
+  }
+
   // Resume analysis
-  async analyzeResume(resumeContent: string): Promise<string> {
+  // chunked forces map-reduce analysis on or off; by default the server chunks long resumes
+  async analyzeResume(resumeContent: string, options: {chunked?: boolean} = {}): Promise<string> {
     const response = await this.makeRequest<{analysis: string}>('/api/ai/analyze-resume', {
-      resume_content: resumeContent
+      resume_content: resumeContent,
+      chunked: options.chunked
     });
     return response.analysis;
   }
@@ -96,6 +222,219 @@ class PythonAIService {
     return response.skills;
   }
 
+  // Structured skill extraction: typed skills, most important first
+  // The server stops the model as soon as maxSkills have been generated
+  async extractTypedSkills(jobDescription: string, maxSkills: number = 15): Promise<TypedSkill[]> {
+    const response = await this.makeRequest<{typed_skills: TypedSkill[], truncated?: boolean}>('/api/ai/extract-job-skills', {
+      job_description: jobDescription,
+      structured: true,
+      max_skills: maxSkills
+    });
+    if (response.truncated) {
+      console.warn(`Skill extraction ran out of tokens after ${response.typed_skills.length} of ${maxSkills} skills`);
+    }
+    return response.typed_skills;
+  }
+
+  // Streams typed skills (NDJSON) as the model writes them; breaking out of the loop stops generation
+  async *streamTypedSkills(jobDescription: string, maxSkills: number = 15): AsyncGenerator<TypedSkill> {
+    const controller = new AbortController();
+    const response = await fetch(`${this.baseUrl}/api/ai/extract-job-skills/stream`, {
+      method: 'POST',
+      headers: this.headers(),
+      body: JSON.stringify({ job_description: jobDescription, max_skills: maxSkills }),
+      signal: controller.signal,
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    // The stream ends with {"truncated": true} if the model ran out of tokens before maxSkills
+    const parse = (line: string): TypedSkill | null => {
+      const item = JSON.parse(line);
+      if (item.truncated) {
+        console.warn(`Skill extraction ran out of tokens before ${maxSkills} skills`);
+        return null;
+      }
+      return item as TypedSkill;
+    };
+
+    try {
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+          const line = buffer.slice(0, newline).trim();
+          buffer = buffer.slice(newline + 1);
+          const skill = line ? parse(line) : null;
+          if (skill) yield skill;
+        }
+      }
+      const skill = buffer.trim() ? parse(buffer) : null;
+      if (skill) yield skill;
+    } finally {
+      controller.abort();
+    }
+  }
+
+  // Semantic search: add documents (e.g. jobs) to the server's embedding index
+  async indexDocuments(items: Array<{id: string, text: string}>): Promise<number> {
+    const response = await this.makeRequest<{total: number}>('/api/ai/semantic/index', { items });
+    return response.total;
+  }
+
+  // Semantic search: top-k indexed document ids for each query text
+  async semanticSearch(queries: string[], options?: {
+    topK?: number;
+    nprobe?: number;
+  }): Promise<Array<Array<{id: string, score: number}>>> {
+    const response = await this.makeRequest<{results: Array<Array<{id: string, score: number}>>}>('/api/ai/semantic/search', {
+      queries,
+      top_k: options?.topK,
+      nprobe: options?.nprobe
+    });
+    return response.results;
+  }
+
+  // Streaming completions: yields content deltas as the upstream produces them (SSE)
+  // Breaking out of the loop aborts the request, which also aborts the upstream call
+  private async *streamRequest(endpoint: string, data: any): AsyncGenerator<string> {
+    const controller = new AbortController();
+    const response = await fetch(`${this.baseUrl}${endpoint}`, {
+      method: 'POST',
+      headers: this.headers({ 'Accept': 'text/event-stream' }),
+      body: JSON.stringify(data),
+      signal: controller.signal,
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    try {
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+          const event = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          for (const line of event.split('\n')) {
+            if (!line.startsWith('data:')) continue;
+            const payload = line.slice(5).trim();
+            if (payload === '[DONE]') return;
+            const delta = JSON.parse(payload).choices?.[0]?.delta?.content;
+            if (delta) yield delta;
+          }
+        }
+      }
+    } finally {
+      controller.abort();
+    }
+  }
+
+  chatCompletionStream(messages: Array<{role: string, content: string}>, options?: {
+    model?: string;
+    max_tokens?: number;
+    temperature?: number;
+    top_p?: number;
+  }): AsyncGenerator<string> {
+    return this.streamRequest('/api/ai/chat/stream', { messages, ...options });
+  }
+
+  enhanceResumeStream(resumeData: any, jobDescription?: string): AsyncGenerator<string> {
+    return this.streamRequest('/api/ai/enhance-resume/stream', {
+      resume_data: resumeData,
+      job_description: jobDescription
+    });
+  }
+
+  generateCoverLetterStream(resumeData: any, jobDescription: string, companyName: string): AsyncGenerator<string> {
+    return this.streamRequest('/api/ai/generate-cover-letter/stream', {
+      resume_data: resumeData,
+      job_description: jobDescription,
+      company_name: companyName
+    });
+  }
+
+  // Batch tasks: yields each result as soon as the server finishes it (NDJSON stream)
+  async *batch(tasks: BatchTask[], options?: { concurrency?: number }): AsyncGenerator<BatchTaskResult> {
+    const response = await fetch(`${this.baseUrl}/api/ai/batch`, {
+      method: 'POST',
+      headers: this.headers(),
+      body: JSON.stringify({ tasks, ...options }),
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let newline;
+      while ((newline = buffer.indexOf('\n')) >= 0) {
+        const line = buffer.slice(0, newline).trim();
+        buffer = buffer.slice(newline + 1);
+        if (line) yield JSON.parse(line) as BatchTaskResult;
+      }
+    }
+
+    if (buffer.trim()) yield JSON.parse(buffer) as BatchTaskResult;
+  }
+
+  // Async jobs: queue a long-running task and return its job id immediately
+  // With webhookUrl, the server POSTs the finished job there as well
+  async submitJob(task: Omit<BatchTask, 'id'>, options?: { webhookUrl?: string }): Promise<{jobId: string, deduplicated: boolean}> {
+    const response = await this.makeRequest<{job_id: string, deduplicated: boolean}>('/api/ai/jobs', {
+      ...task,
+      webhook_url: options?.webhookUrl
+    });
+    return { jobId: response.job_id, deduplicated: response.deduplicated };
+  }
+
+  async getJob(jobId: string): Promise<AIJob> {
+    const response = await fetch(`${this.baseUrl}/api/ai/jobs/${encodeURIComponent(jobId)}`, {
+      headers: this.headers(),
+    });
+    const result = await response.json();
+    if (!response.ok || !result.success) {
+      throw new Error(result.error || `HTTP error! status: ${response.status}`);
+    }
+    return result.job as AIJob;
+  }
+
+  // Poll until the job has finished (succeeded or failed)
+  async waitForJob(jobId: string, options?: { intervalMs?: number, timeoutMs?: number }): Promise<AIJob> {
+    const interval = options?.intervalMs ?? 1000;
+    const deadline = Date.now() + (options?.timeoutMs ?? 5 * 60 * 1000);
+    while (true) {
+      const job = await this.getJob(jobId);
+      if (job.status === 'succeeded' || job.status === 'failed') return job;
+      if (Date.now() > deadline) throw new Error(`Timed out waiting for job ${jobId}`);
+      await new Promise(resolve => setTimeout(resolve, interval));
+    }
+  }
+
   // Health check
   async healthCheck(): Promise<boolean> {
     try {
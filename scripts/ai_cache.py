@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Tiered response cache for NVIDIA AI chat completions
+An in-process LRU (TTL + size-bounded) in front of a shared SQLite store in WAL mode,
+so every worker of the API server sees the same cached results.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ai-responses.sqlite3")
+
+
+def cache_key(model: str, messages: List[Dict], max_tokens: int, temperature: float, top_p: float) -> str:
+    """
+    Canonical hash of a chat completion request
+
+    Messages are reduced to role/content and serialized with sorted keys and no whitespace,
+    so equal requests always hash the same regardless of dict ordering.
+    """
+    canonical = json.dumps(
+        {
+            "model": model,
+            "messages": [{"role": m.get("role"), "content": m.get("content")} for m in messages],
+            "max_tokens": max_tokens,
+            "temperature": float(temperature),
+            "top_p": float(top_p),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with per-entry TTL and entry/byte limits"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class SQLiteCache:
+    """Shared on-disk cache tier backed by SQLite in WAL mode"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = 24 * 3600.0, max_entries: int = 100000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+            (key, value, now + (ttl if ttl is not None else self.ttl), now),
+        )
+        conn.commit()
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % 1000 == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Drop expired rows and the oldest rows beyond max_entries"""
+        conn = self._connection()
+        expired = conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),)).rowcount
+        overflow = conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        conn.commit()
+        with self._lock:
+            self.evictions += expired + overflow
+        return expired + overflow
+
+    def clear(self) -> None:
+        conn = self._connection()
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+
+
+class TieredCache:
+    """
+    Two-tier cache: in-process LRU first, shared SQLite second
+
+    Shared-tier hits are promoted into the in-process tier.
+    """
+
+    def __init__(self, memory: Optional[LRUCache] = None, shared: Optional[SQLiteCache] = None):
+        self.memory = memory or LRUCache()
+        self.shared = shared
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["TieredCache"]:
+        """
+        Build a cache from environment variables, or None if AI_CACHE_ENABLED=false
+
+        AI_CACHE_TTL, AI_CACHE_MAX_ENTRIES, AI_CACHE_MAX_BYTES, AI_CACHE_PATH
+        (set AI_CACHE_PATH to an empty string to keep the cache in-process only)
+        """
+        if os.getenv("AI_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        ttl = float(os.getenv("AI_CACHE_TTL", 3600))
+        memory = LRUCache(
+            max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", 1024)),
+            max_bytes=int(os.getenv("AI_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+            ttl=ttl,
+        )
+        path = os.getenv("AI_CACHE_PATH", DEFAULT_CACHE_PATH)
+        shared = SQLiteCache(path, ttl=ttl) if path else None
+        return cls(memory, shared)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return value
+
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                with self._lock:
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def stats(self) -> Dict:
+        """Hit, miss and eviction counters"""
+        hits = self.memory_hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions,
+            "memory_expirations": self.memory.expirations,
+            "shared_evictions": self.shared.evictions if self.shared is not None else 0,
+        }
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Record/replay transport for offline performance runs
+In record mode every upstream call goes through a PooledTransport and its response,
+with the time to first byte and the arrival time of every streamed chunk, is appended
+to a cassette (JSON Lines, gzip-compressed if the path ends in .gz). In replay mode
+the cassette answers instead of the network, with the recorded latencies (optionally
+scaled), so api-server.py can be benchmarked reproducibly without an API key.
+"""
+
+import atexit
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from ai_transport import PooledTransport, TransportConfig, retry_after_delay
+
+CASSETTE_VERSION = 1
+# Response headers kept in a cassette; bodies are stored decoded, so encodings and lengths are dropped
+RECORDED_HEADERS = ("content-type", "retry-after")
+RECORDED_HEADER_PREFIXES = ("x-ratelimit-",)
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """No recorded interaction matches a request (raised like an unreachable upstream)"""
+
+
+def request_key(payload: Optional[Dict]) -> str:
+    """
+    Canonical digest of a request payload
+
+    The model is left out, as the router may pick another one for the same prompt when
+    replayed; so are the URL and headers (API key).
+    """
+    payload = {name: value for name, value in (payload or {}).items() if name != "model"}
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_cassette(path: str) -> List[Dict]:
+    """Interactions of a cassette in recorded order; a gzip file cut short by a crash yields what was flushed"""
+    interactions = []
+    with _open(path, "r") as f:
+        try:
+            for line in f:
+                entry = json.loads(line) if line.strip() else None
+                if entry is None or "version" in entry:
+                    continue
+                interactions.append(entry)
+        except EOFError:
+            pass
+    return interactions
+
+
+def _encode_chunk(data: bytes) -> str:
+    # surrogateescape keeps multi-byte characters split across chunk boundaries byte-exact
+    return data.decode("utf-8", "surrogateescape")
+
+
+def _decode_chunk(text: str) -> bytes:
+    return text.encode("utf-8", "surrogateescape")
+
+
+def is_complete(entry: Dict) -> bool:
+    """
+    Whether a recorded interaction can be replayed: not closed before its body was read
+    (e.g. a hedged copy that lost), nor a success without a body, as older cassettes stored those
+    """
+    if entry.get("incomplete"):
+        return False
+    return "error" in entry or bool(entry.get("chunks")) or not 200 <= entry.get("status", 0) < 300
+
+
+class _RecordingBody:
+    """
+    Wraps a streamed urllib3 body, timing every chunk; the interaction is saved once the body is done,
+    with complete=False if it was closed before the end
+    """
+
+    def __init__(self, raw, on_done: Callable[[List[List], bool], None], started: float):
+        self._raw = raw
+        self._on_done = on_done
+        self._started = started
+        self._chunks: List[List] = []
+        self._complete = False
+        self._done = False
+
+    def stream(self, amt=None, decode_content=None) -> Iterator[bytes]:
+        try:
+            for data in self._raw.stream(amt, decode_content=decode_content):
+                if data:
+                    self._chunks.append([round(time.monotonic() - self._started, 4), _encode_chunk(data)])
+                yield data
+            self._complete = True
+        finally:
+            self._finish()
+
+    def close(self) -> None:
+        self._raw.close()
+        self._finish()
+
+    def _finish(self) -> None:
+        if not self._done:
+            self._done = True
+            self._on_done(self._chunks, self._complete)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class _ReplayBody:
+    """Yields recorded chunks, each no earlier than its (scaled) offset from the start of the request"""
+
+    def __init__(self, chunks: List[List], started: float, scale: float):
+        self._chunks = chunks
+        self._started = started
+        self._scale = scale
+        self.closed = False
+
+    def stream(self, amt=None, decode_content=None) -> Iterator[bytes]:
+        for offset, text in self._chunks:
+            if self.closed:
+                return
+            _sleep_until(self._started + offset * self._scale)
+            yield _decode_chunk(text)
+
+    def close(self) -> None:
+        self.closed = True
+
+    def release_conn(self) -> None:
+        pass
+
+
+def _sleep_until(deadline: float) -> None:
+    delay = deadline - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+class CassetteTransport:
+    """
+    Drop-in replacement for PooledTransport that records upstream calls to, or replays
+    them from, a cassette file
+
+    Replay matches a request by its payload digest, preferring a recording made with the
+    same model; repeated recordings of the same payload are served in turn. With
+    match="loose", a request that was not recorded (e.g. because a prompt changed) gets
+    a recording of the same model and streaming mode instead, so a benchmark keeps
+    realistic response sizes and timing. Responses closed before their body was read
+    (hedged copies that lost, abandoned streams) are recorded as incomplete and never replayed.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", inner: Optional[PooledTransport] = None,
+                 latency_scale: float = 1.0, match: str = "loose"):
+        """
+        Args:
+            path: Cassette file (.jsonl, or .jsonl.gz for a compressed one)
+            mode: "record" (overwrites path) or "replay"
+            inner: Transport used to reach the upstream while recording. Defaults to a new PooledTransport
+            latency_scale: Multiplier for replayed latencies (0.5 = twice as fast, 0 = no delays)
+            match: "exact" (unrecorded requests fail) or "loose"
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode} (expected record or replay)")
+        if match not in ("exact", "loose"):
+            raise ValueError(f"Unknown cassette match: {match} (expected exact or loose)")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = max(0.0, latency_scale)
+        self.match = match
+        # Replay needs neither network nor API key
+        self.offline = mode == "replay"
+        self.recorded = 0
+        self.incomplete = 0
+        self.replayed = 0
+        self.model_substitutions = 0
+        self.loose_matches = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self.inner = None
+        self.rate_limit_listeners: List[Callable[[Optional[float]], None]] = []
+        self.retry_listeners: List[Callable[[str], None]] = []
+
+        if mode == "record":
+            self.inner = inner or PooledTransport()
+            # The inner transport's lists, so 429s and retries while recording still reach the listeners
+            self.rate_limit_listeners = self.inner.rate_limit_listeners
+            self.retry_listeners = self.inner.retry_listeners
+            self._file = _open(path, "w")
+            self._write({"version": CASSETTE_VERSION})
+            # Close the file at exit so a gzip cassette gets its trailer
+            atexit.register(self.close)
+            self.config = self.inner.config
+        else:
+            # Caps replayed Retry-After delays the way PooledTransport does
+            self.config = TransportConfig.from_env()
+            self._by_key: Dict[str, List[Dict]] = {}
+            self._by_shape: Dict[Tuple, List[Dict]] = {}
+            self._by_stream: Dict[bool, List[Dict]] = {}
+            self._turns: Dict[object, int] = {}
+            for entry in read_cassette(path):
+                if not is_complete(entry):
+                    self.incomplete += 1
+                    continue
+                self._by_key.setdefault(entry["key"], []).append(entry)
+                self._by_shape.setdefault((entry.get("model"), entry.get("stream")), []).append(entry)
+                self._by_stream.setdefault(bool(entry.get("stream")), []).append(entry)
+            self.interactions = sum(len(entries) for entries in self._by_key.values())
+
+    @classmethod
+    def from_env(cls) -> Optional["CassetteTransport"]:
+        """
+        Build from environment variables, or None unless NVIDIA_CASSETTE_MODE is record or replay
+
+        NVIDIA_CASSETTE_PATH (required), NVIDIA_CASSETTE_LATENCY_SCALE (default 1.0),
+        NVIDIA_CASSETTE_MATCH (exact or loose, default loose)
+        """
+        mode = os.getenv("NVIDIA_CASSETTE_MODE", "").lower()
+        if mode in ("", "off", "false", "0", "no"):
+            return None
+        path = os.getenv("NVIDIA_CASSETTE_PATH")
+        if not path:
+            raise ValueError("NVIDIA_CASSETTE_PATH is required when NVIDIA_CASSETTE_MODE is set")
+        return cls(
+            path,
+            mode=mode,
+            latency_scale=float(os.getenv("NVIDIA_CASSETTE_LATENCY_SCALE", 1.0)),
+            match=os.getenv("NVIDIA_CASSETTE_MATCH", "loose").lower(),
+        )
+
+    def post(
+        self,
+        url: str,
+        json: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        stream: bool = False,
+        timeout: Optional[float] = None,
+        allow_redirects: bool = True
+    ) -> requests.Response:
+        """Same contract as PooledTransport.post"""
+        if self.mode == "record":
+            return self._record(url, json, headers, stream, timeout, allow_redirects)
+        return self._replay(url, json, stream)
+
+    def _write(self, entry: Dict) -> None:
+        line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def _record(self, url, payload, headers, stream, timeout, allow_redirects) -> requests.Response:
+        started = time.monotonic()
+        entry = {
+            "key": request_key(payload),
+            "model": (payload or {}).get("model"),
+            "stream": bool((payload or {}).get("stream")),
+        }
+        try:
+            response = self.inner.post(url, json=payload, headers=headers, stream=stream, timeout=timeout,
+                                       allow_redirects=allow_redirects)
+        except requests.exceptions.RequestException as e:
+            entry.update(error=type(e).__name__, ttfb=round(time.monotonic() - started, 4))
+            self._save(entry)
+            raise
+        # elapsed is the last attempt only; the offset from `started` also covers retries and backoff
+        first_byte = time.monotonic() - started if stream else response.elapsed.total_seconds()
+        entry.update(
+            status=response.status_code,
+            headers={
+                name: value for name, value in response.headers.items()
+                if name.lower() in RECORDED_HEADERS or name.lower().startswith(RECORDED_HEADER_PREFIXES)
+            },
+            ttfb=round(min(first_byte, time.monotonic() - started), 4),
+        )
+
+        def done(chunks: List[List], complete: bool) -> None:
+            entry["chunks"] = chunks
+            if not complete:
+                entry["incomplete"] = True
+            self._save(entry)
+
+        if stream:
+            response.raw = _RecordingBody(response.raw, done, started)
+        else:
+            chunks = [[round(time.monotonic() - started, 4), _encode_chunk(response.content)]] if response.content else []
+            done(chunks, True)
+        return response
+
+    def _save(self, entry: Dict) -> None:
+        self._write(entry)
+        with self._lock:
+            self.recorded += 1
+            if entry.get("incomplete"):
+                self.incomplete += 1
+
+    def _take(self, group: object, entries: List[Dict]) -> Dict:
+        with self._lock:
+            turn = self._turns.get(group, 0)
+            self._turns[group] = turn + 1
+        return entries[turn % len(entries)]
+
+    def _lookup(self, payload: Optional[Dict]) -> Dict:
+        key = request_key(payload)
+        model, streamed = (payload or {}).get("model"), bool((payload or {}).get("stream"))
+        if key in self._by_key:
+            entries = [entry for entry in self._by_key[key] if entry.get("model") == model]
+            if entries:
+                return self._take((key, model), entries)
+            with self._lock:
+                self.model_substitutions += 1
+            return self._take(key, self._by_key[key])
+        if self.match == "loose":
+            for group, entries in (
+                (("shape", model, streamed), self._by_shape.get((model, streamed))),
+                (("stream", streamed), self._by_stream.get(streamed)),
+            ):
+                if entries:
+                    with self._lock:
+                        self.loose_matches += 1
+                    return self._take(group, entries)
+        with self._lock:
+            self.misses += 1
+        raise CassetteMiss(f"No recorded interaction for request {key} in {self.path}")
+
+    def _replay(self, url, payload, stream) -> requests.Response:
+        started = time.monotonic()
+        entry = self._lookup(payload)
+        with self._lock:
+            self.replayed += 1
+        scale = self.latency_scale
+        _sleep_until(started + entry.get("ttfb", 0.0) * scale)
+        if "error" in entry:
+            error = getattr(requests.exceptions, entry["error"], requests.exceptions.ConnectionError)
+            raise error(f"Recorded upstream failure ({entry['error']})")
+
+        response = requests.Response()
+        response.url = url
+        response.status_code = entry["status"]
+        response.reason = http.client.responses.get(entry["status"], "")
+        response.headers = CaseInsensitiveDict(entry.get("headers") or {})
+        response.encoding = "utf-8"
+        response.elapsed = timedelta(seconds=entry.get("ttfb", 0.0) * scale)
+        chunks = entry.get("chunks") or []
+        if stream:
+            response.raw = _ReplayBody(chunks, started, scale)
+        else:
+            if chunks:
+                _sleep_until(started + chunks[-1][0] * scale)
+            response._content = b"".join(_decode_chunk(text) for _, text in chunks)
+            response._content_consumed = True
+
+        if response.status_code == 429:
+            delay = retry_after_delay(self.config, response.headers)
+            for listener in self.rate_limit_listeners:
+                listener(delay)
+        return response
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = {"mode": self.mode, "path": self.path}
+            if self.mode == "record":
+                stats.update(recorded=self.recorded, incomplete=self.incomplete)
+            else:
+                stats.update(
+                    interactions=self.interactions, skipped_incomplete=self.incomplete, replayed=self.replayed,
+                    model_substitutions=self.model_substitutions, loose_matches=self.loose_matches, misses=self.misses, latency_scale=self.latency_scale
+                )
+            return stats
+
+    def close(self) -> None:
+        """Flush and close the cassette (and the inner transport when recording)"""
+        with self._lock:
+            file, self._file = self._file, None
+        if file is not None:
+            file.close()
+        if self.inner is not None:
+            self.inner.close()
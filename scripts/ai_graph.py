@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Concurrent task graph for multi-step AI workflows
+Each task names the tasks whose results it needs and starts as soon as they have
+finished, so independent branches run side by side and the whole graph takes about
+as long as its slowest path. A failed task fails only the tasks that depend on it.
+Tasks see the graph's deadline through time_left(), so their upstream calls can stop
+waiting when the graph gives up on them instead of holding a worker and a connection.
+"""
+
+import contextvars
+import time
+from contextvars import ContextVar
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Monotonic deadline of the graph a task belongs to; None outside a graph or without a timeout
+_deadline: ContextVar[Optional[float]] = ContextVar("ai_graph_deadline", default=None)
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current graph task's deadline (0 once passed); None without one"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+@dataclass
+class TaskResult:
+    """Outcome of one graph task"""
+    name: str
+    value: Any = None
+    error: Optional[str] = None
+    started: Optional[float] = None   # Seconds after the graph started
+    seconds: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def timing(self) -> Dict:
+        return {"started": self.started, "seconds": self.seconds}
+
+
+@dataclass
+class _Task:
+    name: str
+    fn: Callable[..., Any]
+    deps: Sequence[str] = field(default_factory=tuple)
+
+
+class TaskGraph:
+    """
+    A DAG of named tasks
+
+    Example:
+        graph = TaskGraph()
+        graph.add("skills", lambda: extract(job))
+        graph.add("letter", lambda skills: write(resume, skills), deps=["skills"])
+        results = graph.run(executor)
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, _Task] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Sequence[str] = ()) -> None:
+        """
+        Add a task; fn is called with the results of deps as keyword arguments
+
+        Dependencies must be added first, which also rules out cycles.
+        """
+        if name in self._tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        missing = [dep for dep in deps if dep not in self._tasks]
+        if missing:
+            raise ValueError(f"Task {name} depends on unknown task(s): {', '.join(missing)}")
+        self._tasks[name] = _Task(name, fn, tuple(deps))
+
+    def run(self, executor: Executor, timeout: Optional[float] = None) -> Dict[str, TaskResult]:
+        """
+        Run every task on executor, each as soon as its dependencies have succeeded
+
+        Tasks run in a copy of the caller's context, so contextvars such as the scheduling
+        class and model recording apply inside them. Tasks not finished within timeout
+        seconds are reported as errors: queued ones are cancelled, and running ones are not
+        interrupted but can check time_left() to bound their own waits.
+
+        Returns:
+            TaskResult per task name, in the order tasks were added
+        """
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        results: Dict[str, TaskResult] = {}
+        running: Dict[Future, str] = {}
+        pending = dict(self._tasks)
+
+        def call(task: _Task, kwargs: Dict) -> TaskResult:
+            begin = time.monotonic()
+            result = TaskResult(task.name, started=round(begin - started, 3))
+            try:
+                result.value = task.fn(**kwargs)
+            except Exception as e:
+                result.error = str(e) or type(e).__name__
+            result.seconds = round(time.monotonic() - begin, 3)
+            return result
+
+        def schedule() -> None:
+            for name, task in list(pending.items()):
+                failed = [dep for dep in task.deps if dep in results and not results[dep].ok]
+                if failed:
+                    results[name] = TaskResult(name, error=f"Skipped: {', '.join(failed)} failed")
+                    del pending[name]
+                elif all(dep in results for dep in task.deps):
+                    kwargs = {dep: results[dep].value for dep in task.deps}
+                    context = contextvars.copy_context()
+                    context.run(_deadline.set, deadline)
+                    running[executor.submit(context.run, call, task, kwargs)] = name
+                    del pending[name]
+
+        schedule()
+        while running:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+            # A skipped task can unblock (and skip) its own dependents, so repeat until stable
+            size = -1
+            while size != len(results):
+                size = len(results)
+                schedule()
+
+        for future, name in running.items():
+            future.cancel()
+            results[name] = TaskResult(name, error="Timed out")
+        for name in pending:
+            results[name] = TaskResult(name, error="Timed out")
+        return {name: results[name] for name in self._tasks}
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Durable asynchronous job queue for long-running AI generations
+Jobs are stored in SQLite (WAL mode) and worked by a pool of threads, so a request
+only enqueues and returns a job ID; clients poll for the result or get a webhook.
+Identical payloads are de-duplicated, and finished jobs expire after a retention period.
+"""
+
+import hashlib
+import ipaddress
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+
+from resume_codec import resume_hash
+
+DEFAULT_JOBS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ai-jobs.sqlite3")
+STATUSES = ("queued", "running", "succeeded", "failed")
+WEBHOOK_TIMEOUT = 10.0
+
+
+def job_key(op: str, payload: Dict) -> str:
+    """
+    Canonical hash of a job's operation and inputs
+
+    resume_data is reduced to its canonical resume_hash(), so resumes that differ only in
+    key order or whitespace share a key. Delivery details (webhook_url) are not part of it.
+    """
+    canonical = {key: value for key, value in payload.items() if key != "webhook_url"}
+    if isinstance(canonical.get("resume_data"), dict):
+        canonical["resume_data"] = resume_hash(canonical["resume_data"])
+    text = json.dumps({"op": op, "payload": canonical}, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+
+def post_pinned(url: str, address: str, body: Dict, timeout: float = WEBHOOK_TIMEOUT) -> int:
+    """
+    POST JSON to url over a connection to address, a checked IP of its host; returns the status
+
+    The host name is still sent as Host and used for TLS (SNI and certificate checks), but is not
+    resolved again, so DNS cannot point the connection elsewhere after the check. Redirects are
+    not followed.
+    """
+    parsed = urlparse(url)
+    host = parsed.hostname
+    if parsed.scheme == "https":
+        pool = urllib3.HTTPSConnectionPool(
+            address, parsed.port or 443, timeout=timeout, retries=False, server_hostname=host,
+            assert_hostname=host, cert_reqs="CERT_REQUIRED", ca_certs=requests.certs.where()
+        )
+    else:
+        pool = urllib3.HTTPConnectionPool(address, parsed.port or 80, timeout=timeout, retries=False)
+    target = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+    headers = {"Host": parsed.netloc.rsplit("@", 1)[-1], "Content-Type": "application/json"}
+    with pool:
+        response = pool.urlopen("POST", target, body=json.dumps(body).encode("utf-8"), headers=headers,
+                                redirect=False, assert_same_host=False)
+    return response.status
+
+class JobQueue:
+    """
+    SQLite-backed job queue with a worker thread pool
+
+    Workers claim the oldest queued job in a write transaction, so several server
+    processes can share one queue file. A claimed job holds a lease that its worker
+    renews while the job runs; if the process dies, the job is picked up again once the
+    lease runs out (up to max_attempts runs). The attempt number is the claim token: a
+    worker whose claim was taken over cannot finish the job or send its webhooks.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[str, Dict, Optional[str]], Dict],
+        path: str = DEFAULT_JOBS_PATH,
+        workers: int = 4,
+        retention: float = 24 * 3600.0,
+        lease: float = 600.0,
+        max_attempts: int = 3,
+        poll_interval: float = 1.0,
+        webhook_hosts: Optional[List[str]] = None,
+        transport=None
+    ):
+        """
+        Initialize the queue (workers start with start())
+
+        Args:
+            runner: runner(op, payload, tenant) performs a job and returns its result fields
+            path: SQLite file
+            workers: Worker threads in this process
+            retention: Seconds finished jobs are kept before they expire
+            lease: Seconds a claimed job may run before another worker may take it over
+            max_attempts: Runs before a job whose worker keeps dying is failed
+            poll_interval: Seconds between checks for jobs queued by other processes
+            webhook_hosts: If given, webhooks may only be sent to these hosts; otherwise to any host
+                that resolves to public addresses only (no loopback, private or link-local targets)
+            transport: Object with post(url, json=..., allow_redirects=...) used to deliver webhooks to
+                allowlisted hosts; others are sent to the checked address by post_pinned(). None disables webhooks
+        """
+        self.runner = runner
+        self.path = path
+        self.workers = workers
+        self.retention = retention
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.webhook_hosts = webhook_hosts
+        self.transport = transport
+        self.submitted = 0
+        self.deduplicated = 0
+        self.webhooks_sent = 0
+        self.webhooks_failed = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = False
+        self._threads: List[threading.Thread] = []
+        self._last_prune = 0.0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, key TEXT NOT NULL, op TEXT NOT NULL, payload TEXT NOT NULL, tenant TEXT, "
+            "status TEXT NOT NULL, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, lease_until REAL, expires_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key)")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_webhooks ("
+            "job_id TEXT NOT NULL, url TEXT NOT NULL, delivered_at REAL, PRIMARY KEY (job_id, url))"
+        )
+
+    @classmethod
+    def from_env(cls, runner: Callable[[str, Dict, Optional[str]], Dict], transport=None) -> Optional["JobQueue"]:
+        """
+        Build a queue from environment variables, or None if AI_JOBS_ENABLED=false
+
+        AI_JOBS_PATH, AI_JOBS_WORKERS, AI_JOBS_RETENTION (seconds), AI_JOBS_LEASE (seconds),
+        AI_JOBS_WEBHOOK_HOSTS (comma-separated allowlist; empty allows any publicly routable host)
+        """
+        if os.getenv("AI_JOBS_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        hosts = [host.strip().lower() for host in os.getenv("AI_JOBS_WEBHOOK_HOSTS", "").split(",") if host.strip()]
+        return cls(
+            runner,
+            path=os.getenv("AI_JOBS_PATH", DEFAULT_JOBS_PATH),
+            workers=int(os.getenv("AI_JOBS_WORKERS", 4)),
+            retention=float(os.getenv("AI_JOBS_RETENTION", 24 * 3600)),
+            lease=float(os.getenv("AI_JOBS_LEASE", 600)),
+            webhook_hosts=hosts or None,
+            transport=transport,
+        )
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads; transactions are explicit
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return conn
+
+    def check_webhook(self, url: str) -> Optional[str]:
+        """
+        Raise ValueError unless url is an http(s) URL on an allowed host
+
+        Without an allowlist, every address the host resolves to must be publicly routable,
+        so a job cannot be used to make the server call itself or its internal network.
+
+        Returns:
+            A checked address to connect to, or None for an allowlisted host
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError("webhook_url must be an http(s) URL")
+        host = parsed.hostname.lower()
+        if self.webhook_hosts is not None:
+            if host not in self.webhook_hosts:
+                raise ValueError(f"Webhook host not allowed: {parsed.hostname}")
+            return None
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or 80, proto=socket.IPPROTO_TCP)}
+        except (socket.gaierror, UnicodeError):
+            raise ValueError(f"Webhook host does not resolve: {parsed.hostname}")
+        for address in addresses:
+            if not ipaddress.ip_address(address.split("%")[0]).is_global:
+                raise ValueError(f"Webhook host not allowed: {parsed.hostname} resolves to a non-public address")
+        return sorted(addresses)[0]
+
+    def submit(self, op: str, payload: Dict, tenant: Optional[str] = None,
+               webhook_url: Optional[str] = None) -> Tuple[Dict, bool]:
+        """
+        Enqueue a job, or join an existing unexpired job with the same inputs
+
+        Returns:
+            (job, deduplicated). A failed job is never reused, so resubmitting retries it
+        """
+        if webhook_url:
+            self.check_webhook(webhook_url)
+        key = job_key(op, payload)
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE key = ? AND status != 'failed' AND (expires_at IS NULL OR expires_at > ?) "
+                "ORDER BY created_at DESC LIMIT 1",
+                (key, now),
+            ).fetchone()
+            deduplicated = row is not None
+            if deduplicated:
+                job_id = row["id"]
+            else:
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, key, op, payload, tenant, status, created_at) VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                    (job_id, key, op, json.dumps(payload), tenant, now),
+                )
+            if webhook_url:
+                conn.execute("INSERT OR IGNORE INTO job_webhooks (job_id, url) VALUES (?, ?)", (job_id, webhook_url))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._wakeup:
+            self.submitted += 1
+            self.deduplicated += deduplicated
+            self._wakeup.notify()
+        job = self.get(job_id)
+        if deduplicated and webhook_url and job["status"] in ("succeeded", "failed"):
+            # The joined job has already finished: deliver the new webhook now
+            threading.Thread(target=self._deliver_webhooks, args=(job_id,), daemon=True).start()
+        return job, deduplicated
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Public view of a job, or None if unknown or expired"""
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or (row["expires_at"] is not None and row["expires_at"] < time.time()):
+            return None
+        return self._view(row)
+
+    def _view(self, row: sqlite3.Row) -> Dict:
+        job = {
+            "id": row["id"],
+            "op": row["op"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "expires_at": row["expires_at"],
+        }
+        if row["status"] == "succeeded":
+            job["result"] = json.loads(row["result"])
+        elif row["status"] == "failed":
+            job["error"] = row["error"]
+        return job
+
+    def claim(self) -> Optional[sqlite3.Row]:
+        """Take the oldest queued job (or one whose lease ran out) and mark it running; row["attempts"] is the claim"""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None and row["attempts"] >= self.max_attempts:
+                # Its workers keep dying (e.g. the process is killed mid-job): give up on it
+                self._finish(conn, row["id"], "failed", error="Job abandoned after repeated worker failures")
+                row = None
+            elif row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, lease_until = ? "
+                    "WHERE id = ?",
+                    (now, now + self.lease, row["id"]),
+                )
+                row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def _finish(self, conn: sqlite3.Connection, job_id: str, status: str,
+                result: Optional[Dict] = None, error: Optional[str] = None, attempt: Optional[int] = None) -> bool:
+        """Record a job's outcome; with attempt, only if that claim still holds the job. Returns whether it did"""
+        now = time.time()
+        query = (
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, expires_at = ?, lease_until = NULL "
+            "WHERE id = ?"
+        )
+        params = [status, json.dumps(result) if result is not None else None, error, now, now + self.retention, job_id]
+        if attempt is not None:
+            query += " AND status = 'running' AND attempts = ?"
+            params.append(attempt)
+        return conn.execute(query, params).rowcount == 1
+
+    def _heartbeat(self, job_id: str, attempt: int, done: threading.Event) -> None:
+        """Renew a running job's lease until done is set, so a long job is not taken over while it runs"""
+        conn = self._open()
+        try:
+            while not done.wait(self.lease / 3):
+                try:
+                    renewed = conn.execute(
+                        "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running' AND attempts = ?",
+                        (time.time() + self.lease, job_id, attempt),
+                    ).rowcount
+                except sqlite3.OperationalError:
+                    # Busy: the next beat comes well before the lease runs out
+                    continue
+                if not renewed:
+                    return
+        finally:
+            conn.close()
+
+    def run_one(self) -> bool:
+        """Claim and run one job; returns False when the queue is empty"""
+        row = self.claim()
+        if row is None:
+            return False
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(row["id"], row["attempts"], done), daemon=True)
+        heartbeat.start()
+        try:
+            result = self.runner(row["op"], json.loads(row["payload"]), row["tenant"])
+            status, error = "succeeded", None
+        except Exception as e:
+            result, status, error = None, "failed", str(e)
+        finally:
+            done.set()
+        heartbeat.join()
+        # A worker that lost its claim (e.g. it stalled past the lease) leaves the job to the new owner
+        if self._finish(self._connection(), row["id"], status, result, error, attempt=row["attempts"]):
+            self._deliver_webhooks(row["id"])
+        return True
+
+    def _deliver_webhooks(self, job_id: str) -> None:
+        """POST the finished job to each of its webhooks that has not been delivered yet"""
+        conn = self._connection()
+        urls = [r["url"] for r in conn.execute(
+            "SELECT url FROM job_webhooks WHERE job_id = ? AND delivered_at IS NULL", (job_id,)
+        )]
+        if not urls or self.transport is None:
+            return
+        job = self.get(job_id)
+        for url in urls:
+            try:
+                # Checked again at delivery (the host's DNS may have changed since submission), then sent
+                # to the address that was checked. A redirect could lead anywhere, so it counts as a failure
+                address = self.check_webhook(url)
+                if address is None:
+                    with self.transport.post(url, json=job, timeout=WEBHOOK_TIMEOUT, allow_redirects=False) as response:
+                        status = response.status_code
+                else:
+                    status = post_pinned(url, address, job)
+                if not 200 <= status < 300:
+                    raise ValueError(f"Webhook answered {status}")
+                conn.execute("UPDATE job_webhooks SET delivered_at = ? WHERE job_id = ? AND url = ?",
+                             (time.time(), job_id, url))
+                sent = True
+            except Exception:
+                # Best effort: the result stays available for polling
+                sent = False
+            with self._lock:
+                if sent:
+                    self.webhooks_sent += 1
+                else:
+                    self.webhooks_failed += 1
+
+    def prune(self) -> int:
+        """Delete expired jobs and their webhooks"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            conn.execute(
+                "DELETE FROM job_webhooks WHERE job_id IN (SELECT id FROM jobs WHERE expires_at < ?)", (now,)
+            )
+            deleted = conn.execute("DELETE FROM jobs WHERE expires_at < ?", (now,)).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return deleted
+
+    def _work(self) -> None:
+        while True:
+            with self._wakeup:
+                if self._stopping:
+                    return
+            try:
+                ran = self.run_one()
+                if time.time() - self._last_prune > min(self.retention, 300):
+                    self._last_prune = time.time()
+                    self.prune()
+            except sqlite3.OperationalError:
+                # Database busy for longer than the connection timeout: try again later
+                ran = False
+            if not ran:
+                with self._wakeup:
+                    if not self._stopping:
+                        self._wakeup.wait(self.poll_interval)
+
+    def start(self) -> "JobQueue":
+        """Start the worker threads"""
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"ai-job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop workers after their current job"""
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def stats(self) -> Dict:
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE expires_at IS NULL OR expires_at > ? GROUP BY status",
+            (time.time(),),
+        ).fetchall()
+        counts = {status: 0 for status in STATUSES}
+        counts.update({status: count for status, count in rows})
+        with self._lock:
+            return {
+                "jobs": counts,
+                "workers": len(self._threads),
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "webhooks_sent": self.webhooks_sent,
+                "webhooks_failed": self.webhooks_failed,
+            }
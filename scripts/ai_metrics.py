@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Low-contention Prometheus-style metrics for the HireSenseAI Python API
+Every thread writes counters and histograms into its own shard without taking a
+lock; shards are only summed when /metrics is scraped. Renders the Prometheus
+text exposition format, so no client library is required.
+"""
+
+import math
+import threading
+import weakref
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# A collector returns [(name, type, help, [(labels, value)])] read from existing stats at scrape time
+Sample = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+class _Shard:
+    """One thread's metric values: {(metric, label values): float or [bucket counts..., sum, count]}"""
+
+    def __init__(self):
+        self.values: Dict[tuple, object] = {}
+
+
+def _merge(target: Dict[tuple, object], values: Dict[tuple, object]) -> None:
+    for key, value in values.items():
+        if isinstance(value, list):
+            current = target.get(key)
+            if current is None:
+                target[key] = list(value)
+            else:
+                for index, item in enumerate(value):
+                    current[index] += item
+        else:
+            target[key] = target.get(key, 0.0) + value
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, labelnames: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        values = self.registry._shard().values
+        key = (self.name, labelvalues)
+        values[key] = values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Up/down gauge (e.g. requests in flight) summed across thread shards"""
+    kind = "gauge"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        values = self.registry._shard().values
+        key = (self.name, labelvalues)
+        values[key] = values.get(key, 0.0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, labelnames, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        values = self.registry._shard().values
+        key = (self.name, labelvalues)
+        counts = values.get(key)
+        if counts is None:
+            # One slot per bucket (non-cumulative), then +Inf, sum and count
+            counts = values[key] = [0.0] * (len(self.buckets) + 3)
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        counts[index] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+
+class MetricsRegistry:
+    """
+    Registry of sharded metrics
+
+    Hot-path updates touch only the calling thread's shard (a plain dict, so no lock
+    and no contention). Shards of finished threads are folded into a retired total,
+    keeping memory bounded under thread-per-request servers.
+
+    A shard's finalizer can run inside any allocation, including one made while
+    _lock is held, so it never takes the lock: it queues the values on a deque
+    that snapshot() drains.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._local = threading.local()
+        self._live: "weakref.WeakSet[_Shard]" = weakref.WeakSet()
+        self._retired: Dict[tuple, object] = {}
+        self._retiring: "deque[Dict[tuple, object]]" = deque()
+        self._lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._live.add(shard)
+            # When the thread exits its shard is collected; keep its totals
+            weakref.finalize(shard, self._retire, shard.values)
+        return shard
+
+    def _retire(self, values: Dict[tuple, object]) -> None:
+        # deque.append is atomic; taking _lock here could deadlock (see class docstring)
+        self._retiring.append(values)
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, help_text, labelnames))
+
+    def histogram(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self, name, help_text, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Add a callback that reports values kept elsewhere (cache stats, breaker state, ...)"""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict[tuple, object]:
+        """Sum of all shards"""
+        with self._lock:
+            while self._retiring:
+                _merge(self._retired, self._retiring.popleft())
+            totals: Dict[tuple, object] = {}
+            _merge(totals, self._retired)
+            for shard in list(self._live):
+                # dict()/list() copies are atomic under the GIL, so the owner thread can keep writing
+                _merge(totals, {key: list(value) if isinstance(value, list) else value
+                                for key, value in dict(shard.values).items()})
+        return totals
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        totals = self.snapshot()
+        by_metric: Dict[str, List[Tuple[tuple, object]]] = {}
+        for (name, labelvalues), value in totals.items():
+            by_metric.setdefault(name, []).append((labelvalues, value))
+
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labelvalues, value in sorted(by_metric.get(name, [])):
+                if isinstance(metric, Histogram):
+                    cumulative = 0.0
+                    for bound, count in zip(list(metric.buckets) + [math.inf], value):
+                        cumulative += count
+                        labels = _format_labels(metric.labelnames, labelvalues, ("le", _format_value(bound)))
+                        lines.append(f"{name}_bucket{labels} {_format_value(cumulative)}")
+                    labels = _format_labels(metric.labelnames, labelvalues)
+                    lines.append(f"{name}_sum{labels} {_format_value(value[-2])}")
+                    lines.append(f"{name}_count{labels} {_format_value(value[-1])}")
+                else:
+                    lines.append(f"{name}{_format_labels(metric.labelnames, labelvalues)} {_format_value(value)}")
+
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class ServiceMetrics:
+    """The API server's metrics: HTTP requests per endpoint and upstream calls per model"""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.requests = r.counter(
+            "hiresense_http_requests_total", "HTTP requests handled", ("endpoint", "method", "status"))
+        self.request_seconds = r.histogram(
+            "hiresense_http_request_duration_seconds", "HTTP request latency including streamed bodies",
+            ("endpoint", "method"))
+        self.requests_in_flight = r.gauge(
+            "hiresense_http_requests_in_flight", "HTTP requests being handled", ("endpoint",))
+        self.upstream_ttfb = r.histogram(
+            "hiresense_upstream_ttfb_seconds", "Upstream time to response headers", ("model", "mode"))
+        self.upstream_seconds = r.histogram(
+            "hiresense_upstream_duration_seconds", "Upstream call time until the body is read", ("model", "mode"))
+        self.upstream_in_flight = r.gauge(
+            "hiresense_upstream_calls_in_flight", "Upstream calls waiting for a response", ("model",))
+        self.upstream_errors = r.counter(
+            "hiresense_upstream_errors_total", "Failed upstream calls", ("model", "reason"))
+        self.tokens = r.counter(
+            "hiresense_upstream_tokens_total", "Prompt and completion tokens of upstream calls", ("model", "kind"))
+        self.retries = r.counter(
+            "hiresense_upstream_retries_total", "Upstream retries by cause (status code or connection)", ("reason",))
+        self.rate_limited = r.counter(
+            "hiresense_upstream_rate_limited_total", "Upstream 429 responses")
+
+    def on_retry(self, reason: str) -> None:
+        self.retries.inc(reason)
+
+    def on_rate_limited(self, retry_after: Optional[float]) -> None:
+        self.rate_limited.inc()
+
+    def render(self) -> str:
+        return self.registry.render()
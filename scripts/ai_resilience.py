@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Tail latency and failure isolation for NVIDIA AI upstream calls
+Hedger sends a second copy of a request that has not answered by the observed
+p95 latency of its model and keeps whichever answers first. CircuitBreaker fails
+calls fast while a model/endpoint keeps failing, instead of tying up server threads.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+import requests
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Whether an error says the upstream is unhealthy (not that the request was bad)"""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+class LatencyWindow:
+    """Sliding window of recent latencies for one key"""
+
+    def __init__(self, size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive upstream failures;
+    open -> half-open after reset_timeout, when one trial call is let through;
+    half-open -> closed on success, or open again on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether a call could go upstream now (no side effects)"""
+        with self._lock:
+            return self.state != "open" or time.monotonic() - self._opened_at >= self.reset_timeout
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go upstream now"""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half-open"
+            if self.state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(f"Upstream circuit open after repeated failures; retry in {retry_in:.0f}s")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per (model, endpoint), created on first use"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["CircuitBreakers"]:
+        """Build from AI_BREAKER_FAILURES and AI_BREAKER_RESET; None when AI_BREAKER_FAILURES=0"""
+        failure_threshold = int(os.getenv("AI_BREAKER_FAILURES", 5))
+        if failure_threshold <= 0:
+            return None
+        return cls(failure_threshold, float(os.getenv("AI_BREAKER_RESET", 30)))
+
+    def get(self, model: str, endpoint: str) -> CircuitBreaker:
+        key = f"{model} {endpoint}"
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def available(self, model: str, endpoint: str) -> bool:
+        """Whether calls to (model, endpoint) are currently allowed"""
+        with self._lock:
+            breaker = self._breakers.get(f"{model} {endpoint}")
+        return breaker is None or breaker.available()
+
+    def call(self, model: str, endpoint: str, fn: Callable[[], Any]) -> Any:
+        """Run fn through the breaker for (model, endpoint)"""
+        breaker = self.get(model, endpoint)
+        breaker.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            if is_upstream_failure(e):
+                breaker.record_failure()
+            else:
+                # The upstream answered; a bad request says nothing about its health
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {key: breaker.stats() for key, breaker in breakers.items()}
+
+
+class Hedger:
+    """
+    Hedged requests keyed by model
+
+    A call that may be hedged runs on a hedge thread; if it has not finished by the
+    model's observed latency percentile, an identical second attempt starts and the
+    first successful result wins. Calls that cannot be hedged (too few samples, ratio
+    reached, or no free hedge thread) run on the caller's thread, so the hedge pool
+    never queues calls or limits upstream concurrency. The loser is told to stop through its cancel event, and its elapsed
+    time at cancellation is recorded as a (censored) latency sample, so the slow
+    attempts hedging cuts short still count toward the percentile. Hedging only
+    starts once min_samples latencies are known, and at most max_ratio of calls
+    are hedged so a degraded upstream does not receive double load.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        min_samples: int = 20,
+        max_ratio: float = 0.1,
+        window: int = 200,
+        max_workers: int = 32
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.window = window
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies: Dict[str, LatencyWindow] = {}
+        self.inline = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+
+    @classmethod
+    def from_env(cls) -> Optional["Hedger"]:
+        """Build from AI_HEDGE_PERCENTILE, AI_HEDGE_MAX_RATIO and AI_HEDGE_MAX_WORKERS; None unless AI_HEDGE_ENABLED=true"""
+        if os.getenv("AI_HEDGE_ENABLED", "false").lower() != "true":
+            return None
+        return cls(
+            percentile=float(os.getenv("AI_HEDGE_PERCENTILE", 95)),
+            max_ratio=float(os.getenv("AI_HEDGE_MAX_RATIO", 0.1)),
+            max_workers=int(os.getenv("AI_HEDGE_MAX_WORKERS", 32)),
+        )
+
+    def _submit(self, fn: Callable[[], Any]) -> Optional[Future]:
+        """Start fn on a free hedge thread, or return None if all are busy (never queues)"""
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        def run():
+            try:
+                return fn()
+            finally:
+                self._slots.release()
+
+        # Attempts run in the caller's context (e.g. its rate limit priority class)
+        return self._executor.submit(contextvars.copy_context().run, run)
+
+    def _window(self, key: str) -> LatencyWindow:
+        with self._lock:
+            window = self._latencies.get(key)
+            if window is None:
+                window = self._latencies[key] = LatencyWindow(self.window)
+            return window
+
+    def record(self, key: str, seconds: float) -> None:
+        self._window(key).record(seconds)
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging a call for key, or None if it should not be hedged"""
+        window = self._window(key)
+        if len(window) < self.min_samples:
+            return None
+        with self._lock:
+            if self.calls and self.hedged >= self.max_ratio * self.calls:
+                return None
+        return window.percentile(self.percentile)
+
+    def call(self, key: str, attempt: Callable[[threading.Event], Any]) -> Any:
+        """
+        Run attempt(cancelled), hedging it with a second copy if it is slow
+
+        Args:
+            key: Latency key, e.g. the model name
+            attempt: Performs one upstream call; should stop early and return once cancelled is set
+
+        Returns:
+            The first successful attempt's result. If every attempt fails, the first error is raised
+        """
+        cancelled = threading.Event()
+        started: Dict[int, float] = {}
+
+        def timed(number: int):
+            started[number] = time.monotonic()
+            result = attempt(cancelled)
+            if not cancelled.is_set():
+                self.record(key, time.monotonic() - started[number])
+            return result
+
+        with self._lock:
+            self.calls += 1
+        delay = self.hedge_delay(key)
+        first = self._submit(lambda: timed(0)) if delay is not None else None
+        if first is None:
+            with self._lock:
+                self.inline += 1
+            return timed(0)
+
+        futures = [first]
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            second = self._submit(lambda: timed(1))
+            if second is not None:
+                with self._lock:
+                    self.hedged += 1
+                futures.append(second)
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    cancelled.set()
+                    now = time.monotonic()
+                    for number, other in enumerate(futures):
+                        # Censored sample: the loser took at least this long
+                        if other in pending and number in started:
+                            self.record(key, now - started[number])
+                    if future is not futures[0]:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+        raise futures[0].exception()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            keys = list(self._latencies)
+            stats = {"calls": self.calls, "hedged": self.hedged, "hedge_wins": self.hedge_wins, "inline": self.inline}
+        stats["p95_ms"] = {
+            key: round(1000 * (self._window(key).percentile(95) or 0.0), 1) for key in keys
+        }
+        return stats
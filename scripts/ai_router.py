@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Latency-aware model routing for NVIDIA AI tasks
+Picks the model for each task (skills, chat, analyze, enhance, cover_letter) from
+configurable rules on input/output length and live per-model latency, throughput
+and error stats over a sliding window. Rules live in data/model-routing.json.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+ROUTING_PATH = os.path.join(DATA_DIR, "model-routing.json")
+STRATEGIES = ("fastest", "throughput", "first")
+
+# Models used while handling the current request, for reporting on the response
+_models_used: ContextVar[Optional[List[str]]] = ContextVar("ai_models_used", default=None)
+
+
+@contextmanager
+def recording_models() -> Iterator[List[str]]:
+    """Collect the models of every upstream call made inside the block"""
+    models: List[str] = []
+    token = _models_used.set(models)
+    try:
+        yield models
+    finally:
+        _models_used.reset(token)
+
+
+def note_model(model: str) -> None:
+    """Record a model on the innermost recording_models() block, if any"""
+    models = _models_used.get()
+    if models is not None and model not in models:
+        models.append(model)
+
+
+class ModelStats:
+    """Sliding window (by count and age) of one model's recent calls"""
+
+    def __init__(self, size: int = 100, max_age: float = 300.0):
+        self.max_age = max_age
+        self._calls: Deque[Tuple[float, float, Optional[int], bool]] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, output_tokens: Optional[int], error: bool) -> None:
+        with self._lock:
+            self._calls.append((time.monotonic(), seconds, output_tokens, error))
+
+    def summary(self) -> Dict:
+        """samples, error_rate, p50 latency (s) and median output tokens/second over the window"""
+        cutoff = time.monotonic() - self.max_age
+        with self._lock:
+            while self._calls and self._calls[0][0] < cutoff:
+                self._calls.popleft()
+            calls = list(self._calls)
+        ok = [(seconds, tokens) for _, seconds, tokens, error in calls if not error]
+        latencies = sorted(seconds for seconds, _ in ok)
+        rates = sorted(tokens / seconds for seconds, tokens in ok if tokens and seconds > 0)
+        return {
+            "samples": len(calls),
+            "error_rate": (len(calls) - len(ok)) / len(calls) if calls else 0.0,
+            "p50_latency": latencies[len(latencies) // 2] if latencies else None,
+            "tokens_per_second": rates[len(rates) // 2] if rates else None,
+        }
+
+
+class ModelRouter:
+    """
+    Chooses a model per task call
+
+    Each task has ordered candidates and a default strategy; its rules (checked in order)
+    can switch strategy or candidates by input/output token length. Strategies:
+    "fastest" (lowest median latency), "throughput" (highest output tokens/second) and
+    "first" (first healthy candidate). Until a model has min_samples calls, its
+    configured expected_latency_ms / expected_tokens_per_second stand in for live stats.
+    """
+
+    def __init__(
+        self,
+        config: Dict,
+        window: int = 100,
+        max_age: float = 300.0,
+        min_samples: int = 5,
+        max_error_rate: float = 0.5,
+        explore: float = 0.05,
+        available: Optional[Callable[[str], bool]] = None
+    ):
+        """
+        Initialize the router
+
+        Args:
+            config: {"models": {model: priors}, "tasks": {task: {"strategy", "candidates", "rules"}}}
+            window: Calls kept per model
+            max_age: Seconds after which calls leave the window
+            min_samples: Calls needed before live stats replace the configured priors
+            max_error_rate: Models failing more often than this are skipped while others are healthy
+            explore: Share of calls routed to another healthy candidate to keep its stats fresh
+            available: Optional check (e.g. circuit breaker state) that excludes a model
+        """
+        self.models = config.get("models", {})
+        self.tasks = config.get("tasks", {})
+        for task, rules in self.tasks.items():
+            for rule in [rules] + rules.get("rules", []):
+                if rule.get("strategy", "first") not in STRATEGIES:
+                    raise ValueError(f"Unknown routing strategy for task {task}: {rule.get('strategy')}")
+        self.window = window
+        self.max_age = max_age
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.explore = explore
+        self.available = available
+        self.routed: Dict[str, Dict[str, int]] = {}
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    @classmethod
+    def from_file(cls, path: str = ROUTING_PATH, **kwargs) -> "ModelRouter":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "ModelRouter":
+        """Load AI_ROUTING_PATH (default data/model-routing.json); AI_ROUTING_EXPLORE sets the exploration share"""
+        kwargs.setdefault("explore", float(os.getenv("AI_ROUTING_EXPLORE", 0.05)))
+        return cls.from_file(os.getenv("AI_ROUTING_PATH", ROUTING_PATH), **kwargs)
+
+    def _model_stats(self, model: str) -> ModelStats:
+        with self._lock:
+            stats = self._stats.get(model)
+            if stats is None:
+                stats = self._stats[model] = ModelStats(self.window, self.max_age)
+            return stats
+
+    def record(self, model: str, seconds: float, output_tokens: Optional[int] = None, error: bool = False) -> None:
+        """Record the outcome of one upstream call"""
+        self._model_stats(model).record(seconds, output_tokens, error)
+
+    def _rule(self, task: str, input_tokens: int, output_tokens: int) -> Tuple[str, List[str]]:
+        config = self.tasks.get(task)
+        if config is None:
+            raise ValueError(f"No routing configured for task: {task}")
+        strategy, candidates = config.get("strategy", "first"), config["candidates"]
+        for rule in config.get("rules", []):
+            if input_tokens <= rule.get("max_input_tokens", float("inf")) and \
+                    output_tokens <= rule.get("max_output_tokens", float("inf")):
+                return rule.get("strategy", strategy), rule.get("candidates", candidates)
+        return strategy, candidates
+
+    def _score(self, model: str, strategy: str, summary: Dict) -> float:
+        """Lower is better"""
+        priors = self.models.get(model, {})
+        live = summary["samples"] >= self.min_samples
+        if strategy == "fastest":
+            latency = summary["p50_latency"] if live and summary["p50_latency"] is not None else None
+            return latency if latency is not None else priors.get("expected_latency_ms", 10000) / 1000.0
+        rate = summary["tokens_per_second"] if live and summary["tokens_per_second"] is not None else None
+        return -(rate if rate is not None else priors.get("expected_tokens_per_second", 1))
+
+    def choose(self, task: str, input_tokens: int = 0, output_tokens: int = 0) -> str:
+        """
+        Pick the model for one call
+
+        Args:
+            task: Task name from the routing config
+            input_tokens: Estimated prompt tokens
+            output_tokens: Requested max_tokens
+
+        Returns:
+            The chosen model name
+        """
+        strategy, candidates = self._rule(task, input_tokens, output_tokens)
+        healthy = [
+            model for model in candidates
+            if (self.available is None or self.available(model))
+            and self._model_stats(model).summary()["error_rate"] <= self.max_error_rate
+        ] or list(candidates)
+
+        if strategy == "first":
+            model = healthy[0]
+        else:
+            ranked = sorted(healthy, key=lambda name: self._score(name, strategy, self._model_stats(name).summary()))
+            model = ranked[0]
+            if len(ranked) > 1 and self._random.random() < self.explore:
+                model = self._random.choice(ranked[1:])
+
+        with self._lock:
+            counts = self.routed.setdefault(task, {})
+            counts[model] = counts.get(model, 0) + 1
+        return model
+
+    def stats(self) -> Dict:
+        with self._lock:
+            models = list(self._stats)
+            routed = {task: dict(counts) for task, counts in self.routed.items()}
+        return {"routed": routed, "models": {model: self._model_stats(model).summary() for model in models}}
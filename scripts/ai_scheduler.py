@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Client-side rate limit scheduler for NVIDIA AI upstream calls
+Token buckets for requests/minute and tokens/minute gate every upstream call.
+Waiting calls are served strictly by priority class (interactive before batch)
+and round-robin across tenants (e.g. recruiter/candidate) within a class, and
+the limits back off on 429 / Retry-After and recover gradually on success.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+DEFAULT_TENANT = "default"
+
+# (priority class, tenant) for upstream calls made by the current request or task
+_schedule: ContextVar[Tuple[str, str]] = ContextVar("ai_schedule", default=("interactive", DEFAULT_TENANT))
+
+
+@contextmanager
+def scheduling(priority: str = "interactive", tenant: Optional[str] = None) -> Iterator[None]:
+    """Tag upstream calls made inside the block with a priority class and tenant"""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority class: {priority}")
+    token = _schedule.set((priority, tenant or DEFAULT_TENANT))
+    try:
+        yield
+    finally:
+        _schedule.reset(token)
+
+
+def current_schedule() -> Tuple[str, str]:
+    """(priority class, tenant) of the current context"""
+    return _schedule.get()
+
+
+class AdmissionTimeout(TimeoutError):
+    """A call was not admitted before its deadline; retry_after estimates when it could be"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate (not thread-safe; guarded by the scheduler)"""
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.capacity = float(burst or per_minute)
+        self.level = self.capacity
+        self.per_minute = float(per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount: float, reserve: float, now: float) -> float:
+        """Seconds until amount can be taken while leaving reserve in the bucket"""
+        self._refill(now)
+        # A request larger than the bucket only has to wait for a full bucket
+        needed = min(amount, self.capacity) + min(reserve, self.capacity - min(amount, self.capacity))
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) * 60.0 / self.per_minute
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= amount  # may go negative for oversized requests; repaid by refill
+
+    def give(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _Ticket:
+    __slots__ = ("priority", "tenant", "tokens")
+
+    def __init__(self, priority: str, tenant: str, tokens: int):
+        self.priority = priority
+        self.tenant = tenant
+        self.tokens = tokens
+
+
+class Grant:
+    """Permission for one upstream call; settle() with the real token usage once known"""
+
+    def __init__(self, scheduler: "RateLimitScheduler", tokens: int, waited: float):
+        self.scheduler = scheduler
+        self.tokens = tokens
+        self.waited = waited
+
+    def settle(self, actual_tokens: Optional[int]) -> None:
+        """Correct the tokens/minute bucket for the difference between estimated and actual usage"""
+        if actual_tokens is not None:
+            self.scheduler._adjust_tokens(self.tokens - actual_tokens)
+
+    def release(self) -> None:
+        """Give the request and its tokens back for a call that was never sent (e.g. a cancelled hedge)"""
+        self.scheduler._release(self.tokens)
+
+
+class RateLimitScheduler:
+    """
+    Thread-safe upstream admission control
+
+    Only the head waiter (highest priority class, next tenant in round-robin order)
+    may take from the buckets, so batch work never overtakes interactive requests
+    and one busy tenant cannot starve another. Batch work additionally leaves
+    batch_reserve of each bucket free, so interactive requests rarely wait at all.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        tokens_per_minute: Optional[float] = None,
+        batch_reserve: float = 0.2,
+        backoff_factor: float = 0.5,
+        recovery: float = 0.02,
+        min_fraction: float = 0.1,
+        max_wait: Optional[float] = None
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            requests_per_minute: Upstream request limit
+            tokens_per_minute: Upstream token limit (prompt + completion); None for no token limit
+            batch_reserve: Fraction of each bucket batch calls must leave for interactive ones
+            backoff_factor: Rate multiplier applied on a 429
+            recovery: Fraction of the configured rate restored after each successful call
+            min_fraction: Lowest fraction of the configured rate backoff may reach
+            max_wait: Default admission timeout in seconds for interactive calls; None to wait indefinitely
+        """
+        self.max_requests_per_minute = float(requests_per_minute)
+        self.max_tokens_per_minute = float(tokens_per_minute) if tokens_per_minute else None
+        self.batch_reserve = batch_reserve
+        self.backoff_factor = backoff_factor
+        self.recovery = recovery
+        self.min_fraction = min_fraction
+        self.max_wait = max_wait
+
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Ticket]]"] = {name: OrderedDict() for name in PRIORITIES}
+        self._cond = threading.Condition()
+        self._paused_until = 0.0
+        self._last_backoff = 0.0
+
+        self.granted = {name: 0 for name in PRIORITIES}
+        self.wait_seconds = {name: 0.0 for name in PRIORITIES}
+        self.rate_limited = 0
+        self.timeouts = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["RateLimitScheduler"]:
+        """
+        Build from AI_RATE_RPM, AI_RATE_TPM, AI_RATE_BATCH_RESERVE and AI_RATE_MAX_WAIT
+
+        Returns None when AI_RATE_RPM is unset or 0 (no client-side rate limiting)
+        """
+        requests_per_minute = float(os.getenv("AI_RATE_RPM", 0))
+        if requests_per_minute <= 0:
+            return None
+        return cls(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=float(os.getenv("AI_RATE_TPM", 0)) or None,
+            batch_reserve=float(os.getenv("AI_RATE_BATCH_RESERVE", 0.2)),
+            max_wait=float(os.getenv("AI_RATE_MAX_WAIT", 30)) or None,
+        )
+
+    def _head(self) -> Optional[_Ticket]:
+        for name in sorted(PRIORITIES, key=PRIORITIES.get):
+            tenants = self._queues[name]
+            if tenants:
+                return next(iter(tenants.values()))[0]
+        return None
+
+    def _wait_time(self, ticket: _Ticket, now: float) -> float:
+        reserve = self.batch_reserve if ticket.priority == "batch" else 0.0
+        wait = max(self._paused_until - now, self.requests.wait_time(1, reserve * self.requests.capacity, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(ticket.tokens, reserve * self.tokens.capacity, now))
+        return wait
+
+    def _remove(self, ticket: _Ticket) -> None:
+        tenants = self._queues[ticket.priority]
+        queue = tenants[ticket.tenant]
+        queue.remove(ticket)
+        if not queue:
+            del tenants[ticket.tenant]
+        else:
+            # Round-robin: the tenant goes to the back after each turn
+            tenants.move_to_end(ticket.tenant)
+
+    def acquire(
+        self,
+        tokens: int = 0,
+        priority: Optional[str] = None,
+        tenant: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> Grant:
+        """
+        Block until the call may be sent
+
+        Args:
+            tokens: Estimated prompt + completion tokens of the call
+            priority: "interactive" or "batch"; defaults to the current scheduling() context
+            tenant: Fair-share group (e.g. user role); defaults to the current scheduling() context
+            timeout: Give up after this many seconds; defaults to max_wait for interactive calls,
+                while batch calls wait indefinitely
+
+        Returns:
+            A Grant to settle() with the actual token usage
+
+        Raises:
+            AdmissionTimeout: If the call could not be admitted within timeout
+        """
+        context_priority, context_tenant = current_schedule()
+        ticket = _Ticket(priority or context_priority, tenant or context_tenant, tokens)
+        if ticket.priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority class: {ticket.priority}")
+        if timeout is None and ticket.priority == "interactive":
+            timeout = self.max_wait
+
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        with self._cond:
+            self._queues[ticket.priority].setdefault(ticket.tenant, deque()).append(ticket)
+            self._cond.notify_all()
+            while True:
+                now = time.monotonic()
+                wait = None
+                if self._head() is ticket:
+                    wait = self._wait_time(ticket, now)
+                    if wait <= 0:
+                        self._remove(ticket)
+                        self.requests.take(1, now)
+                        if self.tokens is not None:
+                            self.tokens.take(tokens, now)
+                        self.granted[ticket.priority] += 1
+                        self.wait_seconds[ticket.priority] += now - start
+                        self._cond.notify_all()
+                        return Grant(self, tokens, now - start)
+                if deadline is not None:
+                    if now >= deadline:
+                        retry_after = self._wait_time(ticket, now)
+                        self._remove(ticket)
+                        self.timeouts += 1
+                        self._cond.notify_all()
+                        raise AdmissionTimeout(f"Upstream rate limit: not admitted within {timeout}s", retry_after)
+                    wait = min(wait, deadline - now) if wait is not None else deadline - now
+                self._cond.wait(wait)
+
+    def _adjust_tokens(self, amount: float) -> None:
+        if self.tokens is None:
+            return
+        with self._cond:
+            self.tokens.give(amount)
+            self._cond.notify_all()
+
+    def _release(self, tokens: float) -> None:
+        with self._cond:
+            self.requests.give(1)
+            if self.tokens is not None:
+                self.tokens.give(tokens)
+            self._cond.notify_all()
+
+    def _set_rate(self, fraction_of_max: float) -> None:
+        self.requests.per_minute = self.max_requests_per_minute * fraction_of_max
+        if self.tokens is not None:
+            self.tokens.per_minute = self.max_tokens_per_minute * fraction_of_max
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """
+        React to a 429: pause all calls for Retry-After (or one second) and cut the rates
+
+        Several 429s from one burst only cut the rates once per second.
+        """
+        now = time.monotonic()
+        with self._cond:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, now + (retry_after if retry_after is not None else 1.0))
+            if now - self._last_backoff >= 1.0:
+                self._last_backoff = now
+                fraction = self.requests.per_minute / self.max_requests_per_minute
+                self._set_rate(max(self.min_fraction, fraction * self.backoff_factor))
+            self.requests.level = min(self.requests.level, 0.0)
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        """Additively restore the rates toward the configured limits"""
+        with self._cond:
+            fraction = self.requests.per_minute / self.max_requests_per_minute
+            if fraction < 1.0:
+                self._set_rate(min(1.0, fraction + self.recovery))
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "requests_per_minute": round(self.requests.per_minute, 2),
+                "tokens_per_minute": round(self.tokens.per_minute, 2) if self.tokens is not None else None,
+                "waiting": {
+                    name: sum(len(queue) for queue in tenants.values()) for name, tenants in self._queues.items()
+                },
+                "granted": dict(self.granted),
+                "avg_wait_ms": {
+                    name: round(1000 * self.wait_seconds[name] / self.granted[name], 2) if self.granted[name] else 0.0
+                    for name in PRIORITIES
+                },
+                "rate_limited": self.rate_limited,
+                "timeouts": self.timeouts,
+            }
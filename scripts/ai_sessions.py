@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Server-side chat sessions with history compaction
+Clients send only the new message and a session ID. Sessions are stored in SQLite
+(WAL mode), so every server process sees them. The last few messages are kept verbatim;
+older ones are folded into a rolling summary by a background model call, so the prompt
+stays about the same size however long a conversation runs.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_SESSIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ai-chat-sessions.sqlite3")
+
+DEFAULT_SYSTEM_PROMPT = (
+    "You are a helpful career advisor and resume expert. Provide practical, actionable advice for job seekers, "
+    "resume writing, interview preparation, and career development. Keep responses concise but informative."
+)
+
+# Completion budget (and so the size bound) of the rolling summary
+SUMMARY_MAX_TOKENS = 300
+
+
+def summary_messages(summary: str, messages: List[Dict]) -> List[Dict]:
+    """Build the prompt that folds messages into the running summary"""
+    transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+    return [
+        {"role": "system", "content": "You maintain a running summary of a career advice conversation."},
+        {
+            "role": "user",
+            "content": f"""Current summary:
+{summary or '(none yet)'}
+
+New messages:
+{transcript}
+
+Rewrite the summary to include the new messages in at most 150 words. Keep the user's goals,
+background and facts they shared, and the advice already given. Answer with the summary only."""
+        }
+    ]
+
+
+class ChatSessionStore:
+    """
+    SQLite-backed chat sessions
+
+    A session holds a system prompt, a rolling summary and its unsummarized messages.
+    Prompts carry the summary and the last keep_messages messages only. Once more than
+    keep_messages + compact_batch messages are stored, all but the last keep_messages are
+    summarized in the background and deleted; max_messages caps the stored history should
+    summarizing keep failing.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[str, List[Dict], Optional[str]], str],
+        path: str = DEFAULT_SESSIONS_PATH,
+        keep_messages: int = 8,
+        compact_batch: int = 4,
+        max_messages: int = 64,
+        ttl: float = 24 * 3600.0,
+        workers: int = 2
+    ):
+        """
+        Initialize the store
+
+        Args:
+            summarize: summarize(summary, messages, tenant) returns the summary updated with messages
+            path: SQLite file
+            keep_messages: Most recent messages always sent verbatim
+            compact_batch: Extra messages allowed to accumulate before a compaction runs
+            max_messages: Stored messages per session; the oldest beyond this are dropped
+            ttl: Seconds an idle session is kept
+            workers: Background compaction threads
+        """
+        self.summarize = summarize
+        self.path = path
+        self.keep_messages = keep_messages
+        self.compact_batch = compact_batch
+        self.max_messages = max(max_messages, keep_messages + compact_batch)
+        self.ttl = ttl
+        self.compactions = 0
+        self.compaction_errors = 0
+        self.dropped_messages = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat-compaction")
+        self._compacting = set()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_sessions ("
+            "id TEXT PRIMARY KEY, tenant TEXT, system TEXT NOT NULL, summary TEXT NOT NULL DEFAULT '', "
+            "summarized INTEGER NOT NULL DEFAULT 0, next_seq INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS chat_sessions_expires ON chat_sessions (expires_at)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_messages ("
+            "session_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, seq))"
+        )
+
+    @classmethod
+    def from_env(cls, summarize: Callable[[str, List[Dict], Optional[str]], str]) -> Optional["ChatSessionStore"]:
+        """
+        Build a store from environment variables, or None if AI_CHAT_SESSIONS_ENABLED=false
+
+        AI_CHAT_SESSIONS_PATH, AI_CHAT_KEEP_MESSAGES, AI_CHAT_COMPACT_BATCH, AI_CHAT_MAX_MESSAGES,
+        AI_CHAT_SESSION_TTL (seconds idle)
+        """
+        if os.getenv("AI_CHAT_SESSIONS_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        return cls(
+            summarize,
+            path=os.getenv("AI_CHAT_SESSIONS_PATH", DEFAULT_SESSIONS_PATH),
+            keep_messages=int(os.getenv("AI_CHAT_KEEP_MESSAGES", 8)),
+            compact_batch=int(os.getenv("AI_CHAT_COMPACT_BATCH", 4)),
+            max_messages=int(os.getenv("AI_CHAT_MAX_MESSAGES", 64)),
+            ttl=float(os.getenv("AI_CHAT_SESSION_TTL", 24 * 3600)),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads; transactions are explicit
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def draft(self, system: Optional[str] = None) -> Dict:
+        """An unsaved new session, enough for prompt(); create() stores it once its first turn succeeded"""
+        return {"system": system or DEFAULT_SYSTEM_PROMPT, "summary": "", "messages": []}
+
+    def create(self, system: Optional[str] = None, tenant: Optional[str] = None,
+               messages: Optional[List[Dict]] = None) -> Dict:
+        """Start a session, optionally with its first messages, and return it"""
+        now = time.time()
+        messages = messages or []
+        session = {
+            "id": uuid.uuid4().hex,
+            "tenant": tenant,
+            "system": system or DEFAULT_SYSTEM_PROMPT,
+            "summary": "",
+            "summarized": 0,
+            "created_at": now,
+            "updated_at": now,
+            "expires_at": now + self.ttl,
+        }
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO chat_sessions (id, tenant, system, next_seq, created_at, updated_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session["id"], tenant, session["system"], len(messages), now, now, session["expires_at"]),
+            )
+            conn.executemany(
+                "INSERT INTO chat_messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                [(session["id"], seq, message["role"], message["content"]) for seq, message in enumerate(messages)],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._maybe_prune(now)
+        return session
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        """
+        A live session with its stored messages, or None if unknown or expired
+
+        Returns:
+            {"id", "tenant", "system", "summary", "summarized", "created_at", "updated_at", "expires_at",
+             "messages": [{"role", "content"}, ...]}
+        """
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT id, tenant, system, summary, summarized, created_at, updated_at, expires_at "
+            "FROM chat_sessions WHERE id = ? AND expires_at >= ?",
+            (session_id, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        session = dict(row)
+        session["messages"] = [
+            {"role": message["role"], "content": message["content"]}
+            for message in conn.execute(
+                "SELECT role, content FROM chat_messages WHERE session_id = ? ORDER BY seq", (session_id,)
+            )
+        ]
+        return session
+
+    def prompt(self, session: Dict, user_message: str) -> List[Dict]:
+        """
+        Messages to send upstream for the next turn: system prompt, summary, last keep_messages messages, new message
+
+        Older stored messages waiting for a background compaction are left out of the prompt.
+        """
+        messages = [{"role": "system", "content": session["system"]}]
+        if session["summary"]:
+            messages.append({"role": "system", "content": f"Summary of the conversation so far:\n{session['summary']}"})
+        if self.keep_messages > 0:
+            messages.extend(session["messages"][-self.keep_messages:])
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def append(self, session_id: str, messages: List[Dict]) -> None:
+        """Store a finished turn and compact the session in the background if it has grown enough"""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT next_seq FROM chat_sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return
+            seq = row["next_seq"]
+            conn.executemany(
+                "INSERT INTO chat_messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                [(session_id, seq + offset, message["role"], message["content"]) for offset, message in enumerate(messages)],
+            )
+            conn.execute(
+                "UPDATE chat_sessions SET next_seq = ?, updated_at = ?, expires_at = ? WHERE id = ?",
+                (seq + len(messages), now, now + self.ttl, session_id),
+            )
+            # Hard bound on stored history, in case summaries keep failing
+            dropped = conn.execute(
+                "DELETE FROM chat_messages WHERE session_id = ? AND seq < ?",
+                (session_id, seq + len(messages) - self.max_messages),
+            ).rowcount
+            stored = conn.execute("SELECT COUNT(*) FROM chat_messages WHERE session_id = ?", (session_id,)).fetchone()[0]
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if dropped:
+            with self._lock:
+                self.dropped_messages += dropped
+        if stored > self.keep_messages + self.compact_batch:
+            with self._lock:
+                if session_id in self._compacting:
+                    return
+                self._compacting.add(session_id)
+            self._executor.submit(self._compact_in_background, session_id)
+
+    def _compact_in_background(self, session_id: str) -> None:
+        try:
+            self.compact(session_id)
+        except Exception:
+            with self._lock:
+                self.compaction_errors += 1
+        finally:
+            with self._lock:
+                self._compacting.discard(session_id)
+
+    def compact(self, session_id: str) -> bool:
+        """
+        Fold all but the last keep_messages stored messages into the summary
+
+        The model call runs outside any transaction; its result is only written if no other
+        process compacted the session meanwhile. Returns whether the session was compacted.
+        """
+        conn = self._connection()
+        session = conn.execute(
+            "SELECT tenant, summary, summarized FROM chat_sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if session is None:
+            return False
+        rows = conn.execute(
+            "SELECT seq, role, content FROM chat_messages WHERE session_id = ? ORDER BY seq", (session_id,)
+        ).fetchall()
+        if len(rows) <= self.keep_messages:
+            return False
+        fold = rows[:len(rows) - self.keep_messages]
+        summary = self.summarize(
+            session["summary"], [{"role": row["role"], "content": row["content"]} for row in fold], session["tenant"]
+        ).strip()
+        if not summary:
+            return False
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            updated = conn.execute(
+                "UPDATE chat_sessions SET summary = ?, summarized = summarized + ? WHERE id = ? AND summarized = ?",
+                (summary, len(fold), session_id, session["summarized"]),
+            ).rowcount
+            if updated:
+                conn.execute(
+                    "DELETE FROM chat_messages WHERE session_id = ? AND seq <= ?", (session_id, fold[-1]["seq"])
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if updated:
+            with self._lock:
+                self.compactions += 1
+        return bool(updated)
+
+    def delete(self, session_id: str) -> bool:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            deleted = conn.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,)).rowcount
+            conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return bool(deleted)
+
+    def _maybe_prune(self, now: float) -> None:
+        if now - self._last_prune >= 60.0:
+            self._last_prune = now
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete expired sessions and their messages; returns the number of sessions removed"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            conn.execute(
+                "DELETE FROM chat_messages WHERE session_id IN (SELECT id FROM chat_sessions WHERE expires_at < ?)",
+                (now,),
+            )
+            removed = conn.execute("DELETE FROM chat_sessions WHERE expires_at < ?", (now,)).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
+
+    def stats(self) -> Dict:
+        conn = self._connection()
+        sessions = conn.execute("SELECT COUNT(*) FROM chat_sessions WHERE expires_at >= ?", (time.time(),)).fetchone()[0]
+        messages = conn.execute("SELECT COUNT(*) FROM chat_messages").fetchone()[0]
+        with self._lock:
+            return {
+                "sessions": sessions,
+                "stored_messages": messages,
+                "keep_messages": self.keep_messages,
+                "compactions": self.compactions,
+                "compaction_errors": self.compaction_errors,
+                "compacting": len(self._compacting),
+                "dropped_messages": self.dropped_messages,
+            }
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate response cache for HireSenseAI
+Inputs are fingerprinted with a 64-bit SimHash over word shingles. A resubmitted resume
+with a typo fixed, or the same CV uploaded from two sources, lands within a few bits of
+the original, and its cached result is returned as an approximate hit. Fingerprints
+are kept in band tables, so a lookup only compares against a handful of candidates
+however many entries are stored.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    # Pure-Python bit counting; same fingerprints, only slower for long texts
+    np = None
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+#][+#]?)?")
+
+# Approximate hits served while handling the current request or task
+_approximate_hits: ContextVar[Optional[List[Dict]]] = ContextVar("ai_approximate_hits", default=None)
+
+
+@contextmanager
+def recording_approximate_hits() -> Iterator[List[Dict]]:
+    """Collect {"namespace", "similarity"} for every approximate hit served inside the block"""
+    hits: List[Dict] = []
+    token = _approximate_hits.set(hits)
+    try:
+        yield hits
+    finally:
+        _approximate_hits.reset(token)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens; punctuation, bullets and layout are ignored"""
+    return TOKEN_RE.findall(text.lower())
+
+
+def shingles(tokens: List[str], size: int = SHINGLE_SIZE) -> Set[str]:
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def simhash(tokens: List[str]) -> int:
+    """
+    64-bit SimHash of a token list
+
+    Each bit is the majority vote of that bit over the hashes of all distinct shingles,
+    so changing a few words flips only a few bits.
+    """
+    hashes = [_hash64(shingle) for shingle in shingles(tokens)]
+    if not hashes:
+        return 0
+    if np is not None:
+        bits = np.unpackbits(
+            np.array(hashes, dtype="<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little"
+        )
+        majority = bits.sum(axis=0, dtype=np.int64) * 2 > len(hashes)
+        return int(np.packbits(majority, bitorder="little").view("<u8")[0])
+    counts = [0] * FINGERPRINT_BITS
+    for value in hashes:
+        for bit in range(FINGERPRINT_BITS):
+            counts[bit] += (value >> bit) & 1
+    return sum(1 << bit for bit, count in enumerate(counts) if count * 2 > len(hashes))
+
+
+if hasattr(int, "bit_count"):
+    def hamming(a: int, b: int) -> int:
+        return (a ^ b).bit_count()
+else:
+    # Python < 3.10
+    def hamming(a: int, b: int) -> int:
+        return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """
+    Bounded FIFO set of fingerprints with near-neighbour lookup
+
+    Fingerprints are split into max_distance + 1 bands with one hash table per band.
+    Two fingerprints at most max_distance bits apart agree on at least one whole band
+    (pigeonhole), so only entries sharing a band value are compared.
+    """
+
+    def __init__(self, max_distance: int = 3, max_entries: int = 100000):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        bands = max_distance + 1
+        self._bands: List[Tuple[int, int]] = []  # (shift, mask) per band
+        shift = 0
+        for band in range(bands):
+            width = FINGERPRINT_BITS // bands + (1 if band < FINGERPRINT_BITS % bands else 0)
+            self._bands.append((shift, (1 << width) - 1))
+            shift += width
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._bands]
+        self._entries: "OrderedDict[int, Tuple[int, str]]" = OrderedDict()  # id -> (fingerprint, digest)
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, fingerprint: int, digest: str) -> None:
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (fingerprint, digest)
+            for table, (shift, mask) in zip(self._tables, self._bands):
+                table.setdefault((fingerprint >> shift) & mask, []).append(entry_id)
+            while len(self._entries) > self.max_entries:
+                old_id, (old_fingerprint, _) = self._entries.popitem(last=False)
+                for table, (shift, mask) in zip(self._tables, self._bands):
+                    band = (old_fingerprint >> shift) & mask
+                    bucket = table[band]
+                    bucket.remove(old_id)
+                    if not bucket:
+                        del table[band]
+
+    def nearest(self, fingerprint: int, digest: Optional[str] = None) -> Optional[Tuple[int, str]]:
+        """
+        Closest stored entry within max_distance bits, newest first on ties
+
+        Returns:
+            (distance, digest), or None. An entry with the same digest wins outright
+        """
+        best = None
+        with self._lock:
+            for table, (shift, mask) in zip(self._tables, self._bands):
+                for entry_id in reversed(table.get((fingerprint >> shift) & mask, ())):
+                    stored, stored_digest = self._entries[entry_id]
+                    if digest is not None and stored_digest == digest:
+                        return 0, stored_digest
+                    distance = hamming(stored, fingerprint)
+                    if distance <= self.max_distance and (best is None or distance < best[0]):
+                        best = (distance, stored_digest)
+        return best
+
+
+class SimilarityCache:
+    """
+    Near-duplicate lookups in front of a response cache
+
+    Results are stored in the given cache (so they share its tiers and TTL) keyed by the
+    digest of the normalized input; per-namespace SimHash indexes map fingerprints to
+    those digests. An input whose normalized tokens equal a stored one is an exact hit.
+    """
+
+    def __init__(self, cache, threshold: float = 0.95, max_entries: int = 100000, min_tokens: int = 30):
+        self.cache = cache
+        self.threshold = threshold
+        self.max_distance = int((1.0 - threshold) * FINGERPRINT_BITS + 1e-9)
+        self.max_entries = max_entries
+        self.min_tokens = min_tokens
+        self.exact_hits = 0
+        self.approximate_hits = 0
+        self.misses = 0
+        self._indexes: Dict[str, SimHashIndex] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, cache) -> Optional["SimilarityCache"]:
+        """
+        Build from environment variables, or None without a cache or if AI_SIMILARITY_ENABLED=false
+
+        AI_SIMILARITY_THRESHOLD (fraction of equal fingerprint bits), AI_SIMILARITY_MAX_ENTRIES
+        (per namespace), AI_SIMILARITY_MIN_TOKENS (shorter inputs are only matched exactly by the cache)
+        """
+        if cache is None or os.getenv("AI_SIMILARITY_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        return cls(
+            cache,
+            threshold=float(os.getenv("AI_SIMILARITY_THRESHOLD", 0.95)),
+            max_entries=int(os.getenv("AI_SIMILARITY_MAX_ENTRIES", 100000)),
+            min_tokens=int(os.getenv("AI_SIMILARITY_MIN_TOKENS", 30)),
+        )
+
+    def _index(self, namespace: str) -> SimHashIndex:
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None:
+                index = self._indexes[namespace] = SimHashIndex(self.max_distance, self.max_entries)
+            return index
+
+    def _fingerprint(self, namespace: str, text: str) -> Optional[Tuple[int, str]]:
+        tokens = tokenize(text)
+        if len(tokens) < self.min_tokens:
+            return None
+        digest = hashlib.sha256(f"{namespace}\n{' '.join(tokens)}".encode("utf-8")).hexdigest()
+        return simhash(tokens), digest
+
+    def get(self, namespace: str, text: str) -> Optional[str]:
+        """
+        Cached result for text or a near-duplicate of it
+
+        Approximate hits are reported to the innermost recording_approximate_hits() block.
+        """
+        fingerprint = self._fingerprint(namespace, text)
+        if fingerprint is None:
+            return None
+        match = self._index(namespace).nearest(*fingerprint)
+        value = self.cache.get(match[1]) if match is not None else None
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        distance, digest = match
+        if digest == fingerprint[1]:
+            with self._lock:
+                self.exact_hits += 1
+            return value
+        with self._lock:
+            self.approximate_hits += 1
+        hits = _approximate_hits.get()
+        if hits is not None:
+            hits.append({"namespace": namespace, "similarity": round(1.0 - distance / FINGERPRINT_BITS, 4)})
+        return value
+
+    def set(self, namespace: str, text: str, value: str) -> None:
+        fingerprint = self._fingerprint(namespace, text)
+        if fingerprint is None or not value:
+            return
+        fingerprint, digest = fingerprint
+        self.cache.set(digest, value)
+        self._index(namespace).add(fingerprint, digest)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "threshold": self.threshold,
+                "max_distance_bits": self.max_distance,
+                "exact_hits": self.exact_hits,
+                "approximate_hits": self.approximate_hits,
+                "misses": self.misses,
+                "entries": {namespace: len(index) for namespace, index in self._indexes.items()},
+            }
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key wait on one in-flight call and share its
+result (or its exception) instead of each sending an identical upstream request.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class _Call:
+    """One in-flight call and the threads waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-safe single-flight group keyed by a canonical request hash"""
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key: Canonical identity of the request
+            fn: Zero-argument callable performing the actual work
+
+        Returns:
+            The result of fn. If fn raised, every caller sharing the call re-raises the same exception
+        """
+        with self._lock:
+            call = self._inflight.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._inflight[key] = call
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Remove before waking waiters so later callers start a fresh call
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running"""
+        with self._lock:
+            return len(self._inflight)
+
+    def stats(self) -> Dict:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": self.in_flight()}
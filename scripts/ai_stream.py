@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Incremental server-sent-events parsing for NVIDIA AI streaming completions
+Turns raw byte chunks (which may split lines anywhere) into SSE events and
+chat completion deltas as they arrive.
+"""
+
+import json
+from typing import Callable, Iterable, Iterator, List, Optional
+
+
+DONE = "[DONE]"
+
+
+class SSEParser:
+    """
+    Incremental SSE parser
+
+    Feed it arbitrary byte chunks; it returns the data payload of every event that
+    completed. Comment lines (": keep-alive") are ignored.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._data: List[str] = []
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """Consume a chunk and return the data of each completed event"""
+        self._buffer.extend(chunk)
+        events = []
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline < 0:
+                break
+            line = bytes(self._buffer[:newline]).rstrip(b"\r")
+            del self._buffer[:newline + 1]
+
+            if not line:
+                # A blank line dispatches the event
+                if self._data:
+                    events.append("\n".join(self._data))
+                    self._data = []
+                continue
+            if line.startswith(b":"):
+                continue
+
+            field, _, value = line.partition(b":")
+            if value.startswith(b" "):
+                value = value[1:]
+            if field == b"data":
+                self._data.append(value.decode("utf-8"))
+        return events
+
+    def flush(self) -> List[str]:
+        """Return any event left without a trailing blank line at end of stream"""
+        if self._buffer:
+            self.feed(b"\n")
+        events = ["\n".join(self._data)] if self._data else []
+        self._data = []
+        return events
+
+
+def iter_sse_events(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Yield SSE event data payloads from a stream of byte chunks"""
+    parser = SSEParser()
+    for chunk in chunks:
+        for event in parser.feed(chunk):
+            yield event
+    for event in parser.flush():
+        yield event
+
+
+def _event_payloads(event: str) -> List[str]:
+    # Some servers omit the blank line between events, which joins several
+    # data lines into one event; fall back to treating each line separately.
+    if "\n" not in event:
+        return [event]
+    try:
+        json.loads(event)
+        return [event]
+    except json.JSONDecodeError:
+        return event.split("\n")
+
+
+def iter_chat_deltas(chunks: Iterable[bytes], on_finish: Optional[Callable[[str], None]] = None) -> Iterator[str]:
+    """
+    Yield content deltas from a streaming chat completion
+
+    Args:
+        chunks: Raw response body chunks (e.g. response.iter_content(chunk_size=None))
+        on_finish: Called with the choice's finish_reason ("stop", "length", ...) when the stream reports one
+
+    Yields:
+        Each non-empty content delta, in order, until [DONE]
+    """
+    for event in iter_sse_events(chunks):
+        for payload in _event_payloads(event):
+            if payload.strip() == DONE:
+                return
+            try:
+                data = json.loads(payload)
+            except json.JSONDecodeError:
+                continue
+            choices = data.get("choices") or [{}]
+            content = (choices[0].get("delta") or {}).get("content")
+            if content:
+                yield content
+            if on_finish is not None and choices[0].get("finish_reason"):
+                on_finish(choices[0]["finish_reason"])
+
+
+class JSONArrayParser:
+    """
+    Incremental parser for a JSON array arriving in text fragments
+
+    Emits each top-level element as soon as it closes, so a caller can act on early
+    elements (or stop the stream) before the model has finished the array. Text before
+    the opening bracket (prose, a ```json fence) is skipped; elements that are not
+    valid JSON are dropped.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.done = False
+        self._element: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[object]:
+        """Consume a fragment and return the elements completed by it"""
+        items = []
+        for char in text:
+            if self.done:
+                break
+            if not self.started:
+                if char == "[":
+                    self.started = True
+                continue
+
+            if self._in_string:
+                self._element.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 0 and char in ",]":
+                item = self._take()
+                if item is not None:
+                    items.append(item)
+                if char == "]":
+                    self.done = True
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+            self._element.append(char)
+            if self._depth == 0 and char in "]}":
+                # A closed object/array is complete without waiting for the next comma
+                item = self._take()
+                if item is not None:
+                    items.append(item)
+        return items
+
+    def _take(self):
+        text = "".join(self._element).strip()
+        self._element = []
+        if not text:
+            return None
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+
+def iter_json_array_items(deltas: Iterable[str]) -> Iterator[object]:
+    """Yield the elements of a JSON array from streamed text deltas as each one closes"""
+    parser = JSONArrayParser()
+    for delta in deltas:
+        for item in parser.feed(delta):
+            yield item
+        if parser.done:
+            return
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for the NVIDIA AI clients
+Keeps a pooled, keep-alive session per process so every chat completion
+reuses an open TCP/TLS connection instead of paying the handshake again.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:
+    # httpx is only needed for AsyncPooledTransport
+    httpx = None
+
+
+# Upstream statuses retried by default: the request was rejected before any work was done.
+# Completions are not idempotent, so 500/502/504 (which may have been billed) are opt-in
+RETRY_STATUS_CODES = frozenset({429, 503})
+# Host pools kept by the default adapter (one per upstream/webhook host in use)
+DEFAULT_HOST_POOLS = 10
+
+
+def _parse_statuses(value: str) -> FrozenSet[int]:
+    """Parse "429,503" into a set of status codes"""
+    return frozenset(int(item) for item in value.split(",") if item.strip().isdigit())
+
+
+def _parse_pool_sizes(value: str) -> Dict[str, int]:
+    """Parse "host=size,host2=size" into a dict"""
+    pool_sizes = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        host, size = item.split("=", 1)
+        if host.strip() and size.strip().isdigit():
+            pool_sizes[host.strip()] = int(size)
+    return pool_sizes
+
+
+def _backoff_delay(config: "TransportConfig", attempt: int) -> float:
+    ceiling = min(config.backoff_max, config.backoff_base * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def retry_after_delay(config: "TransportConfig", headers) -> Optional[float]:
+    """Retry-After of a response in seconds, capped at config.backoff_max; None if absent or not a number"""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return min(max(float(value), 0.0), config.backoff_max)
+    except ValueError:
+        return None
+
+
+@dataclass
+class TransportConfig:
+    """Connection pool, timeout and retry settings for PooledTransport"""
+    connect_timeout: float = 5.0
+    read_timeout: float = 120.0
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 20.0
+    default_pool_size: int = 10
+    pool_sizes: Dict[str, int] = field(default_factory=dict)  # host -> pool size
+    retry_statuses: FrozenSet[int] = RETRY_STATUS_CODES
+
+    @classmethod
+    def from_env(cls) -> "TransportConfig":
+        """
+        Build a config from environment variables
+
+        NVIDIA_CONNECT_TIMEOUT, NVIDIA_READ_TIMEOUT, NVIDIA_MAX_RETRIES,
+        NVIDIA_POOL_SIZE, NVIDIA_POOL_SIZES ("host=20,other-host=5") and
+        NVIDIA_RETRY_STATUSES ("429,503"; add 500,502,504 to also retry server errors)
+        """
+        return cls(
+            connect_timeout=float(os.getenv("NVIDIA_CONNECT_TIMEOUT", cls.connect_timeout)),
+            read_timeout=float(os.getenv("NVIDIA_READ_TIMEOUT", cls.read_timeout)),
+            max_retries=int(os.getenv("NVIDIA_MAX_RETRIES", cls.max_retries)),
+            default_pool_size=int(os.getenv("NVIDIA_POOL_SIZE", cls.default_pool_size)),
+            pool_sizes=_parse_pool_sizes(os.getenv("NVIDIA_POOL_SIZES", "")),
+            retry_statuses=_parse_statuses(os.getenv("NVIDIA_RETRY_STATUSES", "429,503")),
+        )
+
+
+class PooledTransport:
+    """
+    Thread-safe HTTP transport with keep-alive connection pooling,
+    per-host pool sizes, connect/read timeouts and jittered exponential retry
+    """
+
+    def __init__(self, config: Optional[TransportConfig] = None):
+        """
+        Initialize the transport
+
+        Args:
+            config: Transport settings. If not provided, read from environment
+        """
+        self.config = config or TransportConfig.from_env()
+        self.session = requests.Session()
+        # Called with the Retry-After delay (or None) on every 429, e.g. RateLimitScheduler.on_rate_limited
+        self.rate_limit_listeners: List[Callable[[Optional[float]], None]] = []
+        # Called with the cause ("connection" or the status code) before every retry, e.g. for metrics
+        self.retry_listeners: List[Callable[[str], None]] = []
+
+        default_adapter = self._make_adapter(self.config.default_pool_size, DEFAULT_HOST_POOLS)
+        self.session.mount("https://", default_adapter)
+        self.session.mount("http://", default_adapter)
+        for host, size in self.config.pool_sizes.items():
+            self.set_pool_size(host, size)
+
+    def _make_adapter(self, pool_size: int, host_pools: int = 1) -> HTTPAdapter:
+        # Retries are handled in post() so they can honour Retry-After and add jitter.
+        # pool_block=False: a call beyond pool_size opens an extra connection (closed after use)
+        # instead of waiting, with no limit, for a connection held by an open stream
+        return HTTPAdapter(pool_connections=host_pools, pool_maxsize=pool_size, max_retries=0, pool_block=False)
+
+    def set_pool_size(self, host: str, pool_size: int) -> None:
+        """
+        Give an upstream host its own connection pool
+
+        Args:
+            host: Host name, optionally with port (e.g. "integrate.api.nvidia.com")
+            pool_size: Maximum number of kept-alive connections to that host
+        """
+        adapter = self._make_adapter(pool_size)
+        self.session.mount(f"https://{host}", adapter)
+        self.session.mount(f"http://{host}", adapter)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) retry attempt"""
+        return _backoff_delay(self.config, attempt)
+
+    def post(
+        self,
+        url: str,
+        json: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        stream: bool = False,
+        timeout: Optional[float] = None,
+        allow_redirects: bool = True
+    ) -> requests.Response:
+        """
+        POST with pooling, timeouts and retry on config.retry_statuses and connection errors
+
+        Args:
+            url: Request URL
+            json: JSON payload
+            headers: Request headers
+            stream: Whether to stream the response body
+            timeout: Read timeout override in seconds
+            allow_redirects: Follow redirects; if False a 3xx response is returned as is
+
+        Returns:
+            The final response. Callers still call raise_for_status() on it
+        """
+        timeouts = (self.config.connect_timeout, timeout or self.config.read_timeout)
+
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                response = self.session.post(url, json=json, headers=headers, stream=stream, timeout=timeouts,
+                                             allow_redirects=allow_redirects)
+            except (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout):
+                # Read timeouts are not retried: a hung upstream should not hold the caller 3x longer
+                if attempt >= self.config.max_retries:
+                    raise
+                self._notify_retry("connection")
+                time.sleep(self.backoff_delay(attempt))
+                continue
+
+            if response.status_code == 429:
+                for listener in self.rate_limit_listeners:
+                    listener(retry_after_delay(self.config, response.headers))
+
+            if response.status_code in self.config.retry_statuses and attempt < self.config.max_retries:
+                delay = retry_after_delay(self.config, response.headers)
+                response.close()
+                self._notify_retry(str(response.status_code))
+                time.sleep(delay if delay is not None else self.backoff_delay(attempt))
+                continue
+
+            return response
+
+    def _notify_retry(self, reason: str) -> None:
+        for listener in self.retry_listeners:
+            listener(reason)
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        self.session.close()
+
+
+class AsyncPooledTransport:
+    """
+    asyncio counterpart of PooledTransport built on httpx.AsyncClient
+    Same pool sizes, timeouts and retry policy; must be used from a single event loop
+    """
+
+    def __init__(self, config: Optional[TransportConfig] = None):
+        """
+        Initialize the transport
+
+        Args:
+            config: Transport settings. If not provided, read from environment
+        """
+        if httpx is None:
+            raise ImportError("AsyncPooledTransport requires httpx. Install it with: pip install httpx")
+
+        self.config = config or TransportConfig.from_env()
+        mounts = {}
+        for host, size in self.config.pool_sizes.items():
+            for scheme in ("https", "http"):
+                mounts[f"{scheme}://{host}"] = httpx.AsyncHTTPTransport(limits=self._limits(size))
+        self.client = httpx.AsyncClient(
+            limits=self._limits(self.config.default_pool_size),
+            timeout=httpx.Timeout(self.config.read_timeout, connect=self.config.connect_timeout),
+            mounts=mounts
+        )
+
+    def _limits(self, pool_size: int):
+        return httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+
+    async def post(
+        self,
+        url: str,
+        json: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        POST with pooling, timeouts and retry on config.retry_statuses and connection errors
+
+        Args:
+            url: Request URL
+            json: JSON payload
+            headers: Request headers
+            timeout: Read timeout override in seconds
+
+        Returns:
+            The final httpx.Response. Callers still call raise_for_status() on it
+        """
+        timeouts = httpx.Timeout(timeout or self.config.read_timeout, connect=self.config.connect_timeout)
+
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                response = await self.client.post(url, json=json, headers=headers, timeout=timeouts)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError):
+                if attempt >= self.config.max_retries:
+                    raise
+                await asyncio.sleep(_backoff_delay(self.config, attempt))
+                continue
+
+            if response.status_code in self.config.retry_statuses and attempt < self.config.max_retries:
+                delay = retry_after_delay(self.config, response.headers)
+                await asyncio.sleep(delay if delay is not None else _backoff_delay(self.config, attempt))
+                continue
+
+            return response
+
+    async def aclose(self) -> None:
+        """Close all pooled connections"""
+        await self.client.aclose()
+
+
+_default_transport: Optional[PooledTransport] = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> PooledTransport:
+    """
+    Return the process-wide shared transport, creating it on first use
+
+    With NVIDIA_CASSETTE_MODE set this is a CassetteTransport recording to or
+    replaying from NVIDIA_CASSETTE_PATH (see ai_cassette.py).
+    """
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                # Imported here: ai_cassette builds on PooledTransport
+                from ai_cassette import CassetteTransport
+                _default_transport = CassetteTransport.from_env() or PooledTransport()
+    return _default_transport
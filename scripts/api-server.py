@@ -4,15 +4,19 @@ Python API Server for NVIDIA AI Integration
 This Flask server provides Python-based AI endpoints that can be called from your Next.js frontend
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import json
 # Import dependencies
 import sys
 import os
+import contextvars
 import requests
+import time
 import json
+import math
 
 # Try to load .env file if it exists
 try:
@@ -25,21 +29,112 @@ except ImportError:
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from ai_cache import TieredCache, cache_key
+from ai_graph import TaskGraph, time_left
+from ai_jobs import JobQueue
+from ai_metrics import ServiceMetrics
+from ai_resilience import CircuitBreakers, Hedger, is_upstream_failure
+from ai_router import ModelRouter, note_model, recording_models
+from ai_scheduler import DEFAULT_TENANT, AdmissionTimeout, RateLimitScheduler, scheduling
+from ai_sessions import SUMMARY_MAX_TOKENS, ChatSessionStore, summary_messages
+from ai_similarity import SimilarityCache, recording_approximate_hits
+from ai_singleflight import SingleFlight
+from ai_stream import iter_chat_deltas
+from ai_transport import PooledTransport, get_default_transport
+from jd_compactor import compact_job_description, estimate_tokens
+from resume_chunker import (
+    CHUNK_MAX_TOKENS, CHUNK_TEMPERATURE, CHUNKED_MIN_TOKENS, REDUCE_MAX_TOKENS, chunk_analysis_messages, chunk_cache_key, reduce_analysis_messages,
+    split_resume
+)
+from resume_codec import encode_resume
+from skill_extractor import SkillExtractor, get_default_extractor
+from structured_skills import (
+    TRUNCATED_WARNING, TypedSkill, iter_typed_skills, structured_skills_max_tokens, structured_skills_messages
+)
+
+try:
+    from match_engine import MatchEngine
+    from vector_index import DimensionMismatchError, SemanticIndex
+except ImportError:
+    # numpy/scipy not installed; match scoring and semantic search are unavailable
+    MatchEngine = None
+    SemanticIndex = None
+
+# Skills wanted per job description, and the fraction of them the local
+# extractor must find before the LLM fallback is skipped
+SKILLS_TARGET = int(os.getenv('AI_SKILLS_TARGET', 8))
+SKILLS_LOCAL_COVERAGE = float(os.getenv('AI_SKILLS_LOCAL_COVERAGE', 0.5))
+
+# Parallel chunk calls per chunked resume analysis
+ANALYZE_CHUNK_CONCURRENCY = int(os.getenv('AI_ANALYZE_CHUNK_CONCURRENCY', 8))
+
+# Model used when no router is configured
+DEFAULT_MODEL = "meta/llama-guard-4-12b"
+
 # Define the NVIDIA AI client inline for better compatibility
 class NvidiaAIClient:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, transport=None, cache=None, flight=None, skill_extractor=None, scheduler=None,
+                 breakers=None, hedger=None, router=None, metrics=None, similar=None):
         self.api_key = api_key or os.getenv("NVIDIA_API_KEY")
-        self.invoke_url = "https://integrate.api.nvidia.com/v1/chat/completions"
-        if not self.api_key:
+        self.invoke_url = os.getenv("NVIDIA_INVOKE_URL", "https://integrate.api.nvidia.com/v1/chat/completions")
+        self.transport = transport or get_default_transport()
+        self.cache = cache
+        self.flight = flight
+        self.skill_extractor = skill_extractor or get_default_extractor()
+        self.scheduler = scheduler
+        self.breakers = breakers
+        self.hedger = hedger
+        self.router = router
+        self.metrics = metrics
+        self.similar = similar
+        self.chunk_executor = ThreadPoolExecutor(max_workers=ANALYZE_CHUNK_CONCURRENCY, thread_name_prefix="analyze-chunk")
+        if scheduler is not None:
+            self.transport.rate_limit_listeners.append(scheduler.on_rate_limited)
+        if metrics is not None:
+            self.transport.rate_limit_listeners.append(metrics.on_rate_limited)
+            self.transport.retry_listeners.append(metrics.on_retry)
+        # A replaying cassette transport answers offline, so no key is needed
+        if not self.api_key and not getattr(self.transport, "offline", False):
             raise ValueError(
                 "NVIDIA API key is required. Set NVIDIA_API_KEY environment variable.\n"
                 "Get your API key from: https://developer.nvidia.com/"
             )
     
-    def chat_completion(self, messages, model="meta/llama-guard-4-12b", max_tokens=1000, temperature=0.7, top_p=0.9):
+    def route(self, task, messages, max_tokens):
+        """Model for a task call: chosen by the router from prompt/output length and live stats"""
+        if self.router is None:
+            return DEFAULT_MODEL
+        prompt_tokens = sum(estimate_tokens(message.get("content") or "") for message in messages)
+        return self.router.choose(task, prompt_tokens, max_tokens)
+    
+    def chat_completion(self, messages, model=None, max_tokens=1000, temperature=0.7, top_p=0.9, task="chat"):
+        model = model or self.route(task, messages, max_tokens)
+        note_model(model)
+        key = cache_key(model, messages, max_tokens, temperature, top_p)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "stream": False
+        }
+        if self.flight is not None:
+            # Identical concurrent requests share one upstream call
+            return self.flight.do(key, lambda: self._request(key, payload))
+        return self._request(key, payload)
+    
+    def open_stream(self, messages, model=None, max_tokens=1000, temperature=0.7, top_p=0.9, task="chat"):
+        """Start a streaming completion and return the open upstream response"""
+        model = model or self.route(task, messages, max_tokens)
+        note_model(model)
         headers = {
             "Authorization": f"Bearer {self.api_key}",
-            "Accept": "application/json"
+            "Accept": "text/event-stream"
         }
         payload = {
             "model": model,
@@ -47,60 +142,548 @@ class NvidiaAIClient:
             "max_tokens": max_tokens,
             "temperature": temperature,
             "top_p": top_p,
-            "stream": False
+            "stream": True
         }
-        response = requests.post(self.invoke_url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        return result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        
+        def start():
+            grant = self._admit(payload)
+            started = time.monotonic()
+            try:
+                response = self.transport.post(self.invoke_url, headers=headers, json=payload, stream=True)
+                response.raise_for_status()
+            except Exception as e:
+                if isinstance(e, requests.exceptions.HTTPError):
+                    e.response.close()
+                self._record_error(model, started, e)
+                raise
+            if self.metrics is not None:
+                self.metrics.upstream_ttfb.observe(response.elapsed.total_seconds(), model, "stream")
+                # sse_response() observes the total once the body has been relayed
+                response.upstream_call = (model, started)
+            if grant is not None:
+                # Settled by close_stream() once the streamed completion length is known
+                response.grant = (grant, self._prompt_tokens(payload))
+                response.stream_events = 0
+            return response
+        
+        if self.breakers is not None:
+            return self.breakers.call(model, self.invoke_url, start)
+        return start()
+    
+    def iter_stream(self, response):
+        """Raw chunks of a response from open_stream(), counting SSE events for close_stream()"""
+        for chunk in response.iter_content(chunk_size=None):
+            if hasattr(response, 'stream_events'):
+                response.stream_events += chunk.count(b"data:")
+            yield chunk
+    
+    def close_stream(self, response):
+        """
+        Close a response from open_stream(), record the upstream call's total time and settle its
+        rate limit grant: one completion token per relayed SSE event, less the closing [DONE]
+        """
+        response.close()
+        call = getattr(response, 'upstream_call', None)
+        if call is not None and self.metrics is not None:
+            model, started = call
+            self.metrics.upstream_seconds.observe(time.monotonic() - started, model, "stream")
+        admitted = getattr(response, 'grant', None)
+        if admitted is not None:
+            grant, prompt_tokens = admitted
+            response.grant = None
+            grant.settle(prompt_tokens + max(0, response.stream_events - 1))
+            self.scheduler.on_success()
+    
+    @staticmethod
+    def _prompt_tokens(payload):
+        return sum(estimate_tokens(message.get("content") or "") for message in payload["messages"])
+    
+    def _admit(self, payload):
+        """
+        Wait for the rate limit scheduler (if any) to admit the call; returns its grant
+        Inside a report graph the wait also ends at the graph's deadline
+        """
+        left = time_left()
+        if left is not None and left <= 0:
+            raise TimeoutError("Report deadline passed before the call was sent")
+        if self.scheduler is None:
+            return None
+        if left is not None and self.scheduler.max_wait is not None:
+            left = min(left, self.scheduler.max_wait)
+        return self.scheduler.acquire(tokens=self._prompt_tokens(payload) + payload["max_tokens"], timeout=left)
+    
+    def _post(self, payload, cancelled=None):
+        """One upstream call; a hedged copy (cancelled given) stops as soon as the other copy has answered"""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "application/json"
+        }
+        model = payload["model"]
+        grant = self._admit(payload)
+        if cancelled is not None and cancelled.is_set():
+            # The other copy answered while this one waited for admission: never sent
+            if grant is not None:
+                grant.release()
+            return None
+        if self.metrics is not None:
+            self.metrics.upstream_in_flight.inc(model)
+        started = time.monotonic()
+        try:
+            # Hedged copies read headers first so a loser can drop its connection without reading the body.
+            # A report graph task's read timeout ends at the graph's deadline
+            left = time_left()
+            with self.transport.post(self.invoke_url, headers=headers, json=payload, stream=cancelled is not None,
+                                     timeout=None if left is None else max(left, 0.01)) as response:
+                if cancelled is not None and cancelled.is_set():
+                    if grant is not None:
+                        # Dropped before the body: the upstream has processed at most the prompt
+                        grant.settle(self._prompt_tokens(payload))
+                    return None
+                response.raise_for_status()
+                result = response.json()
+        except Exception as e:
+            self._record_error(model, started, e)
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.upstream_in_flight.dec(model)
+        elapsed = time.monotonic() - started
+        usage = result.get("usage") or {}
+        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        completion_tokens = usage.get("completion_tokens") or estimate_tokens(content)
+        if self.router is not None:
+            self.router.record(model, elapsed, completion_tokens)
+        if self.metrics is not None:
+            # response.elapsed stops at the headers, i.e. time to first byte of the final attempt
+            self.metrics.upstream_ttfb.observe(response.elapsed.total_seconds(), model, "json")
+            self.metrics.upstream_seconds.observe(elapsed, model, "json")
+            prompt_tokens = usage.get("prompt_tokens") or sum(
+                estimate_tokens(message.get("content") or "") for message in payload["messages"]
+            )
+            self.metrics.tokens.inc(model, "prompt", amount=prompt_tokens)
+            self.metrics.tokens.inc(model, "completion", amount=completion_tokens)
+        if grant is not None:
+            grant.settle((result.get("usage") or {}).get("total_tokens"))
+            self.scheduler.on_success()
+        return result
+    
+    def _record_error(self, model, started, error):
+        """Count a failed upstream call against its model"""
+        if self.router is not None and is_upstream_failure(error):
+            self.router.record(model, time.monotonic() - started, error=True)
+        if self.metrics is not None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+            self.metrics.upstream_errors.inc(model, str(status) if status else type(error).__name__)
+    
+    def _request(self, key, payload):
+        def call():
+            if self.hedger is not None:
+                return self.hedger.call(payload["model"], lambda cancelled: self._post(payload, cancelled))
+            return self._post(payload)
+        
+        if self.breakers is not None:
+            result = self.breakers.call(payload["model"], self.invoke_url, call)
+        else:
+            result = call()
+        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        if self.cache is not None and content:
+            self.cache.set(key, content)
+        return content
+    
+    def analyze_resume(self, resume_content, chunked=None):
+        """
+        Analyze a resume; long ones (or chunked=True) are analyzed by analyze_resume_chunked()
+        A near-duplicate of a resume analyzed the same way (whole or chunked) gets that analysis back
+        (an approximate hit)
+        """
+        text = encode_resume(resume_content) if isinstance(resume_content, dict) else str(resume_content)
+        if chunked is None:
+            chunked = estimate_tokens(text) > CHUNKED_MIN_TOKENS
+        namespace = "analyze:chunked" if chunked else "analyze"
+        if self.similar is not None:
+            cached = self.similar.get(namespace, text)
+            if cached is not None:
+                return cached
+        chunks = split_resume(resume_content) if chunked else []
+        if len(chunks) > 1:
+            analysis = self.analyze_resume_chunked(chunks)
+        else:
+            analysis = self._analyze_whole(resume_content)
+        if self.similar is not None:
+            self.similar.set(namespace, text, analysis)
+        return analysis
     
-    def analyze_resume(self, resume_content):
+    def _analyze_whole(self, resume_content):
         messages = [
             {"role": "system", "content": "You are an expert resume analyst with deep knowledge of ATS optimization and hiring trends."},
             {"role": "user", "content": f"Analyze this resume and provide improvement suggestions: {resume_content}"}
         ]
-        return self.chat_completion(messages, model="meta/llama-3.1-8b-instruct", max_tokens=1500)
+        return self.chat_completion(messages, max_tokens=1500, task="analyze")
     
-    def enhance_resume_content(self, resume_data, job_description=""):
-        job_context = f"\n\nJob Description: {job_description}" if job_description else ""
-        messages = [
+    def analyze_resume_chunked(self, chunks):
+        """
+        Map-reduce analysis: all chunks in parallel, then one short call merging their findings
+        Wall-clock time follows the slowest chunk rather than the resume's length
+        """
+        # Each chunk call keeps the request's priority class, tenant and model recording
+        futures = [
+            self.chunk_executor.submit(contextvars.copy_context().run, self.analyze_chunk, chunk)
+            for chunk in chunks
+        ]
+        findings = [future.result() for future in futures]
+        return self.chat_completion(
+            reduce_analysis_messages(findings, chunks), max_tokens=REDUCE_MAX_TOKENS, task="analyze"
+        )
+    
+    def analyze_chunk(self, chunk):
+        """Findings for one chunk, cached by its content hash whichever model produced them"""
+        key = chunk_cache_key(chunk)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        findings = self.chat_completion(
+            chunk_analysis_messages(chunk), max_tokens=CHUNK_MAX_TOKENS, temperature=CHUNK_TEMPERATURE, task="analyze"
+        )
+        if self.cache is not None and findings:
+            self.cache.set(key, findings)
+        return findings
+    
+    def enhance_resume_messages(self, resume_data, job_description="", skills=None):
+        job_context = f"\n\nJob Description: {compact_job_description(job_description, task='enhance')}" if job_description else ""
+        if skills:
+            job_context += f"\nKey skills for this job: {', '.join(skills)}"
+        return [
             {"role": "system", "content": "You are an expert resume writer that enhances resumes for job applications."},
-            {"role": "user", "content": f"Enhance this resume: {json.dumps(resume_data)}{job_context}"}
+            {"role": "user", "content": f"Enhance this resume:\n{encode_resume(resume_data)}{job_context}"}
         ]
-        return self.chat_completion(messages, max_tokens=2000)
     
-    def generate_cover_letter(self, resume_data, job_description, company_name):
-        messages = [
+    def enhance_resume_content(self, resume_data, job_description="", skills=None):
+        return self.chat_completion(
+            self.enhance_resume_messages(resume_data, job_description, skills), max_tokens=2000, task="enhance"
+        )
+    
+    def cover_letter_messages(self, resume_data, job_description, company_name, skills=None):
+        key_skills = f"\nKey skills to address: {', '.join(skills)}" if skills else ""
+        return [
             {"role": "system", "content": "You are an expert cover letter writer."},
-            {"role": "user", "content": f"Write a professional cover letter for {company_name}. Resume: {json.dumps(resume_data)}. Job: {job_description}"}
+            {"role": "user", "content": f"Write a professional cover letter for {company_name}. Resume:\n{encode_resume(resume_data)}\nJob: {compact_job_description(job_description, task='cover_letter')}{key_skills}"}
         ]
-        return self.chat_completion(messages, max_tokens=1500)
+    
+    def generate_cover_letter(self, resume_data, job_description, company_name, skills=None):
+        return self.chat_completion(
+            self.cover_letter_messages(resume_data, job_description, company_name, skills), max_tokens=1500, task="cover_letter"
+        )
     
     def extract_job_skills(self, job_description):
-        messages = [
-            {"role": "system", "content": "Extract key skills from job descriptions. List them clearly."},
-            {"role": "user", "content": f"List the key skills required in this job: {job_description[:500]}"}  # Truncate to avoid token limits
-        ]
-        response = self.chat_completion(messages, model="meta/llama-3.1-8b-instruct", max_tokens=300)
-        # Simple parsing - in production you'd want more sophisticated parsing
+        # Local taxonomy scan first; only ask the LLM when it finds too few skills
+        local_skills = self.skill_extractor.extract(job_description)
+        if SkillExtractor.coverage(local_skills, SKILLS_TARGET) >= SKILLS_LOCAL_COVERAGE:
+            return local_skills
+        # Only the LLM's skills are shared with near-duplicate postings; the local scan is always this posting's own
+        skills = None
+        if self.similar is not None:
+            cached = self.similar.get("skills:llm", job_description)
+            if cached is not None:
+                skills = json.loads(cached)
+        
+        if skills is None:
+            messages = [
+                {"role": "system", "content": "Extract key skills from job descriptions. List them clearly."},
+                {"role": "user", "content": f"List the key skills required in this job: {compact_job_description(job_description, task='skills')}"}
+            ]
+            response = self.chat_completion(messages, max_tokens=300, task="skills")
+            # Simple parsing - in production you'd want more sophisticated parsing
+            skills = []
+            for line in response.split('\n'):
+                line = line.strip().replace('- ', '').replace('• ', '').replace('"', '').replace(',', '')
+                if line and len(line) < 50 and not line.startswith('*'):  # Filter out long sentences and headers
+                    skills.append(line)
+            skills = skills[:8]
+            if self.similar is not None:
+                self.similar.set("skills:llm", job_description, json.dumps(skills))
+        known = {skill.lower() for skill in local_skills}
+        merged = local_skills + [skill for skill in skills if skill.lower() not in known]
+        return merged[:max(SKILLS_TARGET, len(local_skills))]
+    
+    def stream_job_skills(self, job_description, max_skills=15, on_truncated=None):
+        """
+        Structured skill extraction: yield each TypedSkill as soon as its JSON element closes
+        The upstream request is closed once max_skills have arrived, saving latency and completion tokens.
+        If the completion ran out of max_tokens first, on_truncated() is called after the last skill
+        and the (incomplete) list is not cached
+        """
+        messages = structured_skills_messages(job_description, max_skills)
+        max_tokens = structured_skills_max_tokens(max_skills)
+        key = cache_key("structured-skills", messages, max_tokens, 0.2, 0.9)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield from (TypedSkill(**skill) for skill in json.loads(cached))
+                return
+        
+        upstream = self.open_stream(messages, max_tokens=max_tokens, temperature=0.2, task="skills")
         skills = []
-        for line in response.split('\n'):
-            line = line.strip().replace('- ', '').replace('• ', '').replace('"', '').replace(',', '')
-            if line and len(line) < 50 and not line.startswith('*'):  # Filter out long sentences and headers
-                skills.append(line)
-        return skills[:8]  # Return up to 8 skills
+        finish = []
+        try:
+            deltas = iter_chat_deltas(self.iter_stream(upstream), on_finish=finish.append)
+            for skill in iter_typed_skills(deltas, max_skills):
+                skills.append(skill)
+                yield skill
+        finally:
+            self.close_stream(upstream)
+        if "length" in finish and len(skills) < max_skills:
+            print(f"{TRUNCATED_WARNING} ({len(skills)} of {max_skills} skills, max_tokens={max_tokens})", file=sys.stderr)
+            if on_truncated is not None:
+                on_truncated()
+            return
+        if self.cache is not None and skills:
+            self.cache.set(key, json.dumps([skill.to_dict() for skill in skills]))
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for Next.js frontend
+CORS(app, expose_headers=['X-AI-Models'])  # Enable CORS for Next.js frontend
+
+# Initialize NVIDIA AI client with the shared response cache and request coalescing
+response_cache = TieredCache.from_env()
+inflight_requests = SingleFlight()
+similar_cache = SimilarityCache.from_env(response_cache)
+rate_scheduler = RateLimitScheduler.from_env()
+circuit_breakers = CircuitBreakers.from_env()
+hedger = Hedger.from_env()
+service_metrics = ServiceMetrics()
+model_router = ModelRouter.from_env(
+    available=(lambda model: circuit_breakers.available(model, nvidia_client.invoke_url)) if circuit_breakers else None
+)
+nvidia_client = NvidiaAIClient(
+    cache=response_cache,
+    flight=inflight_requests,
+    scheduler=rate_scheduler,
+    breakers=circuit_breakers,
+    hedger=hedger,
+    router=model_router,
+    metrics=service_metrics,
+    similar=similar_cache
+)
+match_engine = MatchEngine(skill_extractor=nvidia_client.skill_extractor) if MatchEngine else None
+
+def open_semantic_index():
+    """
+    The semantic index, or None with the reason semantic search is unavailable
+
+    An index built with another embedding dimension (e.g. after switching AI_EMBEDDER) disables
+    semantic search instead of failing server start-up; delete its files to rebuild it.
+    """
+    if SemanticIndex is None:
+        return None, "Semantic search requires numpy (pip install -r requirements.txt)"
+    path = os.getenv(
+        'AI_VECTOR_INDEX_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'vector-index', 'jobs')
+    )
+    try:
+        return SemanticIndex(path), None
+    except DimensionMismatchError as e:
+        reason = f"Semantic search disabled: {e}; delete {path}.* to rebuild the index"
+        print(reason, file=sys.stderr)
+        return None, reason
+
+semantic_index, semantic_index_unavailable = open_semantic_index()
+
+# User.role values with their own fair share; any other X-User-Role shares the default group,
+# so a client cannot take extra shares by making up role names
+TENANT_ROLES = frozenset({"recruiter", "candidate"})
+
+def request_tenant():
+    """Fair-share group of the caller for upstream rate limits: the User.role sent by the frontend"""
+    role = request.headers.get('X-User-Role', '').strip().lower()
+    return role if role in TENANT_ROLES else DEFAULT_TENANT
+
+@app.before_request
+def enter_schedule():
+    # Upstream calls made while handling a request are interactive unless run as batch tasks
+    g.schedule = scheduling('interactive', request_tenant())
+    g.schedule.__enter__()
+
+@app.teardown_request
+def exit_schedule(exc):
+    schedule = g.pop('schedule', None)
+    if schedule is not None:
+        schedule.__exit__(None, None, None)
+
+@app.before_request
+def start_model_recording():
+    g.model_recording = recording_models()
+    g.models = g.model_recording.__enter__()
+
+@app.after_request
+def report_models(response):
+    """Record the model(s) that served the request on every response"""
+    models = g.get('models')
+    if models:
+        response.headers['X-AI-Models'] = ",".join(models)
+    return response
+
+@app.teardown_request
+def stop_model_recording(exc):
+    recording = g.pop('model_recording', None)
+    if recording is not None:
+        recording.__exit__(None, None, None)
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    g.metrics_started = time.monotonic()
+    service_metrics.requests_in_flight.inc(g.metrics_endpoint)
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint, started = g.get('metrics_endpoint'), g.get('metrics_started')
+    if started is None:
+        return response
+    method = request.method
+    service_metrics.requests.inc(endpoint, method, str(response.status_code))
+    
+    def finished():
+        # Runs once the body has been sent, so streamed responses are timed in full
+        service_metrics.request_seconds.observe(time.monotonic() - started, endpoint, method)
+        service_metrics.requests_in_flight.dec(endpoint)
+    
+    response.call_on_close(finished)
+    return response
 
-# Initialize NVIDIA AI client
-nvidia_client = NvidiaAIClient()
+def collect_component_metrics():
+    """Cache, coalescing, scheduler, breaker and hedging state, read at scrape time"""
+    families = []
+    if response_cache is not None:
+        stats = response_cache.stats()
+        families += [
+            ("hiresense_cache_requests_total", "counter", "Response cache lookups by result", [
+                ({"result": "memory_hit"}, stats["memory_hits"]),
+                ({"result": "shared_hit"}, stats["shared_hits"]),
+                ({"result": "miss"}, stats["misses"]),
+            ]),
+            ("hiresense_cache_hit_ratio", "gauge", "Response cache hit ratio", [({}, stats["hit_ratio"])]),
+            ("hiresense_cache_entries", "gauge", "Entries in the in-memory cache tier", [({}, stats["memory_entries"])]),
+        ]
+    if similar_cache is not None:
+        stats = similar_cache.stats()
+        families.append(("hiresense_similarity_requests_total", "counter", "Near-duplicate cache lookups by result", [
+            ({"result": "exact_hit"}, stats["exact_hits"]),
+            ({"result": "approximate_hit"}, stats["approximate_hits"]),
+            ({"result": "miss"}, stats["misses"]),
+        ]))
+    if chat_sessions is not None:
+        stats = chat_sessions.stats()
+        families += [
+            ("hiresense_chat_sessions", "gauge", "Live server-side chat sessions", [({}, stats["sessions"])]),
+            ("hiresense_chat_compactions_total", "counter", "Chat history compactions by result", [
+                ({"result": "ok"}, stats["compactions"]),
+                ({"result": "error"}, stats["compaction_errors"]),
+            ]),
+        ]
+    flight = inflight_requests.stats()
+    families += [
+        ("hiresense_coalesced_requests_total", "counter", "Calls that shared an identical in-flight upstream call",
+         [({}, flight["coalesced"])]),
+        ("hiresense_coalescing_in_flight", "gauge", "Distinct upstream calls being coalesced",
+         [({}, flight["in_flight"])]),
+    ]
+    if rate_scheduler is not None:
+        stats = rate_scheduler.stats()
+        families.append(("hiresense_scheduler_waiting", "gauge", "Calls waiting for a rate limit grant",
+                         [({"priority": name}, count) for name, count in stats["waiting"].items()]))
+    if circuit_breakers is not None:
+        families.append(("hiresense_circuit_open", "gauge", "1 while a model/endpoint circuit breaker is not closed", [
+            ({"breaker": key}, 0 if state["state"] == "closed" else 1)
+            for key, state in circuit_breakers.stats().items()
+        ]))
+    if job_queue is not None:
+        stats = job_queue.stats()
+        families.append(("hiresense_jobs", "gauge", "Queued, running and retained finished jobs by status",
+                         [({"status": status}, count) for status, count in stats["jobs"].items()]))
+    if hedger is not None:
+        stats = hedger.stats()
+        families.append(("hiresense_hedged_calls_total", "counter", "Upstream calls by hedging outcome", [
+            ({"outcome": "calls"}, stats["calls"]),
+            ({"outcome": "hedged"}, stats["hedged"]),
+            ({"outcome": "hedge_won"}, stats["hedge_wins"]),
+            ({"outcome": "inline"}, stats["inline"]),
+        ]))
+    return families
+
+service_metrics.registry.register_collector(collect_component_metrics)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text-format metrics"""
+    return Response(service_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({"status": "healthy", "service": "nvidia-ai-python-api"})
 
+@app.route('/api/ai/cache-stats', methods=['GET'])
+def cache_stats():
+    """Response cache hit, miss and eviction counters"""
+    if response_cache is None:
+        return jsonify({"success": True, "enabled": False, "coalescing": inflight_requests.stats()})
+    return jsonify({
+        "success": True,
+        "enabled": True,
+        "stats": response_cache.stats(),
+        "similarity": similar_cache.stats() if similar_cache is not None else None,
+        "coalescing": inflight_requests.stats()
+    })
+
+@app.route('/api/ai/rate-limits', methods=['GET'])
+def rate_limit_stats():
+    """Client-side upstream rate limit scheduler state"""
+    if rate_scheduler is None:
+        return jsonify({"success": True, "enabled": False})
+    return jsonify({"success": True, "enabled": True, "stats": rate_scheduler.stats()})
+
+@app.route('/api/ai/routing', methods=['GET'])
+def routing_stats():
+    """Model router decisions per task and live per-model latency/throughput/error stats"""
+    return jsonify({"success": True, "stats": model_router.stats()})
+
+@app.route('/api/ai/upstream-health', methods=['GET'])
+def upstream_health():
+    """Circuit breaker state per model/endpoint and request hedging counters"""
+    return jsonify({
+        "success": True,
+        "breakers": circuit_breakers.stats() if circuit_breakers is not None else None,
+        "hedging": hedger.stats() if hedger is not None else None
+    })
+
+def error_response(e):
+    """
+    JSON error for an exception raised while handling a request: 429 with Retry-After when the
+    rate limit scheduler could not admit the upstream call in time, otherwise 500
+    """
+    if isinstance(e, AdmissionTimeout):
+        response = jsonify({"success": False, "error": str(e)})
+        response.headers['Retry-After'] = str(max(1, math.ceil(e.retry_after)))
+        return response, 429
+    return jsonify({"success": False, "error": str(e)}), 500
+
+def sse_response(upstream):
+    """
+    Relay an upstream SSE response to the client chunk by chunk, without buffering
+    If the client disconnects, the generator is closed and the upstream request aborted
+    """
+    def relay():
+        try:
+            for chunk in nvidia_client.iter_stream(upstream):
+                if chunk:
+                    yield chunk
+        finally:
+            nvidia_client.close_stream(upstream)
+    
+    return Response(relay(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # Disable proxy buffering (nginx)
+    })
+
 @app.route('/api/ai/chat', methods=['POST'])
 def chat_completion():
     """
@@ -110,8 +693,11 @@ def chat_completion():
     try:
         data = request.get_json()
         
+        if 'message' in data or 'session_id' in data:
+            return session_chat(data)
+        
         messages = data.get('messages', [])
-        model = data.get('model', 'meta/llama-guard-4-12b')
+        model = data.get('model')  # None: chosen by the model router
         max_tokens = data.get('max_tokens', 1000)
         temperature = data.get('temperature', 0.7)
         top_p = data.get('top_p', 0.9)
@@ -130,10 +716,103 @@ def chat_completion():
         })
         
     except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+        return error_response(e)
+
+CHAT_MAX_MESSAGE_CHARS = int(os.getenv('AI_CHAT_MAX_MESSAGE_CHARS', 8000))
+
+def summarize_chat(summary, messages, tenant):
+    """Fold older chat messages into a session's summary, queued behind interactive calls"""
+    with scheduling('batch', tenant):
+        return nvidia_client.chat_completion(
+            summary_messages(summary, messages), max_tokens=SUMMARY_MAX_TOKENS, temperature=0.2, task="chat"
+        )
+
+chat_sessions = ChatSessionStore.from_env(summarize_chat)
+
+def session_chat(data):
+    """
+    One turn of a server-side chat session: {"message", "session_id"?, "system"?, model options}
+    Without a session_id a new session is started; its ID is returned with the reply.
+    A new session is only stored once its first reply arrived, so failed calls leave none behind
+    """
+    if chat_sessions is None:
+        return jsonify({"success": False, "error": "Chat sessions are disabled"}), 503
+    message = data.get('message')
+    if not isinstance(message, str) or not message.strip():
+        return jsonify({"success": False, "error": "A non-empty message is required"}), 400
+    if len(message) > CHAT_MAX_MESSAGE_CHARS:
+        return jsonify({"success": False, "error": f"Messages are limited to {CHAT_MAX_MESSAGE_CHARS} characters"}), 400
+    
+    if data.get('session_id'):
+        session = chat_sessions.get(data['session_id'])
+        if session is None:
+            return jsonify({"success": False, "error": "Chat session not found or expired"}), 404
+    else:
+        session = chat_sessions.draft(system=data.get('system'))
+    
+    content = nvidia_client.chat_completion(
+        messages=chat_sessions.prompt(session, message),
+        model=data.get('model'),
+        max_tokens=data.get('max_tokens', 1000),
+        temperature=data.get('temperature', 0.7),
+        top_p=data.get('top_p', 0.9)
+    )
+    turn = [
+        {"role": "user", "content": message},
+        {"role": "assistant", "content": content}
+    ]
+    if 'id' in session:
+        chat_sessions.append(session['id'], turn)
+    else:
+        session = chat_sessions.create(system=session['system'], tenant=request_tenant(), messages=turn)
+    return jsonify({
+        "success": True,
+        "content": content,
+        "session_id": session['id']
+    })
+
+@app.route('/api/ai/chat/sessions/<session_id>', methods=['GET'])
+def get_chat_session(session_id):
+    """A chat session's summary and the messages it still keeps verbatim"""
+    session = chat_sessions.get(session_id) if chat_sessions is not None else None
+    if session is None:
+        return jsonify({"success": False, "error": "Chat session not found or expired"}), 404
+    return jsonify({
+        "success": True,
+        "session": {key: session[key] for key in ("id", "summary", "summarized", "messages", "created_at", "expires_at")}
+    })
+
+@app.route('/api/ai/chat/sessions/<session_id>', methods=['DELETE'])
+def delete_chat_session(session_id):
+    if chat_sessions is None or not chat_sessions.delete(session_id):
+        return jsonify({"success": False, "error": "Chat session not found or expired"}), 404
+    return jsonify({"success": True})
+
+@app.route('/api/ai/chat/stream', methods=['POST'])
+def chat_completion_stream():
+    """
+    Streaming chat completion: relays upstream SSE chunks as they arrive
+    """
+    try:
+        data = request.get_json()
+        
+        upstream = nvidia_client.open_stream(
+            messages=data.get('messages', []),
+            model=data.get('model'),
+            max_tokens=data.get('max_tokens', 1000),
+            temperature=data.get('temperature', 0.7),
+            top_p=data.get('top_p', 0.9)
+        )
+        return sse_response(upstream)
+        
+    except Exception as e:
+        return error_response(e)
+
+def approximate_fields(hits):
+    """Response fields flagging a result served from a near-duplicate input's cache entry"""
+    if not hits:
+        return {}
+    return {"approximate": True, "similarity": min(hit["similarity"] for hit in hits)}
 
 @app.route('/api/ai/analyze-resume', methods=['POST'])
 def analyze_resume():
@@ -150,18 +829,18 @@ def analyze_resume():
                 "error": "Resume content is required"
             }), 400
         
-        analysis = nvidia_client.analyze_resume(resume_content)
+        # chunked: true/false forces map-reduce analysis on or off; by default long resumes are chunked
+        with recording_approximate_hits() as hits:
+            analysis = nvidia_client.analyze_resume(resume_content, chunked=data.get('chunked'))
         
         return jsonify({
             "success": True,
-            "analysis": analysis
+            "analysis": analysis,
+            **approximate_fields(hits)
         })
         
     except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+        return error_response(e)
 
 @app.route('/api/ai/enhance-resume', methods=['POST'])
 def enhance_resume():
@@ -187,10 +866,33 @@ def enhance_resume():
         })
         
     except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+        return error_response(e)
+
+@app.route('/api/ai/enhance-resume/stream', methods=['POST'])
+def enhance_resume_stream():
+    """
+    Streaming resume enhancement (SSE)
+    """
+    try:
+        data = request.get_json()
+        resume_data = data.get('resume_data', {})
+        job_description = data.get('job_description', '')
+        
+        if not resume_data:
+            return jsonify({
+                "success": False,
+                "error": "Resume data is required"
+            }), 400
+        
+        upstream = nvidia_client.open_stream(
+            nvidia_client.enhance_resume_messages(resume_data, job_description),
+            max_tokens=2000,
+            task="enhance"
+        )
+        return sse_response(upstream)
+        
+    except Exception as e:
+        return error_response(e)
 
 @app.route('/api/ai/generate-cover-letter', methods=['POST'])
 def generate_cover_letter():
@@ -217,10 +919,34 @@ def generate_cover_letter():
         })
         
     except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+        return error_response(e)
+
+@app.route('/api/ai/generate-cover-letter/stream', methods=['POST'])
+def generate_cover_letter_stream():
+    """
+    Streaming cover letter generation (SSE)
+    """
+    try:
+        data = request.get_json()
+        resume_data = data.get('resume_data', {})
+        job_description = data.get('job_description', '')
+        company_name = data.get('company_name', '')
+        
+        if not all([resume_data, job_description, company_name]):
+            return jsonify({
+                "success": False,
+                "error": "Resume data, job description, and company name are required"
+            }), 400
+        
+        upstream = nvidia_client.open_stream(
+            nvidia_client.cover_letter_messages(resume_data, job_description, company_name),
+            max_tokens=1500,
+            task="cover_letter"
+        )
+        return sse_response(upstream)
+        
+    except Exception as e:
+        return error_response(e)
 
 @app.route('/api/ai/extract-job-skills', methods=['POST'])
 def extract_job_skills():
@@ -237,18 +963,432 @@ def extract_job_skills():
                 "error": "Job description is required"
             }), 400
         
-        skills = nvidia_client.extract_job_skills(job_description)
+        if data.get('structured'):
+            truncated = []
+            typed_skills = list(nvidia_client.stream_job_skills(
+                job_description, skills_limit(data), on_truncated=lambda: truncated.append(True)
+            ))
+            return jsonify({
+                "success": True,
+                "skills": [skill.name for skill in typed_skills],
+                "typed_skills": [skill.to_dict() for skill in typed_skills],
+                "truncated": bool(truncated)
+            })
+        
+        with recording_approximate_hits() as hits:
+            skills = nvidia_client.extract_job_skills(job_description)
+        matches = nvidia_client.skill_extractor.find(job_description)
+        
+        return jsonify({
+            "success": True,
+            "skills": skills,
+            **approximate_fields(hits),
+            "matches": [
+                {"skill": m.skill, "category": m.category, "start": m.start, "end": m.end}
+                for m in matches
+            ]
+        })
+        
+    except Exception as e:
+        return error_response(e)
+
+SKILLS_MAX_STRUCTURED = int(os.getenv('AI_SKILLS_MAX_STRUCTURED', 50))
+
+def skills_limit(data):
+    """Requested number of structured skills (max_skills), within 1..AI_SKILLS_MAX_STRUCTURED"""
+    try:
+        return max(1, min(int(data.get('max_skills', 15)), SKILLS_MAX_STRUCTURED))
+    except (TypeError, ValueError):
+        return 15
+
+@app.route('/api/ai/extract-job-skills/stream', methods=['POST'])
+def extract_job_skills_stream():
+    """
+    Structured skill extraction streamed as NDJSON: one {"name", "type"} line per skill as soon as it is parsed,
+    and a final {"truncated": true} line if the completion ran out of tokens before the list was complete
+    """
+    data = request.get_json(silent=True) or {}
+    job_description = data.get('job_description', '')
+    
+    if not job_description:
+        return jsonify({
+            "success": False,
+            "error": "Job description is required"
+        }), 400
+    
+    truncated = []
+    skills = nvidia_client.stream_job_skills(
+        job_description, skills_limit(data), on_truncated=lambda: truncated.append(True)
+    )
+    try:
+        # Start the upstream call now so errors still get a JSON error response
+        first = next(skills, None)
+    except Exception as e:
+        return error_response(e)
+    
+    def generate():
+        try:
+            if first is not None:
+                yield json.dumps(first.to_dict()) + "\n"
+            for skill in skills:
+                yield json.dumps(skill.to_dict()) + "\n"
+            if truncated:
+                yield json.dumps({"truncated": True}) + "\n"
+        finally:
+            # Client disconnected or finished: stops the upstream completion
+            skills.close()
+    
+    return Response(generate(), mimetype='application/x-ndjson', headers={"X-Accel-Buffering": "no"})
+
+REPORT_CONCURRENCY = int(os.getenv('AI_REPORT_CONCURRENCY', 16))
+REPORT_TIMEOUT = float(os.getenv('AI_REPORT_TIMEOUT', 120))
+report_executor = ThreadPoolExecutor(max_workers=REPORT_CONCURRENCY, thread_name_prefix="full-report")
+
+def skill_match(resume_text, skills):
+    """Which of the job's skills the resume mentions, found locally"""
+    found = {skill.lower() for skill in nvidia_client.skill_extractor.extract(resume_text)}
+    lowered = resume_text.lower()
+    matched = [skill for skill in skills if skill.lower() in found or skill.lower() in lowered]
+    return {
+        "matched": matched,
+        "missing": [skill for skill in skills if skill not in matched],
+        "coverage": round(len(matched) / len(skills), 3) if skills else 0.0
+    }
+
+def build_report_graph(resume, job_description, company_name):
+    """
+    analysis ----------------------------------------------+
+    skills --+-- skill_match                                +-- report
+             +-- enhancement                                |
+             +-- cover_letter (only with a company name) ---+
+    Skills are extracted once and shared by the steps that tailor the resume to the job
+    """
+    resume_text = encode_resume(resume)
+    graph = TaskGraph()
+    graph.add("analysis", lambda: nvidia_client.analyze_resume(resume_text))
+    graph.add("skills", lambda: nvidia_client.extract_job_skills(job_description))
+    graph.add("skill_match", lambda skills: skill_match(resume_text, skills), deps=["skills"])
+    graph.add(
+        "enhancement", lambda skills: nvidia_client.enhance_resume_content(resume, job_description, skills=skills),
+        deps=["skills"]
+    )
+    if company_name:
+        graph.add(
+            "cover_letter",
+            lambda skills: nvidia_client.generate_cover_letter(resume, job_description, company_name, skills=skills),
+            deps=["skills"]
+        )
+    return graph
+
+@app.route('/api/ai/full-report', methods=['POST'])
+def full_report():
+    """
+    Analysis, job skills, skill match, enhancement and cover letter in one request
+    Independent steps run concurrently, so the report takes about as long as its slowest branch
+    """
+    data = request.get_json(silent=True) or {}
+    resume = data.get('resume_data') or data.get('resume_content')
+    job_description = data.get('job_description', '')
+    company_name = data.get('company_name', '')
+    
+    if not resume or not job_description:
+        return jsonify({
+            "success": False,
+            "error": "Resume (resume_data or resume_content) and job description are required"
+        }), 400
+    
+    started = time.monotonic()
+    try:
+        with recording_approximate_hits() as hits:
+            results = build_report_graph(resume, job_description, company_name).run(report_executor, REPORT_TIMEOUT)
+    except Exception as e:
+        return error_response(e)
+    
+    errors = {name: result.error for name, result in results.items() if not result.ok}
+    if len(errors) == len(results):
+        return jsonify({
+            "success": False,
+            "error": "All report steps failed",
+            "errors": errors
+        }), 502
+    return jsonify({
+        "success": True,
+        "report": {name: result.value for name, result in results.items() if result.ok},
+        "errors": errors,
+        "timings": {name: result.timing() for name, result in results.items()},
+        "seconds": round(time.monotonic() - started, 3),
+        **approximate_fields(hits)
+    })
+
+@app.route('/api/ai/match-scores', methods=['POST'])
+def match_scores():
+    """
+    Score resumes against jobs locally (BM25 + skill overlap) and return the top-k jobs per resume
+    """
+    if match_engine is None:
+        return jsonify({
+            "success": False,
+            "error": "Match scoring requires numpy and scipy (pip install -r requirements.txt)"
+        }), 501
+    
+    try:
+        data = request.get_json()
+        resumes = data.get('resumes', [])
+        jobs = data.get('jobs', [])
+        top_k = data.get('top_k', 10)
+        
+        if not resumes or not jobs:
+            return jsonify({
+                "success": False,
+                "error": "Resumes and jobs are required"
+            }), 400
+        
+        if isinstance(top_k, bool) or not isinstance(top_k, int) or not 1 <= top_k <= len(jobs):
+            return jsonify({
+                "success": False,
+                "error": f"top_k must be an integer between 1 and the number of jobs ({len(jobs)})"
+            }), 400
+        
+        index = match_engine.index_jobs_cached(jobs)
+        ranked = match_engine.top_k(resumes, index, k=top_k)
+        
+        results = []
+        for resume, row in zip(resumes, ranked):
+            # Extract the resume's skills once, not once per returned job
+            resume_columns = match_engine.resume_skill_columns(resume, index)
+            results.append([
+                {
+                    "job_index": job,
+                    "job_id": jobs[job].get('id') if isinstance(jobs[job], dict) else None,
+                    "match_score": round(score, 1),
+                    "matching_skills": match_engine.matching_skills(resume, index, job, resume_columns)
+                }
+                for job, score in row
+            ])
+        
+        return jsonify({
+            "success": True,
+            "results": results
+        })
+        
+    except Exception as e:
+        return error_response(e)
+
+@app.route('/api/ai/semantic/index', methods=['POST'])
+def semantic_index_add():
+    """
+    Append documents (e.g. job descriptions) to the memory-mapped semantic index
+    """
+    if semantic_index is None:
+        return jsonify({
+            "success": False,
+            "error": semantic_index_unavailable
+        }), 501
+    
+    try:
+        data = request.get_json()
+        items = data.get('items', [])
+        
+        if not items or not all(isinstance(item, dict) and item.get('id') and item.get('text') for item in items):
+            return jsonify({
+                "success": False,
+                "error": "A list of items with id and text is required"
+            }), 400
+        
+        semantic_index.add_texts([str(item['id']) for item in items], [item['text'] for item in items])
         
         return jsonify({
             "success": True,
-            "skills": skills
+            "indexed": len(items),
+            "total": len(semantic_index.index)
         })
         
     except Exception as e:
+        return error_response(e)
+
+@app.route('/api/ai/semantic/search', methods=['POST'])
+def semantic_search():
+    """
+    Top-k nearest documents for one or more query texts (resume or search text)
+    """
+    if semantic_index is None:
         return jsonify({
             "success": False,
-            "error": str(e)
-        }), 500
+            "error": semantic_index_unavailable
+        }), 501
+    
+    try:
+        data = request.get_json()
+        queries = data.get('queries') or ([data['query']] if data.get('query') else [])
+        top_k = data.get('top_k', 10)
+        nprobe = data.get('nprobe')
+        
+        if not queries:
+            return jsonify({
+                "success": False,
+                "error": "A query or list of queries is required"
+            }), 400
+        
+        invalid = [name for name, value in (("top_k", top_k), ("nprobe", nprobe))
+                   if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 1)]
+        if top_k is None or invalid:
+            return jsonify({
+                "success": False,
+                "error": f"{', '.join(invalid) or 'top_k'} must be a positive integer"
+            }), 400
+        
+        results = semantic_index.search_texts(queries, k=top_k, nprobe=nprobe)
+        
+        return jsonify({
+            "success": True,
+            "results": [[{"id": item_id, "score": round(score, 4)} for item_id, score in row] for row in results]
+        })
+        
+    except Exception as e:
+        return error_response(e)
+
+BATCH_MAX_TASKS = int(os.getenv('AI_BATCH_MAX_TASKS', 500))
+BATCH_DEFAULT_CONCURRENCY = int(os.getenv('AI_BATCH_CONCURRENCY', 8))
+BATCH_MAX_CONCURRENCY = int(os.getenv('AI_BATCH_MAX_CONCURRENCY', 32))
+
+def validate_batch_task(task):
+    """Raise ValueError if a batch/job task has an unknown op or misses required fields"""
+    op = task.get('op')
+    if op == 'analyze':
+        if not task.get('resume_content'):
+            raise ValueError("Resume content is required")
+    elif op == 'enhance':
+        if not task.get('resume_data'):
+            raise ValueError("Resume data is required")
+    elif op == 'skills':
+        if not task.get('job_description'):
+            raise ValueError("Job description is required")
+    elif op == 'cover-letter':
+        if not all([task.get('resume_data'), task.get('job_description'), task.get('company_name')]):
+            raise ValueError("Resume data, job description, and company name are required")
+    else:
+        raise ValueError(f"Unknown op '{op}'. Expected one of: analyze, enhance, skills, cover-letter")
+
+def run_batch_task(task):
+    """Run a single batch task and return its result fields"""
+    validate_batch_task(task)
+    op = task['op']
+    if op == 'analyze':
+        return {"analysis": nvidia_client.analyze_resume(task['resume_content'], chunked=task.get('chunked'))}
+    if op == 'enhance':
+        return {"enhancement": nvidia_client.enhance_resume_content(task['resume_data'], task.get('job_description', ''))}
+    if op == 'skills':
+        return {"skills": nvidia_client.extract_job_skills(task['job_description'])}
+    return {"cover_letter": nvidia_client.generate_cover_letter(
+        task['resume_data'], task['job_description'], task['company_name']
+    )}
+
+def run_scheduled_batch_task(tenant, task):
+    """Run a batch task in the batch priority class, so interactive requests go first upstream"""
+    with scheduling('batch', tenant), recording_models() as models, recording_approximate_hits() as hits:
+        result = run_batch_task(task)
+    result["models"] = models
+    result.update(approximate_fields(hits))
+    return result
+
+@app.route('/api/ai/batch', methods=['POST'])
+def batch():
+    """
+    Run many AI tasks concurrently and stream results as NDJSON
+    Each line is one finished task: {"index", "id", "op", "success", ...result or "error"}
+    """
+    data = request.get_json(silent=True) or {}
+    tasks = data.get('tasks')
+    
+    if not isinstance(tasks, list) or not tasks:
+        return jsonify({
+            "success": False,
+            "error": "A non-empty list of tasks is required"
+        }), 400
+    
+    if len(tasks) > BATCH_MAX_TASKS:
+        return jsonify({
+            "success": False,
+            "error": f"At most {BATCH_MAX_TASKS} tasks are allowed per batch"
+        }), 400
+    
+    try:
+        concurrency = int(data.get('concurrency', BATCH_DEFAULT_CONCURRENCY))
+    except (TypeError, ValueError):
+        concurrency = BATCH_DEFAULT_CONCURRENCY
+    concurrency = max(1, min(concurrency, BATCH_MAX_CONCURRENCY, len(tasks)))
+    tenant = request_tenant()
+    
+    def generate():
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        futures = {
+            executor.submit(run_scheduled_batch_task, tenant, task if isinstance(task, dict) else {}): index
+            for index, task in enumerate(tasks)
+        }
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                task = tasks[index] if isinstance(tasks[index], dict) else {}
+                line = {"index": index, "id": task.get('id'), "op": task.get('op')}
+                try:
+                    line.update(future.result())
+                    line["success"] = True
+                except Exception as e:
+                    line["success"] = False
+                    line["error"] = str(e)
+                yield json.dumps(line) + "\n"
+        finally:
+            # Also reached when the client disconnects: drop tasks that have not started
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+job_queue = JobQueue.from_env(
+    lambda op, payload, tenant: run_scheduled_batch_task(tenant, dict(payload, op=op)),
+    transport=PooledTransport()
+)
+if job_queue is not None:
+    job_queue.start()
+
+@app.route('/api/ai/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue a long-running task (same ops and fields as batch tasks) and return its job ID at once
+    Poll GET /api/ai/jobs/<id>, or pass webhook_url to have the finished job POSTed to it
+    """
+    if job_queue is None:
+        return jsonify({"success": False, "error": "Job queue is disabled (AI_JOBS_ENABLED=false)"}), 501
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "A JSON task is required"}), 400
+    webhook_url = data.pop('webhook_url', None)
+    try:
+        validate_batch_task(data)
+        op = data.pop('op')
+        job, deduplicated = job_queue.submit(op, data, tenant=request_tenant(), webhook_url=webhook_url)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    response = jsonify({"success": True, "job_id": job["id"], "status": job["status"], "deduplicated": deduplicated})
+    response.status_code = 202
+    response.headers['Location'] = f"/api/ai/jobs/{job['id']}"
+    return response
+
+@app.route('/api/ai/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job status, and its result or error once finished"""
+    job = job_queue.get(job_id) if job_queue is not None else None
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found or expired"}), 404
+    return jsonify({"success": True, "job": job})
+
+@app.route('/api/ai/jobs', methods=['GET'])
+def job_stats():
+    """Job queue counts by status, workers and webhook delivery counters"""
+    if job_queue is None:
+        return jsonify({"success": True, "enabled": False})
+    return jsonify({"success": True, "enabled": True, "stats": job_queue.stats()})
 
 @app.route('/api/ai/original-example', methods=['POST'])
 def original_example():
@@ -277,10 +1417,7 @@ def original_example():
         })
         
     except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+        return error_response(e)
 
 if __name__ == '__main__':
     port = int(os.getenv('PYTHON_API_PORT', 5000))
@@ -290,11 +1427,30 @@ if __name__ == '__main__':
     print(f"Debug mode: {debug}")
     print("Available endpoints:")
     print("  GET  /health")
+    print("  GET  /metrics")
+    print("  GET  /api/ai/cache-stats")
+    print("  GET  /api/ai/rate-limits")
+    print("  GET  /api/ai/routing")
+    print("  GET  /api/ai/upstream-health")
     print("  POST /api/ai/chat")
+    print("  POST /api/ai/chat/stream")
+    print("  GET  /api/ai/chat/sessions/<id>")
+    print("  DELETE /api/ai/chat/sessions/<id>")
     print("  POST /api/ai/analyze-resume")
     print("  POST /api/ai/enhance-resume")
+    print("  POST /api/ai/enhance-resume/stream")
     print("  POST /api/ai/generate-cover-letter")
+    print("  POST /api/ai/generate-cover-letter/stream")
     print("  POST /api/ai/extract-job-skills")
+    print("  POST /api/ai/extract-job-skills/stream")
+    print("  POST /api/ai/full-report")
+    print("  POST /api/ai/match-scores")
+    print("  POST /api/ai/semantic/index")
+    print("  POST /api/ai/semantic/search")
+    print("  POST /api/ai/batch")
+    print("  POST /api/ai/jobs")
+    print("  GET  /api/ai/jobs/<id>")
+    print("  GET  /api/ai/jobs")
     print("  POST /api/ai/original-example")
     
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Measure the effect of request hedging and circuit breaking on upstream latency
+Runs against mock_upstream.py with an injected latency tail (a share of slow
+responses), so no API key or network access is needed.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_resilience import CircuitBreakers, CircuitOpenError, Hedger
+from ai_transport import PooledTransport, TransportConfig
+from mock_upstream import MockUpstream
+
+PAYLOAD = {"model": "mock/model", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 16}
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+
+def post(transport, url, cancelled=None):
+    # Same shape as NvidiaAIClient._post in api-server.py
+    with transport.post(url, json=PAYLOAD, stream=cancelled is not None) as response:
+        if cancelled is not None and cancelled.is_set():
+            return None
+        response.raise_for_status()
+        return response.json()
+
+
+def run(label, call, requests_count, concurrency):
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, range(requests_count)))
+    print(
+        f"{label:<14}"
+        + "".join(f"{1000 * percentile(latencies, q):>10.1f}" for q in (50, 95, 99))
+        + f"{1000 * max(latencies):>10.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hedged requests and circuit breaking")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.02, help="Normal upstream latency in seconds")
+    parser.add_argument("--slow-fraction", type=float, default=0.03, help="Share of slow upstream responses")
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="Latency of slow responses in seconds")
+    args = parser.parse_args()
+
+    transport = PooledTransport(TransportConfig(max_retries=0, default_pool_size=64))
+    with MockUpstream(delay=args.delay, slow_fraction=args.slow_fraction, slow_delay=args.slow_delay, seed=1) as mock:
+        print(f"Upstream: {args.delay * 1000:.0f} ms, {args.slow_fraction:.0%} at {args.slow_delay * 1000:.0f} ms; "
+              f"{args.requests} requests x {args.concurrency} concurrent")
+        print(f"{'mode':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+
+        before = mock.request_count
+        run("no hedging", lambda: post(transport, mock.url), args.requests, args.concurrency)
+        plain_calls = mock.request_count - before
+
+        hedger = Hedger(percentile=95, max_ratio=0.1)
+        # Warm up the latency window so hedging is active from the first measured call
+        run("(warm-up)", lambda: hedger.call("mock/model", lambda c: post(transport, mock.url, c)), 50, args.concurrency)
+        before = mock.request_count
+        run("hedged p95", lambda: hedger.call("mock/model", lambda c: post(transport, mock.url, c)),
+            args.requests, args.concurrency)
+        hedged_calls = mock.request_count - before
+        print(f"\nUpstream calls: {plain_calls} without hedging, {hedged_calls} with (+{hedged_calls / plain_calls - 1:.1%})")
+        print(f"Hedging stats: {hedger.stats()}")
+
+        # Degraded upstream: every call fails after the normal delay
+        mock.fail_with(503, times=10 ** 6)
+        breakers = CircuitBreakers(failure_threshold=5, reset_timeout=30)
+        for label, use_breaker in (("no breaker", False), ("breaker", True)):
+            before, start = mock.request_count, time.perf_counter()
+            for _ in range(100):
+                try:
+                    if use_breaker:
+                        breakers.call("mock/model", mock.url, lambda: post(transport, mock.url))
+                    else:
+                        post(transport, mock.url)
+                except Exception as e:
+                    assert isinstance(e, CircuitOpenError) or "503" in str(e)
+            elapsed = time.perf_counter() - start
+            print(f"Failing upstream, {label:<10}: 100 calls in {elapsed * 1000:7.1f} ms, "
+                  f"{mock.request_count - before} reached upstream")
+    transport.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Load-test the Python API server and report per-endpoint throughput and latency as JSON
+By default starts mock_upstream.py and api-server.py in-process, so no API key or
+network access is needed; --server targets an already running server instead.
+--record-cassette saves the upstream traffic of a run and --cassette replays it with
+the recorded timing (see ai_cassette.py), so runs are reproducible offline.
+Compare runs before and after a change with --output and --baseline.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SCRIPTS_DIR)
+
+from mock_upstream import MockUpstream
+
+RESUME_TEXT = (
+    "Jane Doe\nSenior Software Engineer\n\nExperience:\n- 5 years at TechCorp building React and Node.js apps\n"
+    "- Led migration to AWS and Kubernetes\n\nSkills: JavaScript, TypeScript, Python, PostgreSQL, Docker"
+)
+RESUME_DATA = {
+    "personalInfo": {"fullName": "Jane Doe", "email": "jane@example.com", "location": "Berlin"},
+    "summary": "Senior engineer focused on web platforms.",
+    "experience": [{
+        "title": "Senior Software Engineer", "company": "TechCorp", "startDate": "2019", "endDate": "Present",
+        "description": "Built React and Node.js apps; led the AWS migration."
+    }],
+    "education": [{"degree": "BSc Computer Science", "institution": "TU Berlin", "graduationDate": "2018"}],
+    "skills": ["JavaScript", "TypeScript", "React", "Node.js", "AWS", "Docker"]
+}
+JOB_DESCRIPTION = (
+    "We are hiring a Backend Engineer.\n\nRequirements:\n- 3+ years with Python or Go\n"
+    "- Experience with PostgreSQL, Redis and Kafka\n- Familiarity with Kubernetes and CI/CD\n\n"
+    "About us: we are a friendly team that values collaboration."
+)
+
+# name: (path, streamed, payload(variant))
+ENDPOINTS = {
+    "chat": ("/api/ai/chat", False, lambda v: {
+        "messages": [{"role": "user", "content": f"Give one interview tip for a backend developer (#{v})."}],
+        "max_tokens": 200
+    }),
+    "chat_stream": ("/api/ai/chat/stream", True, lambda v: {
+        "messages": [{"role": "user", "content": f"Give one interview tip for a frontend developer (#{v})."}],
+        "max_tokens": 200
+    }),
+    "analyze": ("/api/ai/analyze-resume", False, lambda v: {"resume_content": f"{RESUME_TEXT}\nRef: {v}"}),
+    "enhance": ("/api/ai/enhance-resume", False, lambda v: {
+        "resume_data": dict(RESUME_DATA, summary=f"{RESUME_DATA['summary']} Ref {v}."),
+        "job_description": JOB_DESCRIPTION
+    }),
+    "enhance_stream": ("/api/ai/enhance-resume/stream", True, lambda v: {
+        "resume_data": dict(RESUME_DATA, summary=f"{RESUME_DATA['summary']} Ref {v}."),
+        "job_description": JOB_DESCRIPTION
+    }),
+    "cover_letter": ("/api/ai/generate-cover-letter", False, lambda v: {
+        "resume_data": RESUME_DATA, "job_description": JOB_DESCRIPTION, "company_name": f"Company {v}"
+    }),
+    "skills": ("/api/ai/extract-job-skills", False, lambda v: {"job_description": f"{JOB_DESCRIPTION}\nRef: {v}"}),
+    "match": ("/api/ai/match-scores", False, lambda v: {
+        "resumes": [dict(RESUME_DATA, summary=f"Ref {v}")],
+        "jobs": [{"id": "backend", "description": JOB_DESCRIPTION}, {"id": "frontend", "description": RESUME_TEXT}]
+    }),
+}
+DEFAULT_ENDPOINTS = "chat,chat_stream,analyze,enhance,cover_letter,skills"
+
+
+def percentile(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+
+def summarize(samples: List[float]) -> Optional[Dict]:
+    """p50/p95/p99/max/mean in milliseconds"""
+    if not samples:
+        return None
+    summary = {f"p{q}": round(1000 * percentile(samples, q), 2) for q in (50, 95, 99)}
+    summary["max"] = round(1000 * max(samples), 2)
+    summary["mean"] = round(1000 * sum(samples) / len(samples), 2)
+    return summary
+
+
+class LoadGenerator:
+    """
+    Sends the endpoint mix to a server and records one (endpoint, latency, ttfb, ok) per request
+
+    Closed loop: `concurrency` workers each send their next request as soon as the last one
+    finishes. Open loop: requests arrive as a Poisson process at `rate` per second whatever
+    the server's speed, and latency is measured from the scheduled arrival so a slow server
+    cannot hide queueing (coordinated omission).
+    """
+
+    def __init__(self, base_url: str, endpoints: List[str], repeat: float = 0.0, timeout: float = 120.0,
+                 seed: Optional[int] = None, label: str = ""):
+        self.base_url = base_url.rstrip("/")
+        self.endpoints = endpoints
+        self.repeat = repeat
+        self.label = label
+        self.timeout = timeout
+        self.results: List[tuple] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _variant(self, index: int) -> str:
+        # A repeated variant sends an identical payload, so it can be served from the response cache
+        with self._lock:
+            return "0" if self._random.random() < self.repeat else f"{self.label}{index + 1}"
+
+    def send(self, index: int, scheduled: Optional[float] = None) -> None:
+        name = self.endpoints[index % len(self.endpoints)]
+        path, streamed, payload = ENDPOINTS[name]
+        body = payload(self._variant(index))
+        started = scheduled if scheduled is not None else time.perf_counter()
+        ttfb, ok = None, False
+        try:
+            with self._session().post(self.base_url + path, json=body, stream=streamed, timeout=self.timeout) as response:
+                if streamed:
+                    for chunk in response.iter_content(chunk_size=None):
+                        if ttfb is None and chunk:
+                            ttfb = time.perf_counter() - started
+                else:
+                    response.content
+                ok = response.status_code < 400
+        except requests.exceptions.RequestException:
+            pass
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.results.append((name, elapsed, ttfb, ok))
+
+    def run_closed(self, concurrency: int, requests_count: int) -> float:
+        """Returns the wall time in seconds"""
+        counter = iter(range(requests_count))
+        counter_lock = threading.Lock()
+
+        def worker():
+            while True:
+                with counter_lock:
+                    index = next(counter, None)
+                if index is None:
+                    return
+                self.send(index)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+    def run_open(self, rate: float, duration: float, max_workers: int) -> float:
+        """Returns the wall time in seconds, including draining requests still in flight"""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            arrival, index = start, 0
+            while True:
+                arrival += self._random.expovariate(rate)
+                if arrival - start >= duration:
+                    break
+                pause = arrival - time.perf_counter()
+                if pause > 0:
+                    time.sleep(pause)
+                executor.submit(self.send, index, arrival)
+                index += 1
+        return time.perf_counter() - start
+
+    def report(self, wall: float) -> Dict:
+        report = {"endpoints": {}}
+        groups: Dict[str, List[tuple]] = {}
+        for result in self.results:
+            groups.setdefault(result[0], []).append(result)
+        for name, results in sorted(groups.items()) + [("total", self.results)]:
+            ok = [elapsed for _, elapsed, _, success in results if success]
+            entry = {
+                "requests": len(results),
+                "errors": len(results) - len(ok),
+                "throughput_rps": round(len(ok) / wall, 2) if wall else 0.0,
+                "latency_ms": summarize(ok),
+            }
+            ttfbs = [ttfb for _, _, ttfb, success in results if success and ttfb is not None]
+            if ttfbs:
+                entry["ttfb_ms"] = summarize(ttfbs)
+            if name == "total":
+                report["total"] = entry
+            else:
+                report["endpoints"][name] = entry
+        return report
+
+
+def compare(report: Dict, baseline: Dict) -> Dict:
+    """Percent change of throughput and latency percentiles against a baseline report"""
+    def change(new, old):
+        return round(100.0 * (new - old) / old, 1) if new is not None and old else None
+
+    comparison = {}
+    for name in list(report["endpoints"]) + ["total"]:
+        new = report["total"] if name == "total" else report["endpoints"][name]
+        old = baseline.get("total") if name == "total" else baseline.get("endpoints", {}).get(name)
+        if not old:
+            continue
+        entry = {"throughput_rps_pct": change(new["throughput_rps"], old["throughput_rps"])}
+        for q in ("p50", "p95", "p99"):
+            entry[f"{q}_ms_pct"] = change((new["latency_ms"] or {}).get(q), (old.get("latency_ms") or {}).get(q))
+        comparison[name] = entry
+    return comparison
+
+
+def start_server(upstream_url: Optional[str], cache: bool, workdir: str, cassette: Optional[Dict] = None):
+    """
+    Load api-server.py against upstream_url and serve it on a free port
+
+    cassette: NVIDIA_CASSETTE_* settings; in replay mode no upstream is needed
+
+    Returns:
+        (base_url, server, api-server module)
+    """
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    if upstream_url is not None:
+        os.environ["NVIDIA_INVOKE_URL"] = upstream_url
+    os.environ.update(cassette or {})
+    os.environ.update({
+        "NVIDIA_API_KEY": os.environ.get("NVIDIA_API_KEY", "mock-key"),
+        "AI_CACHE_ENABLED": "true" if cache else "false",
+        # Keep benchmark entries out of the real shared cache and index
+        "AI_CACHE_PATH": os.path.join(workdir, "responses.sqlite3"),
+        "AI_VECTOR_INDEX_PATH": os.path.join(workdir, "vector-index"),
+    })
+    spec = importlib.util.spec_from_file_location("api_server", os.path.join(SCRIPTS_DIR, "api-server.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    server = make_server("127.0.0.1", 0, module.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server, module
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Python API server against a mock upstream")
+    parser.add_argument("--server", help="Base URL of a running server (default: start one in-process on the mock)")
+    parser.add_argument("--endpoints", default=DEFAULT_ENDPOINTS,
+                        help=f"Comma-separated mix, sent round-robin (available: {','.join(ENDPOINTS)})")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed loop: concurrent clients")
+    parser.add_argument("--requests", type=int, default=300, help="Closed loop: total requests")
+    parser.add_argument("--rate", type=float, help="Open loop: arrivals per second (switches to open loop)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Open loop: seconds of arrivals")
+    parser.add_argument("--max-workers", type=int, default=256, help="Open loop: client threads")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests sent before measuring")
+    parser.add_argument("--repeat", type=float, default=0.0, help="Share of requests with a repeated payload")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the server's response cache")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    upstream = parser.add_argument_group("mock upstream")
+    upstream.add_argument("--latency", default="lognormal:0.05,0.4", help="Latency distribution (see mock_upstream.py)")
+    upstream.add_argument("--tokens-per-second", type=float, default=2000.0)
+    upstream.add_argument("--reply-tokens", type=int, default=120)
+    upstream.add_argument("--error-rate", type=float, default=0.0)
+    upstream.add_argument("--error-statuses", default="503")
+    upstream.add_argument("--upstream-url", help="Use this upstream instead of the mock, e.g. to record a cassette")
+    cassette = parser.add_argument_group("cassette")
+    cassette.add_argument("--cassette", help="Replay upstream responses from this cassette instead of the mock")
+    cassette.add_argument("--record-cassette", help="Record this run's upstream responses to a cassette (.jsonl[.gz])")
+    cassette.add_argument("--latency-scale", type=float, default=1.0,
+                          help="Replay: multiply recorded latencies (0.5 = twice as fast, 0 = none)")
+    cassette.add_argument("--match", choices=("exact", "loose"), default="loose",
+                          help="Replay: fail unrecorded requests, or serve a recording of the same model/streaming mode")
+    args = parser.parse_args()
+    if args.cassette and args.record_cassette:
+        parser.error("--cassette and --record-cassette are mutually exclusive")
+
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(unknown)}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    mock, server, transport, workdir = None, None, None, tempfile.TemporaryDirectory()
+    base_url = args.server
+    if base_url is None:
+        cassette, upstream_url = None, args.upstream_url
+        if args.cassette:
+            cassette = {
+                "NVIDIA_CASSETTE_MODE": "replay", "NVIDIA_CASSETTE_PATH": args.cassette,
+                "NVIDIA_CASSETTE_LATENCY_SCALE": str(args.latency_scale), "NVIDIA_CASSETTE_MATCH": args.match
+            }
+        elif args.record_cassette:
+            cassette = {"NVIDIA_CASSETTE_MODE": "record", "NVIDIA_CASSETTE_PATH": args.record_cassette}
+        if upstream_url is None and not args.cassette:
+            mock = MockUpstream(
+                latency=args.latency, tokens_per_second=args.tokens_per_second, reply_tokens=args.reply_tokens,
+                error_rate=args.error_rate, error_statuses=[int(s) for s in args.error_statuses.split(",")],
+                seed=args.seed
+            ).start()
+            upstream_url = mock.url
+        base_url, server, module = start_server(upstream_url, not args.no_cache, workdir.name, cassette)
+        transport = module.nvidia_client.transport if cassette else None
+
+    try:
+        if args.warmup:
+            LoadGenerator(base_url, endpoints, seed=args.seed, label="warmup-").run_closed(min(args.concurrency, args.warmup), args.warmup)
+        upstream_before = mock.request_count if mock else 0
+
+        generator = LoadGenerator(base_url, endpoints, repeat=args.repeat, seed=args.seed)
+        if args.rate:
+            print(f"Open loop: {args.rate}/s for {args.duration}s against {base_url}", file=sys.stderr)
+            wall = generator.run_open(args.rate, args.duration, args.max_workers)
+            mode = {"mode": "open", "rate": args.rate, "duration": args.duration}
+        else:
+            print(f"Closed loop: {args.requests} requests x {args.concurrency} concurrent against {base_url}",
+                  file=sys.stderr)
+            wall = generator.run_closed(args.concurrency, args.requests)
+            mode = {"mode": "closed", "concurrency": args.concurrency, "requests": args.requests}
+
+        report = {
+            "config": dict(mode, endpoints=endpoints, repeat=args.repeat, server=args.server or "in-process"),
+            "wall_seconds": round(wall, 3),
+        }
+        report.update(generator.report(wall))
+        if mock is not None:
+            report["config"]["upstream"] = {
+                "latency": str(mock.latency), "tokens_per_second": mock.tokens_per_second,
+                "reply_tokens": mock.reply_tokens, "error_rate": mock.error_rate
+            }
+            report["upstream"] = {"requests": mock.request_count - upstream_before, "injected_errors": mock.error_count}
+        if transport is not None:
+            report["cassette"] = transport.stats()
+        if baseline is not None:
+            report["comparison"] = compare(report, baseline)
+    finally:
+        if server is not None:
+            server.shutdown()
+        if transport is not None:
+            transport.close()
+        if mock is not None:
+            mock.stop()
+        workdir.cleanup()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark the canonical resume encoding against the JSON previously embedded in prompts
+Compares prompt tokens and encode time of encode_resume() with json.dumps(indent=2)
+and compact json.dumps() over generated ResumeData records.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from jd_compactor import estimate_tokens
+from resume_codec import encode_resume, resume_hash
+
+try:
+    import tiktoken
+except ImportError:
+    # Fall back to the local estimator used for prompt budgets
+    tiktoken = None
+
+WORDS = (
+    "built scalable services reduced latency led team migrated platform designed api improved "
+    "conversion automated deployment pipelines mentored engineers shipped features analytics"
+).split()
+SKILLS = ["Python", "TypeScript", "React", "Node.js", "AWS", "Docker", "Kubernetes", "PostgreSQL", "Go", "GraphQL"]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def sample_resume(rng: random.Random) -> dict:
+    """A ResumeData dict shaped like types/resume.ts"""
+    return {
+        "personalInfo": {
+            "name": "Jordan Lee", "email": "jordan@example.com", "phone": "+1 555 0100",
+            "location": "Austin, TX", "linkedin": "linkedin.com/in/jordanlee", "website": ""
+        },
+        "summary": sentence(rng, 30),
+        "experience": [
+            {
+                "title": "Software Engineer", "company": f"Company {i}", "location": "Remote",
+                "startDate": f"20{10 + i}-01", "endDate": f"20{12 + i}-06",
+                "description": sentence(rng, 25),
+                "achievements": [sentence(rng, 12) for _ in range(3)]
+            }
+            for i in range(rng.randint(2, 5))
+        ],
+        "education": [{
+            "degree": "BSc Computer Science", "institution": "State University", "location": "Austin, TX",
+            "graduationDate": "2010", "gpa": "3.7", "achievements": []
+        }],
+        "skills": rng.sample(SKILLS, 6),
+        "projects": [
+            {"name": f"Project {i}", "description": sentence(rng, 15), "technologies": rng.sample(SKILLS, 3), "link": ""}
+            for i in range(rng.randint(1, 3))
+        ]
+    }
+
+
+def count_tokens(text: str, encoding) -> int:
+    return len(encoding.encode(text)) if encoding is not None else estimate_tokens(text)
+
+
+def measure(name: str, encode, resumes, encoding) -> dict:
+    start = time.perf_counter()
+    outputs = [encode(resume) for resume in resumes]
+    elapsed = time.perf_counter() - start
+    tokens = sum(count_tokens(text, encoding) for text in outputs)
+    return {
+        "encoding": name,
+        "avg_tokens": round(tokens / len(resumes), 1),
+        "avg_chars": round(sum(len(text) for text in outputs) / len(resumes), 1),
+        "encode_us": round(elapsed / len(resumes) * 1e6, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resume prompt encodings")
+    parser.add_argument("--count", type=int, default=2000, help="Number of generated resumes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resumes = [sample_resume(rng) for _ in range(args.count)]
+    encoding = None
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # The BPE file is downloaded on first use; stay offline-friendly
+            encoding = None
+
+    results = [
+        measure("json indent=2", lambda resume: json.dumps(resume, indent=2), resumes, encoding),
+        measure("json compact", lambda resume: json.dumps(resume), resumes, encoding),
+        measure("encode_resume", encode_resume, resumes, encoding),
+    ]
+    baseline = results[0]["avg_tokens"]
+
+    print(f"Resumes: {args.count}   tokens: {'tiktoken cl100k_base' if encoding else 'local estimate'}")
+    print(f"{'encoding':<16}{'tokens':>10}{'chars':>10}{'encode µs':>12}{'vs indent=2':>14}")
+    for result in results:
+        saving = 100 * (1 - result["avg_tokens"] / baseline)
+        print(
+            f"{result['encoding']:<16}{result['avg_tokens']:>10}{result['avg_chars']:>10}"
+            f"{result['encode_us']:>12}{saving:>13.1f}%"
+        )
+
+    # Key order must not change the encoding or the hash
+    shuffled = json.loads(json.dumps(resumes[0], sort_keys=True))
+    stable = resume_hash(shuffled) == resume_hash(resumes[0])
+    print(f"\nHash stable across key order: {'✅' if stable else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -153,6 +153,29 @@ def demo_all_features():
     except Exception as e:
         print(f"❌ Chat failed: {e}")
     
+    print("\n8. 📊 Full Report (all of the above in one request)")
+    print("-" * 30)
+    try:
+        payload = {
+            "resume_content": sample_resume.strip(),
+            "job_description": job_description.strip(),
+            "company_name": company_name
+        }
+        response = requests.post(f"{base_url}/api/ai/full-report", json=payload, timeout=120)
+        result = response.json()
+        if result.get("success"):
+            report = result["report"]
+            print(f"✅ Full Report in {result['seconds']}s: {', '.join(report)}")
+            match = report.get("skill_match")
+            if match:
+                print(f"   Skill coverage: {match['coverage']:.0%} (missing: {', '.join(match['missing'][:5]) or 'none'})")
+            for step, error in result["errors"].items():
+                print(f"   ⚠️ {step}: {error}")
+        else:
+            print(f"❌ Full report failed: {result.get('error', 'Unknown error')}")
+    except Exception as e:
+        print(f"❌ Full report failed: {e}")
+    
     print("\n" + "=" * 50)
     print("🎉 Demo Complete!")
     print("\n🔗 Integration Ready:")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Export the technology list from lib/technologies.ts to scripts/data/technologies.json
+Run this after editing lib/technologies.ts so the Python skill extractor stays in sync.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_PATH = os.path.join(SCRIPT_DIR, "..", "lib", "technologies.ts")
+OUTPUT_PATH = os.path.join(SCRIPT_DIR, "data", "technologies.json")
+
+
+def parse_technologies(source: str) -> dict:
+    """Parse the TECHNOLOGIES object literal into {category: [names]}"""
+    body = source[source.index("TECHNOLOGIES = {"):]
+    categories = {}
+    for category, items in re.findall(r"(\w+):\s*\[([^\]]*)\]", body):
+        categories[category] = re.findall(r"'([^']*)'", items)
+    return categories
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export lib/technologies.ts for the Python skill extractor")
+    parser.add_argument("--source", default=SOURCE_PATH, help="TypeScript file with the TECHNOLOGIES object")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="JSON file to write")
+    parser.add_argument("--check", action="store_true",
+                        help="Only check that the output is up to date (exit status 1 if not)")
+    args = parser.parse_args()
+
+    with open(args.source, encoding="utf-8") as f:
+        categories = parse_technologies(f.read())
+    text = json.dumps({"source": "lib/technologies.ts", "categories": categories}, indent=2) + "\n"
+
+    if args.check:
+        current = None
+        if os.path.exists(args.output):
+            with open(args.output, encoding="utf-8") as f:
+                current = f.read()
+        if current != text:
+            print(f"{os.path.relpath(args.output)} is out of date; run export-technologies.py")
+            return 1
+        print(f"{os.path.relpath(args.output)} is up to date")
+        return 0
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(text)
+
+    total = sum(len(items) for items in categories.values())
+    print(f"Exported {total} technologies in {len(categories)} categories to {os.path.relpath(args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
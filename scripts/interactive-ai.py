@@ -34,12 +34,15 @@ def interactive_ai():
             print("\n💬 AI Chat")
             message = input("Ask AI anything: ")
             try:
-                response = client.chat_completion([
+                print("\n🤖 AI Response:")
+                # Print tokens as they arrive instead of waiting for the full reply
+                for delta in client.chat_completion_stream([
                     {"role": "user", "content": message}
-                ])
-                print(f"\n🤖 AI Response:\n{response}")
+                ]):
+                    print(delta, end="", flush=True)
+                print()
             except Exception as e:
-                print(f"❌ Error: {e}")
+                print(f"\n❌ Error: {e}")
         
         elif choice == "2":
             print("\n📄 Resume Analysis")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Token-aware job description compaction for HireSenseAI prompts
+Splits a job description into sections, drops boilerplate (EEO statements, benefits,
+company blurbs) and repeated lines, and fits what is left to a per-task token budget
+so requirements are kept and filler is not sent upstream.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+BOILERPLATE_PATH = os.path.join(DATA_DIR, "jd-boilerplate.json")
+
+# Default prompt token budget for the job description, per task
+DEFAULT_BUDGETS = {"skills": 400, "enhance": 700, "cover_letter": 700}
+
+TOKEN_PIECE_RE = re.compile(r"[A-Za-z]+|\d+|\n\s*|[^\sA-Za-z\d]")
+SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+BULLET_RE = re.compile(r"^\s*(?:[-*•·▪◦]|\d+[.)])\s*")
+HEADING_MAX_WORDS = 8
+
+# Words that make a short all-caps line a heading, besides the configured section names;
+# an all-caps line without one ("PYTHON, SQL, AWS") is content
+HEADING_WORDS = frozenset(
+    "about benefits company compensation description duties education experience job location offer overview "
+    "perks position preferred qualifications required requirements responsibilities role salary skills summary "
+    "team".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate BPE token count without a tokenizer
+
+    Words cost one token per four letters, numbers one per three digits, and every
+    punctuation mark and line break (with its indentation) one token; this errs
+    slightly high for English, which is the safe side for a budget.
+    """
+    tokens = 0
+    for piece in TOKEN_PIECE_RE.findall(text):
+        if piece[0].isalpha():
+            tokens += (len(piece) + 3) // 4
+        elif piece[0].isdigit():
+            tokens += (len(piece) + 2) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+def _normalize(line: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", line.lower()))
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Leading words of text within the token budget; a single word longer than the budget is cut by characters"""
+    words: List[str] = []
+    used = 0
+    for word in text.split():
+        cost = estimate_tokens(word)
+        if used + cost <= budget:
+            words.append(word)
+            used += cost
+            continue
+        if not words:
+            low, high = 0, len(word)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if estimate_tokens(word[:middle]) <= budget:
+                    low = middle
+                else:
+                    high = middle - 1
+            words.append(word[:low])
+        break
+    return " ".join(words)
+
+
+def fingerprint(line: str) -> str:
+    """Stable fingerprint of a line, insensitive to case, punctuation and bullets"""
+    return hashlib.blake2b(_normalize(line).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _parse_budgets(value: str) -> Dict[str, int]:
+    """Parse "task=tokens,task2=tokens" into a dict"""
+    budgets = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        task, tokens = item.split("=", 1)
+        if task.strip() and tokens.strip().isdigit():
+            budgets[task.strip()] = int(tokens)
+    return budgets
+
+
+@dataclass
+class Section:
+    heading: str
+    lines: List[str] = field(default_factory=list)
+    priority: int = 1  # higher is kept first; 0 is dropped
+
+
+class JobDescriptionCompactor:
+    """
+    Removes boilerplate from job descriptions and fits them to a token budget
+
+    Boilerplate is recognized three ways: whole sections by heading (e.g. "Benefits"),
+    single lines containing a curated phrase (e.g. "equal opportunity employer"), and
+    lines whose fingerprint was learned from a corpus of descriptions with learn().
+    """
+
+    def __init__(
+        self,
+        drop_sections: Iterable[str] = (),
+        priority_sections: Optional[Dict[str, int]] = None,
+        phrases: Iterable[str] = (),
+        fingerprints: Iterable[str] = (),
+        budgets: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize the compactor
+
+        Args:
+            drop_sections: Section headings whose whole section is boilerplate
+            priority_sections: {heading: priority} for sections to keep first when over budget
+            phrases: Phrases marking a single line as boilerplate
+            fingerprints: Line fingerprints (see fingerprint()) known to be boilerplate
+            budgets: {task: token budget}, merged over DEFAULT_BUDGETS
+        """
+        self.drop_sections = {_normalize(heading) for heading in drop_sections}
+        self.priority_sections = {_normalize(heading): priority for heading, priority in (priority_sections or {}).items()}
+        self.phrases = [phrase.lower() for phrase in phrases]
+        self.fingerprints: Set[str] = set(fingerprints)
+        self.budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+
+    @classmethod
+    def from_files(cls, path: str = BOILERPLATE_PATH) -> "JobDescriptionCompactor":
+        """Load the curated boilerplate file; budgets can be overridden with AI_JD_TOKEN_BUDGETS"""
+        data = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        return cls(
+            drop_sections=data.get("drop_sections", []),
+            priority_sections=data.get("priority_sections", {}),
+            phrases=data.get("phrases", []),
+            fingerprints=data.get("fingerprints", []),
+            budgets=_parse_budgets(os.getenv("AI_JD_TOKEN_BUDGETS", "")),
+        )
+
+    def learn(self, descriptions: Iterable[str], min_documents: int = 3, min_words: int = 6) -> int:
+        """
+        Learn boilerplate lines from a corpus of job descriptions
+
+        A line that appears in at least min_documents different descriptions is
+        template text (legal notices, company blurbs), not a requirement.
+
+        Returns:
+            Number of new fingerprints added
+        """
+        counts: Counter = Counter()
+        for description in descriptions:
+            counts.update({
+                fingerprint(line) for line in description.splitlines()
+                if len(_normalize(line).split()) >= min_words
+            })
+        learned = {key for key, count in counts.items() if count >= min_documents} - self.fingerprints
+        self.fingerprints |= learned
+        return len(learned)
+
+    def _heading_of(self, line: str) -> Optional[str]:
+        stripped = line.strip()
+        if not stripped or BULLET_RE.match(stripped):
+            return None
+        name = _normalize(stripped)
+        if not name or len(name.split()) > HEADING_MAX_WORDS:
+            return None
+        if stripped.startswith("#") or stripped.endswith(":"):
+            return name
+        if name in self.priority_sections or name in self.drop_sections:
+            return name
+        if stripped.isupper() and self._names_section(name):
+            return name
+        return None
+
+    def _names_section(self, name: str) -> bool:
+        """Whether a heading-shaped line names a known section or contains a heading word"""
+        padded = f" {name} "
+        if any(f" {section} " in padded for section in (*self.priority_sections, *self.drop_sections)):
+            return True
+        return any(word in HEADING_WORDS for word in name.split())
+
+    def _priority(self, heading: str) -> int:
+        if heading in self.priority_sections:
+            return self.priority_sections[heading]
+        if heading in self.drop_sections:
+            return 0
+        for name, priority in self.priority_sections.items():
+            if name in heading:
+                return priority
+        if any(name in heading for name in self.drop_sections):
+            return 0
+        return 1
+
+    def _is_boilerplate(self, line: str) -> bool:
+        lowered = line.lower()
+        return any(phrase in lowered for phrase in self.phrases) or fingerprint(line) in self.fingerprints
+
+    def sections(self, text: str) -> List[Section]:
+        """Split into sections, without boilerplate or repeated lines"""
+        sections = [Section(heading="")]
+        seen: Set[str] = set()
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+            heading = self._heading_of(line)
+            if heading is not None:
+                sections.append(Section(heading=line, priority=self._priority(heading)))
+                continue
+            key = fingerprint(line)
+            if key in seen or not _normalize(line) or self._is_boilerplate(line):
+                continue
+            seen.add(key)
+            sections[-1].lines.append(line)
+        return [section for section in sections if section.lines and section.priority > 0]
+
+    def compact(self, text: str, task: Optional[str] = None, budget: Optional[int] = None) -> str:
+        """
+        Compact a job description for a prompt
+
+        Args:
+            text: Raw job description
+            task: Task name used to look up the budget ("skills", "enhance", "cover_letter")
+            budget: Explicit token budget; overrides the task budget. None with no task means unlimited
+
+        Returns:
+            The kept sections in their original order, highest-priority content first to fit the budget.
+            If not even one sentence fits, the leading words of the highest-priority section instead
+        """
+        if not text:
+            return text
+        if budget is None and task is not None:
+            budget = self.budgets.get(task)
+        sections = self.sections(text)
+
+        kept: Dict[int, List[str]] = {}
+        remaining = budget if budget is not None else float("inf")
+        order = sorted(range(len(sections)), key=lambda i: (-sections[i].priority, i))
+        for position in order:
+            section = sections[position]
+            heading_cost = estimate_tokens(section.heading) + 1 if section.heading else 0
+            available = remaining - heading_cost
+            lines: List[str] = []
+            for line in section.lines:
+                cost = estimate_tokens(line) + 1
+                if cost <= available:
+                    lines.append(line)
+                    available -= cost
+                    continue
+                # Keep the leading sentences of a long line that does not fit whole
+                partial = []
+                for sentence in SENTENCE_RE.split(line):
+                    sentence_cost = estimate_tokens(sentence) + 1
+                    if sentence_cost > available:
+                        break
+                    partial.append(sentence)
+                    available -= sentence_cost
+                if partial:
+                    lines.append(" ".join(partial))
+            if lines:
+                kept[position] = lines
+                remaining = available
+
+        if not kept and sections and budget is not None:
+            # Nothing fit whole (e.g. one long line without sentence breaks): hard-cut the first lines
+            position = order[0]
+            heading = sections[position].heading
+            heading_cost = estimate_tokens(heading) + 1 if heading else 0
+            cut = truncate_to_tokens(" ".join(sections[position].lines), budget - heading_cost)
+            if cut:
+                kept[position] = [cut]
+
+        output = []
+        for position in sorted(kept):
+            if sections[position].heading:
+                output.append(sections[position].heading)
+            output.extend(kept[position])
+        return "\n".join(output)
+
+
+_default_compactor: Optional[JobDescriptionCompactor] = None
+
+
+def get_default_compactor() -> JobDescriptionCompactor:
+    """Return the shared compactor built from the bundled boilerplate file"""
+    global _default_compactor
+    if _default_compactor is None:
+        _default_compactor = JobDescriptionCompactor.from_files()
+    return _default_compactor
+
+
+def compact_job_description(text: str, task: Optional[str] = None, budget: Optional[int] = None) -> str:
+    """Compact a job description with the shared compactor"""
+    return get_default_compactor().compact(text, task=task, budget=budget)
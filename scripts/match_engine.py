@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Vectorized resume-by-job match scoring for HireSenseAI
+Builds sparse BM25 and skill-overlap features for N resumes and M jobs and computes
+the N x M match score matrix in bounded-memory chunks, returning the top-k jobs per resume.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from skill_extractor import SkillExtractor, get_default_extractor
+
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or our that the their this to "
+    "we will with you your".split()
+)
+
+Document = Union[str, Dict]
+
+# Identifier/contact fields of Job and ResumeData that carry no matching signal
+IGNORED_FIELDS = frozenset({
+    "id", "url", "link", "email", "phone", "website", "linkedin", "postedDate", "source",
+    "salary", "matchScore", "commuteTime", "distance", "startDate", "endDate", "graduationDate", "gpa"
+})
+
+
+def document_text(document: Document) -> str:
+    """Flatten a resume/job (plain text, ResumeData or Job dict) into one text blob"""
+    if isinstance(document, str):
+        return document
+    parts = []
+
+    def collect(value):
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                if key not in IGNORED_FIELDS:
+                    collect(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                collect(item)
+
+    collect(document)
+    return "\n".join(parts)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+@dataclass
+class JobIndex:
+    """Sparse features for a fixed set of jobs, reusable across many resume queries"""
+    vocabulary: Dict[str, int]
+    weights: sparse.csr_matrix  # M x V BM25 term weights
+    self_scores: np.ndarray  # M, BM25 score of each job against its own terms
+    skill_index: Dict[str, int]
+    skills: sparse.csr_matrix  # M x K binary skill matrix
+    skill_counts: np.ndarray  # M, number of distinct skills per job
+    skill_names: List[str]
+
+    @property
+    def size(self) -> int:
+        return self.weights.shape[0]
+
+
+class MatchEngine:
+    """
+    Scores resumes against jobs with BM25 text relevance and skill overlap
+
+    Both features are normalized to [0, 1] as the share of the job's own term weight
+    (or skill set) that the resume covers, then blended into a 0-100 match score.
+    """
+
+    def __init__(
+        self,
+        text_weight: float = 0.5,
+        skill_weight: float = 0.5,
+        k1: float = 1.2,
+        b: float = 0.75,
+        chunk_size: int = 4096,
+        skill_extractor: Optional[SkillExtractor] = None
+    ):
+        """
+        Initialize the engine
+
+        Args:
+            text_weight: Weight of the BM25 text feature
+            skill_weight: Weight of the skill-overlap feature (ignored for jobs without skills)
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+            chunk_size: Rows/columns per score block; bounds memory to chunk_size^2 floats
+            skill_extractor: Extractor used to find skills in free text
+        """
+        self.text_weight = text_weight
+        self.skill_weight = skill_weight
+        self.k1 = k1
+        self.b = b
+        self.chunk_size = chunk_size
+        self.skill_extractor = skill_extractor or get_default_extractor()
+        self._indexes: "OrderedDict[str, JobIndex]" = OrderedDict()
+        self._indexes_lock = threading.Lock()
+        self.max_cached_indexes = 4
+
+    def _skills_of(self, document: Document, text: str) -> Dict[str, str]:
+        """Skills found in the text plus any listed in a "skills" field, keyed by lowercase name"""
+        skills = {skill.lower(): skill for skill in self.skill_extractor.extract(text)}
+        if isinstance(document, dict):
+            for skill in document.get("skills") or []:
+                if isinstance(skill, str) and skill.strip():
+                    skills.setdefault(skill.strip().lower(), skill.strip())
+        return skills
+
+    @staticmethod
+    def _binary_matrix(rows: List[List[str]], index: Dict[str, int]) -> sparse.csr_matrix:
+        indptr, indices = [0], []
+        for items in rows:
+            columns = {index[item] for item in items if item in index}
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), len(index)))
+
+    def index_jobs(self, jobs: List[Document]) -> JobIndex:
+        """Build BM25 and skill features for the jobs"""
+        texts = [document_text(job) for job in jobs]
+        vocabulary: Dict[str, int] = {}
+        indptr, indices, counts = [0], [], []
+        for text in texts:
+            for term, count in Counter(tokenize(text)).items():
+                indices.append(vocabulary.setdefault(term, len(vocabulary)))
+                counts.append(count)
+            indptr.append(len(indices))
+
+        tf = sparse.csr_matrix(
+            (np.asarray(counts, dtype=np.float32), indices, indptr), shape=(len(texts), len(vocabulary))
+        )
+        lengths = np.asarray(tf.sum(axis=1)).ravel()
+        average_length = lengths.mean() if len(lengths) else 0.0
+        document_frequency = np.bincount(tf.indices, minlength=len(vocabulary))
+        idf = np.log1p((len(texts) - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+
+        # BM25 saturation applied to the non-zeros only, keeping the matrix sparse
+        row_of_value = np.repeat(np.arange(len(texts)), np.diff(tf.indptr))
+        norm = self.k1 * (1 - self.b + self.b * lengths / (average_length or 1.0))
+        weights = tf.copy()
+        weights.data = idf[tf.indices] * tf.data * (self.k1 + 1) / (tf.data + norm[row_of_value])
+        self_scores = np.asarray(weights.sum(axis=1)).ravel()
+
+        job_skills = [self._skills_of(job, text) for job, text in zip(jobs, texts)]
+        skill_index: Dict[str, int] = {}
+        skill_names: List[str] = []
+        for skills in job_skills:
+            for key, name in skills.items():
+                if key not in skill_index:
+                    skill_index[key] = len(skill_index)
+                    skill_names.append(name)
+        skills_matrix = self._binary_matrix([list(skills) for skills in job_skills], skill_index)
+
+        return JobIndex(
+            vocabulary=vocabulary,
+            weights=weights.tocsr(),
+            self_scores=self_scores,
+            skill_index=skill_index,
+            skills=skills_matrix,
+            skill_counts=np.asarray(skills_matrix.sum(axis=1)).ravel(),
+            skill_names=skill_names,
+        )
+
+    def index_jobs_cached(self, jobs: List[Document]) -> JobIndex:
+        """index_jobs() memoized on the job list contents, for repeated queries against the same jobs"""
+        key = hashlib.sha256(json.dumps(jobs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        with self._indexes_lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        index = self.index_jobs(jobs)
+        with self._indexes_lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_cached_indexes:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _resume_features(self, resumes: List[Document], index: JobIndex) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        texts = [document_text(resume) for resume in resumes]
+        terms = self._binary_matrix([tokenize(text) for text in texts], index.vocabulary)
+        skills = self._binary_matrix(
+            [list(self._skills_of(resume, text)) for resume, text in zip(resumes, texts)], index.skill_index
+        )
+        return terms, skills
+
+    def _score_block(self, terms, skills, index: JobIndex, start: int, stop: int) -> np.ndarray:
+        text = (terms @ index.weights[start:stop].T).toarray()
+        self_scores = index.self_scores[start:stop]
+        text = np.divide(text, self_scores, out=np.zeros_like(text), where=self_scores > 0)
+
+        overlap = (skills @ index.skills[start:stop].T).toarray()
+        skill_counts = index.skill_counts[start:stop]
+        overlap = np.divide(overlap, skill_counts, out=np.zeros_like(overlap), where=skill_counts > 0)
+
+        # Jobs without any skills are scored on text alone
+        has_skills = skill_counts > 0
+        blended = (self.text_weight * text + self.skill_weight * overlap) / (self.text_weight + self.skill_weight)
+        return np.where(has_skills, blended, text) * 100.0
+
+    def score_matrix(self, resumes: List[Document], index: JobIndex) -> np.ndarray:
+        """Full N x M match score matrix (0-100). Use top_k() for large job sets"""
+        terms, skills = self._resume_features(resumes, index)
+        scores = np.empty((len(resumes), index.size), dtype=np.float32)
+        for start in range(0, index.size, self.chunk_size):
+            stop = min(start + self.chunk_size, index.size)
+            scores[:, start:stop] = self._score_block(terms, skills, index, start, stop)
+        return scores
+
+    def top_k(self, resumes: List[Document], index: JobIndex, k: int = 10) -> List[List[Tuple[int, float]]]:
+        """
+        Best k jobs for every resume
+
+        Args:
+            resumes: Resume texts or ResumeData dicts
+            index: Job features from index_jobs()
+            k: Number of jobs to return per resume (at least 1; capped at the number of jobs)
+
+        Returns:
+            For each resume, [(job index, score)] sorted by descending score
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        terms, skills = self._resume_features(resumes, index)
+        k = min(k, index.size)
+        results: List[List[Tuple[int, float]]] = []
+
+        for row_start in range(0, len(resumes), self.chunk_size):
+            row_stop = min(row_start + self.chunk_size, len(resumes))
+            row_terms, row_skills = terms[row_start:row_stop], skills[row_start:row_stop]
+            best_scores = np.full((row_stop - row_start, 0), -np.inf, dtype=np.float32)
+            best_jobs = np.empty((row_stop - row_start, 0), dtype=np.int64)
+
+            for start in range(0, index.size, self.chunk_size):
+                stop = min(start + self.chunk_size, index.size)
+                block = self._score_block(row_terms, row_skills, index, start, stop)
+                scores = np.hstack([best_scores, block])
+                jobs = np.hstack([best_jobs, np.broadcast_to(np.arange(start, stop), block.shape)])
+                if scores.shape[1] > k:
+                    keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                    scores = np.take_along_axis(scores, keep, axis=1)
+                    jobs = np.take_along_axis(jobs, keep, axis=1)
+                best_scores, best_jobs = scores, jobs
+
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            best_jobs = np.take_along_axis(best_jobs, order, axis=1)
+            for jobs_row, scores_row in zip(best_jobs, best_scores):
+                results.append([(int(job), float(score)) for job, score in zip(jobs_row, scores_row)])
+        return results
+
+    def resume_skill_columns(self, resume: Document, index: JobIndex) -> Set[int]:
+        """Skill columns of the index found in a resume; extract once and pass to matching_skills() per job"""
+        return {
+            index.skill_index[key] for key in self._skills_of(resume, document_text(resume)) if key in index.skill_index
+        }
+
+    def matching_skills(
+        self, resume: Document, index: JobIndex, job: int, resume_columns: Optional[Set[int]] = None
+    ) -> List[str]:
+        """Skills shared by a resume and one indexed job"""
+        if resume_columns is None:
+            resume_columns = self.resume_skill_columns(resume, index)
+        return [index.skill_names[column] for column in index.skills[job].indices if column in resume_columns]
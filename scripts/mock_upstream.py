@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Local stub of the NVIDIA /v1/chat/completions API
+Used to exercise the AI clients and API server without network access or an API key.
+Point a client at it with NVIDIA_INVOKE_URL=http://127.0.0.1:<port>/v1/chat/completions
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Union
+
+
+class LatencyDistribution:
+    """
+    Response latency model, written as "<kind>:<params>" in seconds:
+    fixed:D, uniform:LOW,HIGH, exponential:MEAN, normal:MEAN,STDDEV, lognormal:MEDIAN,SIGMA
+    """
+
+    PARAMS = {"fixed": 1, "uniform": 2, "exponential": 1, "normal": 2, "lognormal": 2}
+
+    def __init__(self, kind: str = "fixed", *params: float):
+        if kind not in self.PARAMS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        if len(params) != self.PARAMS[kind]:
+            raise ValueError(f"{kind} latency takes {self.PARAMS[kind]} parameter(s), got {len(params)}")
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        kind, _, params = spec.partition(":")
+        return cls(kind.strip().lower(), *(float(value) for value in params.split(",") if value.strip()))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        elif self.kind == "exponential":
+            value = rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        elif self.kind == "normal":
+            value = rng.gauss(*self.params)
+        else:
+            value = rng.lognormvariate(math.log(self.params[0]), self.params[1])
+        return max(0.0, value)
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{','.join(str(value) for value in self.params)}"
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body are separate writes; without this, Nagle + delayed ACK adds ~40 ms per response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.mock.record_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict] = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (e.g. read timeout) before the response was ready
+            self.close_connection = True
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_stream(self, payload: Dict):
+        mock = self.server.mock
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            self._write_chunk(b": keep-alive\n\n")
+            token_delay = 1.0 / mock.tokens_per_second if mock.tokens_per_second else mock.token_delay
+            for token in re.findall(r"\S+\s*", mock.reply_for(payload)):
+                if token_delay:
+                    time.sleep(token_delay)
+                event = json.dumps({
+                    "id": f"mock-{mock.request_count}",
+                    "object": "chat.completion.chunk",
+                    "model": payload.get("model", ""),
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                })
+                data = f"data: {event}\n\n".encode("utf-8")
+                # Split events across chunks so clients must handle partial lines
+                self._write_chunk(data[:len(data) // 2])
+                self._write_chunk(data[len(data) // 2:])
+            event = json.dumps({
+                "id": f"mock-{mock.request_count}",
+                "object": "chat.completion.chunk",
+                "model": payload.get("model", ""),
+                "choices": [{"index": 0, "delta": {}, "finish_reason": mock.finish_reason_for(payload)}]
+            })
+            self._write_chunk(f"data: {event}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            mock.record_disconnect()
+            self.close_connection = True
+
+    def do_POST(self):
+        mock = self.server.mock
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        status, headers = mock.next_response(payload)
+
+        delay = mock.delay_for_request()
+        if delay:
+            time.sleep(delay)
+
+        if status != 200:
+            self._send_json(status, {"error": f"mock upstream status {status}"}, headers)
+            return
+
+        if payload.get("stream"):
+            self._send_stream(payload)
+            return
+
+        reply = mock.reply_for(payload)
+        completion_tokens = len(reply.split())
+        if mock.tokens_per_second:
+            # A non-streaming answer arrives once every token has been generated
+            time.sleep(completion_tokens / mock.tokens_per_second)
+        prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in payload.get("messages", []))
+        self._send_json(200, {
+            "id": f"mock-{mock.request_count}",
+            "object": "chat.completion",
+            "model": payload.get("model", ""),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": mock.finish_reason_for(payload)
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+
+class _MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections under load-test concurrency
+    request_queue_size = 128
+
+
+class MockUpstream:
+    """
+    In-process mock of the chat completions API
+
+    Requests with "stream": true get the reply as SSE chunks, one word per event.
+    Responses can be scripted with fail_with() to simulate 429/5xx before a success,
+    and slow_fraction/slow_delay inject a latency tail (a share of requests that take much longer).
+    For load tests, latency draws each response delay from a LatencyDistribution,
+    tokens_per_second paces generation (streamed or not), reply_tokens sets the reply
+    length and error_rate fails a random share of requests with one of error_statuses.
+    Replies are cut at the request's max_tokens words and then finish with reason "length".
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        reply: str = "mock reply",
+        delay: float = 0.0,
+        token_delay: float = 0.0,
+        slow_fraction: float = 0.0,
+        slow_delay: float = 0.0,
+        seed: Optional[int] = None,
+        latency: Union[LatencyDistribution, str, None] = None,
+        tokens_per_second: float = 0.0,
+        reply_tokens: Optional[int] = None,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = (503,)
+    ):
+        self.reply = reply
+        self.delay = delay
+        self.token_delay = token_delay
+        self.slow_fraction = slow_fraction
+        self.slow_delay = slow_delay
+        self.latency = LatencyDistribution.parse(latency) if isinstance(latency, str) else latency
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.error_count = 0
+        self._random = random.Random(seed)
+        self.request_count = 0
+        self.connection_count = 0
+        self.disconnect_count = 0
+        self.payloads: List[Dict] = []
+        self._scripted: List[tuple] = []
+        self._lock = threading.Lock()
+        self._server = _MockServer((host, port), _MockHandler)
+        self._server.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def fail_with(self, status: int, times: int = 1, retry_after: Optional[str] = None) -> None:
+        """Return the given status for the next `times` requests"""
+        headers = {"Retry-After": retry_after} if retry_after is not None else {}
+        with self._lock:
+            self._scripted.extend([(status, headers)] * times)
+
+    def delay_for_request(self) -> float:
+        """Response delay for the next request: slow_delay for slow_fraction of requests, else delay or latency"""
+        with self._lock:
+            if self.slow_fraction and self._random.random() < self.slow_fraction:
+                return self.slow_delay
+            return self.latency.sample(self._random) if self.latency is not None else self.delay
+
+    def reply_for(self, payload: Dict) -> str:
+        """Reply text: the reply (or its words repeated to reply_tokens words), at most max_tokens words"""
+        limit = int(payload.get("max_tokens") or 0)
+        if self.reply_tokens is None:
+            words = re.findall(r"\S+\s*", self.reply)
+            return "".join(words[:limit]).rstrip() if limit and len(words) > limit else self.reply
+        count = min(self.reply_tokens, limit or self.reply_tokens)
+        return " ".join(itertools.islice(itertools.cycle(self.reply.split() or ["mock"]), count))
+
+    def finish_reason_for(self, payload: Dict) -> str:
+        """Finish reason of the reply: length if reply_for() cut it at max_tokens, else stop"""
+        limit = int(payload.get("max_tokens") or 0)
+        length = self.reply_tokens if self.reply_tokens is not None else len(self.reply.split())
+        return "length" if limit and length > limit else "stop"
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.connection_count += 1
+
+    def record_disconnect(self) -> None:
+        with self._lock:
+            self.disconnect_count += 1
+
+    def next_response(self, payload: Dict) -> tuple:
+        with self._lock:
+            self.request_count += 1
+            self.payloads.append(payload)
+            if self._scripted:
+                return self._scripted.pop(0)
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.error_count += 1
+                return self._random.choice(self.error_statuses), {}
+        return 200, {}
+
+    def start(self) -> "MockUpstream":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock NVIDIA chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed tokens")
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="Share of requests that get --slow-delay")
+    parser.add_argument("--slow-delay", type=float, default=0.0, help="Seconds to wait for slow requests")
+    parser.add_argument("--latency", help="Latency distribution, e.g. lognormal:0.3,0.5 (overrides --delay)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Generation speed (0: instant)")
+    parser.add_argument("--reply-tokens", type=int, help="Reply length in words (default: --reply as is)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail")
+    parser.add_argument("--error-statuses", default="503", help="Comma-separated statuses for failed requests")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--reply", default="mock reply")
+    args = parser.parse_args()
+
+    mock = MockUpstream(
+        args.host, args.port, reply=args.reply, delay=args.delay, token_delay=args.token_delay,
+        slow_fraction=args.slow_fraction, slow_delay=args.slow_delay, seed=args.seed, latency=args.latency,
+        tokens_per_second=args.tokens_per_second, reply_tokens=args.reply_tokens, error_rate=args.error_rate,
+        error_statuses=[int(status) for status in args.error_statuses.split(",")]
+    )
+    print(f"Mock NVIDIA upstream listening on {mock.url}")
+    try:
+        mock._server.serve_forever()
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,30 @@ for advanced resume analysis and job matching capabilities.
 """
 
 import os
+import sys
 import json
+import asyncio
 import requests
-from typing import List, Dict, Optional, Union
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Dict, Optional, Union
 from dataclasses import dataclass
 import base64
+from concurrent.futures import ThreadPoolExecutor
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_cache import TieredCache, cache_key
+from ai_stream import JSONArrayParser, iter_chat_deltas
+from jd_compactor import compact_job_description, estimate_tokens
+from resume_chunker import (
+    CHUNK_MAX_TOKENS, CHUNK_TEMPERATURE, CHUNKED_MIN_TOKENS, REDUCE_MAX_TOKENS, ResumeChunk, chunk_analysis_messages,
+    chunk_cache_key, reduce_analysis_messages, split_resume
+)
+from resume_codec import encode_resume
+from ai_transport import AsyncPooledTransport, PooledTransport, get_default_transport
+from structured_skills import (
+    TRUNCATED_WARNING, TypedSkill, iter_typed_skills, structured_skills_max_tokens, structured_skills_messages
+)
 
 
 @dataclass
@@ -20,23 +39,198 @@ class ChatMessage:
     content: str
 
 
+def format_messages(messages: List[Union[ChatMessage, Dict]]) -> List[Dict]:
+    """Convert messages to dict format if they're ChatMessage objects"""
+    formatted_messages = []
+    for msg in messages:
+        if isinstance(msg, ChatMessage):
+            formatted_messages.append({"role": msg.role, "content": msg.content})
+        else:
+            formatted_messages.append(msg)
+    return formatted_messages
+
+
+def analyze_resume_messages(resume_content: str) -> List[ChatMessage]:
+    """Build the prompt for resume analysis"""
+    return [
+        ChatMessage(
+            role="system",
+            content="You are an expert resume analyst with deep knowledge of ATS optimization, industry best practices, and hiring trends. Provide detailed, actionable feedback."
+        ),
+        ChatMessage(
+            role="user",
+            content=f"""Analyze this resume and provide comprehensive feedback:
+
+{resume_content}
+
+Please provide:
+1. Overall assessment and ATS compatibility score (1-10)
+2. Strengths and weaknesses
+3. Specific improvement suggestions
+4. Keyword optimization recommendations
+5. Formatting and structure feedback
+6. Industry-specific advice if applicable
+
+Format your response in a clear, structured manner."""
+        )
+    ]
+
+
+def use_chunked_analysis(resume_content: str, chunked: Optional[bool] = None) -> bool:
+    """Whether to analyze a resume map-reduce style: as requested, else when it is long"""
+    if chunked is not None:
+        return chunked
+    return estimate_tokens(resume_content) > CHUNKED_MIN_TOKENS
+
+
+def enhance_resume_messages(resume_data: Dict, job_description: str = "") -> List[ChatMessage]:
+    """Build the prompt for resume enhancement"""
+    job_context = f"\n\nJob Description to match:\n{compact_job_description(job_description, task='enhance')}" if job_description else ""
+    return [
+        ChatMessage(
+            role="system",
+            content="You are an expert resume writer that enhances resumes to match job requirements while maintaining authenticity and ATS optimization."
+        ),
+        ChatMessage(
+            role="user",
+            content=f"""Enhance this resume content:
+
+{encode_resume(resume_data)}
+{job_context}
+
+Please provide enhanced content that:
+1. Maintains all truthful information
+2. Improves language and impact
+3. Adds relevant keywords naturally
+4. Optimizes for ATS scanning
+5. Highlights achievements with metrics
+6. Ensures proper formatting and structure
+
+Provide the enhanced content in a structured format."""
+        )
+    ]
+
+
+def cover_letter_messages(resume_data: Dict, job_description: str, company_name: str) -> List[ChatMessage]:
+    """Build the prompt for cover letter generation"""
+    job_description = compact_job_description(job_description, task="cover_letter")
+    return [
+        ChatMessage(
+            role="system",
+            content="You are an expert cover letter writer who creates compelling, personalized cover letters that highlight relevant experience and show genuine interest in the role."
+        ),
+        ChatMessage(
+            role="user",
+            content=f"""Create a professional cover letter based on:
+
+Resume Data:
+{encode_resume(resume_data)}
+
+Job Description:
+{job_description}
+
+Company: {company_name}
+
+The cover letter should:
+1. Be 3-4 paragraphs long
+2. Show genuine interest in the role and company
+3. Highlight relevant experience and achievements
+4. Use a professional but engaging tone
+5. Include a strong opening and closing
+6. Be ATS-friendly
+
+Please generate a complete cover letter."""
+        )
+    ]
+
+
+def job_skills_messages(job_description: str) -> List[ChatMessage]:
+    """Build the prompt for job skill extraction"""
+    job_description = compact_job_description(job_description, task="skills")
+    return [
+        ChatMessage(
+            role="system",
+            content="You are an expert at analyzing job descriptions and extracting key skills, technologies, and requirements."
+        ),
+        ChatMessage(
+            role="user",
+            content=f"""Extract all skills, technologies, and requirements from this job description:
+
+{job_description}
+
+Please provide:
+1. Technical skills (programming languages, tools, frameworks)
+2. Soft skills
+3. Required experience levels
+4. Educational requirements
+5. Industry-specific knowledge
+
+Format the response as a JSON list of skills for easy parsing."""
+        )
+    ]
+
+
+def parse_skills_response(response: str) -> List[str]:
+    """Parse a skills reply: a JSON list if possible, else one skill per line"""
+    try:
+        skills_data = json.loads(response)
+        if isinstance(skills_data, list):
+            return skills_data
+    except:
+        # A JSON list wrapped in prose or a ```json fence
+        items = JSONArrayParser().feed(response)
+        skills = [item if isinstance(item, str) else item.get("name") for item in items if isinstance(item, (str, dict))]
+        skills = [skill for skill in skills if isinstance(skill, str) and skill.strip()]
+        if skills:
+            return skills
+        # Fallback: extract skills from text response
+        skills = []
+        for line in response.split('\n'):
+            line = line.strip()
+            # Skip headings ("Technical skills:", "## Soft skills") and code fences
+            if line.endswith(':') or line.startswith(('#', '```')):
+                continue
+            if line and not line.startswith('{') and not line.startswith('}'):
+                # Remove common prefixes and clean up
+                line = line.replace('- ', '').replace('• ', '').replace('"', '').replace(',', '')
+                if line:
+                    skills.append(line)
+        return skills[:20]  # Limit to top 20 skills
+    
+    return []
+
+
 class NvidiaAIClient:
     """
     Python client for NVIDIA AI Foundation Models API
     Provides methods for resume enhancement, job matching, and content generation
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        transport: Optional[PooledTransport] = None,
+        invoke_url: Optional[str] = None,
+        cache: Optional[TieredCache] = None
+    ):
         """
         Initialize the NVIDIA AI client
         
         Args:
             api_key: NVIDIA API key. If not provided, will try to read from environment
+            transport: HTTP transport to use. Defaults to the shared pooled transport
+            invoke_url: Chat completions URL. Defaults to NVIDIA_INVOKE_URL or the public endpoint
+            cache: Response cache for non-streaming completions. Disabled if omitted
         """
         self.api_key = api_key or os.getenv("NVIDIA_API_KEY")
-        self.invoke_url = "https://integrate.api.nvidia.com/v1/chat/completions"
+        self.invoke_url = invoke_url or os.getenv(
+            "NVIDIA_INVOKE_URL", "https://integrate.api.nvidia.com/v1/chat/completions"
+        )
+        self.transport = transport or get_default_transport()
+        self.cache = cache
         
-        if not self.api_key:
+        # A replaying cassette transport answers offline, so no key is needed
+        if not self.api_key and not getattr(self.transport, "offline", False):
             raise ValueError(
                 "NVIDIA API key is required. Set NVIDIA_API_KEY environment variable or pass it directly.\n"
                 "Get your API key from: https://developer.nvidia.com/"
@@ -65,13 +259,14 @@ class NvidiaAIClient:
         Returns:
             Response content as string or full response dict if streaming
         """
-        # Convert messages to dict format if they're ChatMessage objects
-        formatted_messages = []
-        for msg in messages:
-            if isinstance(msg, ChatMessage):
-                formatted_messages.append({"role": msg.role, "content": msg.content})
-            else:
-                formatted_messages.append(msg)
+        formatted_messages = format_messages(messages)
+        
+        key = None
+        if self.cache is not None and not stream:
+            key = cache_key(model, formatted_messages, max_tokens, temperature, top_p)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
         
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -89,71 +284,109 @@ class NvidiaAIClient:
         }
         
         try:
-            response = requests.post(self.invoke_url, headers=headers, json=payload)
+            response = self.transport.post(self.invoke_url, headers=headers, json=payload, stream=stream)
             response.raise_for_status()
             
             if stream:
-                return self._handle_stream_response(response)
+                with response:
+                    return self._handle_stream_response(response)
             else:
                 result = response.json()
-                return result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                if key is not None and content:
+                    self.cache.set(key, content)
+                return content
                 
         except requests.exceptions.RequestException as e:
             print(f"Error calling NVIDIA API: {e}")
             raise
     
+    def chat_completion_stream(
+        self,
+        messages: List[Union[ChatMessage, Dict]],
+        model: str = "meta/llama-guard-4-12b",
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        on_finish: Optional[Callable[[str], None]] = None
+    ) -> Iterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive
+        
+        Args:
+            messages: List of chat messages
+            model: AI model to use
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (0.0 to 1.0)
+            top_p: Top-p sampling parameter
+            on_finish: Called with the finish_reason ("stop", "length", ...) once the model reports it
+            
+        Yields:
+            Content deltas (tokens) in order. Closing the generator early closes the upstream connection
+        """
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "text/event-stream",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model": model,
+            "messages": format_messages(messages),
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "stream": True
+        }
+        
+        response = self.transport.post(self.invoke_url, headers=headers, json=payload, stream=True)
+        try:
+            response.raise_for_status()
+            for delta in iter_chat_deltas(response.iter_content(chunk_size=None), on_finish=on_finish):
+                yield delta
+        finally:
+            response.close()
+    
     def _handle_stream_response(self, response) -> str:
         """Handle streaming response from NVIDIA API"""
-        content = ""
-        for line in response.iter_lines():
-            if line:
-                line_str = line.decode("utf-8")
-                if line_str.startswith("data: "):
-                    try:
-                        data = json.loads(line_str[6:])
-                        if "choices" in data and data["choices"]:
-                            delta = data["choices"][0].get("delta", {})
-                            if "content" in delta:
-                                content += delta["content"]
-                    except json.JSONDecodeError:
-                        continue
-        return content
+        return "".join(iter_chat_deltas(response.iter_content(chunk_size=None)))
     
-    def analyze_resume(self, resume_content: str) -> str:
+    def analyze_resume(self, resume_content: str, chunked: Optional[bool] = None) -> str:
         """
         Analyze a resume and provide improvement suggestions
         
         Args:
             resume_content: The resume content to analyze
+            chunked: Analyze sections in parallel and merge the findings (map-reduce).
+                Defaults to on for resumes longer than AI_ANALYZE_CHUNKED_MIN_TOKENS
             
         Returns:
             Analysis and suggestions as a string
         """
-        messages = [
-            ChatMessage(
-                role="system",
-                content="You are an expert resume analyst with deep knowledge of ATS optimization, industry best practices, and hiring trends. Provide detailed, actionable feedback."
-            ),
-            ChatMessage(
-                role="user",
-                content=f"""Analyze this resume and provide comprehensive feedback:
-
-{resume_content}
-
-Please provide:
-1. Overall assessment and ATS compatibility score (1-10)
-2. Strengths and weaknesses
-3. Specific improvement suggestions
-4. Keyword optimization recommendations
-5. Formatting and structure feedback
-6. Industry-specific advice if applicable
-
-Format your response in a clear, structured manner."""
-            )
-        ]
+        chunks = split_resume(resume_content) if use_chunked_analysis(resume_content, chunked) else []
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), 8)) as pool:
+                findings = list(pool.map(self._analyze_chunk, chunks))
+            return self.chat_completion(reduce_analysis_messages(findings, chunks), max_tokens=REDUCE_MAX_TOKENS)
+        
+        messages = analyze_resume_messages(resume_content)
         
         return self.chat_completion(messages, max_tokens=2000)
     
+    def _analyze_chunk(self, chunk: ResumeChunk) -> str:
+        """Findings for one resume chunk, cached by content hash"""
+        key = chunk_cache_key(chunk)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        findings = self.chat_completion(
+            chunk_analysis_messages(chunk), max_tokens=CHUNK_MAX_TOKENS, temperature=CHUNK_TEMPERATURE
+        )
+        if self.cache is not None and findings:
+            self.cache.set(key, findings)
+        return findings
+    
     def enhance_resume_content(self, resume_data: Dict, job_description: str = "") -> str:
         """
         Enhance resume content to better match job requirements
@@ -165,31 +398,7 @@ Format your response in a clear, structured manner."""
         Returns:
             Enhanced resume suggestions
         """
-        job_context = f"\n\nJob Description to match:\n{job_description}" if job_description else ""
-        
-        messages = [
-            ChatMessage(
-                role="system",
-                content="You are an expert resume writer that enhances resumes to match job requirements while maintaining authenticity and ATS optimization."
-            ),
-            ChatMessage(
-                role="user",
-                content=f"""Enhance this resume content:
-
-{json.dumps(resume_data, indent=2)}
-{job_context}
-
-Please provide enhanced content that:
-1. Maintains all truthful information
-2. Improves language and impact
-3. Adds relevant keywords naturally
-4. Optimizes for ATS scanning
-5. Highlights achievements with metrics
-6. Ensures proper formatting and structure
-
-Provide the enhanced content in a structured format."""
-            )
-        ]
+        messages = enhance_resume_messages(resume_data, job_description)
         
         return self.chat_completion(messages, max_tokens=2000)
     
@@ -205,34 +414,7 @@ Provide the enhanced content in a structured format."""
         Returns:
             Generated cover letter
         """
-        messages = [
-            ChatMessage(
-                role="system",
-                content="You are an expert cover letter writer who creates compelling, personalized cover letters that highlight relevant experience and show genuine interest in the role."
-            ),
-            ChatMessage(
-                role="user",
-                content=f"""Create a professional cover letter based on:
-
-Resume Data:
-{json.dumps(resume_data, indent=2)}
-
-Job Description:
-{job_description}
-
-Company: {company_name}
-
-The cover letter should:
-1. Be 3-4 paragraphs long
-2. Show genuine interest in the role and company
-3. Highlight relevant experience and achievements
-4. Use a professional but engaging tone
-5. Include a strong opening and closing
-6. Be ATS-friendly
-
-Please generate a complete cover letter."""
-            )
-        ]
+        messages = cover_letter_messages(resume_data, job_description, company_name)
         
         return self.chat_completion(messages, max_tokens=1500)
     
@@ -246,48 +428,221 @@ Please generate a complete cover letter."""
         Returns:
             List of extracted skills
         """
-        messages = [
-            ChatMessage(
-                role="system",
-                content="You are an expert at analyzing job descriptions and extracting key skills, technologies, and requirements."
-            ),
-            ChatMessage(
-                role="user",
-                content=f"""Extract all skills, technologies, and requirements from this job description:
-
-{job_description}
+        messages = job_skills_messages(job_description)
+        
+        response = self.chat_completion(messages, max_tokens=800)
+        
+        return parse_skills_response(response)
+    
+    def stream_job_skills(
+        self,
+        job_description: str,
+        max_skills: int = 15,
+        model: str = "meta/llama-guard-4-12b"
+    ) -> Iterator[TypedSkill]:
+        """
+        Structured skill extraction, yielding each typed skill as soon as the model has written it
+        
+        Args:
+            job_description: The job description text
+            max_skills: Stop the upstream request once this many skills have arrived
+            model: AI model to use
+            
+        Yields:
+            TypedSkill(name, type) with type one of technical, soft, experience, education.
+            A warning is printed if the completion ran out of max_tokens before max_skills arrived
+        """
+        finish = []
+        deltas = self.chat_completion_stream(
+            structured_skills_messages(job_description, max_skills),
+            model=model,
+            max_tokens=structured_skills_max_tokens(max_skills),
+            temperature=0.2,
+            on_finish=finish.append
+        )
+        count = 0
+        try:
+            for skill in iter_typed_skills(deltas, max_skills):
+                count += 1
+                yield skill
+        finally:
+            # Closes the upstream connection, so no further completion tokens are generated
+            deltas.close()
+        if "length" in finish and count < max_skills:
+            print(f"{TRUNCATED_WARNING} ({count} of {max_skills} skills)", file=sys.stderr)
+    
+    def extract_job_skills_structured(self, job_description: str, max_skills: int = 15) -> List[TypedSkill]:
+        """
+        Extract up to max_skills typed skills, stopping the completion as soon as they are in
+        
+        Args:
+            job_description: The job description text
+            max_skills: Number of skills wanted
+            
+        Returns:
+            Typed skills, most important first
+        """
+        return list(self.stream_job_skills(job_description, max_skills))
 
-Please provide:
-1. Technical skills (programming languages, tools, frameworks)
-2. Soft skills
-3. Required experience levels
-4. Educational requirements
-5. Industry-specific knowledge
 
-Format the response as a JSON list of skills for easy parsing."""
+class AsyncNvidiaAIClient:
+    """
+    asyncio client for NVIDIA AI Foundation Models API
+    Same task methods as NvidiaAIClient, running on a pooled async HTTP client
+    so one process can keep many upstream requests in flight.
+    """
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        transport: Optional[AsyncPooledTransport] = None,
+        invoke_url: Optional[str] = None,
+        cache: Optional[TieredCache] = None
+    ):
+        """
+        Initialize the async NVIDIA AI client
+        
+        Args:
+            api_key: NVIDIA API key. If not provided, will try to read from environment
+            transport: Async HTTP transport to use. A new pooled transport is created if omitted
+            invoke_url: Chat completions URL. Defaults to NVIDIA_INVOKE_URL or the public endpoint
+            cache: Response cache shared with other clients. Disabled if omitted
+        """
+        self.api_key = api_key or os.getenv("NVIDIA_API_KEY")
+        self.invoke_url = invoke_url or os.getenv(
+            "NVIDIA_INVOKE_URL", "https://integrate.api.nvidia.com/v1/chat/completions"
+        )
+        
+        if not self.api_key:
+            raise ValueError(
+                "NVIDIA API key is required. Set NVIDIA_API_KEY environment variable or pass it directly.\n"
+                "Get your API key from: https://developer.nvidia.com/"
             )
-        ]
         
-        response = self.chat_completion(messages, max_tokens=800)
+        self.transport = transport or AsyncPooledTransport()
+        self.cache = cache
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Close the underlying connection pool"""
+        await self.transport.aclose()
+    
+    async def chat_completion(
+        self,
+        messages: List[Union[ChatMessage, Dict]],
+        model: str = "meta/llama-guard-4-12b",
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 0.9
+    ) -> str:
+        """
+        Send a chat completion request to NVIDIA AI API
         
-        # Try to parse as JSON, fallback to simple text processing
-        try:
-            skills_data = json.loads(response)
-            if isinstance(skills_data, list):
-                return skills_data
-        except:
-            # Fallback: extract skills from text response
-            skills = []
-            for line in response.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('{') and not line.startswith('}'):
-                    # Remove common prefixes and clean up
-                    line = line.replace('- ', '').replace('• ', '').replace('"', '').replace(',', '')
-                    if line:
-                        skills.append(line)
-            return skills[:20]  # Limit to top 20 skills
+        Args:
+            messages: List of chat messages
+            model: AI model to use
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (0.0 to 1.0)
+            top_p: Top-p sampling parameter
+            
+        Returns:
+            Response content as string
+        """
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model": model,
+            "messages": format_messages(messages),
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "stream": False
+        }
         
-        return []
+        key = None
+        if self.cache is not None:
+            key = cache_key(model, payload["messages"], max_tokens, temperature, top_p)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = await self.transport.post(self.invoke_url, headers=headers, json=payload)
+        response.raise_for_status()
+        result = response.json()
+        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        if key is not None and content:
+            self.cache.set(key, content)
+        return content
+    
+    async def analyze_resume(self, resume_content: str, chunked: Optional[bool] = None) -> str:
+        """Analyze a resume and provide improvement suggestions (long ones map-reduce over sections)"""
+        chunks = split_resume(resume_content) if use_chunked_analysis(resume_content, chunked) else []
+        if len(chunks) > 1:
+            findings = await asyncio.gather(*(self._analyze_chunk(chunk) for chunk in chunks))
+            return await self.chat_completion(reduce_analysis_messages(findings, chunks), max_tokens=REDUCE_MAX_TOKENS)
+        return await self.chat_completion(analyze_resume_messages(resume_content), max_tokens=2000)
+    
+    async def _analyze_chunk(self, chunk: ResumeChunk) -> str:
+        """Findings for one resume chunk, cached by content hash"""
+        key = chunk_cache_key(chunk)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        findings = await self.chat_completion(
+            chunk_analysis_messages(chunk), max_tokens=CHUNK_MAX_TOKENS, temperature=CHUNK_TEMPERATURE
+        )
+        if self.cache is not None and findings:
+            self.cache.set(key, findings)
+        return findings
+    
+    async def enhance_resume_content(self, resume_data: Dict, job_description: str = "") -> str:
+        """Enhance resume content to better match job requirements"""
+        return await self.chat_completion(enhance_resume_messages(resume_data, job_description), max_tokens=2000)
+    
+    async def generate_cover_letter(self, resume_data: Dict, job_description: str, company_name: str) -> str:
+        """Generate a personalized cover letter"""
+        messages = cover_letter_messages(resume_data, job_description, company_name)
+        return await self.chat_completion(messages, max_tokens=1500)
+    
+    async def extract_job_skills(self, job_description: str) -> List[str]:
+        """Extract key skills and requirements from a job description"""
+        response = await self.chat_completion(job_skills_messages(job_description), max_tokens=800)
+        return parse_skills_response(response)
+
+
+async def gather_tasks(
+    tasks: Iterable[Awaitable],
+    limit: Optional[int] = None,
+    return_exceptions: bool = False
+) -> List[Any]:
+    """
+    Run many awaitables concurrently with at most `limit` in flight
+    
+    Args:
+        tasks: Coroutines to run, e.g. [client.analyze_resume(r) for r in resumes]
+        limit: Maximum concurrent calls. Defaults to NVIDIA_MAX_CONCURRENCY or 16
+        return_exceptions: Return exceptions in place of results instead of raising the first one
+        
+    Returns:
+        Results in the same order as the input tasks
+    """
+    semaphore = asyncio.Semaphore(limit or int(os.getenv("NVIDIA_MAX_CONCURRENCY", 16)))
+    
+    async def run(task: Awaitable) -> Any:
+        async with semaphore:
+            return await task
+    
+    return await asyncio.gather(*(run(task) for task in tasks), return_exceptions=return_exceptions)
 
 
 def main():
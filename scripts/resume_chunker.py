@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Map-reduce resume analysis: section-aligned chunks and their prompts
+Long resumes are split at section (and, for very long sections, entry) boundaries
+into chunks that are analyzed in parallel with short prompts; one reduce call then
+merges the partial findings into the usual analysis. Chunks are identified by a
+content hash so an unchanged section is not analyzed twice.
+"""
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Union
+
+from ai_cache import cache_key
+from jd_compactor import estimate_tokens
+from resume_codec import encode_resume
+from resume_ingest import section_heading
+
+# Resumes estimated above this many tokens are analyzed in chunks
+CHUNKED_MIN_TOKENS = int(os.getenv("AI_ANALYZE_CHUNKED_MIN_TOKENS", 1500))
+# Target prompt size of one chunk
+CHUNK_TOKENS = int(os.getenv("AI_ANALYZE_CHUNK_TOKENS", 800))
+# Completion budgets of one chunk's findings and of the merged analysis
+CHUNK_MAX_TOKENS = 350
+REDUCE_MAX_TOKENS = 1200
+# Findings should be stable enough to be worth caching
+CHUNK_TEMPERATURE = 0.3
+
+CHUNK_SYSTEM_PROMPT = (
+    "You are an expert resume analyst. You see one part of a longer resume; "
+    "report concise findings about that part only."
+)
+
+
+@dataclass
+class ResumeChunk:
+    """A run of whole resume sections (or entries of one long section)"""
+    sections: List[str]
+    text: str
+
+    @property
+    def content_hash(self) -> str:
+        """Hash of the chunk's text with whitespace collapsed; the chunk cache key"""
+        normalized = re.sub(r"\s+", " ", self.text).strip()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _sections(text: str) -> List[List[str]]:
+    """Split lines into [heading, *lines] groups; the first group is the header (contact details)"""
+    groups: List[List[str]] = [["Header"]]
+    for line in text.splitlines():
+        if section_heading(line.strip()) is not None:
+            groups.append([line.strip().rstrip(":")])
+        else:
+            groups[-1].append(line)
+    return [group for group in groups if any(line.strip() for line in group[1:])]
+
+
+def _split_long(heading: str, lines: List[str], max_tokens: int) -> List[List[str]]:
+    """Split one section that exceeds max_tokens at blank lines or entry lines, keeping entries whole"""
+    entries: List[List[str]] = []
+    for line in lines:
+        starts_entry = not line.strip() or line.lstrip().startswith(("* ", "## "))
+        if not entries or (starts_entry and entries[-1] and any(l.strip() for l in entries[-1])):
+            entries.append([])
+        entries[-1].append(line)
+    parts: List[List[str]] = [[]]
+    size = estimate_tokens(heading)
+    for entry in entries:
+        entry_tokens = estimate_tokens("\n".join(entry))
+        if parts[-1] and size + entry_tokens > max_tokens:
+            parts.append([])
+            size = estimate_tokens(heading)
+        parts[-1].extend(entry)
+        size += entry_tokens
+    return parts
+
+
+def split_resume(resume: Union[str, Dict], max_tokens: int = CHUNK_TOKENS) -> List[ResumeChunk]:
+    """
+    Split a resume into chunks of whole sections of about max_tokens each
+
+    Args:
+        resume: Resume text, or a ResumeData dict (encoded with resume_codec first)
+        max_tokens: Target chunk size; a longer section is split between its entries
+
+    Returns:
+        Chunks in resume order; a single chunk if the resume fits in one
+    """
+    text = encode_resume(resume) if isinstance(resume, dict) else resume
+    chunks: List[ResumeChunk] = []
+    sections: List[str] = []
+    lines: List[str] = []
+    size = 0
+
+    def flush():
+        nonlocal sections, lines, size
+        if any(line.strip() for line in lines):
+            chunks.append(ResumeChunk(sections=sections, text="\n".join(lines).strip()))
+        sections, lines, size = [], [], 0
+
+    for heading, *body in _sections(text):
+        section_text = "\n".join([heading] + body)
+        section_tokens = estimate_tokens(section_text)
+        if section_tokens > max_tokens:
+            flush()
+            parts = _split_long(heading, body, max_tokens)
+            for index, part in enumerate(parts):
+                label = heading if len(parts) == 1 else f"{heading} (part {index + 1} of {len(parts)})"
+                sections, lines = [label], [label] + part
+                flush()
+            continue
+        if lines and size + section_tokens > max_tokens:
+            flush()
+        sections.append(heading)
+        lines.extend([heading] + body if heading != "Header" else body)
+        size += section_tokens
+    flush()
+    return chunks
+
+
+def chunk_cache_key(chunk: ResumeChunk) -> str:
+    """Cache key of a chunk's findings: its content hash, whichever model or prompt labels were used"""
+    return cache_key(
+        "analyze-chunk", [{"role": "user", "content": chunk.content_hash}], CHUNK_MAX_TOKENS, CHUNK_TEMPERATURE, 0.9
+    )
+
+
+def chunk_analysis_messages(chunk: ResumeChunk) -> List[Dict]:
+    """Build the map prompt for one chunk"""
+    return [
+        {"role": "system", "content": CHUNK_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": f"""Resume part ({', '.join(chunk.sections)}):
+
+{chunk.text}
+
+List short bullet points under: Strengths, Weaknesses, Suggestions, Missing keywords.
+Only cover what this part shows; do not score the whole resume."""
+        }
+    ]
+
+
+def reduce_analysis_messages(findings: List[str], chunks: List[ResumeChunk]) -> List[Dict]:
+    """Build the reduce prompt that merges per-chunk findings into one analysis"""
+    parts = "\n\n".join(
+        f"[{', '.join(chunk.sections)}]\n{finding.strip()}" for chunk, finding in zip(chunks, findings)
+    )
+    return [
+        {"role": "system", "content": "You are an expert resume analyst with deep knowledge of ATS optimization and hiring trends."},
+        {
+            "role": "user",
+            "content": f"""These are findings on each part of one resume:
+
+{parts}
+
+Merge them into one analysis of the whole resume, without repeating yourself:
+1. Overall assessment and ATS compatibility score (1-10)
+2. Strengths and weaknesses
+3. Specific improvement suggestions
+4. Keyword optimization recommendations"""
+        }
+    ]
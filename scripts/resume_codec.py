@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Canonical compact encoding of ResumeData for HireSenseAI prompts and cache keys
+Renders the ResumeData shape from types/resume.ts (personalInfo, summary, experience,
+education, projects, skills) as line-oriented text in a fixed field order, so the same
+resume always produces the same prompt, and hashes that text for caching and de-duplication.
+"""
+
+import hashlib
+import json
+import re
+from typing import Dict, List, Union
+
+# Fields joined into the header line of each entry, in this order
+PERSONAL_FIELDS = ["name", "email", "phone", "location", "linkedin", "website"]
+EXPERIENCE_FIELDS = ["title", "company", "location"]
+EDUCATION_FIELDS = ["degree", "institution", "location"]
+PROJECT_FIELDS = ["name", "link"]
+SECTION_ORDER = ["personalInfo", "summary", "experience", "education", "projects", "skills"]
+PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+
+
+def _clean(value) -> str:
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        value = str(value)
+    return " ".join(value.split())
+
+
+def _paragraphs(value) -> str:
+    """Like _clean(), but keeps blank-line paragraph breaks of free text as single line breaks"""
+    if not isinstance(value, str):
+        return _clean(value)
+    return "\n".join(part for part in (_clean(paragraph) for paragraph in PARAGRAPH_BREAK_RE.split(value)) if part)
+
+
+def _join(values: List) -> str:
+    return " | ".join(part for part in (_clean(value) for value in values) if part)
+
+
+def _dates(entry: Dict, start: str, end: str) -> str:
+    start_date, end_date = _clean(entry.get(start)), _clean(entry.get(end))
+    if start_date and end_date:
+        return f"{start_date} - {end_date}"
+    return start_date or end_date
+
+
+def _bullets(lines: List[str], items) -> None:
+    for item in items or []:
+        item = _clean(item)
+        if item:
+            lines.append(f"- {item}")
+
+
+def _unique(items) -> List[str]:
+    seen, unique = set(), []
+    for item in items or []:
+        item = _clean(item)
+        if item and item.lower() not in seen:
+            seen.add(item.lower())
+            unique.append(item)
+    return unique
+
+
+def encode_resume(resume_data: Union[Dict, str]) -> str:
+    """
+    Encode a resume as canonical, compact prompt text
+
+    Args:
+        resume_data: ResumeData dict (types/resume.ts or the shorter types/job.ts shape) or plain text;
+            anything else (e.g. a list from a malformed request) falls back to JSON
+
+    Returns:
+        Line-oriented text with sections in a fixed order, whitespace collapsed (paragraph
+        breaks in the summary and descriptions are kept), empty fields omitted and skills
+        de-duplicated. Unknown top-level keys are appended as compact, key-sorted JSON;
+        unknown fields inside entries are not emitted. Any other value is encoded as
+        compact, key-sorted JSON.
+    """
+    if isinstance(resume_data, str):
+        return "\n".join(_clean(line) for line in resume_data.splitlines() if _clean(line))
+    if not isinstance(resume_data, dict):
+        return json.dumps(resume_data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+    lines: List[str] = []
+    personal = resume_data.get("personalInfo") or {}
+    contact = _join([personal.get(key) for key in PERSONAL_FIELDS]) if isinstance(personal, dict) else ""
+    if contact:
+        lines.append(f"# {contact}")
+
+    summary = _paragraphs(resume_data.get("summary"))
+    if summary:
+        lines += ["SUMMARY", summary]
+
+    experience = [entry for entry in resume_data.get("experience") or [] if isinstance(entry, dict)]
+    if experience:
+        lines.append("EXPERIENCE")
+        for entry in experience:
+            dates = _dates(entry, "startDate", "endDate") or _clean(entry.get("duration"))
+            lines.append(f"* {_join([entry.get(key) for key in EXPERIENCE_FIELDS] + [dates])}")
+            description = _paragraphs(entry.get("description"))
+            if description:
+                lines.append(description)
+            _bullets(lines, entry.get("achievements"))
+
+    education = [entry for entry in resume_data.get("education") or [] if isinstance(entry, dict)]
+    if education:
+        lines.append("EDUCATION")
+        for entry in education:
+            gpa = _clean(entry.get("gpa"))
+            when = _clean(entry.get("graduationDate")) or _clean(entry.get("year"))
+            lines.append(f"* {_join([entry.get(key) for key in EDUCATION_FIELDS] + [when, f'GPA {gpa}' if gpa else ''])}")
+            _bullets(lines, entry.get("achievements"))
+
+    projects = [entry for entry in resume_data.get("projects") or [] if isinstance(entry, dict)]
+    if projects:
+        lines.append("PROJECTS")
+        for entry in projects:
+            lines.append(f"* {_join([entry.get(key) for key in PROJECT_FIELDS])}")
+            description = _paragraphs(entry.get("description"))
+            if description:
+                lines.append(description)
+            technologies = _unique(entry.get("technologies"))
+            if technologies:
+                lines.append(f"Tech: {', '.join(technologies)}")
+
+    skills = _unique(resume_data.get("skills"))
+    if skills:
+        lines += ["SKILLS", ", ".join(skills)]
+
+    extra = {key: value for key, value in resume_data.items() if key not in SECTION_ORDER and value}
+    for key in sorted(extra):
+        lines.append(f"{key.upper()}: {json.dumps(extra[key], sort_keys=True, separators=(',', ':'), ensure_ascii=False)}")
+    return "\n".join(lines)
+
+
+def resume_hash(resume_data: Union[Dict, str]) -> str:
+    """Stable content hash of a resume: equal for resumes that encode identically"""
+    return hashlib.sha256(encode_resume(resume_data).encode("utf-8")).hexdigest()
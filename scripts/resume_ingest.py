@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Bulk resume ingestion: PDF/DOCX/TXT files to ResumeData records
+Walks directories and zip/tar archives, extracts and segments text in a process pool
+and streams one JSON line per file, so thousands of resumes can be fed into analysis
+and matching. A file that fails only produces an error record for that file.
+
+Usage:
+    python resume_ingest.py resumes/ resumes-2024.zip -o resumes.jsonl --workers 8
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import sys
+import tarfile
+import time
+import unicodedata
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from resume_codec import resume_hash
+from skill_extractor import get_default_extractor
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    # PDF files then fail with an error record; DOCX and TXT need no extra packages
+    PdfReader = None
+else:
+    # Malformed files already become error records; keep the parser's warnings off stderr
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+
+TEXT_EXTENSIONS = (".txt", ".md", ".text")
+SUPPORTED_EXTENSIONS = (".pdf", ".docx") + TEXT_EXTENSIONS
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+MAX_FILE_BYTES = int(os.getenv("AI_INGEST_MAX_FILE_BYTES", 20 * 1024 * 1024))
+# Yielded by iter_sources() instead of the bytes of an archive member larger than MAX_FILE_BYTES
+OVERSIZED = object()
+
+# Section headings (lower case, without trailing colon) -> ResumeData section
+SECTION_HEADINGS = {
+    "summary": "summary", "professional summary": "summary", "profile": "summary", "about": "summary",
+    "about me": "summary", "objective": "summary", "career objective": "summary", "overview": "summary",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment": "experience", "employment history": "experience", "work history": "experience",
+    "career history": "experience", "relevant experience": "experience", "internships": "experience",
+    "education": "education", "academic background": "education", "qualifications": "education",
+    "education and training": "education", "certifications": "education", "certificates": "education",
+    "skills": "skills", "technical skills": "skills", "core competencies": "skills", "competencies": "skills",
+    "key skills": "skills", "technologies": "skills", "tools": "skills", "skills and tools": "skills",
+    "projects": "projects", "personal projects": "projects", "selected projects": "projects",
+    "key projects": "projects", "open source": "projects",
+}
+
+MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DATE = rf"(?:{MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{DATE})\s*(?:-|–|—|to)\s*(?P<end>{DATE}|present|current|now|today)", re.IGNORECASE
+)
+YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?:\+\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)[\s.-]?)?\d{2,4}(?:[\s.-]?\d{2,4}){2,3}")
+URL_RE = re.compile(r"(?:https?://|www\.)\S+|\b[\w-]+\.(?:com|io|dev|me|net|org)(?:/\S*)?", re.IGNORECASE)
+GPA_RE = re.compile(r"\bGPA[:\s]*([\d.]+(?:\s*/\s*[\d.]+)?)", re.IGNORECASE)
+DEGREE_RE = re.compile(
+    r"\b(bachelor|master|b\.?\s?sc|m\.?\s?sc|b\.?\s?a\b|m\.?\s?a\b|b\.?\s?tech|m\.?\s?tech|b\.?\s?e\b|m\.?\s?e\b|"
+    r"ph\.?\s?d|mba|associate|diploma|high school|certificat)", re.IGNORECASE
+)
+INSTITUTION_RE = re.compile(r"\b(university|college|institute|school|academy|polytechnic)\b", re.IGNORECASE)
+BULLET_RE = re.compile(r"^\s*(?:[-*•●▪◦‣–]|\d+[.)])\s+")
+TECH_LINE_RE = re.compile(r"^(?:tech(?:nologies)?|stack|tools|built with)\s*:\s*", re.IGNORECASE)
+TITLE_SEPARATORS = (" at ", " | ", " — ", " – ", " - ", " @ ", ", ")
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+# --- Text extraction -------------------------------------------------------
+
+def _decode_text(data: bytes) -> str:
+    for encoding in ("utf-8-sig", "utf-16") if data[:2] in (b"\xff\xfe", b"\xfe\xff") else ("utf-8-sig",):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            pass
+    return data.decode("latin-1")
+
+
+def docx_text(data: bytes) -> str:
+    """Paragraph text of a .docx (numbered/bulleted paragraphs prefixed with "- "); stdlib only"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        xml = archive.read("word/document.xml")
+    lines = []
+    for paragraph in ElementTree.fromstring(xml).iter(f"{WORD_NS}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{WORD_NS}t" and node.text:
+                parts.append(node.text)
+            elif node.tag == f"{WORD_NS}tab":
+                parts.append("\t")
+            elif node.tag in (f"{WORD_NS}br", f"{WORD_NS}cr"):
+                parts.append("\n")
+        text = "".join(parts)
+        if paragraph.find(f"{WORD_NS}pPr/{WORD_NS}numPr") is not None and text.strip():
+            text = "- " + text
+        lines.append(text)
+    return "\n".join(lines)
+
+
+def pdf_text(data: bytes) -> str:
+    if PdfReader is None:
+        raise RuntimeError("PDF support requires pypdf (pip install pypdf)")
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_text(name: str, data: bytes) -> str:
+    """Plain text of a resume file, chosen by extension"""
+    lower = name.lower()
+    if lower.endswith(".pdf"):
+        return pdf_text(data)
+    if lower.endswith(".docx"):
+        return docx_text(data)
+    return _decode_text(data)
+
+
+# --- Segmentation ----------------------------------------------------------
+
+def _normalize_lines(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return [re.sub(r"[ \t ]+", " ", line).strip() for line in text.split("\n")]
+
+
+def section_heading(line: str) -> Optional[str]:
+    """Section of a heading line, or None if the line is not a heading"""
+    if not line or len(line) > 40:
+        return None
+    key = re.sub(r"[^a-z& ]", "", line.lower().rstrip(":").replace("&", "and")).strip()
+    return SECTION_HEADINGS.get(re.sub(r"\s+", " ", key))
+
+
+def segment_sections(lines: List[str]) -> Dict[str, List[str]]:
+    """Split lines into {"header", "summary", "experience", "education", "skills", "projects"}"""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in lines:
+        section = section_heading(line)
+        if section is not None:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _blocks(lines: List[str]) -> List[List[str]]:
+    """Group lines into blank-line separated blocks"""
+    blocks, block = [], []
+    for line in lines:
+        if line:
+            block.append(line)
+        elif block:
+            blocks.append(block)
+            block = []
+    if block:
+        blocks.append(block)
+    return blocks
+
+
+def _split_title(text: str) -> Tuple[str, str]:
+    for separator in TITLE_SEPARATORS:
+        if separator in text:
+            left, right = text.split(separator, 1)
+            return left.strip(" ,|-–—"), right.strip(" ,|-–—")
+    return text.strip(" ,|-–—"), ""
+
+
+def parse_contact(lines: List[str]) -> Dict[str, str]:
+    info = {"name": "", "email": "", "phone": "", "location": "", "linkedin": "", "website": ""}
+    text = "\n".join(lines)
+    email = EMAIL_RE.search(text)
+    info["email"] = email.group(0) if email else ""
+    for url in URL_RE.findall(EMAIL_RE.sub(" ", text)):
+        url = url.rstrip(".,;)")
+        if "linkedin" in url.lower():
+            info["linkedin"] = info["linkedin"] or url
+        elif not info["website"]:
+            info["website"] = url
+    for line in lines:
+        for part in re.split(r"\s*[|•·]\s*", line):
+            if not info["phone"]:
+                phone = PHONE_RE.search(part)
+                if phone and sum(c.isdigit() for c in phone.group(0)) >= 7 and not EMAIL_RE.search(part):
+                    info["phone"] = phone.group(0).strip()
+                    continue
+            if not info["location"] and re.fullmatch(r"[A-Za-z .'-]+,\s*[A-Za-z .'-]+", part) and len(part) < 50:
+                info["location"] = part
+    for line in lines:
+        words = line.split()
+        if line and 1 < len(words) <= 5 and not any(c.isdigit() for c in line) and "@" not in line \
+                and not URL_RE.search(line) and line != info["location"]:
+            info["name"] = line
+            break
+    return info
+
+
+def parse_experience(lines: List[str]) -> List[Dict]:
+    """One entry per date range line (or per block when there are no dates)"""
+    entries: List[Dict] = []
+    pending: List[str] = []  # Non-bullet lines seen before the entry's date line
+
+    def new_entry(heading_lines: List[str], match) -> Dict:
+        heading = " ".join(heading_lines)
+        title, company = _split_title(heading)
+        location = ""
+        if "," in company and len(company.split(",")[-1]) < 30:
+            company, location = [part.strip() for part in company.rsplit(",", 1)]
+        return {
+            "title": title, "company": company, "location": location,
+            "startDate": match.group("start") if match else "", "endDate": match.group("end") if match else "",
+            "description": "", "achievements": [],
+        }
+
+    for line in lines:
+        if not line:
+            continue
+        match = DATE_RANGE_RE.search(line)
+        bullet = BULLET_RE.match(line)
+        if match and not bullet:
+            rest = (line[:match.start()] + line[match.end():]).strip(" ,|()-–—")
+            heading = [rest] if rest else pending[-2:]
+            if rest and pending and entries and not entries[-1]["achievements"] and not entries[-1]["description"]:
+                heading = pending[-1:] + [rest]
+            elif rest and pending and not entries:
+                heading = pending[-1:] + [rest]
+            entries.append(new_entry([h for h in heading if h], match))
+            pending = []
+        elif bullet:
+            if not entries:
+                entries.append(new_entry(pending[-2:], None))
+                pending = []
+            entries[-1]["achievements"].append(line[bullet.end():].strip())
+        elif entries and not DATE_RANGE_RE.search(line) and entries[-1]["achievements"] == [] and len(line) > 60:
+            entries[-1]["description"] = f"{entries[-1]['description']} {line}".strip()
+        else:
+            pending.append(line)
+    if not entries and pending:
+        entries = [new_entry(block[:1], None) for block in _blocks(lines)]
+    return entries
+
+
+def parse_education(lines: List[str]) -> List[Dict]:
+    entries = []
+    for block in _blocks(lines):
+        text = " ".join(block)
+        degree_line = next((line for line in block if DEGREE_RE.search(line)), block[0])
+        institution = next((line for line in block if INSTITUTION_RE.search(line)), "")
+        if institution == degree_line:
+            degree, rest = _split_title(degree_line)
+            institution = rest if INSTITUTION_RE.search(rest) else institution
+            degree_line = degree if institution != degree_line else degree_line
+        years = [match.group(0) for match in YEAR_RE.finditer(text)]
+        gpa = GPA_RE.search(text)
+        entries.append({
+            "degree": DATE_RANGE_RE.sub("", YEAR_RE.sub("", degree_line)).strip(" ,|()-–—"),
+            "institution": DATE_RANGE_RE.sub("", YEAR_RE.sub("", institution)).strip(" ,|()-–—"),
+            "location": "",
+            "graduationDate": years[-1] if years else "",
+            "gpa": gpa.group(1) if gpa else "",
+            "achievements": [BULLET_RE.sub("", line) for line in block if BULLET_RE.match(line)],
+        })
+    return entries
+
+
+def parse_skill_list(lines: List[str]) -> List[str]:
+    skills = []
+    for line in lines:
+        line = BULLET_RE.sub("", line)
+        if ":" in line and len(line.split(":", 1)[0]) < 30:
+            # "Languages: Python, Go" -> drop the category label
+            line = line.split(":", 1)[1]
+        for item in re.split(r"[,;|•·]|\s{2,}|\t", line):
+            item = item.strip(" .")
+            if item and len(item) <= 40:
+                skills.append(item)
+    return skills
+
+
+def parse_projects(lines: List[str]) -> List[Dict]:
+    projects: List[Dict] = []
+    for line in lines:
+        if not line:
+            continue
+        bullet = BULLET_RE.match(line)
+        tech = TECH_LINE_RE.match(line)
+        if tech and projects:
+            projects[-1]["technologies"] += [t.strip() for t in re.split(r"[,;|]", line[tech.end():]) if t.strip()]
+        elif bullet or (projects and len(line) > 60):
+            if not projects:
+                projects.append({"name": "", "description": "", "technologies": [], "link": ""})
+            text = line[bullet.end():] if bullet else line
+            projects[-1]["description"] = f"{projects[-1]['description']} {text}".strip()
+        else:
+            url = URL_RE.search(line)
+            name = URL_RE.sub("", line).strip(" ,|()-–—")
+            name, description = _split_title(name) if " - " in name or " | " in name else (name, "")
+            projects.append({
+                "name": name, "description": description, "technologies": [],
+                "link": url.group(0).rstrip(".,;)") if url else "",
+            })
+    return projects
+
+
+def parse_resume_text(text: str) -> Dict:
+    """
+    Segment plain resume text into a ResumeData dict (types/resume.ts) with local heuristics
+
+    Sections are found by common headings; contact details by pattern; experience entries
+    by date ranges. Skills listed in the skills section are merged with skills the local
+    taxonomy finds anywhere in the text.
+    """
+    sections = segment_sections(_normalize_lines(text))
+    header = [line for line in sections.get("header", []) if line]
+    listed = parse_skill_list(sections.get("skills", []))
+    known = {skill.lower() for skill in listed}
+    found = [skill for skill in get_default_extractor().extract(text) if skill.lower() not in known]
+    return {
+        "personalInfo": parse_contact(header[:8]),
+        "summary": " ".join(line for line in sections.get("summary", []) if line),
+        "experience": parse_experience(sections.get("experience", [])),
+        "education": parse_education(sections.get("education", [])),
+        "skills": listed + found,
+        "projects": parse_projects(sections.get("projects", [])),
+    }
+
+
+# --- Pipeline --------------------------------------------------------------
+
+def process_file(source: str, data: Optional[bytes] = None, path: Optional[str] = None) -> Dict:
+    """
+    Turn one file into a JSONL record; never raises
+
+    Returns:
+        {"source", "ok": True, "sha256", "resume_hash", "chars", "resume"} or {"source", "ok": False, "error"}
+    """
+    started = time.perf_counter()
+    try:
+        if data is None:
+            if os.path.getsize(path) > MAX_FILE_BYTES:
+                raise ValueError(f"File larger than {MAX_FILE_BYTES} bytes")
+            with open(path, "rb") as f:
+                data = f.read()
+        text = extract_text(source, data)
+        if not text.strip():
+            raise ValueError("No text could be extracted (scanned PDF?)")
+        resume = parse_resume_text(text)
+        return {
+            "source": source,
+            "ok": True,
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "resume_hash": resume_hash(resume),
+            "chars": len(text),
+            "ms": round(1000 * (time.perf_counter() - started), 1),
+            "resume": resume,
+        }
+    except Exception as e:
+        return {"source": source, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def _supported(name: str) -> bool:
+    return name.lower().endswith(SUPPORTED_EXTENSIONS) and not os.path.basename(name).startswith(("~$", "."))
+
+
+def iter_sources(paths: Iterable[str]) -> Iterator[Tuple[str, Union[bytes, object, None], Optional[str]]]:
+    """
+    Lazily yield (source name, bytes or None, file path or None) for every resume under paths
+
+    Directories are walked recursively; archive members are read one at a time, and one larger
+    than MAX_FILE_BYTES is yielded with OVERSIZED instead of its bytes.
+    Plain files are passed by path so workers read them themselves.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    full = os.path.join(root, name)
+                    if name.lower().endswith(ARCHIVE_EXTENSIONS):
+                        yield from iter_sources([full])
+                    elif _supported(name):
+                        yield full, None, full
+        elif path.lower().endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not _supported(info.filename):
+                        continue
+                    source = f"{path}!{info.filename}"
+                    if info.file_size > MAX_FILE_BYTES:
+                        yield source, OVERSIZED, None
+                        continue
+                    yield source, archive.read(info), None
+        elif path.lower().endswith(ARCHIVE_EXTENSIONS):
+            # Stream mode: members are read in order without loading the archive index
+            with tarfile.open(path, "r|*") as archive:
+                for member in archive:
+                    if not member.isfile() or not _supported(member.name):
+                        continue
+                    source = f"{path}!{member.name}"
+                    if member.size > MAX_FILE_BYTES:
+                        yield source, OVERSIZED, None
+                        continue
+                    yield source, archive.extractfile(member).read(), None
+        elif _supported(path):
+            yield path, None, path
+
+
+def ingest(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    skip_duplicates: bool = False
+) -> Iterator[Dict]:
+    """
+    Process resumes in a process pool and yield one record per file as it finishes
+
+    Args:
+        paths: Files, directories and zip/tar archives
+        workers: Worker processes (default: CPU count)
+        max_in_flight: Files submitted but not yet finished; bounds memory (default: 4 per worker)
+        skip_duplicates: Skip files whose parsed resume was already seen in this run
+            (same resume_hash, so a PDF and DOCX of one resume count once)
+
+    Yields:
+        process_file() records, in completion order
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 4 * workers
+    seen = set()
+    sources = iter_sources(paths)
+    # Recycle workers now and then so a leaky PDF parser cannot grow them without bound (Python 3.11+)
+    recycle = {"max_tasks_per_child": 500} if sys.version_info >= (3, 11) else {}
+    new_pool = lambda: ProcessPoolExecutor(max_workers=workers, **recycle)
+    executor = new_pool()
+    pending = {}
+    try:
+        while True:
+            while len(pending) < max_in_flight:
+                item = next(sources, None)
+                if item is None:
+                    break
+                source, data, path = item
+                if data is OVERSIZED:
+                    yield {"source": source, "ok": False, "error": f"ValueError: File larger than {MAX_FILE_BYTES} bytes"}
+                    continue
+                pending[executor.submit(process_file, source, data, path)] = source
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                source = pending.pop(future)
+                try:
+                    record = future.result()
+                except BrokenProcessPool:
+                    # A worker died (e.g. a parser crashed the interpreter); only its files fail
+                    broken = True
+                    record = {"source": source, "ok": False, "error": "Worker process crashed"}
+                if skip_duplicates and record.get("ok"):
+                    if record["resume_hash"] in seen:
+                        continue
+                    seen.add(record["resume_hash"])
+                yield record
+            if broken:
+                for future, source in pending.items():
+                    yield {"source": source, "ok": False, "error": "Worker process crashed"}
+                pending = {}
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = new_pool()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def ingest_to_jsonl(paths: Iterable[str], output, **kwargs) -> Dict:
+    """
+    Write ingest() records to a JSONL file (path or text stream) as they finish
+
+    Returns:
+        {"files", "ok", "failed", "seconds", "files_per_second"}
+    """
+    stream = open(output, "w", encoding="utf-8") if isinstance(output, str) else output
+    stats = {"files": 0, "ok": 0, "failed": 0}
+    started = time.perf_counter()
+    try:
+        for record in ingest(paths, **kwargs):
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            stats["files"] += 1
+            stats["ok" if record["ok"] else "failed"] += 1
+    finally:
+        if isinstance(output, str):
+            stream.close()
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    stats["files_per_second"] = round(stats["files"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert resume files (PDF/DOCX/TXT) to ResumeData JSONL")
+    parser.add_argument("paths", nargs="+", help="Files, directories or zip/tar archives")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-in-flight", type=int, help="Files queued at once (default: 4 per worker)")
+    parser.add_argument("--skip-duplicates", action="store_true", help="Skip files that parse to an already seen resume")
+    args = parser.parse_args()
+
+    output = sys.stdout if args.output == "-" else args.output
+    stats = ingest_to_jsonl(
+        args.paths, output, workers=args.workers, max_in_flight=args.max_in_flight,
+        skip_duplicates=args.skip_duplicates
+    )
+    print(
+        f"{stats['files']} files ({stats['ok']} ok, {stats['failed']} failed) in {stats['seconds']}s "
+        f"= {stats['files_per_second']} files/s",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
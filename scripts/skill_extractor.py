@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Local taxonomy-based skill extraction for HireSenseAI
+Scans job descriptions for the technologies in lib/technologies.ts (exported to
+data/technologies.json) plus curated aliases, using a compiled Aho-Corasick automaton.
+Uses pyahocorasick when it is installed, otherwise a pure-Python automaton.
+"""
+
+import bisect
+import json
+import os
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    # pyahocorasick is optional; the pure-Python automaton below is used instead
+    ahocorasick = None
+
+
+# Sentence/list-item boundaries for the context of ambiguous skill names
+SEGMENT_BOUNDARY_RE = re.compile(r"[.!?;](?=\s|$)|\n")
+WORD_RE = re.compile(r"[A-Za-z]+")
+# Words on each side of an ambiguous name searched for a context word
+CONTEXT_WINDOW = 4
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+TECHNOLOGIES_PATH = os.path.join(DATA_DIR, "technologies.json")
+ALIASES_PATH = os.path.join(DATA_DIR, "skill-aliases.json")
+
+
+@dataclass
+class SkillMatch:
+    """A canonical skill found in the text"""
+    skill: str  # canonical name from lib/technologies.ts
+    category: str
+    start: int  # character offsets into the original text
+    end: int
+    matched: str  # surface form as written in the text
+
+
+class AhoCorasick:
+    """Pure-Python Aho-Corasick automaton over lowercase patterns"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, object]]] = [[]]  # node -> [(pattern length, value)]
+
+    def add(self, pattern: str, value: object) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        self._out[node].append((len(pattern), value))
+
+    def build(self) -> None:
+        """Compute failure links; call once after adding all patterns"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                # Children of the root always fail back to the root
+                self._fail[child] = self._goto[fail].get(char, 0) if node else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, object]]:
+        """Yield (end index inclusive, value) for every pattern occurrence"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, value in out[node]:
+                yield index, (length, value)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _lower_same_length(text: str) -> str:
+    # A few characters (e.g. "İ") lowercase to two code points, which would shift offsets
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+class SkillExtractor:
+    """
+    Finds canonical skills in free text with word-boundary and case rules
+
+    Overlapping matches are resolved leftmost-longest, so "React Native" wins over "React"
+    and "JavaScript" never yields "Java". Names that are also everyday words ("Express
+    yourself", "Go further") only count in a technical context: another skill in the same
+    sentence or list line, or a context word such as "framework" next to them.
+    """
+
+    def __init__(
+        self,
+        categories: Dict[str, List[str]],
+        aliases: Optional[Dict[str, List[str]]] = None,
+        case_sensitive: Optional[List[str]] = None,
+        ambiguous: Optional[List[str]] = None,
+        context_words: Optional[List[str]] = None
+    ):
+        """
+        Initialize the extractor
+
+        Args:
+            categories: {category: [canonical names]} as exported from lib/technologies.ts
+            aliases: {canonical name: [alternative spellings]}
+            case_sensitive: Surface forms that only match with exact case (e.g. "Go", "React")
+            ambiguous: Surface forms that are also common words and need a technical context (e.g. "Express")
+            context_words: Words that make a nearby ambiguous name technical (e.g. "framework")
+        """
+        self.categories = {skill: category for category, skills in categories.items() for skill in skills}
+        case_sensitive = set(case_sensitive or [])
+        self.ambiguous = {form.lower() for form in ambiguous or []}
+        self.context_words = {word.lower() for word in context_words or []}
+
+        surface_forms: Dict[str, Tuple[str, str, bool]] = {}
+        for skill in self.categories:
+            surface_forms[skill.lower()] = (skill, skill, skill in case_sensitive)
+        for skill, names in (aliases or {}).items():
+            if skill not in self.categories:
+                continue
+            for name in names:
+                surface_forms.setdefault(name.lower(), (skill, name, name in case_sensitive))
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for pattern, (skill, form, exact) in surface_forms.items():
+                self._automaton.add_word(pattern, (len(pattern), (skill, form, exact)))
+            self._automaton.make_automaton()
+        else:
+            self._automaton = AhoCorasick()
+            for pattern, (skill, form, exact) in surface_forms.items():
+                self._automaton.add(pattern, (skill, form, exact))
+            self._automaton.build()
+
+    @classmethod
+    def from_files(cls, technologies_path: str = TECHNOLOGIES_PATH, aliases_path: str = ALIASES_PATH) -> "SkillExtractor":
+        """Load the exported technology list and the curated alias file"""
+        with open(technologies_path, encoding="utf-8") as f:
+            categories = json.load(f)["categories"]
+        alias_data = {}
+        if os.path.exists(aliases_path):
+            with open(aliases_path, encoding="utf-8") as f:
+                alias_data = json.load(f)
+        return cls(
+            categories,
+            alias_data.get("aliases", {}),
+            alias_data.get("case_sensitive", []),
+            alias_data.get("ambiguous", []),
+            alias_data.get("context_words", []),
+        )
+
+    def find(self, text: str) -> List[SkillMatch]:
+        """
+        Find every skill mention in the text
+
+        Args:
+            text: Job description or resume text (scanned in full)
+
+        Returns:
+            Non-overlapping matches in text order, with offsets into the original text
+        """
+        candidates = []
+        for end, (length, (skill, form, exact)) in self._automaton.iter(_lower_same_length(text)):
+            start = end - length + 1
+            end += 1
+            matched = text[start:end]
+            if exact and matched != form:
+                continue
+            # Word boundaries only apply on sides where the pattern itself is alphanumeric
+            if start > 0 and _is_word_char(matched[0]) and _is_word_char(text[start - 1]):
+                continue
+            if end < len(text) and _is_word_char(matched[-1]) and _is_word_char(text[end]):
+                continue
+            candidates.append((start, -length, skill, matched))
+
+        matches = []
+        last_end = 0
+        for start, negative_length, skill, matched in sorted(candidates):
+            if start < last_end:
+                continue
+            end = start - negative_length
+            matches.append(SkillMatch(skill, self.categories[skill], start, end, matched))
+            last_end = end
+        if self.ambiguous and any(match.matched.lower() in self.ambiguous for match in matches):
+            matches = self._in_context(text, matches)
+        return matches
+
+    def _in_context(self, text: str, matches: List[SkillMatch]) -> List[SkillMatch]:
+        """Drop ambiguous matches with no other skill in their segment and no context word next to them"""
+        boundaries = [m.start() for m in SEGMENT_BOUNDARY_RE.finditer(text)]
+
+        def segment(match: SkillMatch) -> Tuple[int, int]:
+            index = bisect.bisect_left(boundaries, match.start)
+            return (boundaries[index - 1] + 1 if index else 0,
+                    boundaries[index] if index < len(boundaries) else len(text))
+
+        anchors = [match for match in matches if match.matched.lower() not in self.ambiguous]
+        kept = []
+        for match in matches:
+            if match.matched.lower() in self.ambiguous:
+                start, end = segment(match)
+                # Another ambiguous name does not vouch for this one ("Go with Swift")
+                if not any(start <= anchor.start < end for anchor in anchors):
+                    before = WORD_RE.findall(text[start:match.start])[-CONTEXT_WINDOW:]
+                    after = WORD_RE.findall(text[match.end:end])[:CONTEXT_WINDOW]
+                    if not any(word.lower() in self.context_words for word in before + after):
+                        continue
+            kept.append(match)
+        return kept
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills in order of first mention, without duplicates"""
+        seen = []
+        for match in self.find(text):
+            if match.skill not in seen:
+                seen.append(match.skill)
+        return seen
+
+    @staticmethod
+    def coverage(skills: List[str], target: int) -> float:
+        """Fraction of the wanted number of skills that were found locally"""
+        return min(len(skills) / target, 1.0) if target else 1.0
+
+
+_default_extractor: Optional[SkillExtractor] = None
+
+
+def get_default_extractor() -> SkillExtractor:
+    """Return the shared extractor built from the bundled data files"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = SkillExtractor.from_files()
+    return _default_extractor
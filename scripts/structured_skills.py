@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Structured (typed) skill extraction from streamed completions
+The model is asked for a JSON array of {"name", "type"} objects, most important first.
+Skills are parsed as each array element closes, so callers can stop the upstream
+request as soon as they have enough of them.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ai_stream import iter_json_array_items
+from jd_compactor import compact_job_description
+
+SKILL_TYPES = ("technical", "soft", "experience", "education")
+
+# Labels models use instead of the requested types
+TYPE_ALIASES = {
+    "hard": "technical", "tool": "technical", "tools": "technical", "technology": "technical",
+    "framework": "technical", "language": "technical", "domain": "technical", "industry": "technical",
+    "soft skill": "soft", "interpersonal": "soft",
+    "experience level": "experience", "years": "experience", "seniority": "experience",
+    "degree": "education", "certification": "education", "qualification": "education",
+}
+
+# Completion tokens per {"name": ..., "type": ...} element, for sizing max_tokens: elements
+# measure 14-20 tokens with the separator and line break, more for multi-word names, so
+# this leaves headroom rather than cutting the array short (see TRUNCATED_WARNING)
+TOKENS_PER_SKILL = 32
+
+TRUNCATED_WARNING = "Structured skills: completion hit max_tokens before the skill list was complete"
+
+
+@dataclass
+class TypedSkill:
+    """One extracted requirement and its category"""
+    name: str
+    type: str  # one of SKILL_TYPES
+
+    def to_dict(self) -> Dict[str, str]:
+        return asdict(self)
+
+
+def structured_skills_messages(job_description: str, max_skills: int = 15) -> List[Dict]:
+    """Build the prompt for structured skill extraction"""
+    job_description = compact_job_description(job_description, task="skills")
+    return [
+        {
+            "role": "system",
+            "content": "You extract requirements from job descriptions and answer with JSON only, no prose."
+        },
+        {
+            "role": "user",
+            "content": f"""List up to {max_skills} requirements of this job, most important first, as a JSON array of
+objects {{"name": "<short skill name>", "type": "<technical|soft|experience|education>"}}.
+Use "technical" for languages, tools and frameworks, "soft" for interpersonal skills,
+"experience" for years or seniority, and "education" for degrees and certifications.
+
+{job_description}"""
+        }
+    ]
+
+
+def structured_skills_max_tokens(max_skills: int) -> int:
+    """Completion budget for max_skills elements plus the brackets"""
+    return TOKENS_PER_SKILL * max_skills + 16
+
+
+def to_typed_skill(item: object) -> Optional[TypedSkill]:
+    """Coerce one array element into a TypedSkill, or None if it carries no usable name"""
+    if isinstance(item, str):
+        name, kind = item, "technical"
+    elif isinstance(item, dict):
+        name = item.get("name") or item.get("skill") or ""
+        kind = str(item.get("type") or item.get("category") or "technical")
+    else:
+        return None
+    name = str(name).strip()
+    if not name or len(name) > 80:
+        return None
+    kind = kind.strip().lower()
+    kind = kind if kind in SKILL_TYPES else TYPE_ALIASES.get(kind, "technical")
+    return TypedSkill(name=name, type=kind)
+
+
+def iter_typed_skills(deltas: Iterable[str], max_skills: Optional[int] = None) -> Iterator[TypedSkill]:
+    """
+    Yield de-duplicated TypedSkills from streamed completion deltas
+
+    Args:
+        deltas: Content deltas of a streaming completion
+        max_skills: Stop after this many skills. Closing the delta stream (as the
+            clients' generators do when closed) aborts the upstream request
+
+    Yields:
+        Each skill as soon as its array element is complete
+    """
+    seen = set()
+    if max_skills is not None and max_skills <= 0:
+        return
+    for item in iter_json_array_items(deltas):
+        skill = to_typed_skill(item)
+        if skill is None or skill.name.lower() in seen:
+            continue
+        seen.add(skill.name.lower())
+        yield skill
+        if max_skills is not None and len(seen) >= max_skills:
+            return
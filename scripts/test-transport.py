@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled NVIDIA AI transport
+Runs against a local stub server, so no API key or network access is needed
+"""
+
+import importlib.util
+import os
+import sys
+import time
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_transport import PooledTransport, TransportConfig
+from mock_upstream import MockUpstream
+
+
+def load_client_module():
+    """Load nvidia-ai-client.py (the file name is not importable directly)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nvidia-ai-client.py")
+    spec = importlib.util.spec_from_file_location("nvidia_ai_client", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def check(name, condition, detail=""):
+    print(f"{'✅' if condition else '❌'} {name}{f': {detail}' if detail else ''}")
+    return condition
+
+
+def test_transport():
+    print("Testing pooled NVIDIA AI transport")
+    print("=" * 40)
+
+    config = TransportConfig(connect_timeout=1.0, read_timeout=2.0, max_retries=3, backoff_base=0.01, backoff_max=0.5)
+    results = []
+
+    # Test 1: Keep-alive - many requests over a single pooled connection
+    with MockUpstream() as mock:
+        transport = PooledTransport(config)
+        for _ in range(5):
+            transport.post(mock.url, json={"model": "m"}).raise_for_status()
+        results.append(check("Keep-alive", mock.connection_count == 1,
+                             f"{mock.request_count} requests over {mock.connection_count} connection(s)"))
+        transport.close()
+
+    # Test 2: Retry on 5xx with backoff
+    with MockUpstream() as mock:
+        transport = PooledTransport(config)
+        mock.fail_with(503, times=2)
+        response = transport.post(mock.url, json={"model": "m"})
+        results.append(check("Retry on 503", response.status_code == 200 and mock.request_count == 3,
+                             f"status {response.status_code} after {mock.request_count} attempts"))
+        transport.close()
+
+    # Test 3: 429 honours Retry-After
+    with MockUpstream() as mock:
+        transport = PooledTransport(config)
+        mock.fail_with(429, times=1, retry_after="0.2")
+        started = time.monotonic()
+        response = transport.post(mock.url, json={"model": "m"})
+        waited = time.monotonic() - started
+        results.append(check("Retry-After on 429", response.status_code == 200 and waited >= 0.2,
+                             f"waited {waited:.2f}s"))
+        transport.close()
+
+    # Test 4: Retries are bounded
+    with MockUpstream() as mock:
+        transport = PooledTransport(config)
+        mock.fail_with(503, times=10)
+        response = transport.post(mock.url, json={"model": "m"})
+        results.append(check("Bounded retries", response.status_code == 503 and mock.request_count == 4,
+                             f"gave up after {mock.request_count} attempts"))
+        transport.close()
+
+    # Test 5: Read timeout on a hung upstream
+    with MockUpstream(delay=1.0) as mock:
+        transport = PooledTransport(TransportConfig(read_timeout=0.2, max_retries=0))
+        try:
+            transport.post(mock.url, json={"model": "m"})
+            results.append(check("Read timeout", False, "no timeout raised"))
+        except requests.exceptions.ReadTimeout:
+            results.append(check("Read timeout", True))
+        transport.close()
+
+    # Test 6: NvidiaAIClient goes through the transport
+    with MockUpstream(reply="hello from stub") as mock:
+        module = load_client_module()
+        transport = PooledTransport(config)
+        client = module.NvidiaAIClient(api_key="test-key", transport=transport, invoke_url=mock.url)
+        replies = [client.chat_completion([{"role": "user", "content": "hi"}]) for _ in range(3)]
+        results.append(check("NvidiaAIClient", replies == ["hello from stub"] * 3 and mock.connection_count == 1,
+                             f"{len(replies)} replies over {mock.connection_count} connection(s)"))
+        transport.close()
+
+    print("\n" + "=" * 40)
+    print(f"Transport Testing Complete! {sum(results)}/{len(results)} passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_transport() else 1)
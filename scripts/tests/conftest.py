@@ -0,0 +1,48 @@
+"""
+Shared pytest setup for the Python AI scripts
+Run from the repository root with: python -m pytest scripts/tests
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from mock_upstream import MockUpstream
+
+
+def load_script(file_name: str, module_name: str):
+    """Load a script whose file name is not importable directly (e.g. nvidia-ai-client.py)"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def mock_upstream():
+    with MockUpstream() as mock:
+        yield mock
+
+
+@pytest.fixture
+def server(mock_upstream, monkeypatch, tmp_path):
+    """api-server.py loaded against the mock upstream, with every store in tmp_path"""
+    for name, value in {
+        "NVIDIA_API_KEY": "test-key",
+        "NVIDIA_INVOKE_URL": mock_upstream.url,
+        "AI_CACHE_PATH": "",
+        "AI_JOBS_ENABLED": "false",
+        "AI_CHAT_SESSIONS_PATH": str(tmp_path / "sessions.sqlite3"),
+        "AI_VECTOR_INDEX_PATH": str(tmp_path / "vector-index" / "jobs"),
+    }.items():
+        monkeypatch.setenv(name, value)
+    module = load_script("api-server.py", "api_server")
+    module.mock = mock_upstream
+    module.client = module.app.test_client()
+    return module
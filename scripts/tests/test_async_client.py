@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from ai_cache import TieredCache
+from ai_transport import AsyncPooledTransport, TransportConfig
+from conftest import load_script
+
+client_module = load_script("nvidia-ai-client.py", "nvidia_ai_client")
+
+
+def make_client(url, cache=None):
+    transport = AsyncPooledTransport(TransportConfig(max_retries=1, backoff_base=0.01))
+    return client_module.AsyncNvidiaAIClient(api_key="test-key", transport=transport, invoke_url=url, cache=cache)
+
+
+def test_requires_api_key(monkeypatch):
+    monkeypatch.delenv("NVIDIA_API_KEY", raising=False)
+    with pytest.raises(ValueError):
+        client_module.AsyncNvidiaAIClient()
+
+
+def test_chat_completion_and_cache(mock_upstream):
+    cache = TieredCache()
+
+    async def run():
+        async with make_client(mock_upstream.url, cache) as client:
+            first = await client.chat_completion([{"role": "user", "content": "hi"}])
+            second = await client.chat_completion([{"role": "user", "content": "hi"}])
+            return first, second
+
+    assert asyncio.run(run()) == ("mock reply", "mock reply")
+    assert mock_upstream.request_count == 1
+
+
+def test_error_status_raises(mock_upstream):
+    mock_upstream.fail_with(400)
+
+    async def run():
+        async with make_client(mock_upstream.url) as client:
+            await client.chat_completion([{"role": "user", "content": "hi"}])
+
+    with pytest.raises(Exception) as info:
+        asyncio.run(run())
+    assert "400" in str(info.value)
+
+
+def test_gather_tasks_keeps_order_and_limit():
+    active, peak = 0, 0
+
+    async def task(index):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01 * (5 - index % 5))
+        active -= 1
+        return index
+
+    results = asyncio.run(client_module.gather_tasks((task(i) for i in range(12)), limit=3))
+    assert results == list(range(12))
+    assert peak == 3
+
+
+def test_gather_tasks_return_exceptions():
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def ok():
+        return 1
+
+    results = asyncio.run(client_module.gather_tasks([ok(), fail()], limit=2, return_exceptions=True))
+    assert results[0] == 1 and isinstance(results[1], RuntimeError)
+    with pytest.raises(RuntimeError):
+        asyncio.run(client_module.gather_tasks([ok(), fail()], limit=2))
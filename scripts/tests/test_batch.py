@@ -0,0 +1,50 @@
+import json
+
+RESUME = "Jane Doe\nSoftware Engineer\n\nSkills: Python, React, PostgreSQL"
+
+
+def batch_lines(server, body):
+    response = server.client.post("/api/ai/batch", json=body)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return sorted((json.loads(line) for line in response.get_data(as_text=True).splitlines()),
+                  key=lambda line: line["index"])
+
+
+def test_batch_streams_one_line_per_task(server):
+    lines = batch_lines(server, {"tasks": [
+        {"id": "a", "op": "analyze", "resume_content": RESUME},
+        {"id": "b", "op": "enhance", "resume_data": {"summary": "x"}},
+        {"id": "c", "op": "cover-letter", "resume_data": {"summary": "x"}, "job_description": "Backend role",
+         "company_name": "Acme"},
+    ], "concurrency": 2})
+    assert [line["id"] for line in lines] == ["a", "b", "c"]
+    assert all(line["success"] for line in lines)
+    assert lines[0]["analysis"] == "mock reply"
+    assert lines[2]["cover_letter"] == "mock reply"
+
+
+def test_batch_isolates_task_errors(server):
+    server.mock.fail_with(400)
+    lines = batch_lines(server, {"tasks": [
+        {"id": "bad-op", "op": "translate"},
+        {"id": "missing", "op": "analyze"},
+        "not a dict",
+        {"id": "upstream", "op": "analyze", "resume_content": RESUME},
+    ], "concurrency": 1})
+    assert [line["success"] for line in lines] == [False, False, False, False]
+    assert "Unknown op" in lines[0]["error"]
+    assert "Resume content is required" in lines[1]["error"]
+    assert "400" in lines[3]["error"]
+
+
+def test_batch_rejects_bad_requests(server):
+    assert server.client.post("/api/ai/batch", json={"tasks": []}).status_code == 400
+    assert server.client.post("/api/ai/batch", json={"tasks": "x"}).status_code == 400
+    too_many = [{"op": "analyze", "resume_content": RESUME}] * (server.BATCH_MAX_TASKS + 1)
+    assert server.client.post("/api/ai/batch", json={"tasks": too_many}).status_code == 400
+
+
+def test_batch_concurrency_is_clamped(server):
+    lines = batch_lines(server, {"tasks": [{"op": "analyze", "resume_content": RESUME}], "concurrency": "lots"})
+    assert lines[0]["success"]
@@ -0,0 +1,86 @@
+import time
+
+from ai_cache import LRUCache, SQLiteCache, TieredCache, cache_key
+
+
+def test_cache_key_is_canonical():
+    a = cache_key("m", [{"role": "user", "content": "hi", "name": "x"}], 10, 0.7, 0.9)
+    b = cache_key("m", [{"content": "hi", "role": "user"}], 10, 0.7, 0.9)
+    assert a == b
+    assert a != cache_key("m", [{"role": "user", "content": "hi"}], 11, 0.7, 0.9)
+    assert cache_key("m", [], 10, 1, 1) == cache_key("m", [], 10, 1.0, 1.0)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.evictions == 1
+
+
+def test_lru_byte_limit_and_oversized_values():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("big", "x" * 11)
+    assert cache.get("big") is None
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    assert cache.get("a") is None and cache.get("b") == "y" * 6
+
+
+def test_lru_ttl_expires():
+    cache = LRUCache(ttl=0.05)
+    cache.set("a", "1")
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.expirations == 1 and len(cache) == 0
+
+
+def test_sqlite_tier_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path).set("k", "v")
+    assert SQLiteCache(path).get("k") == "v"
+    expired = SQLiteCache(path)
+    expired.set("old", "v", ttl=-1)
+    assert expired.get("old") is None
+
+
+def test_sqlite_prune_keeps_newest(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    for index in range(4):
+        cache.set(f"k{index}", "v")
+        time.sleep(0.001)
+    assert cache.prune() == 2
+    assert cache.get("k0") is None and cache.get("k3") == "v"
+
+
+def test_tiered_promotes_shared_hits(tmp_path):
+    shared = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    shared.set("k", "v")
+    cache = TieredCache(LRUCache(), shared)
+    assert cache.get("k") == "v"
+    assert cache.get("k") == "v"
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["shared_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_get_or_compute_calls_once():
+    cache = TieredCache()
+    calls = []
+    compute = lambda: calls.append(1) or "value"
+    assert cache.get_or_compute("k", compute) == "value"
+    assert cache.get_or_compute("k", compute) == "value"
+    assert len(calls) == 1
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("AI_CACHE_ENABLED", "false")
+    assert TieredCache.from_env() is None
+    monkeypatch.setenv("AI_CACHE_ENABLED", "true")
+    monkeypatch.setenv("AI_CACHE_PATH", "")
+    cache = TieredCache.from_env()
+    assert cache is not None and cache.shared is None
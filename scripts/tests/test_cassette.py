@@ -0,0 +1,141 @@
+import json
+
+import pytest
+import requests
+
+from ai_cassette import CassetteMiss, CassetteTransport, is_complete, read_cassette, request_key
+from ai_transport import PooledTransport, TransportConfig
+
+FAST = dict(connect_timeout=1.0, read_timeout=5.0, max_retries=0, backoff_base=0.01, backoff_max=0.1)
+
+
+def payload(content="hello", model="m", stream=False, **extra):
+    return {"model": model, "messages": [{"role": "user", "content": content}], "stream": stream, **extra}
+
+
+def recorder(path):
+    return CassetteTransport(str(path), mode="record", inner=PooledTransport(TransportConfig(**FAST)))
+
+
+def replayer(path, **kwargs):
+    return CassetteTransport(str(path), latency_scale=0, **kwargs)
+
+
+def write_cassette(path, *entries):
+    path.write_text("\n".join(json.dumps(entry) for entry in ({"version": 1},) + entries) + "\n")
+
+
+def test_request_key_ignores_the_model():
+    assert request_key(payload(model="a")) == request_key(payload(model="b"))
+    assert request_key(payload("hello")) != request_key(payload("bye"))
+    assert request_key(None) == request_key({})
+
+
+def test_record_then_replay_json(tmp_path, mock_upstream):
+    path = tmp_path / "run.jsonl.gz"
+    recording = recorder(path)
+    recorded = recording.post(mock_upstream.url, json=payload()).json()
+    recording.close()
+    assert recording.stats()["recorded"] == 1
+
+    replay = replayer(path)
+    response = replay.post("http://offline", json=payload())
+    assert response.status_code == 200 and response.json() == recorded
+    assert replay.stats()["replayed"] == 1 and replay.offline
+
+
+def test_streamed_chunks_are_replayed_in_order(tmp_path, mock_upstream):
+    path = tmp_path / "stream.jsonl"
+    recording = recorder(path)
+    with recording.post(mock_upstream.url, json=payload(stream=True), stream=True) as response:
+        recorded = b"".join(response.iter_content(chunk_size=None))
+    recording.close()
+
+    with replayer(path).post("http://offline", json=payload(stream=True), stream=True) as response:
+        assert b"".join(response.iter_content(chunk_size=None)) == recorded
+    assert b"[DONE]" in recorded
+
+
+def test_responses_closed_before_their_body_are_never_replayed(tmp_path, mock_upstream):
+    path = tmp_path / "hedged.jsonl"
+    recording = recorder(path)
+    # A hedged call's winner reads its body; the loser drops its connection after the headers
+    winner = recording.post(mock_upstream.url, json=payload(), stream=True).json()
+    recording.post(mock_upstream.url, json=payload(), stream=True).close()
+    recording.close()
+    assert recording.stats()["incomplete"] == 1
+    assert [bool(entry.get("incomplete")) for entry in read_cassette(str(path))] == [False, True]
+
+    replay = replayer(path)
+    for _ in range(3):
+        assert replay.post("http://offline", json=payload()).json() == winner
+    assert replay.stats()["skipped_incomplete"] == 1 and replay.stats()["interactions"] == 1
+
+
+def test_successes_without_a_body_from_older_cassettes_are_skipped(tmp_path):
+    path = tmp_path / "old.jsonl"
+    key = request_key(payload())
+    write_cassette(
+        path,
+        {"key": key, "model": "m", "stream": False, "status": 200, "headers": {}, "ttfb": 0, "chunks": []},
+        {"key": key, "model": "m", "stream": False, "status": 500, "headers": {}, "ttfb": 0, "chunks": []},
+    )
+    assert [is_complete(entry) for entry in read_cassette(str(path))] == [False, True]
+    assert replayer(path).post("http://offline", json=payload()).status_code == 500
+
+
+def test_recorded_errors_are_raised_again(tmp_path):
+    path = tmp_path / "errors.jsonl"
+    write_cassette(path, {"key": request_key(payload()), "model": "m", "stream": False, "error": "ReadTimeout", "ttfb": 0})
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        replayer(path).post("http://offline", json=payload())
+
+
+def test_unrecorded_requests_fail_exactly_or_match_loosely(tmp_path):
+    path = tmp_path / "loose.jsonl"
+    body = json.dumps({"choices": [{"message": {"content": "recorded"}}]})
+    write_cassette(path, {"key": request_key(payload()), "model": "m", "stream": False, "status": 200,
+                          "headers": {}, "ttfb": 0, "chunks": [[0, body]]})
+    with pytest.raises(CassetteMiss):
+        replayer(path, match="exact").post("http://offline", json=payload("changed prompt"))
+
+    loose = replayer(path)
+    assert loose.post("http://offline", json=payload("changed prompt")).json()["choices"][0]["message"]["content"] == "recorded"
+    assert loose.post("http://offline", json=payload(model="other")).status_code == 200
+    assert (loose.stats()["loose_matches"], loose.stats()["model_substitutions"]) == (1, 1)
+    with pytest.raises(CassetteMiss):
+        loose.post("http://offline", json=payload(stream=True), stream=True)
+    assert loose.stats()["misses"] == 1
+
+
+def test_replayed_retry_after_is_capped_like_the_transport(tmp_path):
+    path = tmp_path / "limited.jsonl"
+    write_cassette(path, {"key": request_key(payload()), "model": "m", "stream": False, "status": 429,
+                          "headers": {"Retry-After": "3600"}, "ttfb": 0, "chunks": [[0, "{}"]]})
+    replay = replayer(path)
+    delays = []
+    replay.rate_limit_listeners.append(delays.append)
+    assert replay.post("http://offline", json=payload()).status_code == 429
+    assert delays == [TransportConfig.backoff_max]
+
+
+def test_invalid_settings_are_rejected(tmp_path, monkeypatch):
+    with pytest.raises(ValueError, match="mode"):
+        CassetteTransport(str(tmp_path / "x.jsonl"), mode="rewind")
+    with pytest.raises(ValueError, match="match"):
+        CassetteTransport(str(tmp_path / "x.jsonl"), match="fuzzy")
+    monkeypatch.delenv("NVIDIA_CASSETTE_MODE", raising=False)
+    assert CassetteTransport.from_env() is None
+    monkeypatch.setenv("NVIDIA_CASSETTE_MODE", "replay")
+    with pytest.raises(ValueError, match="NVIDIA_CASSETTE_PATH"):
+        CassetteTransport.from_env()
+
+
+def test_a_gzip_cassette_cut_short_keeps_what_was_flushed(tmp_path, mock_upstream):
+    path = tmp_path / "crashed.jsonl.gz"
+    recording = recorder(path)
+    recording.post(mock_upstream.url, json=payload()).json()
+    recording.close()
+    data = path.read_bytes()
+    path.write_bytes(data[:-8])  # Drop the gzip trailer
+    assert len(read_cassette(str(path))) == 1
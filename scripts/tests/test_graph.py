@@ -0,0 +1,152 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ai_graph import TaskGraph, time_left
+
+label = contextvars.ContextVar("label", default="none")
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def test_dependencies_receive_results_as_keyword_arguments(executor):
+    graph = TaskGraph()
+    graph.add("skills", lambda: ["Python", "Go"])
+    graph.add("count", lambda skills: len(skills), deps=["skills"])
+    graph.add("both", lambda skills, count: f"{count}:{skills[0]}", deps=["skills", "count"])
+    results = graph.run(executor)
+    assert list(results) == ["skills", "count", "both"]
+    assert results["both"].ok and results["both"].value == "2:Python"
+    assert results["count"].started >= results["skills"].started
+    assert set(results["skills"].timing()) == {"started", "seconds"}
+
+
+def test_independent_tasks_run_side_by_side(executor):
+    barrier = threading.Barrier(2, timeout=5)
+    graph = TaskGraph()
+    graph.add("a", barrier.wait)
+    graph.add("b", barrier.wait)
+    # Deadlocks (and times out) unless both run at once
+    assert all(result.ok for result in graph.run(executor, timeout=5).values())
+
+
+def test_failure_skips_dependents_only(executor):
+    graph = TaskGraph()
+    graph.add("skills", lambda: 1 / 0)
+    graph.add("analysis", lambda: "fine")
+    graph.add("match", lambda skills: skills, deps=["skills"])
+    graph.add("letter", lambda match: match, deps=["match"])
+    results = graph.run(executor)
+    assert results["skills"].error == "division by zero"
+    assert results["match"].error == "Skipped: skills failed"
+    assert results["letter"].error == "Skipped: match failed"
+    assert results["analysis"].value == "fine"
+
+
+def test_exceptions_without_a_message_use_the_type_name(executor):
+    graph = TaskGraph()
+
+    def fail():
+        raise KeyError()
+
+    graph.add("x", fail)
+    assert graph.run(executor)["x"].error == "KeyError"
+
+
+def test_add_rejects_duplicates_and_unknown_dependencies():
+    graph = TaskGraph()
+    graph.add("a", lambda: 1)
+    with pytest.raises(ValueError, match="Duplicate"):
+        graph.add("a", lambda: 2)
+    with pytest.raises(ValueError, match="unknown task"):
+        graph.add("b", lambda c: c, deps=["c"])
+
+
+def test_tasks_run_in_the_callers_context(executor):
+    graph = TaskGraph()
+    graph.add("label", label.get)
+    token = label.set("report")
+    try:
+        assert graph.run(executor)["label"].value == "report"
+    finally:
+        label.reset(token)
+
+
+def test_timeout_reports_unfinished_tasks_and_cancels_queued_ones():
+    release = threading.Event()
+    ran = []
+    graph = TaskGraph()
+    graph.add("slow", lambda: release.wait(5))
+    graph.add("queued", lambda: ran.append("queued"))
+    graph.add("after", lambda slow: slow, deps=["slow"])
+    with ThreadPoolExecutor(max_workers=1) as single:
+        results = graph.run(single, timeout=0.1)
+        release.set()
+    assert {name: result.error for name, result in results.items()} == {
+        "slow": "Timed out", "queued": "Timed out", "after": "Timed out"
+    }
+    # "queued" was still waiting for the one worker when the graph gave up
+    assert ran == []
+
+
+def test_tasks_see_the_graph_deadline(executor):
+    assert time_left() is None
+    graph = TaskGraph()
+    graph.add("left", time_left)
+    graph.add("late", lambda: (time.sleep(0.15), time_left())[1])
+    results = graph.run(executor, timeout=0.1)
+    assert 0 < results["left"].value <= 0.1
+    assert results["late"].error == "Timed out"
+
+    untimed = TaskGraph()
+    untimed.add("left", time_left)
+    assert untimed.run(executor)["left"].value is None
+
+
+def test_full_report_runs_every_step(server):
+    response = server.client.post("/api/ai/full-report", json={
+        "resume_content": "Python developer with Flask and PostgreSQL experience",
+        "job_description": "We need a Python engineer who knows Flask and PostgreSQL",
+        "company_name": "Acme"
+    }).get_json()
+    assert response["success"] and response["errors"] == {}
+    assert set(response["report"]) == {"analysis", "skills", "skill_match", "enhancement", "cover_letter"}
+    assert response["report"]["skill_match"]["coverage"] > 0
+
+
+def test_full_report_requires_resume_and_job(server):
+    response = server.client.post("/api/ai/full-report", json={"job_description": "Python"})
+    assert response.status_code == 400
+
+
+def test_report_deadline_bounds_upstream_calls(server, monkeypatch):
+    monkeypatch.setattr(server, "REPORT_TIMEOUT", 0.3)
+    server.mock.delay = 2.0
+    timeouts, finished = [], []
+    post = server.nvidia_client.transport.post
+
+    def spy(*args, **kwargs):
+        timeouts.append(kwargs.get("timeout"))
+        try:
+            return post(*args, **kwargs)
+        finally:
+            finished.append(time.monotonic())
+
+    monkeypatch.setattr(server.nvidia_client.transport, "post", spy)
+    started = time.monotonic()
+    response = server.client.post("/api/ai/full-report", json={
+        "resume_content": "Python developer", "job_description": "Python engineer"
+    })
+    assert response.status_code == 502 and time.monotonic() - started < 1.5
+    assert timeouts and all(timeout is not None and timeout <= 0.3 for timeout in timeouts)
+    # The abandoned calls give up at the deadline instead of holding report workers for the 2s reply
+    while len(finished) < len(timeouts) and time.monotonic() - started < 1.5:
+        time.sleep(0.02)
+    assert len(finished) == len(timeouts) and max(finished) - started < 1.5
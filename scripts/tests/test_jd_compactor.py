@@ -0,0 +1,65 @@
+from jd_compactor import JobDescriptionCompactor, estimate_tokens, fingerprint, truncate_to_tokens
+
+
+def make_compactor(**kwargs):
+    return JobDescriptionCompactor(
+        drop_sections=["Benefits", "About Us"],
+        priority_sections={"Requirements": 3, "Responsibilities": 2},
+        phrases=["equal opportunity employer"],
+        **kwargs
+    )
+
+
+JD = """About Us
+We are a fast-growing startup changing the world.
+Responsibilities
+- Build REST APIs in Python.
+- Review code.
+Requirements:
+- 5+ years of Python and PostgreSQL.
+- Build REST APIs in Python.
+Benefits
+- Unlimited PTO
+We are an equal opportunity employer."""
+
+
+def test_drops_boilerplate_sections_phrases_and_repeats():
+    compacted = make_compactor().compact(JD)
+    assert "startup" not in compacted and "PTO" not in compacted
+    assert "equal opportunity" not in compacted
+    assert compacted.count("Build REST APIs in Python.") == 1
+    assert compacted.splitlines()[0] == "Responsibilities"
+
+
+def test_budget_keeps_highest_priority_section_first():
+    compacted = make_compactor().compact(JD, budget=estimate_tokens("Requirements:\n- 5+ years of Python and PostgreSQL.") + 3)
+    assert "PostgreSQL" in compacted
+    assert "Review code" not in compacted
+
+
+def test_single_line_larger_than_budget_is_hard_cut_not_emptied():
+    text = "Python Django AWS developer wanted building services " * 180
+    compacted = make_compactor().compact(text, task="skills")
+    assert compacted.startswith("Python Django AWS")
+    assert 0 < estimate_tokens(compacted) <= 400
+
+
+def test_truncate_to_tokens_cuts_an_oversized_word_by_characters():
+    assert truncate_to_tokens("alpha beta gamma", 2) == "alpha"
+    cut = truncate_to_tokens("x" * 100, 5)
+    assert cut and estimate_tokens(cut) <= 5
+
+
+def test_all_caps_line_needs_a_heading_word():
+    sections = make_compactor().sections("ABOUT THE ROLE\nShip features\nPYTHON, SQL, AWS\nQA\nSkills:\nGo")
+    assert [section.heading for section in sections] == ["ABOUT THE ROLE", "Skills:"]
+    assert sections[0].lines == ["Ship features", "PYTHON, SQL, AWS", "QA"]
+
+
+def test_learn_marks_lines_shared_across_documents():
+    compactor = make_compactor()
+    shared = "Our company values diversity and inclusion in everything we do"
+    docs = [f"{shared}\nRole {i} needs Python and Kubernetes experience" for i in range(3)]
+    assert compactor.learn(docs) == 1
+    assert fingerprint(shared) in compactor.fingerprints
+    assert "diversity" not in compactor.compact(docs[0])
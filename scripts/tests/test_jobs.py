@@ -0,0 +1,280 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import ai_jobs
+from ai_jobs import JobQueue, job_key, post_pinned
+from ai_transport import PooledTransport
+
+
+def make_queue(tmp_path, runner=None, **kwargs):
+    return JobQueue(runner or (lambda op, payload, tenant: {"op": op, "echo": payload}),
+                    path=str(tmp_path / "jobs.sqlite3"), **kwargs)
+
+
+def resolving_to(monkeypatch, *addresses):
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port)) for address in addresses]
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+
+def serve(respond):
+    """Start a local HTTP server whose POST handler is respond(handler); returns (base URL, shutdown)"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            respond(self)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    def shutdown():
+        httpd.shutdown()
+        httpd.server_close()
+    return f"http://127.0.0.1:{httpd.server_address[1]}", shutdown
+
+
+@pytest.fixture
+def receiver():
+    received = []
+
+    def respond(handler):
+        received.append(json.loads(handler.rfile.read(int(handler.headers["Content-Length"]))))
+        handler.send_response(204)
+        handler.end_headers()
+
+    base, shutdown = serve(respond)
+    yield f"{base}/hook", received
+    shutdown()
+
+
+@pytest.fixture
+def redirector(receiver):
+    """A webhook host that redirects every POST to the receiver on loopback"""
+    url, received = receiver
+
+    def respond(handler):
+        handler.send_response(307)
+        handler.send_header("Location", url)
+        handler.send_header("Content-Length", "0")
+        handler.end_headers()
+
+    base, shutdown = serve(respond)
+    yield f"{base}/hook", received
+    shutdown()
+
+
+def test_job_key_ignores_webhook_and_resume_formatting():
+    a = job_key("skills", {"resume_data": {"name": "A", "skills": ["x"]}, "webhook_url": "http://a"})
+    b = job_key("skills", {"resume_data": {"skills": ["x"], "name": "A"}})
+    assert a == b
+    assert a != job_key("enhance", {"resume_data": {"name": "A", "skills": ["x"]}})
+
+
+def test_identical_submissions_share_a_job(tmp_path):
+    queue = make_queue(tmp_path)
+    first, deduplicated = queue.submit("skills", {"job_description": "Python"})
+    assert not deduplicated
+    second, deduplicated = queue.submit("skills", {"job_description": "Python"})
+    assert deduplicated and second["id"] == first["id"]
+    assert queue.stats()["jobs"]["queued"] == 1
+
+
+def test_run_one_records_result_and_failure(tmp_path):
+    def runner(op, payload, tenant):
+        if payload.get("fail"):
+            raise RuntimeError("upstream down")
+        return {"tenant": tenant}
+
+    queue = make_queue(tmp_path, runner)
+    ok, _ = queue.submit("skills", {}, tenant="recruiter")
+    bad, _ = queue.submit("skills", {"fail": True})
+    assert queue.run_one() and queue.run_one()
+    assert not queue.run_one()
+    assert queue.get(ok["id"])["result"] == {"tenant": "recruiter"}
+    failed = queue.get(bad["id"])
+    assert failed["status"] == "failed" and failed["error"] == "upstream down"
+
+
+def test_resubmitting_a_failed_job_retries_it(tmp_path):
+    queue = make_queue(tmp_path, lambda op, payload, tenant: 1 / 0)
+    first, _ = queue.submit("skills", {})
+    queue.run_one()
+    second, deduplicated = queue.submit("skills", {})
+    assert not deduplicated and second["id"] != first["id"]
+
+
+@pytest.mark.parametrize("address", ["127.0.0.1", "10.0.0.5", "192.168.1.1", "169.254.169.254", "0.0.0.0", "::1"])
+def test_webhooks_to_non_public_addresses_are_rejected(tmp_path, monkeypatch, address):
+    resolving_to(monkeypatch, address)
+    with pytest.raises(ValueError, match="non-public"):
+        make_queue(tmp_path).submit("skills", {}, webhook_url="http://hooks.example.com/x")
+
+
+def test_webhook_host_with_any_private_address_is_rejected(tmp_path, monkeypatch):
+    resolving_to(monkeypatch, "93.184.216.34", "10.1.2.3")
+    with pytest.raises(ValueError):
+        make_queue(tmp_path).check_webhook("https://hooks.example.com/x")
+
+
+def test_public_webhook_host_is_accepted(tmp_path, monkeypatch):
+    resolving_to(monkeypatch, "93.184.216.34")
+    make_queue(tmp_path).check_webhook("https://hooks.example.com/x")
+
+
+def test_webhook_url_must_be_http(tmp_path):
+    queue = make_queue(tmp_path)
+    for url in ("ftp://example.com/x", "file:///etc/passwd", "not a url"):
+        with pytest.raises(ValueError, match="http"):
+            queue.check_webhook(url)
+
+
+def test_allowlist_limits_hosts(tmp_path):
+    queue = make_queue(tmp_path, webhook_hosts=["127.0.0.1"])
+    queue.check_webhook("http://127.0.0.1:9/x")
+    with pytest.raises(ValueError, match="not allowed"):
+        queue.check_webhook("http://example.com/x")
+
+
+def test_webhook_is_delivered_once_finished(tmp_path, receiver):
+    url, received = receiver
+    queue = make_queue(tmp_path, webhook_hosts=["127.0.0.1"], transport=PooledTransport())
+    job, _ = queue.submit("skills", {"job_description": "Go"}, webhook_url=url)
+    queue.run_one()
+    assert [hook["id"] for hook in received] == [job["id"]]
+    assert received[0]["status"] == "succeeded"
+    assert queue.stats()["webhooks_sent"] == 1
+
+
+def test_webhook_is_rechecked_at_delivery(tmp_path, monkeypatch, receiver):
+    url, received = receiver
+    resolving_to(monkeypatch, "93.184.216.34")
+    queue = make_queue(tmp_path, transport=PooledTransport())
+    queue.submit("skills", {}, webhook_url=url.replace("127.0.0.1", "hooks.example.com"))
+    # The host now resolves to the server itself
+    resolving_to(monkeypatch, "127.0.0.1")
+    queue.run_one()
+    assert received == []
+    assert queue.stats()["webhooks_failed"] == 1
+
+
+def test_redirects_are_not_followed(tmp_path, redirector):
+    url, received = redirector
+    queue = make_queue(tmp_path, webhook_hosts=["127.0.0.1"], transport=PooledTransport())
+    queue.submit("skills", {}, webhook_url=url)
+    queue.run_one()
+    assert received == []
+    assert queue.stats()["webhooks_failed"] == 1
+
+
+def test_webhook_is_sent_to_the_checked_address(tmp_path, monkeypatch):
+    resolving_to(monkeypatch, "93.184.216.34")
+    sent = []
+
+    def post_pinned(url, address, body):
+        sent.append((url, address))
+        return 307 if len(sent) > 1 else 204
+
+    monkeypatch.setattr(ai_jobs, "post_pinned", post_pinned)
+    queue = make_queue(tmp_path, transport=PooledTransport())
+    queue.submit("skills", {"n": 1}, webhook_url="https://hooks.example.com/a")
+    queue.submit("skills", {"n": 2}, webhook_url="https://hooks.example.com/b")
+    queue.run_one()
+    queue.run_one()
+    assert sent == [("https://hooks.example.com/a", "93.184.216.34"), ("https://hooks.example.com/b", "93.184.216.34")]
+    assert (queue.stats()["webhooks_sent"], queue.stats()["webhooks_failed"]) == (1, 1)
+
+
+def test_post_pinned_keeps_the_host_name_and_ignores_redirects(redirector):
+    hosts = []
+
+    def respond(handler):
+        hosts.append(handler.headers["Host"])
+        handler.rfile.read(int(handler.headers["Content-Length"]))
+        handler.send_response(204)
+        handler.end_headers()
+
+    base, shutdown = serve(respond)
+    try:
+        port = base.rsplit(":", 1)[1]
+        # The name does not resolve: only the pinned address is connected to
+        assert post_pinned(f"http://hooks.invalid:{port}/hook?x=1", "127.0.0.1", {"id": "j"}) == 204
+        assert hosts == [f"hooks.invalid:{port}"]
+    finally:
+        shutdown()
+    url, received = redirector
+    assert post_pinned(url, "127.0.0.1", {"id": "j"}) == 307
+    assert received == []
+
+
+def test_lease_is_renewed_while_a_long_job_runs(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def runner(op, payload, tenant):
+        started.set()
+        release.wait(5)
+        return {}
+
+    queue = make_queue(tmp_path, runner, lease=0.3)
+    job, _ = queue.submit("skills", {})
+    worker = threading.Thread(target=queue.run_one)
+    worker.start()
+    started.wait(5)
+    time.sleep(0.6)  # twice the lease
+    other = make_queue(tmp_path, runner, lease=0.3)
+    assert other.claim() is None
+    release.set()
+    worker.join(5)
+    finished = queue.get(job["id"])
+    assert finished["status"] == "succeeded" and finished["attempts"] == 1
+
+
+def test_worker_that_lost_its_claim_cannot_finish(tmp_path, receiver):
+    url, received = receiver
+    queue = make_queue(tmp_path, webhook_hosts=["127.0.0.1"], transport=PooledTransport(), lease=60)
+    job, _ = queue.submit("skills", {}, webhook_url=url)
+    stale = queue.claim()
+    # Its lease ran out (e.g. the worker stalled) and another worker took the job over
+    queue._connection().execute("UPDATE jobs SET lease_until = 0 WHERE id = ?", (job["id"],))
+    current = queue.claim()
+    assert current["attempts"] == stale["attempts"] + 1
+
+    assert not queue._finish(queue._connection(), job["id"], "failed", error="stale", attempt=stale["attempts"])
+    assert queue.get(job["id"])["status"] == "running"
+    assert queue._finish(queue._connection(), job["id"], "succeeded", {"ok": True}, attempt=current["attempts"])
+    assert queue.get(job["id"])["result"] == {"ok": True}
+    assert received == []
+
+
+def test_job_is_abandoned_after_max_attempts(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    job, _ = queue.submit("skills", {})
+    for _ in range(2):
+        assert queue.claim() is not None
+        queue._connection().execute("UPDATE jobs SET lease_until = 0 WHERE id = ?", (job["id"],))
+    assert queue.claim() is None
+    assert queue.get(job["id"])["status"] == "failed"
+
+
+def test_expired_jobs_are_pruned(tmp_path):
+    queue = make_queue(tmp_path, retention=0.0)
+    job, _ = queue.submit("skills", {})
+    queue.run_one()
+    time.sleep(0.01)
+    assert queue.get(job["id"]) is None
+    assert queue.prune() == 1
+
+
+def test_from_env_disabled_and_allowlist(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_JOBS_ENABLED", "false")
+    assert JobQueue.from_env(lambda *args: {}) is None
+    monkeypatch.setenv("AI_JOBS_ENABLED", "true")
+    monkeypatch.setenv("AI_JOBS_PATH", str(tmp_path / "env.sqlite3"))
+    monkeypatch.setenv("AI_JOBS_WEBHOOK_HOSTS", " Hooks.Example.com , ")
+    assert JobQueue.from_env(lambda *args: {}).webhook_hosts == ["hooks.example.com"]
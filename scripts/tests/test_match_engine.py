@@ -0,0 +1,70 @@
+import pytest
+
+from match_engine import MatchEngine, document_text, tokenize
+from skill_extractor import SkillExtractor
+
+JOBS = [
+    {"id": "py", "title": "Python Developer", "description": "Build APIs with Python and Django on PostgreSQL"},
+    {"id": "fe", "title": "Frontend Engineer", "description": "React and TypeScript single page apps"},
+    {"id": "ops", "title": "DevOps Engineer", "description": "Kubernetes, Docker and Terraform on AWS"},
+]
+
+
+@pytest.fixture
+def engine():
+    extractor = SkillExtractor({"tech": ["Python", "Django", "PostgreSQL", "React", "TypeScript", "Kubernetes", "Docker"]})
+    return MatchEngine(chunk_size=2, skill_extractor=extractor)
+
+
+def test_document_text_skips_identifier_fields():
+    text = document_text({"id": "x1", "email": "a@b.c", "title": "Engineer", "skills": ["Go"]})
+    assert "x1" not in text and "a@b.c" not in text
+    assert "Engineer" in text and "Go" in text
+    assert tokenize("The Python and C++ dev") == ["python", "c++", "dev"]
+
+
+def test_top_k_ranks_best_job_first_across_chunks(engine):
+    index = engine.index_jobs(JOBS)
+    ranked = engine.top_k(["Python and Django developer", "React TypeScript engineer"], index, k=2)
+    assert ranked[0][0][0] == 0
+    assert ranked[1][0][0] == 1
+    assert all(len(row) == 2 for row in ranked)
+    assert ranked[0][0][1] >= ranked[0][1][1]
+
+
+def test_top_k_matches_full_score_matrix(engine):
+    index = engine.index_jobs(JOBS)
+    resumes = ["Docker and Kubernetes", "Python"]
+    matrix = engine.score_matrix(resumes, index)
+    for row, ranked in zip(matrix, engine.top_k(resumes, index, k=3)):
+        assert [job for job, _ in ranked] == sorted(range(3), key=lambda job: -row[job])
+
+
+def test_top_k_rejects_non_positive_k_and_caps_large_k(engine):
+    index = engine.index_jobs(JOBS)
+    with pytest.raises(ValueError):
+        engine.top_k(["Python"], index, k=0)
+    assert len(engine.top_k(["Python"], index, k=50)[0]) == len(JOBS)
+
+
+def test_matching_skills_with_precomputed_columns(engine):
+    index = engine.index_jobs(JOBS)
+    resume = {"summary": "Python developer", "skills": ["Docker"]}
+    columns = engine.resume_skill_columns(resume, index)
+    assert engine.matching_skills(resume, index, 0, columns) == ["Python"]
+    assert engine.matching_skills(resume, index, 2, columns) == engine.matching_skills(resume, index, 2)
+
+
+def test_index_jobs_cached_reuses_index(engine):
+    assert engine.index_jobs_cached(JOBS) is engine.index_jobs_cached(list(JOBS))
+
+
+def test_match_scores_route_validates_top_k(server):
+    body = {"resumes": ["Python developer"], "jobs": JOBS}
+    for top_k in (0, -1, 4, "3", True):
+        response = server.client.post("/api/ai/match-scores", json={**body, "top_k": top_k})
+        assert response.status_code == 400, top_k
+    response = server.client.post("/api/ai/match-scores", json={**body, "top_k": 3})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert len(results[0]) == 3 and results[0][0]["job_id"] == "py"
@@ -0,0 +1,70 @@
+import threading
+
+from ai_metrics import MetricsRegistry, ServiceMetrics
+
+
+def run_in_thread(fn):
+    thread = threading.Thread(target=fn)
+    thread.start()
+    thread.join(5)
+    return thread
+
+
+def test_counters_sum_across_live_and_finished_threads():
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls", ("kind",))
+    counter.inc("a")
+    for _ in range(3):
+        run_in_thread(lambda: counter.inc("a", amount=2))
+    assert registry.snapshot()[("calls_total", ("a",))] == 7
+
+
+def test_thread_exit_while_snapshot_holds_the_lock_does_not_deadlock():
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls")
+    # A finished thread's shard is retired by a finalizer that may run while the lock is held
+    # (e.g. triggered by an allocation inside snapshot()); it must not wait for the lock
+    counted, release = threading.Event(), threading.Event()
+
+    def worker():
+        counter.inc()
+        counted.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert counted.wait(5)
+    with registry._lock:
+        release.set()
+        thread.join(2)
+        finished = not thread.is_alive()
+    thread.join()
+    assert finished
+    assert registry.snapshot()[("calls_total", ())] == 1
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("model",), buckets=(0.1, 1.0))
+    gauge = registry.gauge("in_flight", "In flight")
+    histogram.observe(0.05, "m")
+    histogram.observe(5.0, "m")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    registry.register_collector(lambda: [("cache_hits", "counter", "Hits", [({"tier": "memory"}, 3)])])
+    text = registry.render()
+    assert 'latency_seconds_bucket{model="m",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{model="m",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{model="m"} 2' in text
+    assert "in_flight 1" in text
+    assert 'cache_hits{tier="memory"} 3' in text
+
+
+def test_service_metrics_listeners():
+    metrics = ServiceMetrics()
+    metrics.on_retry("503")
+    metrics.on_rate_limited(1.0)
+    text = metrics.render()
+    assert 'hiresense_upstream_retries_total{reason="503"} 1' in text
+    assert "hiresense_upstream_rate_limited_total 1" in text
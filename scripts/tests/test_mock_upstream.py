@@ -0,0 +1,90 @@
+import json
+import random
+import time
+
+import pytest
+import requests
+
+from conftest import load_script
+from mock_upstream import LatencyDistribution, MockUpstream
+
+bench_load = load_script("bench-load.py", "bench_load")
+
+
+def test_latency_distribution_parse_and_sample():
+    rng = random.Random(0)
+    assert LatencyDistribution.parse("fixed:0.25").sample(rng) == 0.25
+    uniform = LatencyDistribution.parse("uniform:0.1,0.2")
+    assert all(0.1 <= uniform.sample(rng) <= 0.2 for _ in range(100))
+    assert LatencyDistribution.parse("normal:0,1").sample(rng) >= 0.0
+    assert str(LatencyDistribution.parse("lognormal:0.5,0.3")) == "lognormal:0.5,0.3"
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("pareto:1")
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("uniform:1")
+
+
+def test_reply_tokens_capped_by_max_tokens():
+    with MockUpstream(reply="one two three", reply_tokens=5) as mock:
+        response = requests.post(mock.url, json={"model": "m", "max_tokens": 4, "messages": []})
+        assert response.json()["choices"][0]["message"]["content"] == "one two three one"
+
+
+def test_scripted_failures_then_success(mock_upstream):
+    mock_upstream.fail_with(429, times=2, retry_after="3")
+    first = requests.post(mock_upstream.url, json={"model": "m"})
+    assert first.status_code == 429 and first.headers["Retry-After"] == "3"
+    assert requests.post(mock_upstream.url, json={"model": "m"}).status_code == 429
+    assert requests.post(mock_upstream.url, json={"model": "m"}).status_code == 200
+    assert mock_upstream.request_count == 3
+
+
+def test_stream_sends_one_event_per_word():
+    with MockUpstream(reply="alpha beta gamma") as mock:
+        body = requests.post(mock.url, json={"model": "m", "stream": True}).text
+    events = [line for line in body.splitlines() if line.startswith("data:")]
+    assert len(events) == 5 and events[-1] == "data: [DONE]"
+    assert json.loads(events[-2][len("data:"):])["choices"][0]["finish_reason"] == "stop"
+
+
+def test_reply_is_cut_at_max_tokens_with_finish_reason_length():
+    with MockUpstream(reply='[{"name": "Go"},\n {"name": "Rust"}]') as mock:
+        body = requests.post(mock.url, json={"model": "m", "max_tokens": 2, "messages": []}).json()
+    assert body["choices"][0]["message"]["content"] == '[{"name": "Go"},'
+    assert body["choices"][0]["finish_reason"] == "length"
+
+
+def test_error_rate_and_latency():
+    with MockUpstream(error_rate=1.0, error_statuses=(502,), latency="fixed:0.1", seed=1) as mock:
+        started = time.monotonic()
+        assert requests.post(mock.url, json={"model": "m"}).status_code == 502
+        assert time.monotonic() - started >= 0.1
+        assert mock.error_count == 1
+
+
+def test_summarize_and_compare():
+    summary = bench_load.summarize([0.1, 0.2, 0.3, 0.4])
+    assert summary["p50"] == 300.0 and summary["max"] == 400.0 and summary["mean"] == 250.0
+    assert bench_load.summarize([]) is None
+    report = {"endpoints": {}, "total": {"throughput_rps": 20.0, "latency_ms": {"p50": 50, "p95": 100, "p99": 200}}}
+    baseline = {"endpoints": {}, "total": {"throughput_rps": 10.0, "latency_ms": {"p50": 100, "p95": 100, "p99": 100}}}
+    assert bench_load.compare(report, baseline)["total"] == {
+        "throughput_rps_pct": 100.0, "p50_ms_pct": -50.0, "p95_ms_pct": 0.0, "p99_ms_pct": 100.0
+    }
+
+
+def test_load_generator_closed_loop_against_server(mock_upstream, monkeypatch, tmp_path):
+    # start_server() configures api-server through os.environ; restore it afterwards
+    monkeypatch.setenv("NVIDIA_API_KEY", "test-key")
+    for name in ("NVIDIA_INVOKE_URL", "AI_CACHE_ENABLED", "AI_CACHE_PATH", "AI_VECTOR_INDEX_PATH"):
+        monkeypatch.setenv(name, "")
+    monkeypatch.setenv("AI_JOBS_ENABLED", "false")
+    monkeypatch.setenv("AI_CHAT_SESSIONS_PATH", str(tmp_path / "sessions.sqlite3"))
+    base_url, server, _ = bench_load.start_server(mock_upstream.url, cache=False, workdir=str(tmp_path))
+    try:
+        generator = bench_load.LoadGenerator(base_url, ["chat", "chat_stream"], seed=0)
+        report = generator.report(generator.run_closed(concurrency=2, requests_count=6))
+    finally:
+        server.shutdown()
+    assert report["total"]["requests"] == 6 and report["total"]["errors"] == 0
+    assert "ttfb_ms" in report["endpoints"]["chat_stream"]
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from ai_resilience import CircuitBreaker, CircuitBreakers, CircuitOpenError, Hedger, is_upstream_failure
+from ai_scheduler import RateLimitScheduler
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(response=response)
+
+
+def test_is_upstream_failure():
+    assert is_upstream_failure(http_error(503))
+    assert is_upstream_failure(http_error(429))
+    assert not is_upstream_failure(http_error(400))
+    assert is_upstream_failure(requests.exceptions.ConnectionError())
+    assert not is_upstream_failure(ValueError())
+
+
+def test_breaker_opens_then_half_opens_for_one_trial():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == "half-open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.stats() == {"state": "closed", "failures": 0, "rejected": 2}
+
+
+def test_breakers_ignore_client_errors():
+    breakers = CircuitBreakers(failure_threshold=1)
+
+    def bad_request():
+        raise http_error(400)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        breakers.call("m", "url", bad_request)
+    assert breakers.available("m", "url")
+    with pytest.raises(requests.exceptions.HTTPError):
+        breakers.call("m", "url", lambda: (_ for _ in ()).throw(http_error(502)))
+    assert not breakers.available("m", "url")
+
+
+def primed_hedger(samples=0.02):
+    hedger = Hedger(min_samples=3, max_ratio=1.0)
+    for _ in range(3):
+        hedger.record("m", samples)
+    return hedger
+
+
+def test_slow_call_is_hedged_and_loser_recorded_as_censored_sample():
+    hedger = primed_hedger()
+    calls = []
+
+    def attempt(cancelled):
+        calls.append(1)
+        if len(calls) == 1:
+            cancelled.wait(2.0)  # the slow first attempt only stops when cancelled
+            return "slow"
+        return "fast"
+
+    assert hedger.call("m", attempt) == "fast"
+    assert hedger.stats()["hedge_wins"] == 1
+    samples = list(hedger._window("m").samples)
+    # Three primed samples, the winner, and the cancelled loser's elapsed time
+    assert len(samples) == 5
+    assert max(samples) >= 0.02
+
+
+def test_unhedgeable_calls_run_on_the_callers_thread():
+    hedger = Hedger(min_samples=100)
+    assert hedger.call("m", lambda cancelled: threading.current_thread()) is threading.current_thread()
+    assert hedger.stats()["inline"] == 1
+
+
+def test_busy_hedge_pool_never_queues_calls():
+    hedger = Hedger(min_samples=3, max_ratio=1.0, max_workers=1)
+    for _ in range(3):
+        hedger.record("m", 5.0)
+    release, entered = threading.Event(), threading.Event()
+
+    def blocking(cancelled):
+        entered.set()
+        release.wait(5)
+        return "first"
+
+    worker = threading.Thread(target=lambda: hedger.call("m", blocking))
+    worker.start()
+    entered.wait(5)
+    started = time.monotonic()
+    # The only hedge thread is taken: this call runs at once on its own thread instead of waiting for it
+    assert hedger.call("m", lambda cancelled: threading.current_thread()) is threading.current_thread()
+    assert time.monotonic() - started < 1.0
+    release.set()
+    worker.join(5)
+    assert hedger.stats()["inline"] == 1 and hedger.stats()["hedged"] == 0
+
+
+def test_hedge_returns_first_error_when_all_attempts_fail():
+    hedger = Hedger(min_samples=100)
+
+    def attempt(cancelled):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        hedger.call("m", attempt)
+
+
+def test_cancelled_hedge_copy_releases_its_grant(server, monkeypatch):
+    scheduler = RateLimitScheduler(requests_per_minute=60, tokens_per_minute=10000)
+    monkeypatch.setattr(server.nvidia_client, "scheduler", scheduler)
+    cancelled = threading.Event()
+    cancelled.set()
+    requests_level, tokens_level = scheduler.requests.level, scheduler.tokens.level
+    payload = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 500, "stream": False}
+    assert server.nvidia_client._post(payload, cancelled) is None
+    assert scheduler.requests.level == pytest.approx(requests_level, abs=0.1)
+    assert scheduler.tokens.level == pytest.approx(tokens_level, abs=1)
+    assert server.mock.request_count == 0
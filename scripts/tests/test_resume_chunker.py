@@ -0,0 +1,89 @@
+from jd_compactor import estimate_tokens
+from resume_chunker import (
+    ResumeChunk, chunk_analysis_messages, chunk_cache_key, reduce_analysis_messages, split_resume
+)
+
+
+def job(index):
+    # Entries as resume_codec writes them: "* " starts an entry
+    return (f"* Engineer {index} | Company {index} | 2015 - 2020\n"
+            f"- Built service {index} handling millions of requests with Python and PostgreSQL\n"
+            f"- Led a team of {index} engineers through two product launches")
+
+
+def long_resume(jobs=12):
+    return ("Jane Doe\njane@example.com\n\n"
+            "Summary\nBackend engineer with a decade of experience in distributed systems.\n\n"
+            "Experience\n" + "\n".join(job(index) for index in range(jobs)) + "\n\n"
+            "Education\nBSc Computer Science, Stanford University, 2012\n\n"
+            "Skills\nPython, Go, PostgreSQL, Kafka\n")
+
+
+def test_short_resume_is_one_chunk():
+    chunks = split_resume("Jane Doe\n\nSkills\nPython, Go\n", max_tokens=800)
+    assert len(chunks) == 1
+    assert chunks[0].sections == ["Header", "Skills"]
+    assert chunks[0].text == "Jane Doe\n\nSkills\nPython, Go"
+
+
+def test_sections_are_packed_in_order_within_budget():
+    chunks = split_resume(long_resume(jobs=2), max_tokens=60)
+    assert [section for chunk in chunks for section in chunk.sections] == [
+        "Header", "Summary", "Experience (part 1 of 2)", "Experience (part 2 of 2)", "Education", "Skills"
+    ]
+    for chunk in chunks:
+        # Chunks are about max_tokens: a split part may exceed it by its "(part i of n)" label
+        assert estimate_tokens(chunk.text) <= 60 + estimate_tokens(" (part 1 of 2)")
+
+
+def test_long_section_is_split_between_entries():
+    chunks = split_resume(long_resume(jobs=12), max_tokens=120)
+    parts = [chunk for chunk in chunks if chunk.sections[0].startswith("Experience")]
+    assert len(parts) > 1
+    assert parts[0].sections == [f"Experience (part 1 of {len(parts)})"]
+    for index in range(12):
+        # Every entry ends up whole in exactly one part
+        assert sum(job(index) in part.text for part in parts) == 1
+
+
+def test_dict_resumes_are_encoded_first():
+    resume = {
+        "personalInfo": {"name": "Jane Doe"},
+        "summary": "Backend engineer.",
+        "skills": ["Python", "Go"],
+    }
+    chunks = split_resume(resume)
+    assert len(chunks) == 1
+    assert "Jane Doe" in chunks[0].text and "Python" in chunks[0].text
+
+
+def test_content_hash_ignores_whitespace_and_keys_the_cache():
+    a = ResumeChunk(sections=["Skills"], text="Skills\nPython,  Go")
+    b = ResumeChunk(sections=["Skills (part 1 of 2)"], text="Skills\n Python, Go ")
+    c = ResumeChunk(sections=["Skills"], text="Skills\nPython, Rust")
+    assert a.content_hash == b.content_hash != c.content_hash
+    assert chunk_cache_key(a) == chunk_cache_key(b) != chunk_cache_key(c)
+
+
+def test_map_and_reduce_prompts_name_the_sections():
+    chunks = [ResumeChunk(["Header", "Summary"], "Jane"), ResumeChunk(["Skills"], "Python")]
+    assert "Resume part (Header, Summary)" in chunk_analysis_messages(chunks[0])[1]["content"]
+    merged = reduce_analysis_messages(["- strong\n", "- broad"], chunks)[1]["content"]
+    assert "[Header, Summary]\n- strong\n\n[Skills]\n- broad" in merged
+
+
+def test_long_resume_is_analyzed_map_reduce(server):
+    resume = long_resume(jobs=40)
+    chunks = split_resume(resume)
+    assert len(chunks) > 1
+    response = server.client.post("/api/ai/analyze-resume", json={"resume_content": resume, "chunked": True})
+    assert response.get_json()["success"]
+    # One call per chunk, then one merging their findings
+    assert server.mock.request_count == len(chunks) + 1
+    assert "These are findings on each part" in server.mock.payloads[-1]["messages"][1]["content"]
+
+
+def test_chunking_can_be_turned_off(server):
+    response = server.client.post("/api/ai/analyze-resume", json={"resume_content": long_resume(40), "chunked": False})
+    assert response.get_json()["success"]
+    assert server.mock.request_count == 1
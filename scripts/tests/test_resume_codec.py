@@ -0,0 +1,42 @@
+from resume_codec import encode_resume, resume_hash
+
+RESUME = {
+    "personalInfo": {"name": "Ada Lovelace", "email": "ada@example.com", "phone": ""},
+    "summary": "Engineer   who\nwrites compilers.\n\nLoves   math.",
+    "experience": [{
+        "title": "Engineer", "company": "Analytical", "startDate": "2020", "endDate": "2023",
+        "description": "Built the engine.\n\n  Wrote the first program.  ",
+        "achievements": ["Shipped v1", ""]
+    }],
+    "skills": ["Python", "python", " SQL "],
+    "certifications": ["AWS"]
+}
+
+
+def test_sections_in_fixed_order_with_paragraph_breaks_kept():
+    assert encode_resume(RESUME).splitlines() == [
+        "# Ada Lovelace | ada@example.com",
+        "SUMMARY",
+        "Engineer who writes compilers.",
+        "Loves math.",
+        "EXPERIENCE",
+        "* Engineer | Analytical | 2020 - 2023",
+        "Built the engine.",
+        "Wrote the first program.",
+        "- Shipped v1",
+        "SKILLS",
+        "Python, SQL",
+        'CERTIFICATIONS: ["AWS"]',
+    ]
+
+
+def test_hash_ignores_key_order_and_whitespace():
+    reordered = dict(reversed(list(RESUME.items())))
+    reordered["skills"] = ["Python", "SQL"]
+    assert resume_hash(reordered) == resume_hash(RESUME)
+
+
+def test_plain_text_and_other_values():
+    assert encode_resume("  Ada \n\n Lovelace  ") == "Ada\nLovelace"
+    assert encode_resume(["b", {"y": 1, "x": 2}]) == '["b",{"x":2,"y":1}]'
+    assert encode_resume(None) == "null"
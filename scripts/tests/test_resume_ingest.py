@@ -0,0 +1,199 @@
+import io
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+import resume_ingest
+from resume_ingest import (
+    docx_text, extract_text, ingest, ingest_to_jsonl, iter_sources, parse_contact, parse_education,
+    parse_experience, parse_resume_text, parse_skill_list, process_file, section_heading
+)
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 415 555 0100 | San Francisco, CA
+linkedin.com/in/janedoe
+
+Summary
+Backend engineer building data platforms.
+
+Work Experience
+Senior Engineer at Acme Corp, Berlin
+Jan 2020 - Present
+- Built Kafka pipelines in Python
+- Cut cloud costs by 30%
+
+Engineer | Initech
+2016 - 2019
+- Maintained Django services
+
+Education
+BSc Computer Science, Stanford University
+2012 - 2016
+GPA: 3.8/4.0
+
+Skills
+Languages: Python, Go
+Tools: Docker; Kubernetes
+
+Projects
+resume-parser - Open source resume parser github.com/jane/resume-parser
+Tech: Python, spaCy
+"""
+
+
+def docx_bytes(paragraphs):
+    ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    body = "".join(
+        f"<w:p>{'<w:pPr><w:numPr/></w:pPr>' if bullet else ''}<w:r><w:t>{text}</w:t></w:r></w:p>"
+        for text, bullet in paragraphs
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", f'<w:document xmlns:w="{ns}"><w:body>{body}</w:body></w:document>')
+    return buffer.getvalue()
+
+
+def test_parse_resume_text_fills_every_section():
+    resume = parse_resume_text(RESUME)
+    info = resume["personalInfo"]
+    assert info["name"] == "Jane Doe"
+    assert info["email"] == "jane.doe@example.com"
+    assert info["location"] == "San Francisco, CA"
+    assert "linkedin.com/in/janedoe" in info["linkedin"]
+    assert resume["summary"] == "Backend engineer building data platforms."
+
+    first, second = resume["experience"]
+    assert (first["title"], first["company"], first["location"]) == ("Senior Engineer", "Acme Corp", "Berlin")
+    assert (first["startDate"], first["endDate"]) == ("Jan 2020", "Present")
+    assert first["achievements"] == ["Built Kafka pipelines in Python", "Cut cloud costs by 30%"]
+    assert (second["title"], second["company"]) == ("Engineer", "Initech")
+
+    education = resume["education"][0]
+    assert "Stanford University" in education["institution"]
+    assert education["graduationDate"] == "2016" and education["gpa"] == "3.8/4.0"
+
+    assert resume["skills"][:4] == ["Python", "Go", "Docker", "Kubernetes"]
+    # Found by the taxonomy outside the skills section
+    assert "Django" in resume["skills"]
+    project = resume["projects"][0]
+    assert project["name"] == "resume-parser"
+    assert project["technologies"] == ["Python", "spaCy"]
+    assert "github.com/jane/resume-parser" in project["link"]
+
+
+def test_section_headings():
+    assert section_heading("WORK EXPERIENCE:") == "experience"
+    assert section_heading("Skills & Tools") == "skills"
+    assert section_heading("Built a skills matrix for the whole engineering org") is None
+    assert section_heading("") is None
+
+
+def test_parse_contact_ignores_email_domains_as_websites():
+    info = parse_contact(["Max Mustermann", "max@mustermann.dev", "mustermann.io"])
+    assert info["website"] == "mustermann.io"
+    assert info["phone"] == ""
+
+
+def test_experience_without_dates_is_one_entry_per_block():
+    entries = parse_experience(["Freelance Developer", "", "Teaching Assistant"])
+    assert [entry["title"] for entry in entries] == ["Freelance Developer", "Teaching Assistant"]
+
+
+def test_education_blocks_and_skill_lists():
+    entries = parse_education(["Master of Science - MIT Institute", "2021", "", "High School Diploma"])
+    assert len(entries) == 2 and entries[0]["graduationDate"] == "2021"
+    assert parse_skill_list(["• SQL | Spark  Airflow", "x" * 41]) == ["SQL", "Spark", "Airflow"]
+
+
+def test_docx_text_marks_numbered_paragraphs():
+    data = docx_bytes([("Jane Doe", False), ("Built APIs", True)])
+    assert docx_text(data) == "Jane Doe\n- Built APIs"
+    assert extract_text("cv.DOCX", data) == "Jane Doe\n- Built APIs"
+
+
+def test_text_decoding_falls_back():
+    assert extract_text("cv.txt", "Zoë".encode("utf-16")) == "Zoë"
+    assert extract_text("cv.txt", "Zoë".encode("latin-1")) == "Zoë"
+    assert extract_text("cv.txt", "﻿Zoë".encode("utf-8")) == "Zoë"
+
+
+def test_process_file_records(tmp_path):
+    path = tmp_path / "cv.txt"
+    path.write_text(RESUME, encoding="utf-8")
+    record = process_file(str(path), path=str(path))
+    assert record["ok"] and record["resume"]["personalInfo"]["name"] == "Jane Doe"
+    assert len(record["sha256"]) == 64 and record["resume_hash"]
+
+
+@pytest.mark.parametrize("name, data, error", [
+    ("empty.txt", b"   \n", "No text"),
+    ("broken.docx", b"not a zip", "BadZipFile"),
+])
+def test_process_file_never_raises(name, data, error):
+    record = process_file(name, data)
+    assert not record["ok"] and error in record["error"]
+
+
+def test_process_file_rejects_oversized_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_ingest, "MAX_FILE_BYTES", 10)
+    path = tmp_path / "cv.txt"
+    path.write_text(RESUME)
+    assert "larger than 10 bytes" in process_file(str(path), path=str(path))["error"]
+
+
+def write_tree(tmp_path):
+    folder = tmp_path / "resumes"
+    (folder / "nested").mkdir(parents=True)
+    (folder / "a.txt").write_text(RESUME)
+    (folder / "nested" / "b.md").write_text(RESUME.replace("Jane Doe", "John Roe"))
+    (folder / "~$lock.docx").write_bytes(b"")
+    (folder / "notes.csv").write_text("x")
+    with zipfile.ZipFile(folder / "batch.zip", "w") as archive:
+        archive.writestr("c.txt", RESUME)
+        archive.writestr("image.png", b"")
+    with tarfile.open(tmp_path / "more.tar.gz", "w:gz") as archive:
+        data = RESUME.encode("utf-8")
+        info = tarfile.TarInfo("d.txt")
+        info.size = len(data)
+        archive.addfile(info, io.BytesIO(data))
+    return [str(folder), str(tmp_path / "more.tar.gz")]
+
+
+def test_iter_sources_walks_directories_and_archives(tmp_path):
+    sources = [source for source, _, _ in iter_sources(write_tree(tmp_path))]
+    names = [source.replace(str(tmp_path), "") for source in sources]
+    assert names == ["/resumes/a.txt", "/resumes/batch.zip!c.txt", "/resumes/nested/b.md", "/more.tar.gz!d.txt"]
+
+
+def test_ingest_in_a_process_pool_skips_duplicates(tmp_path):
+    paths = write_tree(tmp_path)
+    records = list(ingest(paths, workers=2, max_in_flight=2))
+    assert len(records) == 4 and all(record["ok"] for record in records)
+    unique = list(ingest(paths, workers=2, skip_duplicates=True))
+    assert sorted(record["resume"]["personalInfo"]["name"] for record in unique) == ["Jane Doe", "John Roe"]
+
+
+def test_ingest_to_jsonl_counts_failures(tmp_path):
+    (tmp_path / "good.txt").write_text(RESUME)
+    (tmp_path / "bad.docx").write_bytes(b"not a zip")
+    output = tmp_path / "out.jsonl"
+    stats = ingest_to_jsonl([str(tmp_path / "good.txt"), str(tmp_path / "bad.docx")], str(output), workers=1)
+    assert (stats["files"], stats["ok"], stats["failed"]) == (2, 1, 1)
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(record["ok"] for record in records) == [False, True]
+
+
+def test_empty_and_oversized_archive_members_are_told_apart(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_ingest, "MAX_FILE_BYTES", 100)
+    with zipfile.ZipFile(tmp_path / "batch.zip", "w") as archive:
+        archive.writestr("empty.txt", b"")
+        archive.writestr("big.txt", RESUME)
+    with tarfile.open(tmp_path / "more.tar", "w") as archive:
+        archive.addfile(tarfile.TarInfo("empty.md"), io.BytesIO(b""))
+    records = {record["source"].split("!")[1]: record["error"]
+               for record in ingest([str(tmp_path / "batch.zip"), str(tmp_path / "more.tar")], workers=1)}
+    assert records["empty.txt"].startswith("ValueError: No text")
+    assert records["empty.md"].startswith("ValueError: No text")
+    assert records["big.txt"] == "ValueError: File larger than 100 bytes"
@@ -0,0 +1,88 @@
+import pytest
+
+from ai_router import ModelRouter, ModelStats, note_model, recording_models
+
+CONFIG = {
+    "models": {
+        "small": {"expected_latency_ms": 300, "expected_tokens_per_second": 80},
+        "large": {"expected_latency_ms": 1500, "expected_tokens_per_second": 30},
+    },
+    "tasks": {
+        "chat": {"strategy": "fastest", "candidates": ["small", "large"]},
+        "enhance": {
+            "strategy": "throughput",
+            "candidates": ["small", "large"],
+            "rules": [{"max_input_tokens": 100, "strategy": "first", "candidates": ["large"]}],
+        },
+    },
+}
+
+
+def make_router(**kwargs):
+    kwargs.setdefault("explore", 0.0)
+    kwargs.setdefault("min_samples", 2)
+    return ModelRouter(CONFIG, **kwargs)
+
+
+def test_priors_decide_until_live_stats_exist():
+    router = make_router()
+    assert router.choose("chat") == "small"
+    for _ in range(2):
+        router.record("small", 3.0, 10)
+        router.record("large", 0.5, 10)
+    assert router.choose("chat") == "large"
+
+
+def test_rules_switch_strategy_and_candidates_by_length():
+    router = make_router()
+    assert router.choose("enhance", input_tokens=50) == "large"
+    assert router.choose("enhance", input_tokens=500) == "small"
+    assert router.stats()["routed"]["enhance"] == {"large": 1, "small": 1}
+
+
+def test_unhealthy_models_are_skipped():
+    router = make_router(available=lambda model: model != "small")
+    assert router.choose("chat") == "large"
+    router = make_router()
+    for _ in range(3):
+        router.record("small", 0.1, error=True)
+    assert router.choose("chat") == "large"
+
+
+def test_exploration_picks_another_candidate():
+    router = make_router(explore=1.0)
+    assert router.choose("chat") == "large"
+
+
+def test_config_errors():
+    with pytest.raises(ValueError):
+        ModelRouter({"tasks": {"chat": {"strategy": "cheapest", "candidates": ["small"]}}})
+    with pytest.raises(ValueError):
+        make_router().choose("unknown")
+
+
+def test_model_stats_window_drops_old_calls():
+    stats = ModelStats(size=10, max_age=0.0)
+    stats.record(1.0, 10, False)
+    assert stats.summary()["samples"] == 0
+    stats = ModelStats(size=2)
+    for seconds in (1.0, 2.0, 4.0):
+        stats.record(seconds, 40, False)
+    summary = stats.summary()
+    assert summary["samples"] == 2 and summary["p50_latency"] == 4.0
+    assert summary["tokens_per_second"] == 20.0
+
+
+def test_recording_models_collects_unique_models():
+    note_model("ignored")
+    with recording_models() as models:
+        note_model("a")
+        note_model("a")
+        note_model("b")
+    assert models == ["a", "b"]
+
+
+def test_bundled_routing_config_loads():
+    router = ModelRouter.from_file()
+    for task in ("skills", "chat", "analyze", "enhance", "cover_letter"):
+        assert router.choose(task, 100, 100)
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from ai_scheduler import AdmissionTimeout, RateLimitScheduler, current_schedule, scheduling
+
+
+def drained(requests_per_minute=60, **kwargs):
+    """A scheduler whose request bucket is empty (one request per second at the default rate)"""
+    scheduler = RateLimitScheduler(requests_per_minute=requests_per_minute, **kwargs)
+    scheduler.requests.level = 0.0
+    return scheduler
+
+
+def test_scheduling_context_sets_priority_and_tenant():
+    with scheduling("batch", "recruiter"):
+        assert current_schedule() == ("batch", "recruiter")
+    assert current_schedule() == ("interactive", "default")
+    with pytest.raises(ValueError):
+        with scheduling("urgent"):
+            pass
+
+
+def test_interactive_waiter_overtakes_batch():
+    scheduler = drained(requests_per_minute=600, batch_reserve=0.0)
+    order = []
+
+    def call(priority):
+        scheduler.acquire(priority=priority)
+        order.append(priority)
+
+    batch = threading.Thread(target=call, args=("batch",))
+    batch.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=call, args=("interactive",))
+    interactive.start()
+    batch.join(5)
+    interactive.join(5)
+    assert order == ["interactive", "batch"]
+
+
+def test_tenants_are_served_round_robin():
+    scheduler = drained(requests_per_minute=600)
+    order = []
+    lock = threading.Lock()
+
+    def call(tenant):
+        scheduler.acquire(tenant=tenant)
+        with lock:
+            order.append(tenant)
+
+    threads = [threading.Thread(target=call, args=(tenant,)) for tenant in ["a", "a", "a", "b"]]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join(5)
+    assert order.index("b") <= 1
+
+
+def test_interactive_calls_time_out_with_retry_after():
+    scheduler = drained(max_wait=0.05)
+    with pytest.raises(AdmissionTimeout) as info:
+        scheduler.acquire()
+    assert info.value.retry_after > 0
+    assert isinstance(info.value, TimeoutError)
+    assert scheduler.stats()["timeouts"] == 1
+    assert scheduler.stats()["waiting"] == {"interactive": 0, "batch": 0}
+
+
+def test_batch_calls_ignore_max_wait():
+    scheduler = drained(requests_per_minute=600, batch_reserve=0.0, max_wait=0.01)
+    grant = scheduler.acquire(priority="batch")
+    assert grant.waited > 0.01
+
+
+def test_settle_returns_unused_tokens():
+    scheduler = RateLimitScheduler(requests_per_minute=60, tokens_per_minute=1000)
+    grant = scheduler.acquire(tokens=600)
+    level = scheduler.tokens.level
+    grant.settle(100)
+    assert scheduler.tokens.level == pytest.approx(level + 500, abs=1)
+
+
+def test_rate_limited_backs_off_and_recovers():
+    scheduler = RateLimitScheduler(requests_per_minute=100, recovery=0.5)
+    scheduler.on_rate_limited(retry_after=0)
+    assert scheduler.stats()["requests_per_minute"] == 50
+    scheduler.on_success()
+    assert scheduler.stats()["requests_per_minute"] == 100
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv("AI_RATE_RPM", raising=False)
+    assert RateLimitScheduler.from_env() is None
+    monkeypatch.setenv("AI_RATE_RPM", "120")
+    monkeypatch.setenv("AI_RATE_MAX_WAIT", "0")
+    assert RateLimitScheduler.from_env().max_wait is None
+
+
+def test_server_answers_429_when_not_admitted_in_time(server, monkeypatch):
+    monkeypatch.setattr(server.nvidia_client, "scheduler", drained(max_wait=0.05))
+    response = server.client.post("/api/ai/chat", json={"messages": [{"role": "user", "content": "hi"}]})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert server.mock.request_count == 0
+
+
+def test_stream_grant_is_settled_when_the_stream_closes(server, monkeypatch):
+    scheduler = RateLimitScheduler(requests_per_minute=600, tokens_per_minute=100000)
+    monkeypatch.setattr(server.nvidia_client, "scheduler", scheduler)
+    before = scheduler.tokens.level
+    response = server.client.post(
+        "/api/ai/chat/stream", json={"messages": [{"role": "user", "content": "hi"}], "max_tokens": 5000}
+    )
+    assert b"[DONE]" in response.get_data()
+    response.close()
+    # The unused part of the max_tokens estimate went back to the bucket
+    assert before - scheduler.tokens.level < 100
+
+
+@pytest.mark.parametrize("header, tenant", [
+    ("Recruiter", "recruiter"), (" candidate ", "candidate"), ("admin-7", "default"), ("", "default"), (None, "default"),
+])
+def test_only_known_roles_get_their_own_share(server, header, tenant):
+    headers = {"X-User-Role": header} if header is not None else {}
+    with server.app.test_request_context("/api/ai/chat", headers=headers):
+        assert server.request_tenant() == tenant
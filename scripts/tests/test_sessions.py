@@ -0,0 +1,177 @@
+import threading
+import time
+
+import pytest
+
+from ai_sessions import DEFAULT_SYSTEM_PROMPT, ChatSessionStore, summary_messages
+
+
+class Summarizer:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, summary, messages, tenant):
+        self.calls.append((summary, [message["content"] for message in messages], tenant))
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return f"{summary}+{len(messages)}".lstrip("+")
+
+
+def make_store(tmp_path, summarize=None, **kwargs):
+    return ChatSessionStore(summarize or Summarizer(), path=str(tmp_path / "sessions.sqlite3"), **kwargs)
+
+
+def turn(number):
+    return [{"role": "user", "content": f"q{number}"}, {"role": "assistant", "content": f"a{number}"}]
+
+
+def wait_idle(store):
+    deadline = time.monotonic() + 5
+    while store.stats()["compacting"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_create_get_append_roundtrip(tmp_path):
+    store = make_store(tmp_path)
+    session = store.create(tenant="candidate", messages=turn(0))
+    store.append(session["id"], turn(1))
+    stored = store.get(session["id"])
+    assert stored["system"] == DEFAULT_SYSTEM_PROMPT and stored["tenant"] == "candidate"
+    assert [message["content"] for message in stored["messages"]] == ["q0", "a0", "q1", "a1"]
+    assert store.get("unknown") is None
+
+
+def test_draft_is_not_stored(tmp_path):
+    store = make_store(tmp_path)
+    draft = store.draft(system="Be brief")
+    assert "id" not in draft
+    assert store.prompt(draft, "hi") == [{"role": "system", "content": "Be brief"}, {"role": "user", "content": "hi"}]
+    assert store.stats()["sessions"] == 0
+
+
+def test_prompt_sends_summary_and_last_keep_messages_only(tmp_path):
+    store = make_store(tmp_path, keep_messages=4)
+    session = {"system": "sys", "summary": "earlier", "messages": turn(0) + turn(1) + turn(2)}
+    prompt = store.prompt(session, "next")
+    assert prompt[1] == {"role": "system", "content": "Summary of the conversation so far:\nearlier"}
+    assert [message["content"] for message in prompt[2:]] == ["q1", "a1", "q2", "a2", "next"]
+
+
+def test_old_messages_are_compacted_in_the_background(tmp_path):
+    summarize = Summarizer()
+    store = make_store(tmp_path, summarize, keep_messages=4, compact_batch=2)
+    session = store.create(tenant="recruiter")
+    for number in range(3):
+        store.append(session["id"], turn(number))
+    wait_idle(store)
+    assert summarize.calls == []
+    store.append(session["id"], turn(3))
+    wait_idle(store)
+
+    assert summarize.calls == [("", ["q0", "a0", "q1", "a1"], "recruiter")]
+    stored = store.get(session["id"])
+    assert stored["summary"] == "4" and stored["summarized"] == 4
+    assert [message["content"] for message in stored["messages"]] == ["q2", "a2", "q3", "a3"]
+    assert store.stats()["compactions"] == 1
+
+
+def test_compaction_yields_to_a_concurrent_one(tmp_path):
+    store = make_store(tmp_path, keep_messages=2)
+    session = store.create(messages=turn(0) + turn(1))
+    started, release = threading.Event(), threading.Event()
+
+    def slow(summary, messages, tenant):
+        started.set()
+        release.wait(5)
+        return "stale"
+
+    store.summarize = slow
+    results = []
+    worker = threading.Thread(target=lambda: results.append(store.compact(session["id"])))
+    worker.start()
+    started.wait(5)
+    store.summarize = Summarizer()
+    assert store.compact(session["id"])
+    release.set()
+    worker.join(5)
+    assert results == [False]
+    assert store.get(session["id"])["summary"] == "2"
+
+
+def test_failing_summaries_are_counted_and_history_is_capped(tmp_path):
+    store = make_store(tmp_path, Summarizer(fail=True), keep_messages=2, compact_batch=2, max_messages=6)
+    session = store.create()
+    for number in range(5):
+        store.append(session["id"], turn(number))
+        wait_idle(store)
+    stats = store.stats()
+    assert stats["compaction_errors"] >= 1
+    assert stats["dropped_messages"] == 4
+    assert [message["content"] for message in store.get(session["id"])["messages"]][0] == "q2"
+
+
+def test_expired_sessions_are_pruned(tmp_path):
+    store = make_store(tmp_path, ttl=0.05)
+    session = store.create(messages=turn(0))
+    assert store.get(session["id"]) is not None
+    time.sleep(0.1)
+    assert store.get(session["id"]) is None
+    assert store.prune() == 1
+    assert store.stats()["stored_messages"] == 0
+
+
+def test_delete(tmp_path):
+    store = make_store(tmp_path)
+    session = store.create(messages=turn(0))
+    assert store.delete(session["id"])
+    assert not store.delete(session["id"])
+    store.append(session["id"], turn(1))
+    assert store.stats()["stored_messages"] == 0
+
+
+def test_summary_prompt_includes_transcript():
+    prompt = summary_messages("", turn(0))[1]["content"]
+    assert "(none yet)" in prompt and "user: q0\nassistant: a0" in prompt
+
+
+def test_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_CHAT_SESSIONS_PATH", str(tmp_path / "env.sqlite3"))
+    monkeypatch.setenv("AI_CHAT_KEEP_MESSAGES", "6")
+    assert ChatSessionStore.from_env(Summarizer()).keep_messages == 6
+    monkeypatch.setenv("AI_CHAT_SESSIONS_ENABLED", "false")
+    assert ChatSessionStore.from_env(Summarizer()) is None
+
+
+def test_session_chat_keeps_the_conversation(server):
+    first = server.client.post("/api/ai/chat", json={"message": "How do I explain a gap?"}).get_json()
+    assert first["success"] and first["session_id"]
+    second = server.client.post("/api/ai/chat", json={"message": "And in a cover letter?",
+                                                      "session_id": first["session_id"]}).get_json()
+    assert second["session_id"] == first["session_id"]
+    sent = [message["content"] for message in server.mock.payloads[-1]["messages"][1:]]
+    assert sent == ["How do I explain a gap?", "mock reply", "And in a cover letter?"]
+
+    stored = server.client.get(f"/api/ai/chat/sessions/{first['session_id']}").get_json()
+    assert len(stored["session"]["messages"]) == 4
+    assert server.client.delete(f"/api/ai/chat/sessions/{first['session_id']}").get_json()["success"]
+    assert server.client.post("/api/ai/chat", json={"message": "hi", "session_id": first["session_id"]}).status_code == 404
+
+
+def test_failed_first_turn_leaves_no_session(server):
+    server.mock.fail_with(500)
+    response = server.client.post("/api/ai/chat", json={"message": "hello"})
+    assert response.status_code == 500 and "session_id" not in response.get_json()
+    assert server.chat_sessions.stats()["sessions"] == 0
+
+
+@pytest.mark.parametrize("body", [{"message": ""}, {"message": 5}, {"message": "x" * 8001}])
+def test_invalid_messages_are_rejected(server, body):
+    assert server.client.post("/api/ai/chat", json=body).status_code == 400
+
+
+def test_disabled_sessions_answer_503(server, monkeypatch):
+    monkeypatch.setattr(server, "chat_sessions", None)
+    assert server.client.post("/api/ai/chat", json={"message": "hello"}).status_code == 503
+    stateless = server.client.post("/api/ai/chat", json={"messages": [{"role": "user", "content": "hello"}]})
+    assert stateless.get_json()["content"] == "mock reply"
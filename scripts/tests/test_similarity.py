@@ -0,0 +1,169 @@
+import random
+
+import pytest
+
+import ai_similarity
+from ai_cache import TieredCache
+from ai_similarity import (
+    FINGERPRINT_BITS, SimHashIndex, SimilarityCache, hamming, recording_approximate_hits, shingles, simhash, tokenize
+)
+
+RESUME = (
+    "Senior backend engineer with eight years of experience building distributed data platforms in Python and Go. "
+    "Led the migration of a monolith to event driven services on Kubernetes, cut infrastructure costs by thirty "
+    "percent and mentored a team of six engineers. Comfortable with PostgreSQL, Kafka, Terraform and AWS. "
+    "At Acme Corp designed the ingestion pipeline that processes four billion events a day with exactly once "
+    "delivery, introduced contract testing between services and reduced the incident rate by half over two years. "
+    "Before that worked at Initech on payment reconciliation, wrote the ledger service in Go, automated the "
+    "quarterly audit exports and on-boarded three new teams onto the shared observability stack. Holds a BSc in "
+    "Computer Science from Stanford University, speaks English and German, and regularly gives talks about "
+    "stream processing, schema evolution and operating stateful workloads on managed cloud infrastructure."
+)
+TYPO_FIXED = RESUME.replace("eight years", "eigth years").replace("Terraform and AWS", "Terraform, AWS")
+OTHER = (
+    "Registered nurse with a decade of intensive care experience, trained in patient triage, ventilator management "
+    "and family communication, looking for a charge nurse role in a teaching hospital with a strong research program "
+    "and flexible night shift rotation across several specialist wards."
+)
+
+
+def test_tokenize_keeps_language_suffixes_and_drops_layout():
+    assert tokenize("• C++, C# and Node.js!\n") == ["c++", "c#", "and", "node", "js"]
+    assert shingles(["a", "b"]) == {"a b"}
+    assert shingles(["a", "b", "c", "d"]) == {"a b c", "b c d"}
+    assert shingles([]) == set()
+
+
+def test_simhash_is_stable_and_local():
+    assert simhash(tokenize(RESUME)) == simhash(tokenize(RESUME.upper()))
+    near = hamming(simhash(tokenize(RESUME)), simhash(tokenize(TYPO_FIXED)))
+    far = hamming(simhash(tokenize(RESUME)), simhash(tokenize(OTHER)))
+    assert near <= 3 < 16 < far
+    assert simhash([]) == 0
+
+
+def test_pure_python_fingerprints_match_numpy(monkeypatch):
+    if ai_similarity.np is None:
+        pytest.skip("numpy not installed")
+    expected = simhash(tokenize(RESUME))
+    monkeypatch.setattr(ai_similarity, "np", None)
+    assert simhash(tokenize(RESUME)) == expected
+
+
+def test_index_finds_every_fingerprint_within_max_distance():
+    rng = random.Random(7)
+    index = SimHashIndex(max_distance=3)
+    stored = [rng.getrandbits(FINGERPRINT_BITS) for _ in range(200)]
+    for number, fingerprint in enumerate(stored):
+        index.add(fingerprint, f"d{number}")
+    for number, fingerprint in enumerate(stored):
+        flipped = fingerprint
+        for bit in rng.sample(range(FINGERPRINT_BITS), 3):
+            flipped ^= 1 << bit
+        # Pigeonhole: three flipped bits leave at least one of the four bands intact
+        assert index.nearest(flipped) == (3, f"d{number}")
+
+
+def test_index_prefers_same_digest_then_closest_then_newest():
+    index = SimHashIndex(max_distance=3)
+    index.add(0b111, "far")
+    index.add(0b001, "close-old")
+    index.add(0b010, "close-new")
+    assert index.nearest(0b000) == (1, "close-new")
+    assert index.nearest(0b000, digest="far") == (0, "far")
+    assert index.nearest(0b1111 << 40) is None
+
+
+def test_index_evicts_oldest_entries():
+    index = SimHashIndex(max_distance=1, max_entries=2)
+    fingerprints = [0, (1 << 64) - 1, 0x5555555555555555]
+    for number, fingerprint in enumerate(fingerprints):
+        index.add(fingerprint, f"d{number}")
+    assert len(index) == 2
+    assert index.nearest(fingerprints[0]) is None
+    assert index.nearest(fingerprints[2]) == (0, "d2")
+
+
+def make_cache(**kwargs):
+    return SimilarityCache(TieredCache(), **kwargs)
+
+
+def test_exact_and_approximate_hits_are_counted_and_recorded():
+    similar = make_cache()
+    similar.set("analyze", RESUME, "analysis")
+    with recording_approximate_hits() as hits:
+        assert similar.get("analyze", "  " + RESUME.lower()) == "analysis"
+        assert hits == []
+        assert similar.get("analyze", TYPO_FIXED) == "analysis"
+    assert hits[0]["namespace"] == "analyze" and 0.95 <= hits[0]["similarity"] < 1.0
+    assert similar.get("analyze", OTHER) is None
+    stats = similar.stats()
+    assert (stats["exact_hits"], stats["approximate_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["max_distance_bits"] == 3 and stats["entries"] == {"analyze": 1}
+
+
+def test_namespaces_and_short_inputs_are_kept_apart():
+    similar = make_cache()
+    similar.set("analyze", RESUME, "analysis")
+    assert similar.get("skills", RESUME) is None
+    similar.set("skills", "Python developer", "short")
+    assert similar.get("skills", "Python developer") is None
+    similar.set("skills", OTHER, "")
+    assert similar.stats()["entries"] == {"analyze": 1, "skills": 0}
+
+
+def test_expired_results_are_misses():
+    cache = TieredCache()
+    similar = SimilarityCache(cache)
+    similar.set("analyze", RESUME, "analysis")
+    cache.memory.clear()
+    assert similar.get("analyze", TYPO_FIXED) is None
+
+
+def test_from_env(monkeypatch):
+    assert SimilarityCache.from_env(None) is None
+    monkeypatch.setenv("AI_SIMILARITY_THRESHOLD", "0.9")
+    assert SimilarityCache.from_env(TieredCache()).max_distance == 6
+    monkeypatch.setenv("AI_SIMILARITY_ENABLED", "false")
+    assert SimilarityCache.from_env(TieredCache()) is None
+
+
+def test_near_duplicate_resume_is_served_from_cache(server):
+    first = server.client.post("/api/ai/analyze-resume", json={"resume_content": RESUME}).get_json()
+    assert "approximate" not in first
+    second = server.client.post("/api/ai/analyze-resume", json={"resume_content": TYPO_FIXED}).get_json()
+    assert second["analysis"] == first["analysis"]
+    assert second["approximate"] is True and second["similarity"] >= 0.95
+    assert server.mock.request_count == 1
+    server.client.post("/api/ai/analyze-resume", json={"resume_content": OTHER})
+    assert server.mock.request_count == 2
+
+
+POSTING = (
+    "Acme Corp is a fast growing logistics company headquartered in Berlin with offices across Europe. We value "
+    "ownership, curiosity and kindness, offer flexible hours, a generous learning budget, thirty days of paid leave and "
+    "a modern office close to the central station. Our teams ship small changes every day and care deeply about the "
+    "people who use our products. You will join the platform group that runs the routing engine, talk to customers "
+    "every week, review designs with peers and help new colleagues settle in quickly. We look for an engineer who "
+    "writes clear code and tests, communicates openly and enjoys mentoring others in a calm environment. Required: {}. "
+    "Applications from every background are welcome and we answer every candidate within two weeks of applying."
+)
+
+
+def test_near_duplicate_posting_keeps_its_own_local_skills(server):
+    first = server.client.post("/api/ai/extract-job-skills", json={"job_description": POSTING.format("Python")}).get_json()
+    assert first["skills"] == ["Python", "mock reply"]
+    # Same boilerplate, another required language: only the LLM's skills are reused
+    second = server.client.post("/api/ai/extract-job-skills", json={"job_description": POSTING.format("PHP")}).get_json()
+    assert second["approximate"] is True
+    assert second["skills"] == ["PHP", "mock reply"]
+    assert server.mock.request_count == 1
+
+
+def test_chunked_and_whole_analyses_are_not_shared(server):
+    server.client.post("/api/ai/analyze-resume", json={"resume_content": RESUME, "chunked": False})
+    chunked = server.client.post("/api/ai/analyze-resume", json={"resume_content": TYPO_FIXED, "chunked": True}).get_json()
+    assert "approximate" not in chunked
+    assert server.mock.request_count == 2
+    again = server.client.post("/api/ai/analyze-resume", json={"resume_content": RESUME, "chunked": True}).get_json()
+    assert again["approximate"] is True and server.mock.request_count == 2
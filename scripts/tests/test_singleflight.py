@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from ai_singleflight import SingleFlight
+
+
+def run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls, results = [], []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return "result"
+
+    run_concurrently(5, lambda: results.append(flight.do("k", work)))
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+    errors = []
+
+    def fail():
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    def call():
+        try:
+            flight.do("k", fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    run_concurrently(3, call)
+    assert errors == ["upstream down"] * 3
+    # The failed call is forgotten, so the next caller tries again
+    assert flight.do("k", lambda: "ok") == "ok"
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_leader_exception_propagates():
+    with pytest.raises(ValueError):
+        SingleFlight().do("k", lambda: int("x"))
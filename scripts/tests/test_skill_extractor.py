@@ -0,0 +1,86 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import skill_extractor
+from conftest import SCRIPTS_DIR, load_script
+from skill_extractor import AhoCorasick, SkillExtractor
+
+CATEGORIES = {
+    "languages": ["Java", "JavaScript", "Go", "C++", "C#"],
+    "web": ["React", "React Native", "Express.js", "Node.js"],
+}
+ALIASES = {"Go": ["Golang"], "Express.js": ["Express"], "JavaScript": ["JS"]}
+
+
+@pytest.fixture(params=["native", "pure-python"])
+def extractor(request, monkeypatch):
+    if request.param == "pure-python":
+        monkeypatch.setattr(skill_extractor, "ahocorasick", None)
+    elif skill_extractor.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+    return SkillExtractor(CATEGORIES, ALIASES, case_sensitive=["Go", "Express", "JS", "React"],
+                          ambiguous=["Go", "Express"], context_words=["framework", "experience"])
+
+
+def test_leftmost_longest_and_word_boundaries(extractor):
+    assert extractor.extract("JavaScript and React Native, not Java-ish Reactor") == ["JavaScript", "React Native", "Java"]
+    assert extractor.extract("C++ and C# required") == ["C++", "C#"]
+
+
+def test_aliases_map_to_canonical_names(extractor):
+    assert extractor.extract("JS, Golang and Node.js") == ["JavaScript", "Go", "Node.js"]
+
+
+def test_case_sensitive_forms(extractor):
+    assert extractor.extract("react quickly; js snippets") == []
+    assert extractor.extract("React") == ["React"]
+
+
+def test_offsets_survive_case_folding_that_changes_length(extractor):
+    text = "İstanbul team uses Node.js"
+    [match] = extractor.find(text)
+    assert text[match.start:match.end] == "Node.js"
+
+
+def test_ambiguous_names_need_technical_context(extractor):
+    assert extractor.extract("Express yourself and Go the extra mile.") == []
+    assert extractor.extract("Express yourself. Stack: Express, Node.js") == ["Express.js", "Node.js"]
+    assert extractor.extract("3 years of Go experience") == ["Go"]
+    assert extractor.extract("Express framework") == ["Express.js"]
+    # Two ambiguous names do not vouch for each other
+    assert extractor.extract("Go Express!") == []
+    matches = extractor.find("Go further.\nGo, React")
+    assert [(m.skill, m.start) for m in matches] == [("Go", 12), ("React", 16)]
+
+
+def test_pure_python_automaton_reports_every_occurrence():
+    automaton = AhoCorasick()
+    for word in ("he", "she", "hers"):
+        automaton.add(word, word)
+    automaton.build()
+    found = sorted((end, value) for end, (_, value) in automaton.iter("ushers"))
+    assert found == [(3, "he"), (3, "she"), (5, "hers")]
+
+
+def test_bundled_data_loads():
+    extractor = SkillExtractor.from_files()
+    assert extractor.extract("Python, Docker and Kubernetes; express yourself") == ["Python", "Docker", "Kubernetes"]
+
+
+def test_export_technologies(tmp_path):
+    exporter = load_script("export-technologies.py", "export_technologies")
+    source = "export const TECHNOLOGIES = {\n  languages: ['Python', 'Go'],\n  web: ['React'],\n};"
+    assert exporter.parse_technologies(source) == {"languages": ["Python", "Go"], "web": ["React"]}
+
+    script = f"{SCRIPTS_DIR}/export-technologies.py"
+    usage = subprocess.run([sys.executable, script, "--help"], capture_output=True, text=True)
+    assert usage.returncode == 0 and "usage:" in usage.stdout
+
+    output = tmp_path / "technologies.json"
+    assert subprocess.run([sys.executable, script, "--output", str(output), "--check"], capture_output=True).returncode == 1
+    assert subprocess.run([sys.executable, script, "--output", str(output)], capture_output=True).returncode == 0
+    assert "categories" in json.loads(output.read_text())
+    assert subprocess.run([sys.executable, script, "--output", str(output), "--check"], capture_output=True).returncode == 0
@@ -0,0 +1,33 @@
+from ai_stream import iter_chat_deltas
+
+RESUME_DATA = {"personalInfo": {"fullName": "Jane Doe"}, "summary": "Engineer", "skills": ["Python"]}
+
+
+def relayed(response):
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    return "".join(iter_chat_deltas(response.response))
+
+
+def test_chat_stream_relays_upstream_events(server):
+    response = server.client.post("/api/ai/chat/stream", json={"messages": [{"role": "user", "content": "hi"}]})
+    assert relayed(response) == "mock reply"
+    assert server.mock.payloads[-1]["stream"] is True
+
+
+def test_enhance_and_cover_letter_streams(server):
+    assert relayed(server.client.post("/api/ai/enhance-resume/stream", json={"resume_data": RESUME_DATA})) == "mock reply"
+    response = server.client.post("/api/ai/generate-cover-letter/stream", json={
+        "resume_data": RESUME_DATA, "job_description": "Backend role", "company_name": "Acme"
+    })
+    assert relayed(response) == "mock reply"
+
+
+def test_stream_validation_and_upstream_errors(server):
+    assert server.client.post("/api/ai/enhance-resume/stream", json={}).status_code == 400
+    assert server.client.post("/api/ai/generate-cover-letter/stream", json={"resume_data": RESUME_DATA}).status_code == 400
+    server.mock.fail_with(400)
+    response = server.client.post("/api/ai/chat/stream", json={"messages": [{"role": "user", "content": "hi"}]})
+    assert response.status_code == 500
+    assert response.get_json()["success"] is False
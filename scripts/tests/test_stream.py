@@ -0,0 +1,55 @@
+from ai_stream import SSEParser, iter_chat_deltas, iter_sse_events
+from ai_transport import PooledTransport, TransportConfig
+from conftest import load_script
+from mock_upstream import MockUpstream
+
+
+def event(content):
+    return ('data: {"choices": [{"delta": {"content": "%s"}}]}\n\n' % content).encode("utf-8")
+
+
+def test_events_split_anywhere():
+    body = b": keep-alive\n\n" + event("Hel") + event("lo") + b"data: [DONE]\n\n"
+    for size in (1, 3, 7, len(body)):
+        chunks = [body[i:i + size] for i in range(0, len(body), size)]
+        assert list(iter_chat_deltas(chunks)) == ["Hel", "lo"]
+
+
+def test_multibyte_character_split_across_chunks():
+    body = event("café ✓")
+    split = body.index("✓".encode("utf-8")) + 1
+    assert list(iter_chat_deltas([body[:split], body[split:]])) == ["café ✓"]
+
+
+def test_crlf_comments_and_multiline_data():
+    parser = SSEParser()
+    assert parser.feed(b": ping\r\ndata: a\r\ndata: b\r\n\r\n") == ["a\nb"]
+    assert parser.feed(b"event: x\ndata:no-space\n") == []
+    assert parser.flush() == ["no-space"]
+
+
+def test_events_without_blank_lines_between_them():
+    body = event("a").rstrip(b"\n") + b"\n" + event("b")
+    assert list(iter_chat_deltas([body])) == ["a", "b"]
+
+
+def test_done_stops_and_bad_payloads_are_skipped():
+    body = b"data: not json\n\n" + event("x") + b"data: [DONE]\n\n" + event("after")
+    assert list(iter_chat_deltas([body])) == ["x"]
+
+
+def test_trailing_event_without_blank_line():
+    assert list(iter_sse_events([b"data: last"])) == ["last"]
+
+
+def test_client_stream_yields_deltas_and_closes_early():
+    client_module = load_script("nvidia-ai-client.py", "nvidia_ai_client")
+    with MockUpstream(reply="one two three four") as mock:
+        transport = PooledTransport(TransportConfig(max_retries=0))
+        client = client_module.NvidiaAIClient(api_key="k", transport=transport, invoke_url=mock.url)
+        messages = [{"role": "user", "content": "hi"}]
+        assert "".join(client.chat_completion_stream(messages)) == "one two three four"
+        stream = client.chat_completion_stream(messages)
+        assert next(stream) == "one "
+        stream.close()
+        transport.close()
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from ai_stream import JSONArrayParser, iter_chat_deltas, iter_json_array_items
+from structured_skills import (
+    TOKENS_PER_SKILL, TypedSkill, iter_typed_skills, structured_skills_max_tokens, to_typed_skill
+)
+
+SKILLS = [
+    {"name": "Python", "type": "technical"},
+    {"name": "Communication", "type": "soft skill"},
+    {"name": "5+ years", "type": "Years"},
+    {"name": "BSc Computer Science", "type": "degree"},
+]
+
+
+def fragments(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_parser_emits_elements_split_anywhere():
+    text = json.dumps(SKILLS)
+    for size in (1, 2, 5, len(text)):
+        parser = JSONArrayParser()
+        items = [item for fragment in fragments(text, size) for item in parser.feed(fragment)]
+        assert items == SKILLS
+        assert parser.done
+
+
+def test_parser_emits_each_object_as_soon_as_it_closes():
+    parser = JSONArrayParser()
+    assert parser.feed('[{"name": "Go"') == []
+    assert parser.feed('}, {"name"') == [{"name": "Go"}]
+
+
+def test_parser_skips_prose_and_keeps_brackets_inside_strings():
+    text = 'Sure! ```json\n[{"name": "C++ [STL]", "type": "x\\"}"}, "plain", 3]``` done'
+    assert list(iter_json_array_items(fragments(text, 3))) == [{"name": "C++ [STL]", "type": 'x"}'}, "plain", 3]
+
+
+def test_parser_drops_invalid_elements_and_ignores_text_after_the_array():
+    parser = JSONArrayParser()
+    assert parser.feed('[{"name": "Go"}, nonsense, {"name": "Rust"}] [{"name": "late"}]') == [
+        {"name": "Go"}, {"name": "Rust"}
+    ]
+
+
+def test_parser_unterminated_array_yields_complete_elements_only():
+    assert list(iter_json_array_items(['[{"name": "Go"}, {"name": "Ru'])) == [{"name": "Go"}]
+
+
+def test_to_typed_skill_normalizes_types():
+    assert [to_typed_skill(item).type for item in SKILLS] == ["technical", "soft", "experience", "education"]
+    assert to_typed_skill("Docker") == TypedSkill("Docker", "technical")
+    assert to_typed_skill({"skill": "SQL", "category": "unknown"}) == TypedSkill("SQL", "technical")
+
+
+@pytest.mark.parametrize("item", [None, 3, {"name": ""}, {"type": "soft"}, {"name": "x" * 81}])
+def test_to_typed_skill_rejects_unusable_items(item):
+    assert to_typed_skill(item) is None
+
+
+def test_iter_typed_skills_deduplicates_and_stops_at_max():
+    items = [{"name": "Python"}, {"name": "python"}, {"name": "Go"}, {"name": "Rust"}]
+    deltas = fragments(json.dumps(items), 4)
+    assert [skill.name for skill in iter_typed_skills(deltas, max_skills=2)] == ["Python", "Go"]
+    assert list(iter_typed_skills(deltas, max_skills=0)) == []
+
+
+def test_iter_typed_skills_stops_consuming_deltas_at_max():
+    consumed = []
+
+    def deltas():
+        for fragment in fragments(json.dumps(SKILLS), 5):
+            consumed.append(fragment)
+            yield fragment
+
+    assert len(list(iter_typed_skills(deltas(), max_skills=1))) == 1
+    assert "".join(consumed).count("}") == 1
+
+
+def test_max_tokens_allows_headroom_per_skill():
+    assert structured_skills_max_tokens(15) == 15 * TOKENS_PER_SKILL + 16
+    assert TOKENS_PER_SKILL >= 32
+
+
+def test_chat_deltas_report_finish_reason():
+    finish = []
+    body = (b'data: {"choices": [{"delta": {"content": "a"}, "finish_reason": null}]}\n\n'
+            b'data: {"choices": [{"delta": {}, "finish_reason": "length"}]}\n\ndata: [DONE]\n\n')
+    assert list(iter_chat_deltas([body], on_finish=finish.append)) == ["a"]
+    assert finish == ["length"]
+
+
+def test_structured_endpoint_returns_typed_skills(server):
+    server.mock.reply = json.dumps(SKILLS)
+    response = server.client.post("/api/ai/extract-job-skills",
+                                  json={"job_description": "Python developer", "structured": True, "max_skills": 3})
+    body = response.get_json()
+    assert body["success"] and body["truncated"] is False
+    assert body["skills"] == ["Python", "Communication", "5+ years"]
+    assert body["typed_skills"][2] == {"name": "5+ years", "type": "experience"}
+    assert server.mock.payloads[-1]["max_tokens"] == structured_skills_max_tokens(3)
+
+
+def long_reply():
+    # The second element is longer than the whole max_tokens budget for two skills
+    filler = " ".join(["word"] * (2 * TOKENS_PER_SKILL + 16))
+    return json.dumps([{"name": "Go", "type": "technical"}, {"name": "Rust", "type": "technical", "note": filler}])
+
+
+def test_truncated_completion_is_reported_and_not_cached(server, capsys):
+    server.mock.reply = long_reply()
+    payload = {"job_description": "Systems engineer", "structured": True, "max_skills": 2}
+    body = server.client.post("/api/ai/extract-job-skills", json=payload).get_json()
+    assert body["typed_skills"] == [{"name": "Go", "type": "technical"}]
+    assert body["truncated"] is True
+    assert "max_tokens" in capsys.readouterr().err
+
+    server.client.post("/api/ai/extract-job-skills", json=payload)
+    assert server.mock.request_count == 2
+
+
+def test_truncation_ends_the_ndjson_stream(server):
+    server.mock.reply = long_reply()
+    response = server.client.post("/api/ai/extract-job-skills/stream",
+                                  json={"job_description": "Systems engineer", "max_skills": 2})
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines == [{"name": "Go", "type": "technical"}, {"truncated": True}]
@@ -0,0 +1,57 @@
+import threading
+
+from ai_transport import PooledTransport, TransportConfig, _parse_statuses
+from mock_upstream import MockUpstream
+
+FAST = dict(connect_timeout=1.0, read_timeout=5.0, max_retries=3, backoff_base=0.01, backoff_max=0.1)
+
+
+def test_server_errors_are_not_retried_by_default(mock_upstream):
+    transport = PooledTransport(TransportConfig(**FAST))
+    mock_upstream.fail_with(500, times=5)
+    response = transport.post(mock_upstream.url, json={"model": "m"})
+    assert response.status_code == 500
+    assert mock_upstream.request_count == 1
+    transport.close()
+
+
+def test_opt_in_retry_statuses(mock_upstream):
+    transport = PooledTransport(TransportConfig(retry_statuses=frozenset({502}), **FAST))
+    mock_upstream.fail_with(502, times=2)
+    assert transport.post(mock_upstream.url, json={"model": "m"}).status_code == 200
+    assert mock_upstream.request_count == 3
+    transport.close()
+
+
+def test_retry_listeners_see_each_retry(mock_upstream):
+    transport = PooledTransport(TransportConfig(**FAST))
+    reasons, delays = [], []
+    transport.retry_listeners.append(reasons.append)
+    transport.rate_limit_listeners.append(delays.append)
+    mock_upstream.fail_with(429, times=1, retry_after="0")
+    mock_upstream.fail_with(503, times=1)
+    assert transport.post(mock_upstream.url, json={"model": "m"}).status_code == 200
+    assert reasons == ["429", "503"]
+    assert delays == [0.0]
+    transport.close()
+
+
+def test_call_beyond_pool_size_does_not_wait_for_a_held_connection():
+    with MockUpstream(token_delay=0.5) as mock:
+        transport = PooledTransport(TransportConfig(default_pool_size=1, **FAST))
+        # An open stream holds the only pooled connection
+        held = transport.post(mock.url, json={"model": "m", "stream": True}, stream=True)
+        done = threading.Event()
+
+        def second():
+            transport.post(mock.url, json={"model": "m"}).raise_for_status()
+            done.set()
+
+        threading.Thread(target=second, daemon=True).start()
+        assert done.wait(2.0)
+        held.close()
+        transport.close()
+
+
+def test_parse_statuses():
+    assert _parse_statuses("429, 503,x,") == frozenset({429, 503})
@@ -0,0 +1,114 @@
+import json
+
+import numpy as np
+import pytest
+
+from vector_index import DimensionMismatchError, HashingEmbedder, SemanticIndex, VectorIndex
+
+
+def unit(dim, axis):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[axis] = 1.0
+    return vector
+
+
+def test_search_returns_nearest_first(tmp_path):
+    index = VectorIndex(str(tmp_path / "jobs"), dim=4)
+    index.add(["a", "b", "c"], np.stack([unit(4, 0), unit(4, 1), unit(4, 0) + unit(4, 1)]))
+    [row] = index.search(unit(4, 0), k=2)
+    assert [item for item, _ in row] == ["a", "c"]
+    assert row[0][1] == pytest.approx(1.0)
+
+
+def test_re_adding_an_id_replaces_its_vector(tmp_path):
+    index = VectorIndex(str(tmp_path / "jobs"), dim=4, chunk_rows=2)
+    index.add(["a", "b"], np.stack([unit(4, 0), unit(4, 1)]))
+    index.add(["a"], unit(4, 2)[None])
+    assert len(index) == 2
+    [row] = index.search(unit(4, 0), k=10)
+    assert sorted(item for item, _ in row) == ["a", "b"]
+    [row] = index.search(unit(4, 2), k=1)
+    assert row[0] == ("a", pytest.approx(1.0))
+
+
+def test_ivf_search_skips_superseded_rows(tmp_path):
+    index = VectorIndex(str(tmp_path / "jobs"), dim=4)
+    index.add(["a", "b", "c"], np.stack([unit(4, 0), unit(4, 1), unit(4, 2)]))
+    index.build_ivf(n_lists=3)
+    index.add(["b"], unit(4, 3)[None])
+    [row] = index.search(unit(4, 1), k=3, nprobe=3)
+    assert [item for item, _ in row].count("b") == 1
+    assert dict(row)["b"] == pytest.approx(0.0)
+
+
+def test_torn_write_is_truncated_and_later_adds_stay_aligned(tmp_path):
+    path = str(tmp_path / "jobs")
+    index = VectorIndex(path, dim=4)
+    index.add(["a"], unit(4, 0)[None])
+    # A writer crashed after appending its vectors but before (fully) appending the ids
+    with open(f"{path}.vec", "ab") as f:
+        f.write(np.stack([unit(4, 1), unit(4, 2)]).astype(np.float32).tobytes())
+    with open(f"{path}.ids", "a", encoding="utf-8") as f:
+        f.write(json.dumps("lost"))
+
+    reopened = VectorIndex(path, dim=4)
+    assert len(reopened) == 1
+    reopened.add(["d"], unit(4, 3)[None])
+    [row] = reopened.search(unit(4, 3), k=1)
+    assert row[0] == ("d", pytest.approx(1.0))
+    with open(f"{path}.ids", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == ["a", "d"]
+
+
+def test_dimension_mismatch_raises_specific_error(tmp_path):
+    VectorIndex(str(tmp_path / "jobs"), dim=4)
+    with pytest.raises(DimensionMismatchError):
+        VectorIndex(str(tmp_path / "jobs"), dim=8)
+
+
+def test_semantic_index_text_round_trip(tmp_path):
+    index = SemanticIndex(str(tmp_path / "jobs"), embedder=HashingEmbedder(dim=64))
+    index.add_texts(["py", "fe"], ["python django developer", "react typescript frontend"])
+    [row] = index.search_texts(["senior python developer"], k=1)
+    assert row[0][0] == "py"
+
+
+def test_server_disables_semantic_search_on_dimension_mismatch(server, monkeypatch, tmp_path):
+    path = str(tmp_path / "other-index" / "jobs")
+    VectorIndex(path, dim=7)
+    monkeypatch.setenv("AI_VECTOR_INDEX_PATH", path)
+    index, reason = server.open_semantic_index()
+    assert index is None and "dim 7" in reason
+    monkeypatch.setattr(server, "semantic_index", None)
+    monkeypatch.setattr(server, "semantic_index_unavailable", reason)
+    response = server.client.post("/api/ai/semantic/search", json={"query": "python"})
+    assert response.status_code == 501
+    assert "dim 7" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("k, nprobe", [(0, None), (-1, None), (2, 0), (2, -3)])
+def test_search_rejects_non_positive_k_and_nprobe(tmp_path, k, nprobe):
+    index = VectorIndex(str(tmp_path / "jobs"), dim=4)
+    index.add(["a", "b"], np.stack([unit(4, 0), unit(4, 1)]))
+    with pytest.raises(ValueError):
+        index.search(unit(4, 0), k=k, nprobe=nprobe)
+
+
+@pytest.mark.parametrize("body", [
+    {"top_k": 0}, {"top_k": -1}, {"top_k": "3"}, {"top_k": 2.5}, {"top_k": True}, {"top_k": None},
+    {"nprobe": 0}, {"nprobe": "many"}, {"nprobe": 1.5},
+])
+def test_semantic_search_rejects_invalid_top_k_and_nprobe(server, body):
+    response = server.client.post("/api/ai/semantic/search", json={"query": "python", **body})
+    assert response.status_code == 400
+    assert "must be a positive integer" in response.get_json()["error"]
+
+
+def test_semantic_search_returns_at_most_top_k(server):
+    server.client.post("/api/ai/semantic/index", json={"items": [
+        {"id": "py", "text": "python django developer"}, {"id": "fe", "text": "react typescript frontend"},
+        {"id": "go", "text": "go backend engineer"},
+    ]})
+    response = server.client.post("/api/ai/semantic/search", json={"query": "python developer", "top_k": 2})
+    [row] = response.get_json()["results"]
+    assert len(row) == 2 and row[0]["id"] == "py"
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped embedding index for job descriptions and resumes
+Vectors live in a flat float32/float16 file read through np.memmap, with a JSONL
+ID sidecar, so several worker processes share the same OS page cache instead of
+each loading the corpus into RAM.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: appends are only serialized within one process
+    fcntl = None
+
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+
+class DimensionMismatchError(ValueError):
+    """The index on disk was built with a different embedding dimension than requested"""
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder: signed feature hashing of unigrams and bigrams
+
+    Needs no model or network, and gives the same vector in every process
+    (it uses blake2b rather than Python's randomized hash()).
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        tokens = TOKEN_RE.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                sign = 1.0 if digest & 1 else -1.0
+                vectors[row, (digest >> 1) % self.dim] += sign
+        return normalize(vectors)
+
+
+class NvidiaEmbedder:
+    """Embeddings from the NVIDIA /v1/embeddings API, using the shared pooled transport"""
+
+    name = "nvidia"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "nvidia/nv-embedqa-e5-v5",
+        dim: int = 1024,
+        url: str = "https://integrate.api.nvidia.com/v1/embeddings",
+        input_type: str = "passage"
+    ):
+        from ai_transport import get_default_transport
+
+        self.api_key = api_key or os.getenv("NVIDIA_API_KEY")
+        if not self.api_key:
+            raise ValueError("NVIDIA API key is required for NvidiaEmbedder")
+        self.model = model
+        self.dim = dim
+        self.url = url
+        self.input_type = input_type
+        self.transport = get_default_transport()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        response = self.transport.post(
+            self.url,
+            headers={"Authorization": f"Bearer {self.api_key}", "Accept": "application/json"},
+            json={"model": self.model, "input": list(texts), "input_type": self.input_type, "encoding_format": "float"}
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return normalize(np.asarray([item["embedding"] for item in data], dtype=np.float32))
+
+
+def get_embedder(dim: int = 384):
+    """NvidiaEmbedder when AI_EMBEDDER=nvidia and a key is set, else the local hashing fallback"""
+    if os.getenv("AI_EMBEDDER", "hashing").lower() == "nvidia" and os.getenv("NVIDIA_API_KEY"):
+        return NvidiaEmbedder(dim=int(os.getenv("AI_EMBEDDING_DIM", 1024)))
+    return HashingEmbedder(dim)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _top_k_merge(best_scores, best_rows, scores, rows, k):
+    scores = np.hstack([best_scores, scores])
+    rows = np.hstack([best_rows, rows])
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, keep, axis=1)
+        rows = np.take_along_axis(rows, keep, axis=1)
+    return scores, rows
+
+
+class VectorIndex:
+    """
+    Append-only, memory-mapped vector index with brute-force or IVF top-k search
+
+    Files: <path>.vec (row-major vectors), <path>.ids (one JSON id per line),
+    <path>.meta.json (dim, dtype) and optionally <path>.ivf.npz (IVF centroids and lists).
+    Adding an id again is an upsert: the latest row for an id wins and older rows are
+    skipped by search.
+    """
+
+    def __init__(self, path: str, dim: int, dtype: str = "float32", chunk_rows: int = 65536):
+        """
+        Open or create an index
+
+        Args:
+            path: File prefix for the index files
+            dim: Vector dimension
+            dtype: Storage type, "float32" or "float16" (half the disk and page cache)
+            chunk_rows: Rows scored per block during brute-force search
+        """
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._latest: Dict[str, int] = {}  # id -> row of its current vector
+        self._live: Optional[np.ndarray] = None  # row mask, False for superseded rows
+        self._matrix: Optional[np.memmap] = None
+        self._ivf: Optional[Tuple[np.ndarray, List[np.ndarray]]] = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        meta_path = f"{path}.meta.json"
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["dim"] != dim:
+                raise DimensionMismatchError(f"Index at {path} has dim {meta['dim']}, expected {dim}")
+            dtype = meta["dtype"]
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": dim, "dtype": dtype}, f)
+            open(f"{path}.vec", "ab").close()
+            open(f"{path}.ids", "ab").close()
+
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self._row_bytes = self.dim * self.dtype.itemsize
+        with self._locked_files() as (vec_file, id_file):
+            self._repair(vec_file, id_file)
+        self.refresh()
+
+    def __len__(self) -> int:
+        """Number of distinct ids"""
+        return len(self._latest)
+
+    @contextmanager
+    def _locked_files(self):
+        """The vector and ID files opened for appending, under an exclusive lock across processes"""
+        with open(f"{self.path}.vec", "ab") as vec_file, open(f"{self.path}.ids", "ab") as id_file:
+            if fcntl is not None:
+                fcntl.flock(vec_file, fcntl.LOCK_EX)
+            try:
+                yield vec_file, id_file
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(vec_file, fcntl.LOCK_UN)
+
+    def _repair(self, vec_file, id_file) -> None:
+        """
+        Truncate both files to the rows that have a vector and a complete ID line
+
+        A writer that crashed between the two writes leaves extra vectors (or a torn ID line);
+        appending after them would pair every later ID with the wrong vector.
+        """
+        with open(f"{self.path}.ids", "rb") as f:
+            lines = f.read().split(b"\n")[:-1]
+        vec_rows = os.fstat(vec_file.fileno()).st_size // self._row_bytes
+        rows = min(vec_rows, len(lines))
+        id_bytes = sum(len(line) + 1 for line in lines[:rows])
+        if os.fstat(id_file.fileno()).st_size != id_bytes:
+            id_file.truncate(id_bytes)
+        if os.fstat(vec_file.fileno()).st_size != rows * self._row_bytes:
+            vec_file.truncate(rows * self._row_bytes)
+
+    def refresh(self) -> None:
+        """Pick up rows appended by other processes"""
+        rows = os.path.getsize(f"{self.path}.vec") // self._row_bytes
+        if self._matrix is not None and rows == len(self._ids):
+            return
+        with open(f"{self.path}.ids", encoding="utf-8") as f:
+            # Ignore a trailing line another process is still writing
+            ids = [json.loads(line) for line in f.read().split("\n")[:-1] if line]
+        rows = min(rows, len(ids))
+        ids = ids[:rows]
+        latest = {item: row for row, item in enumerate(ids)}
+        live = np.zeros(rows, dtype=bool)
+        live[list(latest.values())] = True
+        with self._lock:
+            self._ids = ids
+            self._latest = latest
+            self._live = live
+            self._matrix = (
+                np.memmap(f"{self.path}.vec", dtype=self.dtype, mode="r", shape=(rows, self.dim)) if rows else None
+            )
+            ivf_path = f"{self.path}.ivf.npz"
+            if os.path.exists(ivf_path):
+                data = np.load(ivf_path)
+                lists = [data[f"list_{i}"] for i in range(len(data["centroids"]))]
+                self._ivf = (data["centroids"], lists)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Append vectors and their IDs, replacing the vectors of IDs already in the index
+
+        Vectors are L2-normalized before storage so search scores are cosine similarities.
+        """
+        vectors = normalize(np.asarray(vectors, dtype=np.float32)).astype(self.dtype)
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"Expected {len(ids)} vectors of dim {self.dim}, got {vectors.shape}")
+
+        with self._locked_files() as (vec_file, id_file):
+            self._repair(vec_file, id_file)
+            # Vectors first: readers only expose rows that also have an ID
+            vec_file.write(vectors.tobytes())
+            vec_file.flush()
+            id_file.write("".join(json.dumps(str(item)) + "\n" for item in ids).encode("utf-8"))
+            id_file.flush()
+        self.refresh()
+
+    def build_ivf(self, n_lists: int = 256, iterations: int = 10, sample: int = 100000, seed: int = 0) -> None:
+        """
+        Cluster the stored vectors into n_lists inverted lists (spherical k-means)
+
+        Rows appended later are still searched (brute force) until the IVF is rebuilt.
+        """
+        self.refresh()
+        if self._matrix is None:
+            return
+        rng = np.random.default_rng(seed)
+        rows = len(self._ids)
+        n_lists = min(n_lists, rows)
+        sample_rows = np.sort(rng.choice(rows, size=min(sample, rows), replace=False))
+        data = np.asarray(self._matrix[sample_rows], dtype=np.float32)
+        centroids = data[rng.choice(len(data), size=n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            for cluster in range(n_lists):
+                members = data[assignment == cluster]
+                if len(members):
+                    centroids[cluster] = members.mean(axis=0)
+            centroids = normalize(centroids)
+
+        assignment = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, self.chunk_rows):
+            block = np.asarray(self._matrix[start:start + self.chunk_rows], dtype=np.float32)
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        lists = {f"list_{i}": np.flatnonzero(assignment == i).astype(np.int64) for i in range(n_lists)}
+        np.savez(f"{self.path}.ivf.npz", centroids=centroids, **lists)
+        self.refresh()
+        with self._lock:
+            self._ivf = (centroids, [lists[f"list_{i}"] for i in range(n_lists)])
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k nearest neighbours by cosine similarity for a batch of queries
+
+        Args:
+            queries: Q x dim query vectors
+            k: Neighbours per query
+            nprobe: Search only the nprobe closest IVF lists (requires build_ivf); None for exact brute force
+
+        Returns:
+            For each query, [(id, score)] sorted by descending score
+
+        Raises:
+            ValueError: If k or nprobe is less than 1
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        if nprobe is not None and nprobe < 1:
+            raise ValueError(f"nprobe must be at least 1, got {nprobe}")
+        self.refresh()
+        queries = normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        with self._lock:
+            matrix, ids, ivf, live, distinct = self._matrix, self._ids, self._ivf, self._live, len(self._latest)
+        if matrix is None:
+            return [[] for _ in queries]
+
+        k = min(k, distinct)
+        if nprobe is not None and ivf is not None:
+            centroids, lists = ivf
+            indexed = sum(len(rows) for rows in lists)
+            probes = np.argsort(-(queries @ centroids.T), axis=1)[:, :nprobe]
+            output = []
+            for query, probe in zip(queries, probes):
+                # Rows appended after the IVF was built are always scanned
+                rows = np.sort(np.concatenate([lists[p] for p in probe] + [np.arange(indexed, len(ids))]))
+                rows = rows[rows < len(ids)]
+                rows = rows[live[rows]]
+                scores = np.asarray(matrix[rows], dtype=np.float32) @ query
+                top = np.argsort(-scores, kind="stable")[:k]
+                output.append([(ids[rows[i]], float(scores[i])) for i in top])
+            return output
+
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(ids), self.chunk_rows):
+            block = np.asarray(matrix[start:start + self.chunk_rows], dtype=np.float32)
+            scores = queries @ block.T
+            scores[:, ~live[start:start + len(block)]] = -np.inf
+            rows = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            best_scores, best_rows = _top_k_merge(best_scores, best_rows, scores, rows, k)
+
+        output = []
+        for scores, rows in zip(best_scores, best_rows):
+            order = np.argsort(-scores, kind="stable")
+            output.append([(ids[rows[i]], float(scores[i])) for i in order])
+        return output
+
+
+class SemanticIndex:
+    """A VectorIndex paired with an embedder: add and search by text"""
+
+    def __init__(self, path: str, embedder=None, dtype: str = "float16"):
+        self.embedder = embedder or get_embedder()
+        self.index = VectorIndex(path, self.embedder.dim, dtype=dtype)
+
+    def add_texts(self, ids: Sequence[str], texts: Sequence[str], batch_size: int = 256) -> None:
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            self.index.add(ids[start:start + batch_size], self.embedder.embed(batch))
+
+    def search_texts(self, texts: Sequence[str], k: int = 10, nprobe: Optional[int] = None) -> List[List[Tuple[str, float]]]:
+        return self.index.search(self.embedder.embed(texts), k=k, nprobe=nprobe)